@@ -0,0 +1,196 @@
+"""
+Registro de consultas lentas con captura automática del plan de ejecución
+
+Cada sentencia que supera SLOW_QUERY_MS se guarda en un buffer circular con
+su SQL normalizado, la forma de los parámetros, el método del repositorio
+que la lanzó y su duración. La primera vez que aparece una forma de
+sentencia se ejecuta EXPLAIN / EXPLAIN QUERY PLAN sobre ella y el plan se
+reutiliza para las siguientes apariciones. El EXPLAIN corre en la conexión
+de la petición dentro de un SAVEPOINT: si falla, la transacción de la
+petición sigue intacta (en PostgreSQL un error la abortaría entera).
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config.entorno import _env_bool
+from app.config.presupuesto_consultas import normalizar_sql
+
+# Umbral en milisegundos a partir del cual una consulta se considera lenta
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+
+# Tamaño del buffer circular de consultas lentas
+SLOW_QUERY_BUFFER = int(os.getenv("SLOW_QUERY_BUFFER", 200))
+
+# Capturar el plan de ejecución de cada forma de sentencia lenta
+SLOW_QUERY_EXPLAIN = _env_bool("SLOW_QUERY_EXPLAIN", True)
+
+# Formas distintas de sentencia cuyo plan se conserva
+MAX_PLANES = 500
+
+_PREFIJO_EXPLAIN = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+    "mysql": "EXPLAIN ",
+    "mariadb": "EXPLAIN ",
+}
+
+_SENTENCIAS_EXPLICABLES = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+_SAVEPOINT = "plan_consulta_lenta"
+
+_CARPETA_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CARPETA_REPOSITORIOS = os.path.join(_CARPETA_APP, "repositories")
+
+registros: deque = deque(maxlen=SLOW_QUERY_BUFFER)
+_planes: "OrderedDict[str, list]" = OrderedDict()
+_lock_planes = threading.Lock()
+
+
+# ========== Datos de la consulta ==========
+
+def forma_parametros(parametros: Any, executemany: bool = False) -> Any:
+    """
+    Forma de los parámetros ligados: tipos en lugar de valores, para no
+    guardar datos personales en el registro
+    """
+    if executemany and isinstance(parametros, (list, tuple)):
+        if not parametros:
+            return []
+        return {"filas": len(parametros), "fila": forma_parametros(parametros[0])}
+    if isinstance(parametros, dict):
+        return {clave: type(valor).__name__ for clave, valor in parametros.items()}
+    if isinstance(parametros, (list, tuple)):
+        return [type(valor).__name__ for valor in parametros]
+    return type(parametros).__name__
+
+
+def origen_llamada() -> str:
+    """
+    Método del repositorio (o, en su defecto, del código de la aplicación)
+    que originó la consulta, a partir de la pila de llamadas
+    """
+    marco = sys._getframe(1)
+    primero_app = None
+    while marco is not None:
+        archivo = marco.f_code.co_filename
+        if archivo.startswith(_CARPETA_APP) and not archivo.startswith(os.path.dirname(__file__)):
+            nombre = _nombre_marco(marco)
+            if archivo.startswith(_CARPETA_REPOSITORIOS):
+                return nombre
+            if primero_app is None:
+                primero_app = nombre
+        marco = marco.f_back
+    return primero_app or "desconocido"
+
+
+def _nombre_marco(marco) -> str:
+    modulo = marco.f_globals.get("__name__", "?")
+    funcion = getattr(marco.f_code, "co_qualname", marco.f_code.co_name)
+    instancia = marco.f_locals.get("self")
+    if instancia is not None and "." not in funcion:
+        funcion = f"{type(instancia).__name__}.{funcion}"
+    return f"{modulo}.{funcion}"
+
+
+def _explicar(conn, cursor, sentencia: str, parametros: Any, executemany: bool) -> list:
+    """
+    Ejecutar el EXPLAIN del dialecto con un cursor DBAPI aparte (sin pasar
+    por los eventos del motor), dentro de un SAVEPOINT si hay una
+    transacción abierta, y devolver las filas del plan como texto
+    """
+    prefijo = _PREFIJO_EXPLAIN.get(conn.dialect.name)
+    if prefijo is None:
+        return [f"EXPLAIN no soportado para {conn.dialect.name}"]
+    if not sentencia.lstrip().upper().startswith(_SENTENCIAS_EXPLICABLES):
+        return []
+    if executemany and isinstance(parametros, (list, tuple)):
+        parametros = parametros[0] if parametros else ()
+
+    cursor_plan = cursor.connection.cursor()
+    savepoint = conn.in_transaction()
+    try:
+        if savepoint:
+            cursor_plan.execute(f"SAVEPOINT {_SAVEPOINT}")
+        try:
+            cursor_plan.execute(prefijo + sentencia, parametros or ())
+            plan = [" | ".join(str(valor) for valor in fila) for fila in cursor_plan.fetchall()]
+        except Exception as e:
+            if savepoint:
+                cursor_plan.execute(f"ROLLBACK TO SAVEPOINT {_SAVEPOINT}")
+            plan = [f"Error al obtener el plan: {e}"]
+        if savepoint:
+            cursor_plan.execute(f"RELEASE SAVEPOINT {_SAVEPOINT}")
+        return plan
+    except Exception as e:
+        return [f"Error al obtener el plan: {e}"]
+    finally:
+        cursor_plan.close()
+
+
+def _plan(conn, cursor, forma: str, sentencia: str, parametros: Any, executemany: bool) -> Optional[list]:
+    """Plan de la forma de sentencia, calculado solo la primera vez"""
+    if not SLOW_QUERY_EXPLAIN:
+        return None
+    with _lock_planes:
+        if forma in _planes:
+            _planes.move_to_end(forma)
+            return _planes[forma]
+    plan = _explicar(conn, cursor, sentencia, parametros, executemany)
+    with _lock_planes:
+        _planes[forma] = plan
+        while len(_planes) > MAX_PLANES:
+            _planes.popitem(last=False)
+    return plan
+
+
+# ========== Eventos del motor ==========
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("lentas_inicio", []).append(time.perf_counter())
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("lentas_inicio")
+    if not inicios:
+        return
+    duracion_ms = (time.perf_counter() - inicios.pop()) * 1000
+    if duracion_ms < SLOW_QUERY_MS:
+        return
+
+    forma = normalizar_sql(statement)
+    registros.append({
+        "fecha": datetime.now().isoformat(),
+        "duracion_ms": round(duracion_ms, 3),
+        "sql": forma,
+        "parametros": forma_parametros(parameters, executemany),
+        "origen": origen_llamada(),
+        "motor": conn.engine.url.render_as_string(hide_password=True),
+        "plan": _plan(conn, cursor, forma, statement, parameters, executemany)
+    })
+
+
+def registrar(motor: Engine) -> None:
+    """Activar el registro de consultas lentas en un motor"""
+    event.listen(motor, "before_cursor_execute", _antes_de_ejecutar)
+    event.listen(motor, "after_cursor_execute", _despues_de_ejecutar)
+
+
+def obtener(limite: int = 50) -> list[dict]:
+    """Consultas lentas registradas, de la más reciente a la más antigua"""
+    return list(reversed(registros))[:limite]
+
+
+def limpiar() -> None:
+    """Vaciar el buffer y los planes guardados"""
+    registros.clear()
+    with _lock_planes:
+        _planes.clear()
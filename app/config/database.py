@@ -2,24 +2,183 @@
 Configuración de la base de datos
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.schema import AddConstraint, CreateColumn
+from sqlalchemy.sql.dml import UpdateBase
 import os
+import random
+import sqlite3
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from http.cookies import SimpleCookie
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Tras load_dotenv: el registro de consultas lentas lee su umbral del entorno
+from app.config import consultas_lentas
+from app.config.entorno import _env_bool
+
 # URL de la base de datos
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./hotel_reservas.db")
 
+# Réplicas de solo lectura (URLs separadas por comas)
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+
+# Segundos que un cliente sigue leyendo del motor principal después de
+# escribir (cookie COOKIE_ESCRITURA): debe cubrir el retraso de las réplicas
+REPLICA_LECTURA_PROPIA_SEGUNDOS = float(os.getenv("REPLICA_LECTURA_PROPIA_SEGUNDOS", 5))
+COOKIE_ESCRITURA = "db_escritura"
+
+
+# Pool de conexiones (motores servidor: PostgreSQL, MySQL...)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+
+# Modo asíncrono (AsyncEngine/AsyncSession para las rutas de lectura)
+DB_ASYNC = _env_bool("DB_ASYNC", False)
+
+# PRAGMAs de SQLite aplicados a cada conexión nueva
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", -64000))  # negativo = KiB
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 268435456))
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000))  # milisegundos
+
+
+def _es_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _es_sqlite_memoria(url: str) -> bool:
+    return _es_sqlite(url) and (":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite+pysqlite:"))
+
+
+def _aplicar_pragmas_sqlite(dbapi_connection, memoria: bool, solo_lectura: bool = False) -> None:
+    """
+    Aplicar los PRAGMAs de rendimiento a una conexión SQLite
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        # WAL permite que los reportes lean mientras se escriben reservas
+        if not memoria:
+            cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+        if solo_lectura:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def engine_kwargs(url: str) -> dict:
+    """
+    Argumentos de create_engine según el motor de base de datos
+    """
+    if _es_sqlite(url):
+        return {
+            "connect_args": {
+                "check_same_thread": False,
+                "timeout": SQLITE_BUSY_TIMEOUT / 1000
+            }
+        }
+
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING
+    }
+
+
+def crear_engine(url: str, solo_lectura: bool = False, **kwargs) -> Engine:
+    """
+    Crear un motor con la configuración de pool y PRAGMAs del entorno
+    """
+    opciones = engine_kwargs(url)
+    opciones.update(kwargs)
+    nuevo_engine = create_engine(url, **opciones)
+
+    if _es_sqlite(url):
+        memoria = _es_sqlite_memoria(url)
+
+        @event.listens_for(nuevo_engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            _aplicar_pragmas_sqlite(dbapi_connection, memoria, solo_lectura)
+
+    consultas_lentas.registrar(nuevo_engine)
+    return nuevo_engine
+
+
 # Crear motor de base de datos
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+engine = crear_engine(DATABASE_URL)
+
+# Motores de las réplicas de solo lectura
+replica_engines = [crear_engine(url, solo_lectura=True) for url in DATABASE_REPLICA_URLS]
+
+
+# Petición HTTP en curso (LecturaPropiaMiddleware): hora de la última
+# escritura del cliente según su cookie y si esta petición escribió
+_peticion: ContextVar[Optional[dict]] = ContextVar("peticion_db", default=None)
+
+
+class RoutingSession(Session):
+    """
+    Sesión que enruta las lecturas a las réplicas cuando se marcó como de
+    solo lectura (info["solo_lectura"]). Cualquier escritura va al motor
+    principal y deja la sesión fija en él, para que las lecturas siguientes
+    vean lo que se acaba de escribir. Entre peticiones, esa garantía la da
+    LecturaPropiaMiddleware.
+
+    La réplica se elige al crear la sesión: todas sus lecturas van a la
+    misma y ven un mismo estado.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = random.choice(replica_engines) if replica_engines else None
+
+    def marcar_escritura(self) -> None:
+        """Fijar la sesión (y la petición en curso) en el motor principal"""
+        self.info["escritura"] = True
+        peticion = _peticion.get()
+        if peticion is not None:
+            peticion["escritura"] = True
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if isinstance(clause, UpdateBase):
+            self.marcar_escritura()
+
+        if (
+            self.replica is not None
+            and self.info.get("solo_lectura")
+            and not self.info.get("escritura")
+        ):
+            return self.replica
+
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _escritura_por_flush(session, flush_context, instances):
+    # Las escrituras del ORM pasan por un flush
+    session.marcar_escritura()
+
 
 # Crear sesión
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 # Base declarativa para los modelos
 Base = declarative_base()
@@ -35,3 +194,258 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Drivers asíncronos equivalentes a cada driver síncrono
+_DRIVERS_ASYNC = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql"
+}
+
+
+def url_async(url: str) -> str:
+    """
+    Convertir una URL de base de datos a su driver asíncrono
+    """
+    esquema, separador, resto = url.partition("://")
+    return f"{_DRIVERS_ASYNC.get(esquema, esquema)}{separador}{resto}"
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", url_async(DATABASE_URL))
+
+async_engine = None
+AsyncSessionLocal = None
+
+
+def crear_async_engine(url: str, **kwargs):
+    """
+    Crear un AsyncEngine con la misma configuración de pool y PRAGMAs
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    opciones = engine_kwargs(url)
+    opciones.update(kwargs)
+    nuevo_engine = create_async_engine(url, **opciones)
+
+    if _es_sqlite(url):
+        memoria = _es_sqlite_memoria(url)
+
+        @event.listens_for(nuevo_engine.sync_engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            _aplicar_pragmas_sqlite(dbapi_connection, memoria)
+
+    consultas_lentas.registrar(nuevo_engine.sync_engine)
+    return nuevo_engine
+
+
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine = crear_async_engine(ASYNC_DATABASE_URL)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+
+# Dependencia para obtener la sesión asíncrona de BD
+async def get_async_db():
+    """
+    Generador de sesión asíncrona de base de datos (requiere DB_ASYNC)
+    """
+    if AsyncSessionLocal is None:
+        raise RuntimeError("El modo asíncrono no está habilitado (DB_ASYNC)")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _escritura_reciente() -> bool:
+    """El cliente de la petición en curso escribió hace menos del margen"""
+    peticion = _peticion.get()
+    if peticion is None or peticion["ultima_escritura"] is None:
+        return False
+    return time.time() - peticion["ultima_escritura"] < REPLICA_LECTURA_PROPIA_SEGUNDOS
+
+
+# Dependencia para rutas de solo lectura (reportes y listados)
+def get_db_lectura():
+    """
+    Generador de sesión que lee de las réplicas si están configuradas (del
+    principal si el cliente acaba de escribir)
+    """
+    db = SessionLocal(info={"solo_lectura": not _escritura_reciente()})
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _leer_cookie_escritura(scope) -> Optional[float]:
+    for nombre, valor in scope["headers"]:
+        if nombre == b"cookie":
+            galleta = SimpleCookie()
+            galleta.load(valor.decode("latin-1"))
+            if COOKIE_ESCRITURA in galleta:
+                try:
+                    return float(galleta[COOKIE_ESCRITURA].value)
+                except ValueError:
+                    return None
+    return None
+
+
+class LecturaPropiaMiddleware:
+    """
+    Middleware ASGI que extiende la lectura de lo propio a las peticiones
+    siguientes: la respuesta a una petición que escribió lleva la cookie
+    COOKIE_ESCRITURA con la hora, y mientras no pasen
+    REPLICA_LECTURA_PROPIA_SEGUNDOS las lecturas de ese cliente van al motor
+    principal en vez de a una réplica que quizá aún no tiene el cambio
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not replica_engines:
+            await self.app(scope, receive, send)
+            return
+
+        peticion = {"ultima_escritura": _leer_cookie_escritura(scope), "escritura": False}
+        token = _peticion.set(peticion)
+
+        async def send_con_cookie(mensaje):
+            if mensaje["type"] == "http.response.start" and peticion["escritura"]:
+                galleta = (
+                    f"{COOKIE_ESCRITURA}={time.time():.3f}; Max-Age={int(REPLICA_LECTURA_PROPIA_SEGUNDOS) + 1}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                mensaje = {**mensaje, "headers": [*mensaje.get("headers", []), (b"set-cookie", galleta.encode())]}
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, send_con_cookie)
+        finally:
+            _peticion.reset(token)
+
+
+def snapshot_sqlite(destino: str, origen_url: str = None) -> str:
+    """
+    Copiar la base SQLite principal a un archivo que puede usarse como
+    réplica de solo lectura (API de backup de sqlite3, consistente en caliente)
+    """
+    origen_url = origen_url or DATABASE_URL
+    if not _es_sqlite(origen_url) or _es_sqlite_memoria(origen_url):
+        raise ValueError("La copia instantánea solo está disponible para bases SQLite en archivo")
+
+    origen = sqlite3.connect(origen_url.split("///", 1)[1])
+    copia = sqlite3.connect(destino)
+    try:
+        origen.backup(copia)
+    finally:
+        copia.close()
+        origen.close()
+    return destino
+
+
+def get_pool_status(motor: Engine = None) -> dict:
+    """
+    Estadísticas del pool de conexiones
+    """
+    motor = motor or engine
+    pool = motor.pool
+    estado = {
+        "motor": motor.dialect.name,
+        "pool": type(pool).__name__,
+        "estado": pool.status()
+    }
+    for metrica in ("size", "checkedin", "checkedout", "overflow"):
+        funcion = getattr(pool, metrica, None)
+        if callable(funcion):
+            estado[metrica] = funcion()
+    return estado
+
+
+def a_utc(momento: datetime) -> datetime:
+    """
+    Instante con zona UTC. Las columnas DateTime(timezone=True) vuelven sin
+    zona desde SQLite, donde se guardan en UTC
+    """
+    if momento.tzinfo is None:
+        return momento.replace(tzinfo=timezone.utc)
+    return momento
+
+
+# Columnas que las reservas por tipo y de grupo añadieron a una tabla
+# reservas anterior
+COLUMNAS_NUEVAS_RESERVAS = ("tipo", "cantidad", "grupo_id")
+
+
+def _actualizar_reservas(conexion) -> None:
+    """
+    Llevar una tabla reservas creada por una versión anterior al modelo
+    actual: columnas de COLUMNAS_NUEVAS_RESERVAS, habitacion_id opcional y
+    la restricción check_habitacion_o_tipo. No hace nada si ya está al día.
+    """
+    inspector = inspect(conexion)
+    if not inspector.has_table("reservas"):
+        return
+    columnas = {columna["name"]: columna for columna in inspector.get_columns("reservas")}
+    faltan = [nombre for nombre in COLUMNAS_NUEVAS_RESERVAS if nombre not in columnas]
+    habitacion_obligatoria = not columnas["habitacion_id"]["nullable"]
+    if not faltan and not habitacion_obligatoria:
+        return
+
+    tabla = Base.metadata.tables["reservas"]
+    if conexion.dialect.name == "sqlite":
+        # SQLite no quita un NOT NULL ni añade un CHECK con ALTER TABLE: se
+        # crea la tabla nueva y se copian las filas. Con legacy_alter_table
+        # el renombrado no reescribe las claves foráneas de facturas y
+        # asignaciones, que siguen apuntando a "reservas".
+        indices = [indice["name"] for indice in inspector.get_indexes("reservas")]
+        conexion.exec_driver_sql("PRAGMA legacy_alter_table=ON")
+        conexion.exec_driver_sql("ALTER TABLE reservas RENAME TO reservas_anterior")
+        conexion.exec_driver_sql("PRAGMA legacy_alter_table=OFF")
+        for indice in indices:
+            conexion.exec_driver_sql(f"DROP INDEX {indice}")
+        tabla.create(conexion)
+        comunes = ", ".join(nombre for nombre in columnas if nombre in tabla.c)
+        conexion.exec_driver_sql(
+            f"INSERT INTO reservas ({comunes}) SELECT {comunes} FROM reservas_anterior"
+        )
+        conexion.exec_driver_sql("DROP TABLE reservas_anterior")
+        return
+
+    for nombre in faltan:
+        columna = str(CreateColumn(tabla.c[nombre]).compile(dialect=conexion.dialect))
+        for clave in tabla.c[nombre].foreign_keys:
+            columna += f" REFERENCES {clave.column.table.name} ({clave.column.name})"
+        conexion.exec_driver_sql(f"ALTER TABLE reservas ADD COLUMN {columna}")
+    if habitacion_obligatoria:
+        conexion.exec_driver_sql("ALTER TABLE reservas ALTER COLUMN habitacion_id DROP NOT NULL")
+        restriccion = next(r for r in tabla.constraints if r.name == "check_habitacion_o_tipo")
+        conexion.execute(AddConstraint(restriccion))
+
+
+def init_db(motor: Engine = None):
+    """
+    Crear las tablas que no existan y actualizar las que creó una versión
+    anterior.
+
+    create_all no modifica tablas existentes: las columnas nuevas de
+    reservas se aplican con _actualizar_reservas y los índices nuevos se
+    crean si faltan. Ambos pasos son idempotentes, así que actualizar una
+    instalación consiste en arrancar la nueva versión (o llamar a init_db)
+    tras una copia de seguridad de la base.
+    """
+    import app.models  # noqa: F401 - registra los modelos en Base.metadata
+    motor = motor or engine
+    Base.metadata.create_all(bind=motor)
+    with motor.begin() as conexion:
+        _actualizar_reservas(conexion)
+        for tabla in Base.metadata.sorted_tables:
+            for indice in tabla.indexes:
+                indice.create(conexion, checkfirst=True)
@@ -0,0 +1,17 @@
+"""
+Lectura de variables de entorno
+
+Módulo sin dependencias de la aplicación: lo usan tanto database.py como
+los módulos que database.py importa al arrancar (consultas_lentas), sin
+crear importaciones circulares.
+"""
+
+import os
+
+
+def _env_bool(nombre: str, defecto: bool) -> bool:
+    """Leer una variable de entorno booleana"""
+    valor = os.getenv(nombre)
+    if valor is None:
+        return defecto
+    return valor.strip().lower() in ("1", "true", "yes", "si", "on")
@@ -0,0 +1,242 @@
+"""
+Métricas de la API: latencia y estado por ruta, consultas SQL y tiempo de
+base de datos por petición, exportadas en formato de texto de Prometheus
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config.database import _env_bool
+
+# Activar el middleware y los eventos SQL de métricas
+METRICAS_HABILITADAS = _env_bool("METRICAS_HABILITADAS", True)
+
+# Límites superiores (segundos) de los buckets del histograma de latencia
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Etiqueta para peticiones que no coinciden con ninguna ruta (evita cardinalidad infinita)
+RUTA_DESCONOCIDA = "sin_ruta"
+
+# Etiqueta para consultas SQL ejecutadas fuera de una petición (arranque, tareas)
+FUERA_DE_PETICION = ("", "fuera_de_peticion")
+
+# Contadores SQL de la petición en curso: [consultas, segundos]
+_sql_peticion: ContextVar[Optional[list]] = ContextVar("sql_peticion", default=None)
+
+
+class _ContadoresPorHilo:
+    """
+    Contadores fragmentados por hilo: cada hilo escribe solo en su propio
+    diccionario, así el camino caliente no toma ningún lock. La exportación
+    suma todos los fragmentos.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._fragmentos = []
+        self._registro = threading.Lock()
+
+    def fragmento(self) -> dict:
+        """Obtener el fragmento del hilo actual (se crea la primera vez)"""
+        try:
+            return self._local.datos
+        except AttributeError:
+            datos = {"latencia": {}, "estados": {}, "sql": {}}
+            with self._registro:
+                self._fragmentos.append(datos)
+            self._local.datos = datos
+            return datos
+
+    def fragmentos(self) -> list:
+        """Copia de la lista de fragmentos para exportar"""
+        with self._registro:
+            return list(self._fragmentos)
+
+    def reiniciar(self) -> None:
+        """Vaciar todos los contadores"""
+        for datos in self.fragmentos():
+            for tabla in datos.values():
+                tabla.clear()
+
+
+contadores = _ContadoresPorHilo()
+
+
+# ========== Registro ==========
+
+def registrar_peticion(metodo: str, ruta: str, codigo: int, duracion: float, sql: Optional[list]) -> None:
+    """
+    Registrar una petición terminada en el fragmento del hilo actual
+    """
+    datos = contadores.fragmento()
+    clave = (metodo, ruta)
+
+    histograma = datos["latencia"].get(clave)
+    if histograma is None:
+        # buckets + [suma, cuenta]
+        histograma = datos["latencia"][clave] = [0] * (len(BUCKETS_LATENCIA) + 2)
+    indice = bisect_left(BUCKETS_LATENCIA, duracion)
+    if indice < len(BUCKETS_LATENCIA):
+        histograma[indice] += 1
+    histograma[-2] += duracion
+    histograma[-1] += 1
+
+    clave_estado = (metodo, ruta, codigo)
+    datos["estados"][clave_estado] = datos["estados"].get(clave_estado, 0) + 1
+
+    if sql is not None:
+        _sumar_sql(datos, clave, sql[0], sql[1])
+
+
+def _sumar_sql(datos: dict, clave: tuple, consultas: int, segundos: float) -> None:
+    acumulado = datos["sql"].get(clave)
+    if acumulado is None:
+        acumulado = datos["sql"][clave] = [0, 0.0]
+    acumulado[0] += consultas
+    acumulado[1] += segundos
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metricas_inicio", []).append(time.perf_counter())
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("metricas_inicio")
+    if not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+
+    sql = _sql_peticion.get()
+    if sql is not None:
+        sql[0] += 1
+        sql[1] += duracion
+    else:
+        _sumar_sql(contadores.fragmento(), FUERA_DE_PETICION, 1, duracion)
+
+
+def instalar_metricas_sql() -> None:
+    """
+    Registrar los eventos de SQLAlchemy que cuentan consultas y tiempo de BD
+    en todos los motores (principal, réplicas y asíncrono)
+    """
+    if not event.contains(Engine, "before_cursor_execute", _antes_de_ejecutar):
+        event.listen(Engine, "before_cursor_execute", _antes_de_ejecutar)
+        event.listen(Engine, "after_cursor_execute", _despues_de_ejecutar)
+
+
+# ========== Middleware ASGI ==========
+
+class MetricasMiddleware:
+    """
+    Middleware ASGI que mide cada petición HTTP: latencia, código de estado
+    y consultas SQL ejecutadas mientras se atendía
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        sql = [0, 0.0]
+        token = _sql_peticion.set(sql)
+        estado = [500]
+
+        async def send_con_estado(mensaje):
+            if mensaje["type"] == "http.response.start":
+                estado[0] = mensaje["status"]
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, send_con_estado)
+        finally:
+            _sql_peticion.reset(token)
+            ruta = scope.get("route")
+            registrar_peticion(
+                scope["method"],
+                getattr(ruta, "path", RUTA_DESCONOCIDA),
+                estado[0],
+                time.perf_counter() - inicio,
+                sql
+            )
+
+
+# ========== Exportación ==========
+
+def _etiquetas(**valores) -> str:
+    partes = []
+    for nombre, valor in valores.items():
+        texto = str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        partes.append(f'{nombre}="{texto}"')
+    return "{" + ",".join(partes) + "}"
+
+
+def _sumar_fragmentos() -> tuple:
+    latencia, estados, sql = {}, {}, {}
+    for datos in contadores.fragmentos():
+        for clave, valores in list(datos["latencia"].items()):
+            total = latencia.setdefault(clave, [0] * len(valores))
+            for i, valor in enumerate(list(valores)):
+                total[i] += valor
+        for clave, valor in list(datos["estados"].items()):
+            estados[clave] = estados.get(clave, 0) + valor
+        for clave, valores in list(datos["sql"].items()):
+            total = sql.setdefault(clave, [0, 0.0])
+            total[0] += valores[0]
+            total[1] += valores[1]
+    return latencia, estados, sql
+
+
+def exportar_prometheus() -> str:
+    """
+    Generar el texto de exposición de Prometheus con todas las métricas
+    """
+    latencia, estados, sql = _sumar_fragmentos()
+    lineas = [
+        "# HELP http_request_duration_seconds Latencia de las peticiones HTTP por ruta",
+        "# TYPE http_request_duration_seconds histogram"
+    ]
+    for (metodo, ruta), valores in sorted(latencia.items()):
+        acumulado = 0
+        for limite, cuenta in zip(BUCKETS_LATENCIA, valores):
+            acumulado += cuenta
+            lineas.append(
+                f"http_request_duration_seconds_bucket{_etiquetas(method=metodo, route=ruta, le=limite)} {acumulado}"
+            )
+        lineas.append(
+            f"http_request_duration_seconds_bucket{_etiquetas(method=metodo, route=ruta, le='+Inf')} {valores[-1]}"
+        )
+        lineas.append(f"http_request_duration_seconds_sum{_etiquetas(method=metodo, route=ruta)} {valores[-2]}")
+        lineas.append(f"http_request_duration_seconds_count{_etiquetas(method=metodo, route=ruta)} {valores[-1]}")
+
+    lineas += [
+        "# HELP http_requests_total Peticiones HTTP por ruta y código de estado",
+        "# TYPE http_requests_total counter"
+    ]
+    for (metodo, ruta, codigo), cuenta in sorted(estados.items()):
+        lineas.append(f"http_requests_total{_etiquetas(method=metodo, route=ruta, status=codigo)} {cuenta}")
+
+    lineas += [
+        "# HELP db_queries_total Consultas SQL ejecutadas por ruta",
+        "# TYPE db_queries_total counter"
+    ]
+    for (metodo, ruta), (consultas, _) in sorted(sql.items()):
+        lineas.append(f"db_queries_total{_etiquetas(method=metodo, route=ruta)} {consultas}")
+
+    lineas += [
+        "# HELP db_query_duration_seconds_total Tiempo total en base de datos por ruta",
+        "# TYPE db_query_duration_seconds_total counter"
+    ]
+    for (metodo, ruta), (_, segundos) in sorted(sql.items()):
+        lineas.append(f"db_query_duration_seconds_total{_etiquetas(method=metodo, route=ruta)} {segundos}")
+
+    return "\n".join(lineas) + "\n"
@@ -0,0 +1,239 @@
+"""
+Perfilado bajo demanda de peticiones individuales
+
+Un administrador obtiene un token firmado (POST /admin/perfiles/token) y lo
+envía en la cabecera ``X-Perfilado`` o en el parámetro ``perfilado`` de una
+petición real. Esa petición se ejecuta bajo cProfile y el resultado se guarda
+como archivo .pstats descargable. Sin token la petición sigue el camino
+normal: una búsqueda en las cabeceras y una lectura de ContextVar.
+"""
+
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import re
+import time
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import Optional
+from urllib.parse import parse_qs
+
+from fastapi.routing import APIRoute
+from jose import JWTError, jwt
+
+from app.config.database import _env_bool
+from app.config.security import ALGORITHM, SECRET_KEY, TOKEN_TIPO_PERFILADO
+
+# Instalar el middleware y los envoltorios de perfilado
+PERFILADO_HABILITADO = _env_bool("PERFILADO_HABILITADO", True)
+
+# Carpeta donde se guardan los perfiles y cuántos se conservan
+PERFILADO_DIR = os.getenv("PERFILADO_DIR", "./perfiles")
+PERFILADO_MAX = int(os.getenv("PERFILADO_MAX", 20))
+
+# Validez de los tokens de perfilado
+PERFILADO_TOKEN_MINUTOS = int(os.getenv("PERFILADO_TOKEN_MINUTOS", 10))
+
+CABECERA = b"x-perfilado"
+PARAMETRO = "perfilado"
+
+_NOMBRE_VALIDO = re.compile(r"^[\w.-]+\.pstats$")
+
+# Perfiles abiertos por la petición en curso (uno por hilo que la atiende)
+_perfiles_peticion: ContextVar[Optional[list]] = ContextVar("perfiles_peticion", default=None)
+
+
+# ========== Tokens ==========
+
+def crear_token(usuario: str) -> str:
+    """
+    Token firmado que habilita el perfilado durante unos minutos. Lleva
+    ``typ`` para que la autenticación lo rechace como token de acceso
+    """
+    expira = datetime.utcnow() + timedelta(minutes=PERFILADO_TOKEN_MINUTOS)
+    return jwt.encode(
+        {"sub": usuario, "typ": TOKEN_TIPO_PERFILADO, "exp": expira},
+        SECRET_KEY,
+        algorithm=ALGORITHM
+    )
+
+
+def token_valido(token: str) -> bool:
+    """Verificar firma, vigencia y propósito del token"""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return False
+    return payload.get("typ") == TOKEN_TIPO_PERFILADO
+
+
+def _token_de(scope) -> Optional[str]:
+    for nombre, valor in scope["headers"]:
+        if nombre == CABECERA:
+            return valor.decode("latin-1")
+    consulta = scope.get("query_string", b"")
+    if PARAMETRO.encode() in consulta:
+        valores = parse_qs(consulta.decode("latin-1")).get(PARAMETRO)
+        if valores:
+            return valores[0]
+    return None
+
+
+# ========== Almacenamiento ==========
+
+def _guardar(perfiles: list, metodo: str, ruta: str, duracion: float) -> str:
+    """Combinar los perfiles de la petición y guardarlos como .pstats"""
+    os.makedirs(PERFILADO_DIR, exist_ok=True)
+    slug = re.sub(r"[^\w]+", "_", ruta).strip("_") or "raiz"
+    nombre = f"{datetime.now():%Y%m%d_%H%M%S_%f}_{metodo}_{slug}_{int(duracion * 1000)}ms.pstats"
+    estadisticas = pstats.Stats(perfiles[0])
+    for perfil in perfiles[1:]:
+        try:
+            estadisticas.add(perfil)
+        except TypeError:
+            # Perfil de un hilo que no llegó a registrar llamadas
+            pass
+    estadisticas.dump_stats(os.path.join(PERFILADO_DIR, nombre))
+    _recortar()
+    return nombre
+
+
+def _recortar() -> None:
+    archivos = sorted(listar(), key=lambda p: p["nombre"])
+    for perfil in archivos[:-PERFILADO_MAX]:
+        os.remove(os.path.join(PERFILADO_DIR, perfil["nombre"]))
+
+
+def listar() -> list[dict]:
+    """Perfiles guardados"""
+    if not os.path.isdir(PERFILADO_DIR):
+        return []
+    return [
+        {"nombre": nombre, "bytes": os.path.getsize(os.path.join(PERFILADO_DIR, nombre))}
+        for nombre in sorted(os.listdir(PERFILADO_DIR), reverse=True)
+        if _NOMBRE_VALIDO.match(nombre)
+    ]
+
+
+def ruta_perfil(nombre: str) -> Optional[str]:
+    """Ruta del archivo de un perfil guardado (None si no existe o el nombre no es válido)"""
+    if not _NOMBRE_VALIDO.match(nombre):
+        return None
+    ruta = os.path.join(PERFILADO_DIR, nombre)
+    return ruta if os.path.isfile(ruta) else None
+
+
+def resumen(nombre: str, lineas: int = 30) -> Optional[str]:
+    """Texto con las funciones de mayor tiempo acumulado de un perfil"""
+    ruta = ruta_perfil(nombre)
+    if ruta is None:
+        return None
+    salida = io.StringIO()
+    pstats.Stats(ruta, stream=salida).sort_stats("cumulative").print_stats(lineas)
+    return salida.getvalue()
+
+
+# ========== Middleware y endpoints síncronos ==========
+
+def _iniciar(perfil: cProfile.Profile) -> bool:
+    """
+    Activar un perfilador. Desde Python 3.12 cProfile es global al intérprete
+    y solo admite uno activo: si ya hay otro, ese ya cubre este hilo.
+    """
+    try:
+        perfil.enable()
+        return True
+    except ValueError:
+        return False
+
+
+class PerfiladoMiddleware:
+    """
+    Middleware ASGI que perfila las peticiones que traen un token válido.
+    Devuelve el nombre del perfil guardado en la cabecera X-Perfil.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _token_de(scope)
+        if token is None or not token_valido(token):
+            await self.app(scope, receive, send)
+            return
+
+        perfil = cProfile.Profile()
+        if not _iniciar(perfil):
+            # Otra petición se está perfilando: esta sigue sin perfilar
+            await self.app(scope, receive, send)
+            return
+        perfiles = [perfil]
+        marcador = _perfiles_peticion.set(perfiles)
+        inicio = time.perf_counter()
+        inicio_respuesta = []
+
+        async def send_diferido(mensaje):
+            # Retener la cabecera de respuesta hasta saber el nombre del perfil
+            if mensaje["type"] == "http.response.start":
+                inicio_respuesta.append(mensaje)
+                return
+            if mensaje["type"] == "http.response.body" and not mensaje.get("more_body", False) and inicio_respuesta:
+                perfil.disable()
+                ruta = scope.get("route")
+                nombre = _guardar(
+                    perfiles,
+                    scope["method"],
+                    getattr(ruta, "path", scope["path"]),
+                    time.perf_counter() - inicio
+                )
+                cabecera = inicio_respuesta.pop()
+                cabecera["headers"] = list(cabecera.get("headers", [])) + [(b"x-perfil", nombre.encode())]
+                await send(cabecera)
+            elif inicio_respuesta:
+                await send(inicio_respuesta.pop())
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, send_diferido)
+        finally:
+            perfil.disable()
+            _perfiles_peticion.reset(marcador)
+
+
+def _envolver_sincrono(funcion):
+    """
+    Envolver un endpoint síncrono para que, si la petición se está perfilando,
+    también se perfile el hilo del threadpool que lo ejecuta
+    """
+    @wraps(funcion)
+    def envoltorio(*args, **kwargs):
+        perfiles = _perfiles_peticion.get()
+        if perfiles is None:
+            return funcion(*args, **kwargs)
+        perfil = cProfile.Profile()
+        if not _iniciar(perfil):
+            return funcion(*args, **kwargs)
+        perfiles.append(perfil)
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            perfil.disable()
+
+    return envoltorio
+
+
+def instalar_perfilado(app) -> None:
+    """
+    Instalar el middleware y envolver los endpoints síncronos (que FastAPI
+    ejecuta en el threadpool, fuera del hilo del event loop)
+    """
+    for ruta in app.routes:
+        if isinstance(ruta, APIRoute) and not asyncio.iscoroutinefunction(ruta.dependant.call):
+            ruta.dependant.call = _envolver_sincrono(ruta.dependant.call)
+    app.add_middleware(PerfiladoMiddleware)
@@ -0,0 +1,304 @@
+"""
+Presupuesto de consultas SQL por endpoint y detector de N+1
+
+Captura cada sentencia ejecutada mientras está activo un contexto, agrupa
+las sentencias por forma normalizada (sin literales ni parámetros) y marca
+como N+1 las formas que se repiten. Pensado para pruebas y benchmarks:
+
+    with presupuesto_ruta("GET", "/reportes/libro-diario"):
+        client.get("/reportes/libro-diario", params=...)
+
+En las pruebas, el fixture ``presupuesto_consultas`` de tests/conftest.py
+devuelve ``presupuesto_ruta`` tras comprobar que ningún endpoint carece de
+presupuesto.
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Veces que debe repetirse una misma forma de SELECT para considerarla N+1
+UMBRAL_N_MAS_1 = 3
+
+# Consultas máximas por endpoint ("MÉTODO /ruta" tal como la declara el router).
+# La dependencia de autenticación cuenta como una consulta (carga del usuario).
+# Los listados paginados cuentan el COUNT del total en frío (sin caché).
+PRESUPUESTOS_RUTAS = {
+    # Autenticación y usuarios
+    "POST /auth/login": 1,
+    "POST /auth/change-password": 4,
+    "GET /auth/me": 1,
+    "GET /usuarios/me": 1,
+    "GET /usuarios/admin": 1,
+    "POST /usuarios/usuarios": 5,
+    "GET /usuarios/usuarios": 2,
+    "GET /usuarios/usuarios/{usuario_id}": 2,
+    "PUT /usuarios/usuarios/{usuario_id}": 4,
+    "DELETE /usuarios/usuarios/{usuario_id}": 4,
+    # Clientes
+    "POST /clientes/clientes": 5,
+    "GET /clientes/clientes": 3,
+    # Una página de bloques y un grupo fusionado
+    "POST /clientes/clientes/deduplicar": 17,
+    "POST /clientes/clientes/{cliente_id}/fusionar": 12,
+    "GET /clientes/clientes/{cliente_id}": 2,
+    "GET /clientes/clientes/{cliente_id}/perfil": 3,
+    "PUT /clientes/clientes/{cliente_id}": 4,
+    "DELETE /clientes/clientes/{cliente_id}": 4,
+    # Habitaciones
+    "POST /habitaciones/habitaciones": 5,
+    "GET /habitaciones/habitaciones": 3,
+    "GET /habitaciones/habitaciones/disponibles": 2,
+    "GET /habitaciones/habitaciones/{habitacion_id}": 2,
+    "PUT /habitaciones/habitaciones/{habitacion_id}": 4,
+    "DELETE /habitaciones/habitaciones/{habitacion_id}": 6,
+    # Reservas
+    "POST /reservas/reservas": 15,
+    "GET /reservas/reservas": 3,
+    "GET /reservas/reservas/{reserva_id}": 2,
+    "PUT /reservas/reservas/{reserva_id}": 13,
+    "DELETE /reservas/reservas/{reserva_id}": 17,
+    "GET /reservas/reservas/{reserva_id}/habitaciones": 3,
+    # 2 + 6 por tipo con estancias movibles (medido con 3 tipos)
+    "POST /reservas/asignaciones/reoptimizar": 20,
+    "POST /reservas/bloqueos": 7,
+    "DELETE /reservas/bloqueos/{token}": 3,
+    "POST /reservas/bloqueos/{token}/confirmar": 15,
+    "POST /reservas/grupos": 19,
+    "GET /reservas/grupos/{grupo_id}": 3,
+    "POST /reservas/grupos/{grupo_id}/check-in": 9,
+    # Unas 9 por habitación ofrecida a la lista de espera (medido con 3)
+    "POST /reservas/grupos/{grupo_id}/check-out": 46,
+    # Auditoría nocturna (hasta AUDITORIA_MAX_DIAS días por ejecución)
+    "GET /auditoria/fecha-negocio": 3,
+    # Unas 15 por día auditado
+    "POST /auditoria/ejecutar": 450,
+    # Inventario por tipo
+    "GET /inventario/disponibilidad": 4,
+    "POST /inventario/reconciliar": 6,
+    # Lista de espera
+    "POST /lista-espera": 4,
+    "GET /lista-espera": 2,
+    "GET /lista-espera/cliente/{cliente_id}": 2,
+    "POST /lista-espera/{lista_espera_id}/aceptar": 18,
+    # Cancelar una oferta la pasa a la siguiente inscripción
+    "DELETE /lista-espera/{lista_espera_id}": 17,
+    # Facturas y pagos
+    "POST /facturas/facturas": 8,
+    "GET /facturas/facturas": 3,
+    "GET /facturas/facturas/{factura_id}": 2,
+    "PUT /facturas/facturas/{factura_id}": 4,
+    "DELETE /facturas/facturas/{factura_id}": 5,
+    "POST /pagos": 6,
+    "GET /pagos": 3,
+    "GET /pagos/factura/{factura_id}": 2,
+    "GET /pagos/factura/{factura_id}/saldo": 3,
+    "GET /pagos/{pago_id}": 2,
+    # Contabilidad
+    "POST /contabilidad/cuentas": 4,
+    "GET /contabilidad/cuentas": 2,
+    "GET /contabilidad/cuentas/{cuenta_id}": 2,
+    "PUT /contabilidad/cuentas/{cuenta_id}": 4,
+    "POST /contabilidad/transacciones": 4,
+    "GET /contabilidad/transacciones": 3,
+    "GET /contabilidad/balance": 3,
+    # Reportes
+    "GET /reportes/ocupacion": 3,
+    "GET /reportes/revpar": 3,
+    "GET /reportes/ingresos": 3,
+    "GET /reportes/libro-diario": 2,
+    "GET /reportes/habitaciones": 3,
+    # Tarifas
+    "POST /tarifas/tarifas": 3,
+    "GET /tarifas/tarifas": 2,
+    "PUT /tarifas/tarifas/{tarifa_id}": 4,
+    "DELETE /tarifas/tarifas/{tarifa_id}": 4,
+    "POST /tarifas/cotizaciones": 3,
+    "POST /tarifas/cotizaciones/lote": 4,
+    # Administración y métricas
+    "GET /admin/db/pool": 1,
+    "POST /admin/db/replicas/snapshot": 1,
+    "GET /admin/db/consultas-lentas": 1,
+    "DELETE /admin/db/consultas-lentas": 1,
+    "POST /admin/perfiles/token": 1,
+    "GET /admin/perfiles": 1,
+    "GET /admin/perfiles/{nombre}": 1,
+    "GET /admin/perfiles/{nombre}/resumen": 1,
+    "GET /admin/trazas": 1,
+    "GET /admin/programador": 1,
+    "GET /admin/programador/ejecuciones": 2,
+    "POST /admin/programador/tareas/{nombre}/ejecutar": 1,
+    "GET /metrics": 0,
+}
+
+_LITERAL_CADENA = re.compile(r"'(?:[^']|'')*'")
+_LITERAL_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAMETRO = re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+|\?")
+_LISTA_IN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACIOS = re.compile(r"\s+")
+
+
+class PresupuestoExcedido(AssertionError):
+    """Un bloque ejecutó más consultas de las permitidas o tiene un patrón N+1"""
+
+
+def normalizar_sql(sentencia: str) -> str:
+    """
+    Forma normalizada de una sentencia: literales y parámetros sustituidos
+    por ``?`` y listas IN colapsadas, para agrupar ejecuciones equivalentes
+    """
+    forma = _LITERAL_CADENA.sub("?", sentencia)
+    forma = _PARAMETRO.sub("?", forma)
+    forma = _LITERAL_NUMERO.sub("?", forma)
+    forma = _LISTA_IN.sub("(?)", forma)
+    return _ESPACIOS.sub(" ", forma).strip()
+
+
+class CapturaConsultas:
+    """
+    Registro de las sentencias ejecutadas en cualquier motor mientras la
+    captura está activa (también desde otros hilos, como el de TestClient)
+    """
+
+    def __init__(self):
+        self.sentencias: list[tuple[str, float]] = []
+
+    def __enter__(self) -> "CapturaConsultas":
+        _activar(self)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _desactivar(self)
+
+    @property
+    def total(self) -> int:
+        """Número de sentencias capturadas"""
+        return len(self.sentencias)
+
+    @property
+    def tiempo_total(self) -> float:
+        """Segundos acumulados en base de datos"""
+        return sum(duracion for _, duracion in self.sentencias)
+
+    def formas(self) -> Counter:
+        """Ejecuciones por forma normalizada"""
+        return Counter(normalizar_sql(sql) for sql, _ in self.sentencias)
+
+    def n_mas_1(self, umbral: int = UMBRAL_N_MAS_1) -> dict[str, int]:
+        """SELECT cuya forma se repite al menos ``umbral`` veces"""
+        return {
+            forma: veces
+            for forma, veces in self.formas().items()
+            if veces >= umbral and forma.upper().startswith("SELECT")
+        }
+
+    def verificar(self, maximo: Optional[int] = None, umbral: int = UMBRAL_N_MAS_1, etiqueta: str = "bloque") -> None:
+        """
+        Lanzar PresupuestoExcedido si se supera el máximo de consultas o si
+        se detecta un patrón N+1
+        """
+        problemas = []
+        if maximo is not None and self.total > maximo:
+            problemas.append(f"{self.total} consultas (presupuesto {maximo})")
+        for forma, veces in self.n_mas_1(umbral).items():
+            problemas.append(f"N+1: {veces}x {forma}")
+        if problemas:
+            raise PresupuestoExcedido(f"{etiqueta}: " + "; ".join(problemas))
+
+
+# ========== Eventos del motor ==========
+
+_capturas_activas: list[CapturaConsultas] = []
+_lock_capturas = threading.Lock()
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if _capturas_activas:
+        conn.info.setdefault("presupuesto_inicio", []).append(time.perf_counter())
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("presupuesto_inicio")
+    if not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    for captura in list(_capturas_activas):
+        captura.sentencias.append((statement, duracion))
+
+
+def _activar(captura: CapturaConsultas) -> None:
+    with _lock_capturas:
+        if not event.contains(Engine, "before_cursor_execute", _antes_de_ejecutar):
+            event.listen(Engine, "before_cursor_execute", _antes_de_ejecutar)
+            event.listen(Engine, "after_cursor_execute", _despues_de_ejecutar)
+        _capturas_activas.append(captura)
+
+
+def _desactivar(captura: CapturaConsultas) -> None:
+    with _lock_capturas:
+        if captura in _capturas_activas:
+            _capturas_activas.remove(captura)
+
+
+# ========== Presupuestos ==========
+
+@contextmanager
+def limite_consultas(maximo: Optional[int] = None, umbral: int = UMBRAL_N_MAS_1, etiqueta: str = "bloque") -> Iterator[CapturaConsultas]:
+    """
+    Capturar las consultas del bloque y fallar si supera ``maximo`` o
+    contiene un N+1
+    """
+    with CapturaConsultas() as captura:
+        yield captura
+    captura.verificar(maximo, umbral, etiqueta)
+
+
+def presupuesto_de(metodo: str, ruta: str) -> int:
+    """Presupuesto declarado para un endpoint"""
+    clave = f"{metodo.upper()} {ruta}"
+    if clave not in PRESUPUESTOS_RUTAS:
+        raise KeyError(f"No hay presupuesto de consultas declarado para {clave}")
+    return PRESUPUESTOS_RUTAS[clave]
+
+
+@contextmanager
+def presupuesto_ruta(metodo: str, ruta: str, umbral: int = UMBRAL_N_MAS_1) -> Iterator[CapturaConsultas]:
+    """
+    Capturar las consultas de una petición y validarlas contra el presupuesto
+    declarado del endpoint (ruta tal como la declara el router)
+    """
+    with limite_consultas(presupuesto_de(metodo, ruta), umbral, f"{metodo.upper()} {ruta}") as captura:
+        yield captura
+
+
+def _rutas_api(rutas, prefijo: str = "") -> Iterator[tuple[str, object]]:
+    """
+    (ruta, APIRoute) de una lista de rutas. Las versiones recientes de
+    FastAPI no copian las rutas de los routers incluidos en la aplicación:
+    las dejan dentro de un nodo con el router original y su prefijo.
+    """
+    from fastapi.routing import APIRoute
+
+    for ruta in rutas:
+        if isinstance(ruta, APIRoute):
+            yield prefijo + ruta.path, ruta
+        elif hasattr(ruta, "original_router"):
+            contexto = getattr(ruta, "include_context", None)
+            yield from _rutas_api(ruta.original_router.routes, prefijo + getattr(contexto, "prefix", ""))
+        # Las rutas de documentación (/docs, /openapi.json) no son APIRoute
+
+
+def rutas_sin_presupuesto(app) -> list[str]:
+    """Endpoints de la aplicación que no tienen presupuesto declarado"""
+    faltantes = []
+    for camino, ruta in _rutas_api(app.routes):
+        for metodo in sorted(ruta.methods - {"HEAD", "OPTIONS"}):
+            if f"{metodo} {camino}" not in PRESUPUESTOS_RUTAS:
+                faltantes.append(f"{metodo} {camino}")
+    return faltantes
@@ -0,0 +1,245 @@
+"""
+Renderizado rápido de respuestas y compresión negociada
+
+Los endpoints devuelven los envoltorios comunes (ResponseData, ResponseList).
+Por defecto FastAPI los recorre con jsonable_encoder y luego json.dumps;
+aquí se convierten directamente en una respuesta renderizada con orjson
+(model_dump + orjson.dumps), sin el recorrido recursivo intermedio.
+
+El middleware de compresión negocia ``Accept-Encoding`` y comprime con
+brotli (si el paquete está instalado) o gzip las respuestas de texto que
+superan COMPRESION_MIN_BYTES.
+"""
+
+import asyncio
+import json
+import os
+import zlib
+from functools import wraps
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.datastructures import MutableHeaders
+from starlette.responses import Response
+
+from app.config.database import _env_bool
+from app.schemas.common import ResponseBase
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+# Convertir los envoltorios en respuestas renderizadas con orjson
+RESPUESTAS_RAPIDAS = _env_bool("RESPUESTAS_RAPIDAS", True)
+
+# Compresión de respuestas
+COMPRESION_HABILITADA = _env_bool("COMPRESION_HABILITADA", True)
+COMPRESION_MIN_BYTES = int(os.getenv("COMPRESION_MIN_BYTES", 1024))
+COMPRESION_NIVEL_GZIP = int(os.getenv("COMPRESION_NIVEL_GZIP", 6))
+COMPRESION_CALIDAD_BROTLI = int(os.getenv("COMPRESION_CALIDAD_BROTLI", 4))
+
+_TIPOS_COMPRIMIBLES = ("application/json", "text/", "application/xml", "application/javascript")
+
+
+# ========== Renderizado ==========
+
+def _por_defecto(valor: Any) -> Any:
+    """Tipos que orjson no serializa por sí mismo"""
+    if isinstance(valor, BaseModel):
+        return valor.model_dump()
+    if isinstance(valor, (set, frozenset)):
+        return list(valor)
+    return jsonable_encoder(valor)
+
+
+def renderizar(contenido: Any) -> bytes:
+    """JSON en bytes de un envoltorio, modelo o estructura ya codificada"""
+    if orjson is not None:
+        if isinstance(contenido, BaseModel):
+            contenido = contenido.model_dump()
+        # OPT_UTC_Z: las fechas UTC salen con "Z", igual que en pydantic
+        return orjson.dumps(
+            contenido,
+            default=_por_defecto,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        )
+    if isinstance(contenido, BaseModel):
+        return contenido.model_dump_json().encode("utf-8")
+    return json.dumps(
+        jsonable_encoder(contenido),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+class RespuestaJSON(Response):
+    """Respuesta JSON renderizada con orjson (o pydantic si orjson no está)"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return renderizar(content)
+
+
+def _a_respuesta(resultado: Any, status_code: int) -> Any:
+    if isinstance(resultado, ResponseBase):
+        return RespuestaJSON(resultado, status_code=status_code)
+    return resultado
+
+
+def _envolver(funcion, status_code: int):
+    """
+    Envolver un endpoint para que los envoltorios comunes que devuelve
+    salgan ya renderizados. FastAPI no valida ni recodifica una Response,
+    así que se evita jsonable_encoder y la revalidación del response_model
+    (el contenido ya se validó al construir el envoltorio).
+    """
+    if asyncio.iscoroutinefunction(funcion):
+        @wraps(funcion)
+        async def envoltorio_async(*args, **kwargs):
+            return _a_respuesta(await funcion(*args, **kwargs), status_code)
+        return envoltorio_async
+
+    @wraps(funcion)
+    def envoltorio(*args, **kwargs):
+        return _a_respuesta(funcion(*args, **kwargs), status_code)
+    return envoltorio
+
+
+def instalar_respuestas_rapidas(app) -> int:
+    """Envolver todos los endpoints de la aplicación; devuelve cuántos"""
+    envueltos = 0
+    for ruta in app.routes:
+        if isinstance(ruta, APIRoute):
+            ruta.dependant.call = _envolver(ruta.dependant.call, ruta.status_code or 200)
+            envueltos += 1
+    return envueltos
+
+
+# ========== Compresión ==========
+
+def negociar_codificacion(accept_encoding: str) -> Optional[str]:
+    """Mejor codificación aceptada por el cliente: br, gzip o None"""
+    aceptadas = set()
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        if parametros.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        aceptadas.add(nombre.strip())
+    if brotli is not None and "br" in aceptadas:
+        return "br"
+    if "gzip" in aceptadas or "*" in aceptadas:
+        return "gzip"
+    return None
+
+
+class Compresor:
+    """Compresión incremental gzip o brotli"""
+
+    def __init__(self, codificacion: str):
+        self.codificacion = codificacion
+        if codificacion == "br":
+            self._compresor = brotli.Compressor(quality=COMPRESION_CALIDAD_BROTLI)
+        else:
+            self._compresor = zlib.compressobj(COMPRESION_NIVEL_GZIP, zlib.DEFLATED, 31)
+
+    def comprimir(self, datos: bytes) -> bytes:
+        if self.codificacion == "br":
+            return self._compresor.process(datos)
+        return self._compresor.compress(datos)
+
+    def vaciar(self) -> bytes:
+        if self.codificacion == "br":
+            return self._compresor.flush()
+        return self._compresor.flush(zlib.Z_SYNC_FLUSH)
+
+    def terminar(self) -> bytes:
+        if self.codificacion == "br":
+            return self._compresor.finish()
+        return self._compresor.flush()
+
+
+def _comprimible(cabeceras: MutableHeaders) -> bool:
+    if "content-encoding" in cabeceras:
+        return False
+    return cabeceras.get("content-type", "").startswith(_TIPOS_COMPRIMIBLES)
+
+
+class CompresionMiddleware:
+    """
+    Middleware ASGI que comprime las respuestas de texto según Accept-Encoding.
+    Las respuestas completas menores que el mínimo se envían sin comprimir;
+    las respuestas en streaming se comprimen trozo a trozo.
+    """
+
+    def __init__(self, app, minimo: int = COMPRESION_MIN_BYTES):
+        self.app = app
+        self.minimo = minimo
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codificacion = None
+        for nombre, valor in scope["headers"]:
+            if nombre == b"accept-encoding":
+                codificacion = negociar_codificacion(valor.decode("latin-1"))
+                break
+        if codificacion is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio: dict = {}
+        # None: aún sin decidir; False: sin comprimir; Compresor: comprimiendo
+        estado: dict = {"compresor": None}
+
+        async def send_comprimido(mensaje):
+            if mensaje["type"] == "http.response.start":
+                inicio.update(mensaje)
+                return
+            if mensaje["type"] != "http.response.body":
+                await send(mensaje)
+                return
+
+            cuerpo = mensaje.get("body", b"")
+            mas = mensaje.get("more_body", False)
+            compresor = estado["compresor"]
+
+            if compresor is None:
+                cabeceras = MutableHeaders(raw=list(inicio.get("headers", [])))
+                if not _comprimible(cabeceras) or (not mas and len(cuerpo) < self.minimo):
+                    estado["compresor"] = False
+                    await send(inicio)
+                    await send(mensaje)
+                    return
+                compresor = estado["compresor"] = Compresor(codificacion)
+                cabeceras["content-encoding"] = codificacion
+                cabeceras.add_vary_header("Accept-Encoding")
+                if "content-length" in cabeceras:
+                    del cabeceras["content-length"]
+                if not mas:
+                    cuerpo = compresor.comprimir(cuerpo) + compresor.terminar()
+                    cabeceras["content-length"] = str(len(cuerpo))
+                else:
+                    cuerpo = compresor.comprimir(cuerpo) + compresor.vaciar()
+                await send({**inicio, "headers": cabeceras.raw})
+                await send({"type": "http.response.body", "body": cuerpo, "more_body": mas})
+                return
+
+            if compresor is False:
+                await send(mensaje)
+                return
+
+            cuerpo = compresor.comprimir(cuerpo) + (compresor.vaciar() if mas else compresor.terminar())
+            await send({"type": "http.response.body", "body": cuerpo, "more_body": mas})
+
+        await self.app(scope, receive, send_comprimido)
@@ -9,10 +9,12 @@ from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
 from dotenv import load_dotenv
 
-from app.config.database import get_db
+from app.config.database import get_db, get_async_db
 from app.models.usuario import Usuario
 
 load_dotenv()
@@ -22,6 +24,9 @@ SECRET_KEY = os.getenv("SECRET_KEY", "tu-clave-secreta-cambiar-en-produccion")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
+# Propósito (claim "typ") de los tokens firmados que no son de acceso
+TOKEN_TIPO_PERFILADO = "perfilado"
+
 # Contexto de encriptación de contraseñas
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -56,22 +61,50 @@ def get_current_user(
     db: Session = Depends(get_db)
 ) -> Usuario:
     """Obtener usuario actual desde el token"""
-    token = credentials.credentials
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudo validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    username = _decode_username(credentials.credentials, credentials_exception)
+    
+    user = db.query(Usuario).filter(Usuario.username == username).first()
+    return _validar_usuario(user, credentials_exception)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
+    db: AsyncSession = Depends(get_async_db)
+) -> Usuario:
+    """Obtener usuario actual desde el token usando la sesión asíncrona"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="No se pudo validar las credenciales",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    username = _decode_username(credentials.credentials, credentials_exception)
+    
+    result = await db.execute(select(Usuario).where(Usuario.username == username).limit(1))
+    return _validar_usuario(result.scalars().first(), credentials_exception)
+
+
+def _decode_username(token: str, credentials_exception: HTTPException) -> str:
+    """Obtener el username (sub) de un token JWT válido"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
-        if username is None:
+        # Los tokens con propósito propio (p. ej. perfilado) no autentican
+        if username is None or payload.get("typ") is not None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    user = db.query(Usuario).filter(Usuario.username == username).first()
+    return username
+
+
+def _validar_usuario(user: Optional[Usuario], credentials_exception: HTTPException) -> Usuario:
+    """Verificar que el usuario del token exista y esté activo"""
     if user is None:
         raise credentials_exception
     
@@ -94,3 +127,15 @@ def require_role(roles: list):
             )
         return current_user
     return role_checker
+
+
+def require_role_async(roles: list):
+    """Variante de require_role que valida el token con la sesión asíncrona"""
+    async def role_checker(current_user: Usuario = Depends(get_current_user_async)):
+        if current_user.rol not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Se requiere uno de los siguientes roles: {', '.join(roles)}"
+            )
+        return current_user
+    return role_checker
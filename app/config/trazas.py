@@ -0,0 +1,326 @@
+"""
+Trazas distribuidas compatibles con OpenTelemetry
+
+Cada petición muestreada abre un span raíz; los métodos públicos de los
+singletons de servicios y repositorios, y cada sentencia SQL, abren spans
+hijos. Los identificadores siguen el formato W3C Trace Context (se respeta
+la cabecera ``traceparent`` entrante) y los spans se exportan con la forma
+JSON de OTLP (traceId, spanId, parentSpanId, startTimeUnixNano...), de modo
+que pueden cargarse en cualquier visor compatible.
+
+Las peticiones no muestreadas solo pagan una lectura de ContextVar por
+llamada instrumentada.
+"""
+
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config.database import _env_bool
+
+# Activar la instrumentación de capas, SQL y el middleware de trazas
+TRAZAS_HABILITADAS = _env_bool("TRAZAS_HABILITADAS", False)
+
+# Fracción de peticiones muestreadas (0 a 1)
+TRAZAS_MUESTREO = float(os.getenv("TRAZAS_MUESTREO", 0.01))
+
+
+def _reglas_muestreo(texto: str) -> list[tuple[str, str, float]]:
+    """Interpretar reglas "MÉTODO /prefijo=fracción" separadas por comas"""
+    reglas = []
+    for regla in texto.split(","):
+        clave, _, valor = regla.strip().rpartition("=")
+        metodo, _, prefijo = clave.strip().partition(" ")
+        if metodo and valor:
+            reglas.append((metodo.upper(), prefijo.strip(), float(valor)))
+    return reglas
+
+
+# Muestreo por método y prefijo de ruta, p. ej. "POST /reservas=0,GET /reportes=0.5"
+TRAZAS_MUESTREO_RUTAS = _reglas_muestreo(os.getenv("TRAZAS_MUESTREO_RUTAS", ""))
+
+# Exportador: "memoria" (consultable en /admin/trazas) o "archivo" (JSON por línea)
+TRAZAS_EXPORTADOR = os.getenv("TRAZAS_EXPORTADOR", "memoria")
+TRAZAS_ARCHIVO = os.getenv("TRAZAS_ARCHIVO", "./trazas.jsonl")
+TRAZAS_MEMORIA_MAX = int(os.getenv("TRAZAS_MEMORIA_MAX", 200))
+
+# Longitud máxima del SQL guardado como atributo db.statement
+MAX_SQL_ATRIBUTO = 2000
+
+SERVICIO = "hotel-reservas-api"
+
+_span_actual: ContextVar[Optional["Span"]] = ContextVar("span_actual", default=None)
+
+
+class Span:
+    """Intervalo de trabajo dentro de una traza"""
+
+    __slots__ = ("traza", "trace_id", "span_id", "parent_id", "nombre", "tipo", "inicio", "fin", "atributos", "error")
+
+    def __init__(self, traza: list, trace_id: str, parent_id: Optional[str], nombre: str, tipo: str = "INTERNAL"):
+        self.traza = traza
+        self.trace_id = trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.nombre = nombre
+        self.tipo = tipo
+        self.inicio = time.time_ns()
+        self.fin = 0
+        self.atributos: dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    def hijo(self, nombre: str, tipo: str = "INTERNAL") -> "Span":
+        """Crear un span hijo dentro de la misma traza"""
+        return Span(self.traza, self.trace_id, self.span_id, nombre, tipo)
+
+    def terminar(self, error: Optional[BaseException] = None) -> None:
+        """Cerrar el span y añadirlo a su traza"""
+        self.fin = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.traza.append(self)
+
+    def a_otlp(self) -> dict:
+        """Representación JSON con los nombres de campo de OTLP"""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.nombre,
+            "kind": f"SPAN_KIND_{self.tipo}",
+            "startTimeUnixNano": self.inicio,
+            "endTimeUnixNano": self.fin,
+            "attributes": [
+                {"key": clave, "value": {"stringValue": str(valor)}} for clave, valor in self.atributos.items()
+            ],
+            "status": {"code": "STATUS_CODE_ERROR", "message": self.error} if self.error else {"code": "STATUS_CODE_OK"},
+            "resource": {"service.name": SERVICIO}
+        }
+
+
+# ========== Exportadores ==========
+
+trazas_recientes: deque = deque(maxlen=TRAZAS_MEMORIA_MAX)
+_lock_archivo = threading.Lock()
+
+
+def exportar(spans: list) -> None:
+    """Enviar los spans de una traza terminada al exportador configurado"""
+    datos = [span.a_otlp() for span in spans]
+    if TRAZAS_EXPORTADOR == "archivo":
+        lineas = "".join(json.dumps(dato, ensure_ascii=False) + "\n" for dato in datos)
+        with _lock_archivo:
+            with open(TRAZAS_ARCHIVO, "a", encoding="utf-8") as archivo:
+                archivo.write(lineas)
+    else:
+        trazas_recientes.append(datos)
+
+
+def obtener(limite: int = 20) -> list[list[dict]]:
+    """Trazas en memoria, de la más reciente a la más antigua"""
+    return list(reversed(trazas_recientes))[:limite]
+
+
+# ========== Spans ==========
+
+@contextmanager
+def span(nombre: str, tipo: str = "INTERNAL", **atributos):
+    """
+    Abrir un span hijo del span actual. Si la petición no se muestrea no
+    hace nada y devuelve None.
+    """
+    padre = _span_actual.get()
+    if padre is None:
+        yield None
+        return
+    actual = padre.hijo(nombre, tipo)
+    actual.atributos.update(atributos)
+    marcador = _span_actual.set(actual)
+    error = None
+    try:
+        yield actual
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _span_actual.reset(marcador)
+        actual.terminar(error)
+
+
+def _envolver(metodo, nombre: str):
+    if inspect.iscoroutinefunction(metodo):
+        @wraps(metodo)
+        async def envoltorio_async(*args, **kwargs):
+            if _span_actual.get() is None:
+                return await metodo(*args, **kwargs)
+            with span(nombre):
+                return await metodo(*args, **kwargs)
+        return envoltorio_async
+
+    @wraps(metodo)
+    def envoltorio(*args, **kwargs):
+        if _span_actual.get() is None:
+            return metodo(*args, **kwargs)
+        with span(nombre):
+            return metodo(*args, **kwargs)
+    return envoltorio
+
+
+def instrumentar(instancia: Any, capa: str) -> int:
+    """
+    Envolver en spans los métodos públicos de un singleton. Los envoltorios
+    se asignan a la instancia, así que afectan también a quien ya la importó.
+    Los generadores se omiten (su trabajo ocurre fuera de la llamada).
+    """
+    clase = type(instancia).__name__
+    envueltos = 0
+    for nombre, metodo in inspect.getmembers(instancia, inspect.ismethod):
+        if nombre.startswith("_") or hasattr(metodo, "__wrapped__"):
+            continue
+        if inspect.isgeneratorfunction(metodo) or inspect.isasyncgenfunction(metodo):
+            continue
+        setattr(instancia, nombre, _envolver(metodo, f"{capa}.{clase}.{nombre}"))
+        envueltos += 1
+    return envueltos
+
+
+def instrumentar_capas() -> int:
+    """
+    Instrumentar todos los singletons ``*_service`` y ``*_repository`` de
+    app.services y app.repositories
+    """
+    total = 0
+    for paquete, sufijo, capa in (
+        ("app.services", "_service", "service"),
+        ("app.repositories", "_repository", "repository"),
+    ):
+        modulo_paquete = importlib.import_module(paquete)
+        for info in pkgutil.iter_modules(modulo_paquete.__path__):
+            modulo = importlib.import_module(f"{paquete}.{info.name}")
+            for nombre, valor in vars(modulo).items():
+                if nombre.endswith(sufijo) and not inspect.isclass(valor) and not inspect.ismodule(valor):
+                    total += instrumentar(valor, capa)
+    return total
+
+
+# ========== SQL ==========
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    padre = _span_actual.get()
+    if padre is None:
+        return
+    actual = padre.hijo(f"SQL {statement.lstrip().split(' ', 1)[0].upper()}", "CLIENT")
+    actual.atributos["db.system"] = conn.dialect.name
+    actual.atributos["db.statement"] = statement[:MAX_SQL_ATRIBUTO]
+    conn.info.setdefault("trazas_spans", []).append(actual)
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trazas_spans")
+    if spans:
+        spans.pop().terminar()
+
+
+def _error_sql(contexto_excepcion):
+    spans = contexto_excepcion.connection.info.get("trazas_spans") if contexto_excepcion.connection else None
+    if spans:
+        spans.pop().terminar(contexto_excepcion.original_exception)
+
+
+def instalar_trazas_sql() -> None:
+    """Abrir un span por sentencia SQL en todos los motores"""
+    if not event.contains(Engine, "before_cursor_execute", _antes_de_ejecutar):
+        event.listen(Engine, "before_cursor_execute", _antes_de_ejecutar)
+        event.listen(Engine, "after_cursor_execute", _despues_de_ejecutar)
+        event.listen(Engine, "handle_error", _error_sql)
+
+
+# ========== Middleware ASGI ==========
+
+def _muestrear(metodo: str, ruta: str) -> bool:
+    fraccion = TRAZAS_MUESTREO
+    for metodo_regla, prefijo, valor in TRAZAS_MUESTREO_RUTAS:
+        if metodo_regla == metodo and ruta.startswith(prefijo):
+            fraccion = valor
+            break
+    return fraccion > 0 and random.random() < fraccion
+
+
+def _traceparent(scope) -> Optional[tuple[str, str, bool]]:
+    """Leer la cabecera W3C traceparent: (trace_id, parent_id, muestreada)"""
+    for nombre, valor in scope["headers"]:
+        if nombre == b"traceparent":
+            partes = valor.decode("latin-1").split("-")
+            if len(partes) == 4 and len(partes[1]) == 32 and len(partes[2]) == 16:
+                return partes[1], partes[2], partes[3].endswith("1")
+    return None
+
+
+class TrazasMiddleware:
+    """
+    Middleware ASGI que abre el span raíz de cada petición muestreada y
+    exporta la traza completa al terminar
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        entrante = _traceparent(scope)
+        if entrante is not None and entrante[2]:
+            trace_id, parent_id = entrante[0], entrante[1]
+        elif _muestrear(scope["method"], scope["path"]):
+            trace_id, parent_id = "%032x" % random.getrandbits(128), None
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        traza = []
+        raiz = Span(traza, trace_id, parent_id, f"{scope['method']} {scope['path']}", "SERVER")
+        raiz.atributos["http.method"] = scope["method"]
+        raiz.atributos["http.target"] = scope["path"]
+        marcador = _span_actual.set(raiz)
+
+        async def send_con_estado(mensaje):
+            if mensaje["type"] == "http.response.start":
+                raiz.atributos["http.status_code"] = mensaje["status"]
+            await send(mensaje)
+
+        error = None
+        try:
+            await self.app(scope, receive, send_con_estado)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _span_actual.reset(marcador)
+            ruta = scope.get("route")
+            if ruta is not None:
+                raiz.nombre = f"{scope['method']} {ruta.path}"
+                raiz.atributos["http.route"] = ruta.path
+            raiz.terminar(error)
+            exportar(traza)
+
+
+def instalar_trazas(app) -> None:
+    """Instrumentar capas y SQL, y registrar el middleware de trazas"""
+    instrumentar_capas()
+    instalar_trazas_sql()
+    app.add_middleware(TrazasMiddleware)
@@ -0,0 +1,206 @@
+"""
+Versiones de entidades de catálogo y GET condicional
+
+Cada catálogo (habitaciones, cuentas contables, tarifas) tiene un contador de versión
+y el instante de su última modificación. Los servicios lo incrementan al
+crear, actualizar o eliminar; de él se derivan las cabeceras ETag y
+Last-Modified de los listados. Los cambios de estado de habitación que
+provocan las reservas llevan su propio contador (estados_habitacion): no
+invalidan el catálogo en memoria, pero sí el ETag de los listados que
+devuelven el estado.
+
+Los contadores viven en un archivo mapeado en memoria compartido por todos
+los workers del host, así que una escritura en un worker invalida el ETag
+en los demás. Los incrementos se serializan con un bloqueo de archivo
+(fcntl, si la plataforma lo ofrece); las lecturas no bloquean.
+
+CondicionalMiddleware responde 304 a If-None-Match / If-Modified-Since
+sin tocar la base de datos: solo verifica la firma del JWT y el rol que
+lleva, no consulta el usuario.
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from jose import JWTError, jwt
+
+from app.config.database import _env_bool
+from app.config.security import ALGORITHM, SECRET_KEY
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: solo exclusión entre hilos
+    fcntl = None
+
+# Responder 304 en los catálogos registrados
+CONDICIONAL_HABILITADO = _env_bool("CONDICIONAL_HABILITADO", True)
+
+# Archivo de contadores compartido por los workers del host
+VERSIONES_ARCHIVO = os.getenv(
+    "VERSIONES_ARCHIVO",
+    os.path.join(tempfile.gettempdir(), "hotel_reservas_versiones.bin")
+)
+
+# "estados_habitacion" cuenta los cambios de estado que hacen las reservas
+# (Reservada, Ocupada, Disponible): cambian a cada venta y no deben invalidar
+# el catálogo de habitaciones ni lo que se deriva de él
+ENTIDADES = ("habitaciones", "cuentas_contables", "tarifas", "estados_habitacion")
+
+# Versión y epoch de la última modificación de cada entidad
+_REGISTRO = struct.Struct("<qd")
+
+
+class ContadoresVersiones:
+    """Contadores de versión por entidad sobre un archivo mapeado en memoria"""
+
+    def __init__(self, ruta: str, entidades: tuple):
+        self.ruta = ruta
+        self.posiciones = {nombre: i * _REGISTRO.size for i, nombre in enumerate(entidades)}
+        self._tamano = len(entidades) * _REGISTRO.size
+        self._lock = threading.Lock()
+        self._archivo = None
+        self._mapa: Optional[mmap.mmap] = None
+
+    def _abrir(self) -> mmap.mmap:
+        if self._mapa is None:
+            with self._lock:
+                if self._mapa is None:
+                    archivo = open(self.ruta, "a+b")
+                    if os.fstat(archivo.fileno()).st_size < self._tamano:
+                        archivo.truncate(self._tamano)
+                    self._archivo = archivo
+                    self._mapa = mmap.mmap(archivo.fileno(), self._tamano)
+        return self._mapa
+
+    def leer(self, entidad: str) -> tuple[int, float]:
+        """Versión actual e instante (epoch) de la última modificación"""
+        mapa = self._abrir()
+        posicion = self.posiciones[entidad]
+        while True:
+            version, modificado = _REGISTRO.unpack_from(mapa, posicion)
+            # El escritor publica la versión al final: si cambió, releer
+            if _REGISTRO.unpack_from(mapa, posicion)[0] == version:
+                return version, modificado
+
+    def incrementar(self, entidad: str) -> int:
+        """Registrar una modificación de la entidad; devuelve la nueva versión"""
+        mapa = self._abrir()
+        posicion = self.posiciones[entidad]
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._archivo.fileno(), fcntl.LOCK_EX)
+            try:
+                version = _REGISTRO.unpack_from(mapa, posicion)[0] + 1
+                struct.pack_into("<d", mapa, posicion + 8, time.time())
+                struct.pack_into("<q", mapa, posicion, version)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._archivo.fileno(), fcntl.LOCK_UN)
+        return version
+
+    def incrementar_todas(self) -> None:
+        """
+        Invalidar todos los ETag emitidos. Se usa al arrancar, porque la base
+        de datos pudo cambiar mientras la aplicación estaba detenida.
+        """
+        for entidad in self.posiciones:
+            self.incrementar(entidad)
+
+
+# Instancia singleton
+versiones = ContadoresVersiones(VERSIONES_ARCHIVO, ENTIDADES)
+
+
+# ========== GET condicional ==========
+
+# Ruta exacta -> (entidades de las que depende, roles que pueden leerla)
+_catalogos: dict[str, tuple[tuple, tuple]] = {}
+
+
+def registrar_catalogo(ruta: str, entidades: list, roles: list) -> None:
+    """Declarar un listado cuyo contenido depende solo de la versión de las entidades"""
+    _catalogos[ruta] = (tuple(entidades), tuple(roles))
+
+
+def etag(entidades: tuple, versiones_entidades: list) -> str:
+    return 'W/"' + "+".join(f"{entidad}-{version}" for entidad, version in zip(entidades, versiones_entidades)) + '"'
+
+
+def _coincide(if_none_match: str, actual: str) -> bool:
+    """Comparación débil de If-None-Match (RFC 9110)"""
+    for valor in if_none_match.split(","):
+        valor = valor.strip()
+        if valor == "*" or valor.removeprefix("W/") == actual.removeprefix("W/"):
+            return True
+    return False
+
+
+def _sin_cambios(cabeceras: dict, version_etag: str, modificado: float) -> bool:
+    if_none_match = cabeceras.get(b"if-none-match")
+    if if_none_match is not None:
+        return _coincide(if_none_match.decode("latin-1"), version_etag)
+    if_modified_since = cabeceras.get(b"if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return int(modificado) <= parsedate_to_datetime(if_modified_since.decode("latin-1")).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _rol_autorizado(cabeceras: dict, roles: tuple) -> bool:
+    autorizacion = cabeceras.get(b"authorization", b"").decode("latin-1")
+    esquema, _, token = autorizacion.partition(" ")
+    if esquema.lower() != "bearer" or not token:
+        return False
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return False
+    return payload.get("rol") in roles
+
+
+class CondicionalMiddleware:
+    """
+    Middleware ASGI que añade ETag / Last-Modified a los listados de
+    catálogo y responde 304 cuando el cliente ya tiene la versión actual
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in _catalogos:
+            await self.app(scope, receive, send)
+            return
+
+        entidades, roles = _catalogos[scope["path"]]
+        # La versión se lee antes que los datos: si cambia mientras se
+        # atiende la petición, el ETag emitido queda viejo, nunca adelantado
+        lecturas = [versiones.leer(entidad) for entidad in entidades]
+        version_etag = etag(entidades, [version for version, _ in lecturas])
+        modificado = max(instante for _, instante in lecturas)
+        validadores = [
+            (b"etag", version_etag.encode()),
+            (b"last-modified", formatdate(modificado, usegmt=True).encode()),
+            (b"cache-control", b"private, no-cache"),
+        ]
+
+        cabeceras = dict(scope["headers"])
+        if _sin_cambios(cabeceras, version_etag, modificado) and _rol_autorizado(cabeceras, roles):
+            await send({"type": "http.response.start", "status": 304, "headers": validadores})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_con_validadores(mensaje):
+            if mensaje["type"] == "http.response.start" and mensaje["status"] == 200:
+                mensaje = {**mensaje, "headers": list(mensaje.get("headers", [])) + validadores}
+            await send(mensaje)
+
+        await self.app(scope, receive, send_con_validadores)
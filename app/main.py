@@ -1,102 +1,111 @@
 """
-Configuración de seguridad y autenticación
+Sistema de Reservas de Hoteles - API
 """
 
-from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-import os
-from dotenv import load_dotenv
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.config import database
+from app.config.database import LecturaPropiaMiddleware, SessionLocal, init_db
+from app.config.metricas import METRICAS_HABILITADAS, MetricasMiddleware, instalar_metricas_sql
+from app.config.perfilado import PERFILADO_HABILITADO, instalar_perfilado
+from app.config.respuestas import (
+    COMPRESION_HABILITADA,
+    RESPUESTAS_RAPIDAS,
+    CompresionMiddleware,
+    RespuestaJSON,
+    instalar_respuestas_rapidas
+)
+from app.config.trazas import TRAZAS_HABILITADAS, instalar_trazas
+from app.config.versiones import CONDICIONAL_HABILITADO, CondicionalMiddleware, versiones
+from app.routes.admin_router import router as admin_router
+from app.routes.auditoria_router import router as auditoria_router
+from app.routes.auth_router import router as auth_router
+from app.routes.clientes_router import router as clientes_router
+from app.routes.contabilidad_router import router as contabilidad_router
+from app.routes.facturas_router import router as facturas_router
+from app.routes.habitaciones_router import router as habitaciones_router
+from app.routes.inventario_router import router as inventario_router
+from app.routes.lista_espera_router import router as lista_espera_router
+from app.routes.metricas_router import router as metricas_router
+from app.routes.pagos_router import router as pagos_router
+from app.routes.reportes_router import router as reportes_router
+from app.routes.reservas_router import router as reservas_router
+from app.routes.tarifas_router import router as tarifas_router
+from app.routes.usuario_router import router as usuario_router
+from app.routes.usuarios_router import router as usuarios_router
+from app.repositories.habitacion_repository import habitacion_repository
+from app.repositories.lista_espera_repository import lista_espera_repository
+from app.repositories.reserva_repository import reserva_repository
+from app.services.programador import PROGRAMADOR_HABILITADO, programador
+from app.services.tareas_programadas import registrar_tareas
+
+app = FastAPI(
+    title="Sistema de Reservas de Hoteles - API",
+    version="1.0.0",
+    default_response_class=RespuestaJSON if RESPUESTAS_RAPIDAS else JSONResponse
+)
+
+app.include_router(auth_router)
+app.include_router(usuarios_router)
+app.include_router(usuario_router)
+app.include_router(clientes_router)
+app.include_router(habitaciones_router)
+app.include_router(reservas_router)
+app.include_router(tarifas_router)
+app.include_router(inventario_router)
+app.include_router(lista_espera_router)
+app.include_router(facturas_router)
+app.include_router(pagos_router)
+app.include_router(contabilidad_router)
+app.include_router(auditoria_router)
+app.include_router(reportes_router)
+app.include_router(admin_router)
+app.include_router(metricas_router)
+
+if RESPUESTAS_RAPIDAS:
+    instalar_respuestas_rapidas(app)
+
+if COMPRESION_HABILITADA:
+    app.add_middleware(CompresionMiddleware)
+
+if CONDICIONAL_HABILITADO:
+    app.add_middleware(CondicionalMiddleware)
+
+# Sin réplicas configuradas el middleware no hace nada
+app.add_middleware(LecturaPropiaMiddleware)
+
+if METRICAS_HABILITADAS:
+    app.add_middleware(MetricasMiddleware)
+    instalar_metricas_sql()
+
+if PERFILADO_HABILITADO:
+    instalar_perfilado(app)
+
+if TRAZAS_HABILITADAS:
+    instalar_trazas(app)
 
-from app.config.database import get_db
-from app.models.usuario import Usuario
-
-load_dotenv()
-
-# Configuración
-SECRET_KEY = os.getenv("SECRET_KEY", "tu-clave-secreta-cambiar-en-produccion")
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
-
-# Contexto de encriptación de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# Esquema OAuth2
-http_bearer = HTTPBearer()
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verificar contraseña"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password: str) -> str:
-    """Encriptar contraseña"""
-    return pwd_context.hash(password)
-
-
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    """Crear token JWT"""
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
-
-
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
-    db: Session = Depends(get_db)
-) -> Usuario:
-    token = credentials.credentials
-    """Obtener usuario actual desde el token"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="No se pudo validar las credenciales",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    user = db.query(Usuario).filter(Usuario.username == username).first()
-    if user is None:
-        raise credentials_exception
-    
-    if not user.activo:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Usuario inactivo"
-        )
-    
-    return user
-
-
-def require_role(roles: list):
-    """Decorador para requerir roles específicos"""
-    def role_checker(current_user: Usuario = Depends(get_current_user)):
-        if current_user.rol not in roles:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Se requiere uno de los siguientes roles: {', '.join(roles)}"
-            )
-        return current_user
-    return role_checker
-
-from app.config.database import init_db  # Asegúrate de que init_db esté importado
 
 @app.on_event("startup")
 def on_startup():
-    init_db()
\ No newline at end of file
+    init_db()
+    # Estados escritos con otras mayúsculas por versiones anteriores
+    db = SessionLocal()
+    try:
+        reserva_repository.normalizar_estados(db)
+        habitacion_repository.normalizar_estados(db)
+        lista_espera_repository.normalizar_estados(db)
+    finally:
+        db.close()
+    versiones.incrementar_todas()
+    # Tareas periódicas: solo el worker con el arriendo las ejecuta
+    registrar_tareas()
+    if PROGRAMADOR_HABILITADO:
+        programador.iniciar()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    programador.detener()
+    if database.async_engine is not None:
+        await database.async_engine.dispose()
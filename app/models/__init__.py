@@ -10,6 +10,15 @@ from app.models.factura import Factura
 from app.models.pago import Pago
 from app.models.cuenta_contable import CuentaContable
 from app.models.transaccion import Transaccion
+from app.models.clave_deduplicacion import ClaveDeduplicacion
+from app.models.tarifa import Tarifa
+from app.models.asignacion_habitacion import AsignacionHabitacion
+from app.models.inventario_tipo import InventarioTipo
+from app.models.lista_espera import ListaEspera
+from app.models.bloqueo_habitacion import BloqueoHabitacion
+from app.models.grupo_reserva import GrupoReserva
+from app.models.auditoria_nocturna import AuditoriaNocturna
+from app.models.programador import ArriendoProgramador, EjecucionTarea
 
 __all__ = [
     "Usuario",
@@ -19,5 +28,15 @@ __all__ = [
     "Factura",
     "Pago",
     "CuentaContable",
-    "Transaccion"
+    "Transaccion",
+    "ClaveDeduplicacion",
+    "Tarifa",
+    "AsignacionHabitacion",
+    "InventarioTipo",
+    "ListaEspera",
+    "BloqueoHabitacion",
+    "GrupoReserva",
+    "AuditoriaNocturna",
+    "ArriendoProgramador",
+    "EjecucionTarea"
 ]
@@ -0,0 +1,40 @@
+"""
+Modelo de Asignación de Habitación
+@Entity
+@Table
+"""
+
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.config.database import Base
+
+
+class AsignacionHabitacion(Base):
+    """
+    Entidad AsignacionHabitacion - Habitación concreta asignada a una unidad
+    de una reserva por tipo. Una reserva de N habitaciones tiene N filas; el
+    motor de asignación puede cambiar la habitación mientras el huésped no
+    haya llegado.
+    """
+    __tablename__ = "asignaciones_habitacion"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+
+    reserva_id = Column(Integer, ForeignKey("reservas.id", ondelete="CASCADE"), nullable=False, index=True)
+    habitacion_id = Column(Integer, ForeignKey("habitaciones.id"), nullable=False, index=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relaciones
+    reserva = relationship("Reserva", back_populates="asignaciones")
+
+    # Restricciones
+    __table_args__ = (
+        UniqueConstraint("reserva_id", "habitacion_id", name="uq_asignacion_reserva_habitacion"),
+    )
+
+    def __repr__(self):
+        return f"<AsignacionHabitacion Reserva:{self.reserva_id} - Habitación:{self.habitacion_id}>"
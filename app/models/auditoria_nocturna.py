@@ -0,0 +1,41 @@
+"""
+Modelo de Auditoría Nocturna
+@Entity
+@Table
+"""
+
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime
+from sqlalchemy.sql import func
+from app.config.database import Base
+
+
+class AuditoriaNocturna(Base):
+    """
+    Entidad AuditoriaNocturna - Cierre de un día de negocio. Guarda el
+    último paso terminado para que una auditoría interrumpida se reanude
+    donde quedó; la fecha de negocio vigente es el día siguiente a la última
+    auditoría completada.
+    """
+    __tablename__ = "auditorias_nocturnas"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Día de negocio que se cierra
+    fecha = Column(Date, nullable=False, unique=True)
+
+    # Último paso terminado (0: ninguno) y estado: En_Curso, Completada
+    paso = Column(Integer, default=0, nullable=False)
+    estado = Column(String(20), default="En_Curso", nullable=False)
+
+    # Resultados de cada paso
+    no_shows = Column(Integer, default=0, nullable=False)
+    noches_cargadas = Column(Integer, default=0, nullable=False)
+    ingreso_habitaciones = Column(Float, default=0.0, nullable=False)
+    salidas_vencidas = Column(Integer, default=0, nullable=False)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finalizada_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<AuditoriaNocturna {self.fecha} - paso {self.paso} - {self.estado}>"
@@ -0,0 +1,46 @@
+"""
+Modelo de Bloqueo de Habitación
+@Entity
+@Table
+"""
+
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Index, CheckConstraint
+from sqlalchemy.sql import func
+from app.config.database import Base
+
+
+class BloqueoHabitacion(Base):
+    """
+    Entidad BloqueoHabitacion - Reserva provisional de corta duración
+    mientras el cliente completa el pago. Ocupa la habitación hasta
+    `expira`; pasado ese instante se ignora sin necesidad de borrarla.
+    """
+    __tablename__ = "bloqueos_habitacion"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Identificador opaco que recibe el cliente para confirmar o liberar
+    token = Column(String(32), nullable=False, unique=True)
+
+    habitacion_id = Column(Integer, ForeignKey("habitaciones.id", ondelete="CASCADE"), nullable=False)
+    cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=True)
+
+    fecha_entrada = Column(Date, nullable=False)
+    fecha_salida = Column(Date, nullable=False)
+
+    # Precio cotizado al bloquear: es el que se cobra si se confirma a tiempo
+    precio_total = Column(Float, nullable=False)
+
+    expira = Column(DateTime(timezone=True), nullable=False)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Restricciones
+    __table_args__ = (
+        CheckConstraint('fecha_salida > fecha_entrada', name='check_bloqueo_fechas'),
+        Index("ix_bloqueos_habitacion_habitacion_expira", "habitacion_id", "expira"),
+    )
+
+    def __repr__(self):
+        return f"<BloqueoHabitacion {self.token} - Habitación:{self.habitacion_id} - hasta {self.expira}>"
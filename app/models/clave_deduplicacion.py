@@ -0,0 +1,30 @@
+"""
+Modelo de Clave de Deduplicación
+@Entity
+@Table
+"""
+
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.config.database import Base
+
+
+class ClaveDeduplicacion(Base):
+    """
+    Entidad ClaveDeduplicacion - Tabla de trabajo con las claves de bloqueo
+    de cada cliente, regenerada en cada ejecución del proceso de deduplicación
+    """
+    __tablename__ = "claves_deduplicacion"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Clave de bloqueo normalizada (ej. "nom:juan perez", "tel:987654321")
+    clave = Column(String(150), nullable=False)
+    cliente_id = Column(Integer, ForeignKey("clientes.id", ondelete="CASCADE"), nullable=False)
+
+    # Restricciones
+    __table_args__ = (
+        Index("ix_claves_deduplicacion_clave_cliente", "clave", "cliente_id"),
+    )
+
+    def __repr__(self):
+        return f"<ClaveDeduplicacion {self.clave} - Cliente:{self.cliente_id}>"
@@ -0,0 +1,43 @@
+"""
+Modelo de Grupo de Reservas
+@Entity
+@Table
+"""
+
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Text, CheckConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.config.database import Base
+
+
+class GrupoReserva(Base):
+    """
+    Entidad GrupoReserva - Reservas de varias habitaciones hechas de una vez
+    (agencias, tour operadores). Cada habitación es una Reserva normal que
+    apunta al grupo; el grupo se crea, entra y sale como una unidad.
+    """
+    __tablename__ = "grupos_reserva"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+
+    nombre = Column(String(100), nullable=False)
+    cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=False, index=True)
+
+    fecha_entrada = Column(Date, nullable=False)
+    fecha_salida = Column(Date, nullable=False)
+
+    observaciones = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relaciones
+    reservas = relationship("Reserva", back_populates="grupo", order_by="Reserva.id")
+
+    # Restricciones
+    __table_args__ = (
+        CheckConstraint('fecha_salida > fecha_entrada', name='check_grupo_fechas'),
+    )
+
+    def __repr__(self):
+        return f"<GrupoReserva {self.id} - {self.nombre}>"
@@ -28,7 +28,7 @@ class Habitacion(Base):
     caracteristicas = Column(Text, nullable=True)  # JSON o texto con características
     
     # Estado
-    estado = Column(String(20), default="disponible", nullable=False)  # disponible, ocupada, mantenimiento
+    estado = Column(String(20), default="Disponible", nullable=False)  # Disponible, Reservada, Ocupada, Mantenimiento
     activa = Column(Boolean, default=True, nullable=False)
     
     # Timestamps
@@ -0,0 +1,43 @@
+"""
+Modelo de Inventario por Tipo
+@Entity
+@Table
+"""
+
+from sqlalchemy import Column, Integer, String, Date, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from app.config.database import Base
+
+
+class InventarioTipo(Base):
+    """
+    Entidad InventarioTipo - Contadores de habitaciones de un tipo para una
+    noche: total de habitaciones activas, vendidas (reservas activas o en
+    curso) y bloqueadas (en mantenimiento). Libres = total - vendidas -
+    bloqueadas.
+
+    Las filas se crean al vender la primera habitación del tipo para esa
+    noche; una noche sin fila tiene todas las habitaciones del tipo libres.
+    """
+    __tablename__ = "inventario_tipos"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    tipo = Column(String(50), nullable=False)
+    fecha = Column(Date, nullable=False)
+
+    # Contadores
+    total = Column(Integer, default=0, nullable=False)
+    vendidas = Column(Integer, default=0, nullable=False)
+    bloqueadas = Column(Integer, default=0, nullable=False)
+
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Restricciones
+    __table_args__ = (
+        UniqueConstraint("tipo", "fecha", name="uq_inventario_tipo_fecha"),
+    )
+
+    def __repr__(self):
+        return f"<InventarioTipo {self.tipo} {self.fecha} - {self.vendidas}/{self.total}>"
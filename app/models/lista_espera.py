@@ -0,0 +1,57 @@
+"""
+Modelo de Lista de Espera
+@Entity
+@Table
+"""
+
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, ForeignKey, Index, CheckConstraint
+from sqlalchemy.sql import func
+from app.config.database import Base
+
+
+class ListaEspera(Base):
+    """
+    Entidad ListaEspera - Estadía que un cliente quiere y no encontró libre.
+    Cuando una cancelación o una salida anticipada libera una habitación
+    que la satisface, se le ofrece o se reserva automáticamente.
+    """
+    __tablename__ = "lista_espera"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+
+    cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=False, index=True)
+
+    # Estadía deseada (tipo opcional: cualquiera si es nulo)
+    fecha_entrada = Column(Date, nullable=False)
+    fecha_salida = Column(Date, nullable=False)
+    tipo = Column(String(50), nullable=True)
+    capacidad = Column(Integer, default=1, nullable=False)
+
+    # Mayor prioridad primero; a igual prioridad, por antigüedad
+    prioridad = Column(Integer, default=0, nullable=False)
+
+    # Reservar sin preguntar en lugar de ofrecer
+    auto_reservar = Column(Boolean, default=False, nullable=False)
+
+    # Estado: Pendiente, Ofrecida, Reservada, Cancelada
+    estado = Column(String(20), default="Pendiente", nullable=False)
+
+    # Oferta o reserva resultante. Mientras dura la oferta, un bloqueo
+    # retiene la habitación ofrecida
+    habitacion_id = Column(Integer, ForeignKey("habitaciones.id"), nullable=True)
+    oferta_expira = Column(DateTime(timezone=True), nullable=True)
+    bloqueo_token = Column(String(32), nullable=True)
+    reserva_id = Column(Integer, ForeignKey("reservas.id"), nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Restricciones: el emparejamiento busca por estado y rango de entrada
+    __table_args__ = (
+        CheckConstraint('fecha_salida > fecha_entrada', name='check_lista_espera_fechas'),
+        Index("ix_lista_espera_estado_entrada", "estado", "fecha_entrada"),
+    )
+
+    def __repr__(self):
+        return f"<ListaEspera #{self.id} - Cliente:{self.cliente_id} - {self.fecha_entrada}/{self.fecha_salida} - {self.estado}>"
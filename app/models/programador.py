@@ -0,0 +1,59 @@
+"""
+Modelos del Programador de Tareas
+@Entity
+@Table
+"""
+
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index
+from sqlalchemy.sql import func
+from app.config.database import Base
+
+
+class ArriendoProgramador(Base):
+    """
+    Entidad ArriendoProgramador - Arriendo con vencimiento que elige al
+    único worker que ejecuta las tareas programadas. El titular lo renueva
+    mientras vive; si deja de hacerlo, otro worker lo toma al vencer.
+    """
+    __tablename__ = "arriendos_programador"
+
+    nombre = Column(String(50), primary_key=True)
+    titular = Column(String(100), nullable=False)
+    expira = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return f"<ArriendoProgramador {self.nombre} - {self.titular} hasta {self.expira}>"
+
+
+class EjecucionTarea(Base):
+    """
+    Entidad EjecucionTarea - Historial de ejecuciones de las tareas
+    programadas
+    """
+    __tablename__ = "ejecuciones_tareas"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    tarea = Column(String(50), nullable=False)
+    titular = Column(String(100), nullable=False)
+
+    # La fila se crea al empezar: un líder nuevo ve la ejecución en curso
+    # del anterior y no la repite
+    inicio = Column(DateTime(timezone=True), nullable=False)
+    fin = Column(DateTime(timezone=True), nullable=True)
+    duracion = Column(Float, nullable=True)
+
+    # Estados: En_Curso, Completada, Error
+    estado = Column(String(20), default="En_Curso", nullable=False)
+    error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Restricciones
+    __table_args__ = (
+        Index("ix_ejecuciones_tareas_tarea_inicio", "tarea", "inicio"),
+    )
+
+    def __repr__(self):
+        return f"<EjecucionTarea {self.tarea} - {self.inicio} - {self.estado}>"
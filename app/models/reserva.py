@@ -4,7 +4,7 @@ Modelo de Reserva
 @Table
 """
 
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Text, CheckConstraint
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Text, CheckConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.config.database import Base
@@ -20,7 +20,15 @@ class Reserva(Base):
     
     # Relaciones foráneas
     cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=False)
-    habitacion_id = Column(Integer, ForeignKey("habitaciones.id"), nullable=False)
+    habitacion_id = Column(Integer, ForeignKey("habitaciones.id"), nullable=True)
+    
+    # Reserva por tipo: tipo y número de habitaciones, sin habitación fija
+    # (las concretas se guardan en asignaciones_habitacion)
+    tipo = Column(String(50), nullable=True, index=True)
+    cantidad = Column(Integer, default=1, server_default="1", nullable=False)
+    
+    # Reserva de grupo: todas las habitaciones del grupo comparten fechas
+    grupo_id = Column(Integer, ForeignKey("grupos_reserva.id"), nullable=True, index=True)
     
     # Fechas
     fecha_entrada = Column(Date, nullable=False)
@@ -30,8 +38,8 @@ class Reserva(Base):
     precio_total = Column(Float, nullable=False)
     
     # Estado
-    estado = Column(String(20), default="pendiente", nullable=False)  
-    # Estados: pendiente, confirmada, cancelada, completada
+    estado = Column(String(20), default="Pendiente", nullable=False)  
+    # Estados: Pendiente, Confirmada, En_Curso, Completada, Cancelada, No_Show
     
     # Observaciones
     observaciones = Column(Text, nullable=True)
@@ -44,11 +52,24 @@ class Reserva(Base):
     cliente = relationship("Cliente", back_populates="reservas")
     habitacion = relationship("Habitacion", back_populates="reservas")
     factura = relationship("Factura", back_populates="reserva", uselist=False)
+    grupo = relationship("GrupoReserva", back_populates="reservas")
+    asignaciones = relationship(
+        "AsignacionHabitacion",
+        back_populates="reserva",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
     
     # Restricciones
     __table_args__ = (
         CheckConstraint('fecha_salida > fecha_entrada', name='check_fechas_validas'),
+        CheckConstraint(
+            '(habitacion_id IS NOT NULL) OR (tipo IS NOT NULL)',
+            name='check_habitacion_o_tipo'
+        ),
+        # Auditoría nocturna: reservas de un estado por fecha de entrada
+        Index("ix_reservas_estado_entrada", "estado", "fecha_entrada"),
     )
     
     def __repr__(self):
-        return f"<Reserva #{self.id} - Cliente:{self.cliente_id} - Habitación:{self.habitacion_id} - {self.estado}>"
+        return f"<Reserva #{self.id} - Cliente:{self.cliente_id} - Habitación:{self.habitacion_id or self.tipo} - {self.estado}>"
@@ -0,0 +1,57 @@
+"""
+Modelo de Tarifa
+@Entity
+@Table
+"""
+
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy.sql import func
+from app.config.database import Base
+
+
+class Tarifa(Base):
+    """
+    Entidad Tarifa - Regla del calendario de precios por noche
+
+    Aplica a una habitación concreta, a un tipo de habitación o (sin ninguno
+    de los dos) a todo el hotel, dentro de una temporada opcional y para
+    ciertos días de la semana. Fija el precio de la noche o lo multiplica
+    por un factor sobre el precio base de la habitación.
+    """
+    __tablename__ = "tarifas"
+    __table_args__ = (
+        CheckConstraint(
+            "(precio IS NOT NULL) OR (factor IS NOT NULL)",
+            name="ck_tarifa_precio_o_factor"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+
+    # Temporada o nombre descriptivo (Temporada alta, Fin de semana...)
+    nombre = Column(String(100), nullable=False)
+
+    # Alcance: habitación concreta, tipo, o todo el hotel
+    habitacion_id = Column(Integer, ForeignKey("habitaciones.id", ondelete="CASCADE"), nullable=True, index=True)
+    tipo = Column(String(50), nullable=True)
+
+    # Vigencia (ambas inclusive; sin límite si son nulas)
+    fecha_desde = Column(Date, nullable=True)
+    fecha_hasta = Column(Date, nullable=True)
+
+    # Días de la semana de lunes a domingo, p. ej. "0000011" = fin de semana
+    dias_semana = Column(String(7), nullable=True)
+
+    # Precio fijo por noche o factor sobre el precio base
+    precio = Column(Float, nullable=True)
+    factor = Column(Float, nullable=True)
+
+    # A igual alcance, gana la de mayor prioridad
+    prioridad = Column(Integer, default=0, nullable=False)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<Tarifa {self.nombre} - {self.tipo or self.habitacion_id or 'general'}>"
@@ -0,0 +1,103 @@
+"""
+Repositorio de Asignaciones de Habitación
+"""
+
+from datetime import date, datetime, timezone
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.models.asignacion_habitacion import AsignacionHabitacion
+from app.models.bloqueo_habitacion import BloqueoHabitacion
+from app.models.reserva import Reserva
+from app.repositories.base_repository import BaseRepository
+from app.repositories.reserva_repository import ESTADOS_OCUPAN, filtro_solapamiento
+
+
+class AsignacionRepository(BaseRepository[AsignacionHabitacion]):
+    """
+    Repositorio para la entidad AsignacionHabitacion
+    """
+
+    def __init__(self):
+        super().__init__(AsignacionHabitacion)
+
+    def get_by_reserva(self, db: Session, reserva_id: int) -> list[AsignacionHabitacion]:
+        """Habitaciones asignadas a una reserva"""
+        return db.query(AsignacionHabitacion).filter(
+            AsignacionHabitacion.reserva_id == reserva_id
+        ).order_by(AsignacionHabitacion.id).all()
+
+    def ocupacion_tipo(
+        self,
+        db: Session,
+        tipo: str,
+        habitacion_ids: list[int],
+        desde: date,
+        hasta: date
+    ) -> tuple[list, list]:
+        """
+        Ocupación de las habitaciones de un tipo en un rango, en dos consultas
+        de columnas:
+
+        - (habitacion_id, fecha_entrada, fecha_salida) de las reservas con
+          habitación fija y de los bloqueos vigentes, que el motor no mueve
+        - (id, habitacion_id, fecha_entrada, fecha_salida, estado) de las
+          asignaciones, en esas habitaciones o de reservas de ese tipo
+        """
+        ocupa = Reserva.estado.in_(ESTADOS_OCUPAN)
+        solapa = filtro_solapamiento(desde, hasta)
+        directas = db.query(
+            Reserva.habitacion_id,
+            Reserva.fecha_entrada,
+            Reserva.fecha_salida
+        ).filter(Reserva.habitacion_id.in_(habitacion_ids), ocupa, solapa).union_all(
+            db.query(
+                BloqueoHabitacion.habitacion_id,
+                BloqueoHabitacion.fecha_entrada,
+                BloqueoHabitacion.fecha_salida
+            ).filter(
+                BloqueoHabitacion.habitacion_id.in_(habitacion_ids),
+                BloqueoHabitacion.expira > datetime.now(timezone.utc),
+                BloqueoHabitacion.fecha_entrada < hasta,
+                BloqueoHabitacion.fecha_salida > desde
+            )
+        ).all()
+        asignadas = db.query(
+            AsignacionHabitacion.id,
+            AsignacionHabitacion.habitacion_id,
+            Reserva.fecha_entrada,
+            Reserva.fecha_salida,
+            Reserva.estado
+        ).join(Reserva, AsignacionHabitacion.reserva_id == Reserva.id).filter(
+            or_(AsignacionHabitacion.habitacion_id.in_(habitacion_ids), Reserva.tipo == tipo),
+            ocupa,
+            solapa
+        ).all()
+        return directas, asignadas
+
+    def tipos_movibles(self, db: Session, estados: list[str], desde: date, hasta: date, entrada_minima: date) -> set[str]:
+        """
+        Tipos con asignaciones de reservas en `estados` que se cruzan con
+        [desde, hasta) y entran a partir de `entrada_minima`
+        """
+        filas = db.query(Reserva.tipo).join(
+            AsignacionHabitacion, AsignacionHabitacion.reserva_id == Reserva.id
+        ).filter(
+            Reserva.estado.in_(estados),
+            Reserva.fecha_entrada >= entrada_minima,
+            filtro_solapamiento(desde, hasta)
+        ).distinct().all()
+        return {tipo for tipo, in filas}
+
+    def mover(self, db: Session, movimientos: list[tuple[int, int]]) -> None:
+        """Cambiar de habitación varias asignaciones (asignación_id, habitacion_id) en bloque"""
+        if not movimientos:
+            return
+        db.bulk_update_mappings(
+            AsignacionHabitacion,
+            [{"id": asignacion_id, "habitacion_id": habitacion_id} for asignacion_id, habitacion_id in movimientos]
+        )
+        db.commit()
+
+
+# Instancia singleton
+asignacion_repository = AsignacionRepository()
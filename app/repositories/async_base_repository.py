@@ -0,0 +1,130 @@
+"""
+Repositorio Base Asíncrono - Operaciones CRUD genéricas sobre AsyncSession
+Variante de BaseRepository para el modo DB_ASYNC
+"""
+
+from typing import Generic, TypeVar, Type, List, Optional
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.database import Base
+from app.repositories.base_repository import (
+    TOTALES_ESTIMADOS_DESDE,
+    guardar_total,
+    invalidar_totales,
+    sql_estimacion_total,
+    total_en_cache
+)
+
+ModelType = TypeVar("ModelType", bound=Base)
+
+
+class AsyncBaseRepository(Generic[ModelType]):
+    """
+    Repositorio base asíncrono con operaciones CRUD
+    """
+
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+
+    async def create(self, db: AsyncSession, obj_in: dict) -> ModelType:
+        """Crear un nuevo registro"""
+        db_obj = self.model(**obj_in)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        invalidar_totales(self.model.__tablename__)
+        return db_obj
+
+    async def get_by_id(self, db: AsyncSession, id: int) -> Optional[ModelType]:
+        """Obtener por ID"""
+        return await db.get(self.model, id)
+
+    async def get_all(self, db: AsyncSession, skip: int = 0, limit: int = 100) -> List[ModelType]:
+        """Obtener todos los registros"""
+        result = await db.execute(select(self.model).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    async def get_pagina(
+        self,
+        db: AsyncSession,
+        limit: int = 100,
+        ultimo_id: Optional[int] = None,
+        skip: int = 0,
+        filtros: tuple = (),
+        columnas: Optional[tuple] = None
+    ) -> tuple[list, Optional[int]]:
+        """Página ordenada por ID con paginación por clave (ver BaseRepository.get_pagina)"""
+        if columnas:
+            stmt = select(*[getattr(self.model, columna) for columna in columnas])
+        else:
+            stmt = select(self.model)
+        stmt = stmt.where(*filtros)
+        if ultimo_id is not None:
+            stmt = stmt.where(self.model.id > ultimo_id)
+        elif skip:
+            stmt = stmt.offset(skip)
+        stmt = stmt.order_by(self.model.id).limit(limit + 1)
+        if columnas:
+            filas = list((await db.execute(stmt)).all())
+        else:
+            filas = await self._all(db, stmt)
+        if len(filas) > limit:
+            return filas[:limit], filas[limit - 1].id
+        return filas, None
+
+    async def count_total(self, db: AsyncSession, filtros: tuple = (), clave: str = "") -> int:
+        """Total real de registros cacheado (ver BaseRepository.count_total)"""
+        tabla = self.model.__tablename__
+        cacheable = not filtros or bool(clave)
+        total = total_en_cache(tabla, clave) if cacheable else None
+        if total is not None:
+            return total
+
+        if not filtros:
+            estimacion = sql_estimacion_total(db.get_bind().dialect.name)
+            if estimacion is not None:
+                total = (await db.execute(estimacion, {"tabla": tabla})).scalar()
+                if total is None or total < TOTALES_ESTIMADOS_DESDE:
+                    total = None
+        if total is None:
+            result = await db.execute(select(func.count(self.model.id)).where(*filtros))
+            total = result.scalar_one()
+        if cacheable:
+            guardar_total(tabla, clave, total)
+        return total
+
+    async def update(self, db: AsyncSession, id: int, obj_in: dict) -> Optional[ModelType]:
+        """Actualizar un registro"""
+        # db.get reutiliza el objeto si el servicio ya lo cargó en la sesión
+        db_obj = await db.get(self.model, id)
+        if db_obj:
+            for key, value in obj_in.items():
+                setattr(db_obj, key, value)
+            await db.commit()
+            await db.refresh(db_obj)
+        return db_obj
+
+    async def delete(self, db: AsyncSession, id: int) -> bool:
+        """Eliminar un registro"""
+        db_obj = await db.get(self.model, id)
+        if db_obj:
+            await db.delete(db_obj)
+            await db.commit()
+            invalidar_totales(self.model.__tablename__)
+            return True
+        return False
+
+    async def count(self, db: AsyncSession) -> int:
+        """Contar registros"""
+        result = await db.execute(select(func.count()).select_from(self.model))
+        return result.scalar_one()
+
+    async def _first(self, db: AsyncSession, stmt) -> Optional[ModelType]:
+        """Ejecutar una consulta y devolver el primer resultado"""
+        result = await db.execute(stmt.limit(1))
+        return result.scalars().first()
+
+    async def _all(self, db: AsyncSession, stmt) -> List[ModelType]:
+        """Ejecutar una consulta y devolver todos los resultados"""
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
@@ -0,0 +1,70 @@
+"""
+Repositorio de Auditorías Nocturnas
+"""
+
+from datetime import date
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.auditoria_nocturna import AuditoriaNocturna
+from app.repositories.base_repository import BaseRepository
+
+
+class AuditoriaRepository(BaseRepository[AuditoriaNocturna]):
+    """
+    Repositorio para la entidad AuditoriaNocturna
+    """
+
+    def __init__(self):
+        super().__init__(AuditoriaNocturna)
+
+    def get_by_fecha(self, db: Session, fecha: date) -> Optional[AuditoriaNocturna]:
+        """Auditoría de un día de negocio"""
+        return db.query(AuditoriaNocturna).filter(AuditoriaNocturna.fecha == fecha).first()
+
+    def get_ultima_completada(self, db: Session) -> Optional[AuditoriaNocturna]:
+        """Última auditoría completada (fija la fecha de negocio vigente)"""
+        return db.query(AuditoriaNocturna).filter(
+            AuditoriaNocturna.estado == "Completada"
+        ).order_by(AuditoriaNocturna.fecha.desc()).first()
+
+    def get_ultimas(self, db: Session, limite: int = 10) -> list[AuditoriaNocturna]:
+        """Auditorías más recientes"""
+        return db.query(AuditoriaNocturna).order_by(
+            AuditoriaNocturna.fecha.desc()
+        ).limit(limite).all()
+
+    def iniciar(self, db: Session, fecha: date) -> AuditoriaNocturna:
+        """
+        Auditoría de un día, creándola si no existe. Si otro proceso la crea
+        a la vez, la restricción única descarta la repetida y se lee la suya.
+        """
+        auditoria = self.get_by_fecha(db, fecha)
+        if auditoria is not None:
+            return auditoria
+        try:
+            return self.create(db, {"fecha": fecha, "paso": 0, "estado": "En_Curso"})
+        except IntegrityError:
+            db.rollback()
+            return self.get_by_fecha(db, fecha)
+
+    def avanzar(self, db: Session, auditoria_id: int, paso: int, valores: dict) -> bool:
+        """
+        Marcar un paso como terminado y confirmar la transacción con lo que
+        el paso preparó en ella. El UPDATE solo aplica si el paso anterior
+        era el último terminado: si otro proceso ya lo hizo, se deshace todo
+        y devuelve False.
+        """
+        filas = db.query(AuditoriaNocturna).filter(
+            AuditoriaNocturna.id == auditoria_id,
+            AuditoriaNocturna.paso == paso - 1
+        ).update({AuditoriaNocturna.paso: paso, **valores}, synchronize_session=False)
+        if filas != 1:
+            db.rollback()
+            return False
+        db.commit()
+        return True
+
+
+# Instancia singleton
+auditoria_repository = AuditoriaRepository()
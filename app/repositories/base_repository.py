@@ -3,12 +3,69 @@ Repositorio Base - Operaciones CRUD genéricas
 Similar a CrudRepository de Spring
 """
 
+import base64
+import json
+import os
+import time
 from typing import Generic, TypeVar, Type, List, Optional
+from sqlalchemy import func, text
 from sqlalchemy.orm import Session
 from app.config.database import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+# Segundos durante los que se reutiliza un total contado (0 = contar siempre)
+TOTALES_TTL = float(os.getenv("TOTALES_TTL", 60))
+
+# En PostgreSQL, filas estimadas a partir de las cuales se usa la estimación
+# del planificador (pg_class.reltuples) en lugar de COUNT(*)
+TOTALES_ESTIMADOS_DESDE = int(os.getenv("TOTALES_ESTIMADOS_DESDE", 1000000))
+
+# Totales cacheados: (tabla, clave de filtros) -> (total, instante)
+_totales: dict = {}
+
+
+def codificar_cursor(ultimo_id: int) -> str:
+    """Token opaco para pedir la página siguiente"""
+    datos = json.dumps({"id": ultimo_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(datos).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> int:
+    """Último ID de la página anterior; ValueError si el token no es válido"""
+    try:
+        datos = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return int(datos["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Cursor de paginación inválido") from e
+
+
+def total_en_cache(tabla: str, clave: str) -> Optional[int]:
+    """Total cacheado si sigue vigente"""
+    guardado = _totales.get((tabla, clave))
+    if guardado is None or time.monotonic() - guardado[1] > TOTALES_TTL:
+        return None
+    return guardado[0]
+
+
+def guardar_total(tabla: str, clave: str, total: int) -> None:
+    """Guardar un total contado"""
+    if TOTALES_TTL > 0:
+        _totales[(tabla, clave)] = (total, time.monotonic())
+
+
+def invalidar_totales(tabla: str) -> None:
+    """Descartar todos los totales cacheados de una tabla"""
+    for clave in [clave for clave in list(_totales) if clave[0] == tabla]:
+        _totales.pop(clave, None)
+
+
+def sql_estimacion_total(dialecto: str):
+    """Consulta de filas estimadas por el planificador (None si el motor no la ofrece)"""
+    if dialecto == "postgresql":
+        return text("SELECT reltuples::bigint FROM pg_class WHERE relname = :tabla")
+    return None
+
 
 class BaseRepository(Generic[ModelType]):
     """
@@ -24,6 +81,7 @@ class BaseRepository(Generic[ModelType]):
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        invalidar_totales(self.model.__tablename__)
         return db_obj
     
     def get_by_id(self, db: Session, id: int) -> Optional[ModelType]:
@@ -33,10 +91,65 @@ class BaseRepository(Generic[ModelType]):
     def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[ModelType]:
         """Obtener todos los registros"""
         return db.query(self.model).offset(skip).limit(limit).all()
+
+    def get_pagina(
+        self,
+        db: Session,
+        limit: int = 100,
+        ultimo_id: Optional[int] = None,
+        skip: int = 0,
+        filtros: tuple = (),
+        columnas: Optional[tuple] = None
+    ) -> tuple[list, Optional[int]]:
+        """
+        Página ordenada por ID. Con ultimo_id se pagina por clave
+        (WHERE id > ultimo_id), así una página profunda cuesta lo mismo que
+        la primera; skip se mantiene para los clientes que aún usan OFFSET.
+        Con columnas (que deben incluir "id") se devuelven tuplas de esas
+        columnas en lugar de entidades.
+        Devuelve las filas y el ID desde el que pedir la siguiente página.
+        """
+        if columnas:
+            query = db.query(*[getattr(self.model, columna) for columna in columnas])
+        else:
+            query = db.query(self.model)
+        query = query.filter(*filtros)
+        if ultimo_id is not None:
+            query = query.filter(self.model.id > ultimo_id)
+        elif skip:
+            query = query.offset(skip)
+        filas = query.order_by(self.model.id).limit(limit + 1).all()
+        if len(filas) > limit:
+            return filas[:limit], filas[limit - 1].id
+        return filas, None
+
+    def count_total(self, db: Session, filtros: tuple = (), clave: str = "") -> int:
+        """
+        Total real de registros (con filtros opcionales identificados por
+        clave), cacheado TOTALES_TTL segundos e invalidado al crear o borrar
+        """
+        tabla = self.model.__tablename__
+        cacheable = not filtros or bool(clave)
+        total = total_en_cache(tabla, clave) if cacheable else None
+        if total is not None:
+            return total
+
+        if not filtros:
+            estimacion = sql_estimacion_total(db.get_bind().dialect.name)
+            if estimacion is not None:
+                total = db.execute(estimacion, {"tabla": tabla}).scalar()
+                if total is None or total < TOTALES_ESTIMADOS_DESDE:
+                    total = None
+        if total is None:
+            total = db.query(func.count(self.model.id)).filter(*filtros).scalar()
+        if cacheable:
+            guardar_total(tabla, clave, total)
+        return total
     
     def update(self, db: Session, id: int, obj_in: dict) -> Optional[ModelType]:
         """Actualizar un registro"""
-        db_obj = self.get_by_id(db, id)
+        # db.get reutiliza el objeto si el servicio ya lo cargó en la sesión
+        db_obj = db.get(self.model, id)
         if db_obj:
             for key, value in obj_in.items():
                 setattr(db_obj, key, value)
@@ -46,10 +159,11 @@ class BaseRepository(Generic[ModelType]):
     
     def delete(self, db: Session, id: int) -> bool:
         """Eliminar un registro"""
-        db_obj = self.get_by_id(db, id)
+        db_obj = db.get(self.model, id)
         if db_obj:
             db.delete(db_obj)
             db.commit()
+            invalidar_totales(self.model.__tablename__)
             return True
         return False
     
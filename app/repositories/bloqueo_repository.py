@@ -0,0 +1,68 @@
+"""
+Repositorio de Bloqueos de Habitación
+"""
+
+from datetime import date, datetime, timezone
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.models.bloqueo_habitacion import BloqueoHabitacion
+from app.repositories.base_repository import BaseRepository
+
+
+class BloqueoRepository(BaseRepository[BloqueoHabitacion]):
+    """
+    Repositorio para la entidad BloqueoHabitacion. Los bloqueos vencidos no
+    se barren con una tarea periódica: las consultas de ocupación los ignoran
+    y se borran al bloquear de nuevo la misma habitación.
+    """
+
+    def __init__(self):
+        super().__init__(BloqueoHabitacion)
+
+    def get_by_token(self, db: Session, token: str, bloquear: bool = False) -> Optional[BloqueoHabitacion]:
+        """
+        Buscar bloqueo por token. Con `bloquear` la fila queda tomada
+        (SELECT ... FOR UPDATE) y una segunda confirmación del mismo token
+        espera y ya no la encuentra.
+        """
+        query = db.query(BloqueoHabitacion).filter(BloqueoHabitacion.token == token)
+        if bloquear:
+            query = query.with_for_update()
+        return query.first()
+
+    def vigentes(self, db: Session, habitacion_ids: list[int], desde: date, hasta: date) -> list[tuple]:
+        """(fecha_entrada, fecha_salida) de los bloqueos vigentes de esas habitaciones que se cruzan con [desde, hasta)"""
+        if not habitacion_ids:
+            return []
+        return db.query(BloqueoHabitacion.fecha_entrada, BloqueoHabitacion.fecha_salida).filter(
+            BloqueoHabitacion.habitacion_id.in_(habitacion_ids),
+            BloqueoHabitacion.expira > datetime.now(timezone.utc),
+            BloqueoHabitacion.fecha_entrada < hasta,
+            BloqueoHabitacion.fecha_salida > desde
+        ).all()
+
+    def purgar_vencidos(self, db: Session, habitacion_id: int, ahora: datetime) -> int:
+        """Borrar los bloqueos vencidos de una habitación (sin confirmar la transacción)"""
+        return db.query(BloqueoHabitacion).filter(
+            BloqueoHabitacion.habitacion_id == habitacion_id,
+            BloqueoHabitacion.expira <= ahora
+        ).delete(synchronize_session=False)
+
+    def reasignar_cliente(self, db: Session, clientes_origen_ids: list[int], cliente_destino_id: int) -> int:
+        """
+        Pasar los bloqueos de varios clientes a otro cliente (no confirma la
+        transacción)
+        """
+        if not clientes_origen_ids:
+            return 0
+        return db.query(BloqueoHabitacion).filter(
+            BloqueoHabitacion.cliente_id.in_(clientes_origen_ids)
+        ).update({BloqueoHabitacion.cliente_id: cliente_destino_id}, synchronize_session=False)
+
+    def eliminar(self, db: Session, bloqueo: BloqueoHabitacion) -> None:
+        """Quitar un bloqueo de la sesión (sin confirmar la transacción)"""
+        db.delete(bloqueo)
+
+
+# Instancia singleton
+bloqueo_repository = BloqueoRepository()
@@ -0,0 +1,70 @@
+"""
+Repositorio de Claves de Deduplicación
+"""
+
+from typing import Iterator
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from app.models.clave_deduplicacion import ClaveDeduplicacion
+from app.repositories.base_repository import BaseRepository
+
+
+class ClaveDeduplicacionRepository(BaseRepository[ClaveDeduplicacion]):
+    """
+    Repositorio para la tabla de trabajo de claves de bloqueo
+    """
+
+    def __init__(self):
+        super().__init__(ClaveDeduplicacion)
+
+    def limpiar(self, db: Session) -> None:
+        """Eliminar todas las claves de una ejecución anterior"""
+        db.query(ClaveDeduplicacion).delete(synchronize_session=False)
+        db.commit()
+
+    def insertar_lote(self, db: Session, filas: list[dict]) -> None:
+        """Insertar un lote de claves en una sola sentencia"""
+        if filas:
+            db.bulk_insert_mappings(ClaveDeduplicacion, filas)
+            db.commit()
+
+    def iter_paginas(
+        self,
+        db: Session,
+        tamano_lote: int = 1000
+    ) -> Iterator[list[tuple[str, list[int]]]]:
+        """
+        Recorrer los bloques (clave, [cliente_id, ...]) con más de un cliente,
+        ordenados por clave y en páginas de hasta tamano_lote bloques para no
+        cargar todos en memoria
+        """
+        ultima_clave = ""
+        while True:
+            claves = [
+                fila[0] for fila in db.query(ClaveDeduplicacion.clave).filter(
+                    ClaveDeduplicacion.clave > ultima_clave
+                ).group_by(
+                    ClaveDeduplicacion.clave
+                ).having(
+                    func.count(func.distinct(ClaveDeduplicacion.cliente_id)) > 1
+                ).order_by(ClaveDeduplicacion.clave).limit(tamano_lote).all()
+            ]
+            if not claves:
+                break
+
+            miembros: dict[str, list[int]] = {clave: [] for clave in claves}
+            filas = db.query(
+                ClaveDeduplicacion.clave,
+                ClaveDeduplicacion.cliente_id
+            ).filter(
+                ClaveDeduplicacion.clave.in_(claves)
+            ).distinct().all()
+            for clave, cliente_id in filas:
+                miembros[clave].append(cliente_id)
+
+            yield [(clave, sorted(miembros[clave])) for clave in claves]
+            ultima_clave = claves[-1]
+
+
+# Instancia singleton
+clave_deduplicacion_repository = ClaveDeduplicacionRepository()
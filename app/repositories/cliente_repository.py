@@ -2,10 +2,17 @@
 Repositorio de Clientes
 """
 
-from typing import Optional
+from typing import Iterator, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy import func, case, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.cliente import Cliente
+from app.models.reserva import Reserva
+from app.models.factura import Factura
+from app.models.pago import Pago
 from app.repositories.base_repository import BaseRepository
+from app.repositories.async_base_repository import AsyncBaseRepository
+from app.repositories.reserva_repository import reserva_repository
 
 
 class ClienteRepository(BaseRepository[Cliente]):
@@ -34,6 +41,92 @@ class ClienteRepository(BaseRepository[Cliente]):
             (Cliente.email.like(search_pattern))
         ).all()
 
+    def get_con_historial(self, db: Session, cliente_id: int):
+        """
+        Obtener el cliente junto con los agregados de su historial (reservas,
+        estadías, noches, gasto y total pagado) en una sola consulta
+        """
+        # Pagos sumados por factura para no multiplicar filas en el join
+        pagos = db.query(
+            Pago.factura_id,
+            func.sum(Pago.monto).label("pagado")
+        ).group_by(Pago.factura_id).subquery()
+
+        estadia = Reserva.estado.in_(["En_Curso", "Completada"])
+        noches = reserva_repository.noches_expr(db)
+
+        return db.query(
+            Cliente,
+            func.count(Reserva.id).label("total_reservas"),
+            func.coalesce(func.sum(case((estadia, 1), else_=0)), 0).label("total_estadias"),
+            func.coalesce(func.sum(case((estadia, noches), else_=0)), 0).label("total_noches"),
+            func.coalesce(func.sum(Factura.total), 0).label("gasto_total"),
+            func.coalesce(func.sum(pagos.c.pagado), 0).label("total_pagado")
+        ).outerjoin(
+            Reserva, Reserva.cliente_id == Cliente.id
+        ).outerjoin(
+            Factura, Factura.reserva_id == Reserva.id
+        ).outerjoin(
+            pagos, pagos.c.factura_id == Factura.id
+        ).filter(
+            Cliente.id == cliente_id
+        ).group_by(Cliente.id).first()
+
+    def get_by_ids(self, db: Session, ids: list[int]) -> list[Cliente]:
+        """Obtener clientes por una lista de IDs"""
+        if not ids:
+            return []
+        return db.query(Cliente).filter(Cliente.id.in_(ids)).all()
+
+    def iter_lotes(self, db: Session, tamano_lote: int = 5000) -> Iterator[list[Cliente]]:
+        """
+        Recorrer todos los clientes en lotes ordenados por ID (paginación por
+        clave), de modo que la memoria usada no depende del tamaño de la tabla
+        """
+        ultimo_id = 0
+        while True:
+            lote = db.query(Cliente).filter(
+                Cliente.id > ultimo_id
+            ).order_by(Cliente.id).limit(tamano_lote).all()
+            if not lote:
+                break
+            yield lote
+            ultimo_id = lote[-1].id
+            db.expunge_all()
+
 
 # Instancia singleton
 cliente_repository = ClienteRepository()
+
+
+class AsyncClienteRepository(AsyncBaseRepository[Cliente]):
+    """
+    Repositorio asíncrono para la entidad Cliente
+    """
+
+    def __init__(self):
+        super().__init__(Cliente)
+
+    async def get_by_identificacion(self, db: AsyncSession, identificacion: str) -> Optional[Cliente]:
+        """Buscar cliente por identificación"""
+        return await self._first(db, select(Cliente).where(Cliente.identificacion == identificacion))
+
+    async def get_by_email(self, db: AsyncSession, email: str) -> Optional[Cliente]:
+        """Buscar cliente por email"""
+        return await self._first(db, select(Cliente).where(Cliente.email == email))
+
+    async def search(self, db: AsyncSession, query: str) -> list[Cliente]:
+        """Buscar clientes por nombre, apellido, identificación o email"""
+        search_pattern = f"%{query}%"
+        return await self._all(db, select(Cliente).where(
+            or_(
+                Cliente.nombre.like(search_pattern),
+                Cliente.apellido.like(search_pattern),
+                Cliente.identificacion.like(search_pattern),
+                Cliente.email.like(search_pattern)
+            )
+        ))
+
+
+# Instancia singleton
+async_cliente_repository = AsyncClienteRepository()
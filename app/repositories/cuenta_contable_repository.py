@@ -4,8 +4,11 @@ Repositorio de Cuentas Contables
 
 from typing import Optional
 from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.cuenta_contable import CuentaContable
 from app.repositories.base_repository import BaseRepository
+from app.repositories.async_base_repository import AsyncBaseRepository
 
 
 class CuentaContableRepository(BaseRepository[CuentaContable]):
@@ -39,3 +42,36 @@ class CuentaContableRepository(BaseRepository[CuentaContable]):
 
 # Instancia singleton
 cuenta_contable_repository = CuentaContableRepository()
+
+
+class AsyncCuentaContableRepository(AsyncBaseRepository[CuentaContable]):
+    """
+    Repositorio asíncrono para la entidad CuentaContable
+    """
+
+    def __init__(self):
+        super().__init__(CuentaContable)
+
+    async def get_by_codigo(self, db: AsyncSession, codigo: str) -> Optional[CuentaContable]:
+        """Buscar cuenta por código"""
+        return await self._first(db, select(CuentaContable).where(CuentaContable.codigo == codigo))
+
+    async def get_by_tipo(self, db: AsyncSession, tipo: str) -> list[CuentaContable]:
+        """Obtener cuentas por tipo"""
+        return await self._all(db, select(CuentaContable).where(CuentaContable.tipo == tipo))
+
+    async def get_subcuentas(self, db: AsyncSession, cuenta_padre_id: int) -> list[CuentaContable]:
+        """Obtener subcuentas de una cuenta padre"""
+        return await self._all(db, select(CuentaContable).where(
+            CuentaContable.cuenta_padre_id == cuenta_padre_id
+        ))
+
+    async def get_cuentas_principales(self, db: AsyncSession) -> list[CuentaContable]:
+        """Obtener cuentas principales (sin padre)"""
+        return await self._all(db, select(CuentaContable).where(
+            CuentaContable.cuenta_padre_id == None
+        ))
+
+
+# Instancia singleton
+async_cuenta_contable_repository = AsyncCuentaContableRepository()
@@ -2,17 +2,29 @@
 Repositorio de Facturas
 """
 
-from typing import Optional
+from typing import Callable, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.factura import Factura
-from app.repositories.base_repository import BaseRepository
+from app.repositories.base_repository import BaseRepository, invalidar_totales
+from app.repositories.async_base_repository import AsyncBaseRepository
 
 
 class FacturaRepository(BaseRepository[Factura]):
     """
     Repositorio para la entidad Factura
+
+    Los números son consecutivos a partir de la última factura. Dos
+    transacciones que facturan a la vez pueden calcular el mismo número: el
+    INSERT se hace en un SAVEPOINT y, si la restricción única lo rechaza, se
+    vuelve a numerar con la última factura ya confirmada.
     """
     
+    # Intentos de numeración antes de propagar el conflicto
+    INTENTOS_NUMERACION = 5
+    
     def __init__(self):
         super().__init__(Factura)
     
@@ -30,7 +42,71 @@ class FacturaRepository(BaseRepository[Factura]):
         if ultima_factura:
             return ultima_factura.numero_factura
         return "FAC-0000"
+    
+    def get_reservas_facturadas(self, db: Session, reserva_ids: list[int]) -> set[int]:
+        """IDs de las reservas indicadas que ya tienen factura"""
+        filas = db.query(Factura.reserva_id).filter(Factura.reserva_id.in_(reserva_ids)).all()
+        return {fila[0] for fila in filas}
+    
+    def create_numerada(self, db: Session, obj_in: dict) -> Factura:
+        """Crear una factura con el siguiente número libre"""
+        creadas = []
+        
+        def insertar(facturas: list[dict]) -> None:
+            creadas[:] = [Factura(**facturas[0])]
+            db.add(creadas[0])
+            db.flush()
+        
+        self._numerar_e_insertar(db, [dict(obj_in)], insertar)
+        db.commit()
+        db.refresh(creadas[0])
+        invalidar_totales(Factura.__tablename__)
+        return creadas[0]
+    
+    def create_lote(self, db: Session, facturas: list[dict]) -> None:
+        """
+        Numerar a continuación de la última factura e insertar varias en
+        bloque (sin confirmar la transacción)
+        """
+        if facturas:
+            self._numerar_e_insertar(db, facturas, lambda filas: db.bulk_insert_mappings(Factura, filas))
+            invalidar_totales(Factura.__tablename__)
+    
+    def _numerar_e_insertar(self, db: Session, facturas: list[dict], insertar: Callable[[list[dict]], None]) -> None:
+        for intento in range(self.INTENTOS_NUMERACION):
+            siguiente = int(self.get_ultimo_numero(db).split("-")[1]) + 1
+            for desplazamiento, factura in enumerate(facturas):
+                factura["numero_factura"] = f"FAC-{siguiente + desplazamiento:06d}"
+            try:
+                with db.begin_nested():
+                    insertar(facturas)
+                return
+            except IntegrityError:
+                # Otra transacción tomó esos números: volver a numerar
+                if intento == self.INTENTOS_NUMERACION - 1:
+                    raise
 
 
 # Instancia singleton
 factura_repository = FacturaRepository()
+
+
+class AsyncFacturaRepository(AsyncBaseRepository[Factura]):
+    """
+    Repositorio asíncrono para la entidad Factura
+    """
+
+    def __init__(self):
+        super().__init__(Factura)
+
+    async def get_by_numero(self, db: AsyncSession, numero_factura: str) -> Optional[Factura]:
+        """Buscar factura por número"""
+        return await self._first(db, select(Factura).where(Factura.numero_factura == numero_factura))
+
+    async def get_by_reserva(self, db: AsyncSession, reserva_id: int) -> Optional[Factura]:
+        """Obtener factura de una reserva"""
+        return await self._first(db, select(Factura).where(Factura.reserva_id == reserva_id))
+
+
+# Instancia singleton
+async_factura_repository = AsyncFacturaRepository()
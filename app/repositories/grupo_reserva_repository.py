@@ -0,0 +1,53 @@
+"""
+Repositorio de Grupos de Reservas
+"""
+
+from typing import Optional
+from sqlalchemy.orm import Session, selectinload
+from app.models.grupo_reserva import GrupoReserva
+from app.models.reserva import Reserva
+from app.repositories.base_repository import BaseRepository, invalidar_totales
+
+
+class GrupoReservaRepository(BaseRepository[GrupoReserva]):
+    """
+    Repositorio para la entidad GrupoReserva
+    """
+
+    def __init__(self):
+        super().__init__(GrupoReserva)
+
+    def get_con_reservas(self, db: Session, grupo_id: int) -> Optional[GrupoReserva]:
+        """Grupo con sus reservas cargadas en una segunda consulta"""
+        return db.query(GrupoReserva).options(
+            selectinload(GrupoReserva.reservas)
+        ).filter(GrupoReserva.id == grupo_id).first()
+
+    def create_con_reservas(self, db: Session, obj_in: dict, reservas: list[dict]) -> GrupoReserva:
+        """
+        Crear el grupo y todas sus reservas y confirmar en un solo commit lo
+        que el llamador haya preparado en la misma transacción (inventario y
+        estados de habitación): o se guarda todo o nada
+        """
+        grupo = GrupoReserva(**obj_in)
+        grupo.reservas = [Reserva(**reserva) for reserva in reservas]
+        db.add(grupo)
+        db.commit()
+        db.refresh(grupo)
+        invalidar_totales(Reserva.__tablename__)
+        return grupo
+
+    def reasignar_cliente(self, db: Session, clientes_origen_ids: list[int], cliente_destino_id: int) -> int:
+        """
+        Pasar los grupos de varios clientes a otro cliente (no confirma la
+        transacción)
+        """
+        if not clientes_origen_ids:
+            return 0
+        return db.query(GrupoReserva).filter(
+            GrupoReserva.cliente_id.in_(clientes_origen_ids)
+        ).update({GrupoReserva.cliente_id: cliente_destino_id}, synchronize_session=False)
+
+
+# Instancia singleton
+grupo_reserva_repository = GrupoReservaRepository()
@@ -5,10 +5,27 @@ Repositorio de Habitaciones
 from typing import Optional
 from datetime import date
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, not_
+from sqlalchemy import and_, func, not_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.habitacion import Habitacion
-from app.models.reserva import Reserva
 from app.repositories.base_repository import BaseRepository
+from app.repositories.async_base_repository import AsyncBaseRepository
+from app.repositories.reserva_repository import select_ocupacion
+
+# Formato canónico de los estados de habitación
+ESTADOS_HABITACION = ["Disponible", "Reservada", "Ocupada", "Mantenimiento"]
+
+
+def filtro_disponibles_por_fechas(fecha_entrada: date, fecha_salida: date):
+    """
+    Condición de habitaciones activas sin reservas que se crucen con las fechas
+    """
+    habitaciones_reservadas = select(select_ocupacion(fecha_entrada, fecha_salida).c.habitacion_id)
+    return and_(
+        Habitacion.activa == True,
+        Habitacion.estado == "Disponible",
+        not_(Habitacion.id.in_(habitaciones_reservadas))
+    )
 
 
 class HabitacionRepository(BaseRepository[Habitacion]):
@@ -51,41 +68,123 @@ class HabitacionRepository(BaseRepository[Habitacion]):
         """
         Obtener habitaciones disponibles en un rango de fechas
         """
-        # Subconsulta para habitaciones reservadas en las fechas
-        habitaciones_reservadas = db.query(Reserva.habitacion_id).filter(
-            and_(
-                Reserva.estado.in_(["pendiente", "confirmada"]),
-                or_(
-                    and_(
-                        Reserva.fecha_entrada <= fecha_entrada,
-                        Reserva.fecha_salida > fecha_entrada
-                    ),
-                    and_(
-                        Reserva.fecha_entrada < fecha_salida,
-                        Reserva.fecha_salida >= fecha_salida
-                    ),
-                    and_(
-                        Reserva.fecha_entrada >= fecha_entrada,
-                        Reserva.fecha_salida <= fecha_salida
-                    )
-                )
-            )
-        ).subquery()
-        
-        # Consulta de habitaciones disponibles
+        # Habitaciones activas sin reservas que se crucen con las fechas
         query = db.query(Habitacion).filter(
-            and_(
-                Habitacion.activa == True,
-                Habitacion.estado == "disponible",
-                not_(Habitacion.id.in_(habitaciones_reservadas))
-            )
+            filtro_disponibles_por_fechas(fecha_entrada, fecha_salida)
         )
         
         if tipo:
             query = query.filter(Habitacion.tipo == tipo)
         
         return query.all()
+    
+    def get_catalogo(self, db: Session) -> list[Habitacion]:
+        """Todas las habitaciones, para construir el catálogo en memoria"""
+        return db.query(Habitacion).order_by(Habitacion.id).all()
+    
+    def get_estados(self, db: Session) -> dict[int, str]:
+        """Estado de cada habitación, para refrescar el catálogo sin recargarlo"""
+        return dict(db.query(Habitacion.id, Habitacion.estado).all())
+    
+    def actualizar_estado(self, db: Session, habitacion_id: int, estado: str) -> bool:
+        """Cambiar el estado de una habitación con un UPDATE directo, sin leerla"""
+        filas = db.query(Habitacion).filter(
+            Habitacion.id == habitacion_id
+        ).update({Habitacion.estado: estado}, synchronize_session=False)
+        db.commit()
+        return filas > 0
+
+    def actualizar_estados(self, db: Session, habitacion_ids: list[int], estado: str) -> int:
+        """Cambiar el estado de varias habitaciones con un solo UPDATE (sin confirmar la transacción)"""
+        return db.query(Habitacion).filter(
+            Habitacion.id.in_(habitacion_ids)
+        ).update({Habitacion.estado: estado}, synchronize_session=False)
+
+    def bloquear_filas(self, db: Session, habitacion_ids: list[int]) -> list[Habitacion]:
+        """
+        Tomar las filas de varias habitaciones con SELECT ... FOR UPDATE, en
+        orden de ID para que dos grupos que se solapan no se bloqueen entre sí
+        """
+        return db.query(Habitacion).filter(
+            Habitacion.id.in_(habitacion_ids)
+        ).order_by(Habitacion.id).with_for_update().all()
+
+    def bloquear_fila(self, db: Session, habitacion_id: int) -> Optional[Habitacion]:
+        """
+        Leer la habitación con SELECT ... FOR UPDATE: serializa a quienes
+        reservan o bloquean la misma habitación hasta el fin de la transacción
+        """
+        return db.query(Habitacion).filter(Habitacion.id == habitacion_id).with_for_update().first()
+
+    def normalizar_estados(self, db: Session) -> int:
+        """
+        Reescribir con el formato canónico los estados guardados con otras
+        mayúsculas ("disponible"...). Devuelve las filas corregidas.
+        """
+        corregidas = 0
+        for estado in ESTADOS_HABITACION:
+            corregidas += db.query(Habitacion).filter(
+                func.lower(Habitacion.estado) == estado.lower(),
+                Habitacion.estado != estado
+            ).update({Habitacion.estado: estado}, synchronize_session=False)
+        db.commit()
+        return corregidas
 
 
 # Instancia singleton
 habitacion_repository = HabitacionRepository()
+
+
+class AsyncHabitacionRepository(AsyncBaseRepository[Habitacion]):
+    """
+    Repositorio asíncrono para la entidad Habitación
+    """
+
+    def __init__(self):
+        super().__init__(Habitacion)
+
+    async def get_by_numero(self, db: AsyncSession, numero: str) -> Optional[Habitacion]:
+        """Buscar habitación por número"""
+        return await self._first(db, select(Habitacion).where(Habitacion.numero == numero))
+
+    async def get_by_tipo(self, db: AsyncSession, tipo: str) -> list[Habitacion]:
+        """Obtener habitaciones por tipo"""
+        return await self._all(db, select(Habitacion).where(Habitacion.tipo == tipo))
+
+    async def get_disponibles(self, db: AsyncSession, tipo: Optional[str] = None) -> list[Habitacion]:
+        """Obtener habitaciones disponibles"""
+        stmt = select(Habitacion).where(
+            Habitacion.estado == "Disponible",
+            Habitacion.activa == True
+        )
+        if tipo:
+            stmt = stmt.where(Habitacion.tipo == tipo)
+        return await self._all(db, stmt)
+
+    async def get_disponibles_por_fechas(
+        self,
+        db: AsyncSession,
+        fecha_entrada: date,
+        fecha_salida: date,
+        tipo: Optional[str] = None
+    ) -> list[Habitacion]:
+        """
+        Obtener habitaciones disponibles en un rango de fechas
+        """
+        stmt = select(Habitacion).where(filtro_disponibles_por_fechas(fecha_entrada, fecha_salida))
+        if tipo:
+            stmt = stmt.where(Habitacion.tipo == tipo)
+        return await self._all(db, stmt)
+
+    async def get_catalogo(self, db: AsyncSession) -> list[Habitacion]:
+        """Todas las habitaciones, para construir el catálogo en memoria"""
+        return await self._all(db, select(Habitacion).order_by(Habitacion.id))
+
+    async def get_estados(self, db: AsyncSession) -> dict[int, str]:
+        """Estado de cada habitación, para refrescar el catálogo sin recargarlo"""
+        result = await db.execute(select(Habitacion.id, Habitacion.estado))
+        return dict(result.all())
+
+
+# Instancia singleton
+async_habitacion_repository = AsyncHabitacionRepository()
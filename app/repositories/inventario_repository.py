@@ -0,0 +1,161 @@
+"""
+Repositorio de Inventario por Tipo
+"""
+
+from datetime import date, timedelta
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.habitacion import Habitacion
+from app.models.inventario_tipo import InventarioTipo
+from app.models.reserva import Reserva
+from app.repositories.base_repository import BaseRepository
+from app.repositories.reserva_repository import ESTADOS_OCUPAN, filtro_solapamiento
+
+
+class InventarioRepository(BaseRepository[InventarioTipo]):
+    """
+    Repositorio para la entidad InventarioTipo. Los métodos de escritura no
+    confirman la transacción: la confirma la operación de reserva o de
+    habitación que los usa, para que contadores y datos cambien juntos.
+    """
+
+    def __init__(self):
+        super().__init__(InventarioTipo)
+
+    def get_rango(self, db: Session, tipo: str, desde: date, hasta: date) -> list[InventarioTipo]:
+        """Filas de un tipo para las noches [desde, hasta)"""
+        return db.query(InventarioTipo).filter(
+            InventarioTipo.tipo == tipo,
+            InventarioTipo.fecha >= desde,
+            InventarioTipo.fecha < hasta
+        ).order_by(InventarioTipo.fecha).all()
+
+    def get_desde(self, db: Session, desde: date, hasta: date) -> list[InventarioTipo]:
+        """Filas de todos los tipos para las noches [desde, hasta)"""
+        return db.query(InventarioTipo).filter(
+            InventarioTipo.fecha >= desde,
+            InventarioTipo.fecha < hasta
+        ).all()
+
+    def asegurar_filas(
+        self,
+        db: Session,
+        tipo: str,
+        desde: date,
+        hasta: date,
+        total: int,
+        bloqueadas: int
+    ) -> None:
+        """
+        Crear las filas que falten para las noches [desde, hasta) con la
+        capacidad actual del tipo. Si otra transacción las crea a la vez, la
+        restricción única descarta las repetidas.
+        """
+        existentes = {
+            fila[0] for fila in db.query(InventarioTipo.fecha).filter(
+                InventarioTipo.tipo == tipo,
+                InventarioTipo.fecha >= desde,
+                InventarioTipo.fecha < hasta
+            ).all()
+        }
+        faltan = [
+            desde + timedelta(days=i) for i in range((hasta - desde).days)
+            if desde + timedelta(days=i) not in existentes
+        ]
+        if not faltan:
+            return
+        try:
+            with db.begin_nested():
+                db.bulk_insert_mappings(InventarioTipo, [
+                    {"tipo": tipo, "fecha": fecha, "total": total, "vendidas": 0, "bloqueadas": bloqueadas}
+                    for fecha in faltan
+                ])
+        except IntegrityError:
+            # Otra transacción creó alguna: insertar una a una las que sigan faltando
+            for fecha in faltan:
+                try:
+                    with db.begin_nested():
+                        db.add(InventarioTipo(tipo=tipo, fecha=fecha, total=total, vendidas=0, bloqueadas=bloqueadas))
+                except IntegrityError:
+                    pass
+
+    def vender(
+        self,
+        db: Session,
+        tipo: str,
+        desde: date,
+        hasta: date,
+        cantidad: int,
+        exigir_cupo: bool = False
+    ) -> bool:
+        """
+        Sumar habitaciones vendidas en las noches [desde, hasta). Con
+        exigir_cupo solo se actualizan las noches con cupo suficiente y
+        devuelve False si alguna no lo tenía (la transacción debe deshacerse).
+        """
+        query = db.query(InventarioTipo).filter(
+            InventarioTipo.tipo == tipo,
+            InventarioTipo.fecha >= desde,
+            InventarioTipo.fecha < hasta
+        )
+        if exigir_cupo:
+            query = query.filter(
+                InventarioTipo.total - InventarioTipo.vendidas - InventarioTipo.bloqueadas >= cantidad
+            )
+        filas = query.update(
+            {InventarioTipo.vendidas: InventarioTipo.vendidas + cantidad},
+            synchronize_session=False
+        )
+        return filas == (hasta - desde).days
+
+    def liberar(self, db: Session, tipo: str, desde: date, hasta: date, cantidad: int) -> None:
+        """Restar habitaciones vendidas en las noches [desde, hasta)"""
+        if desde >= hasta:
+            return
+        db.query(InventarioTipo).filter(
+            InventarioTipo.tipo == tipo,
+            InventarioTipo.fecha >= desde,
+            InventarioTipo.fecha < hasta
+        ).update(
+            {InventarioTipo.vendidas: InventarioTipo.vendidas - cantidad},
+            synchronize_session=False
+        )
+
+    def fijar_capacidad(self, db: Session, tipo: str, desde: date, total: int, bloqueadas: int) -> None:
+        """Fijar total y bloqueadas de un tipo en todas las noches desde una fecha"""
+        db.query(InventarioTipo).filter(
+            InventarioTipo.tipo == tipo,
+            InventarioTipo.fecha >= desde
+        ).update(
+            {InventarioTipo.total: total, InventarioTipo.bloqueadas: bloqueadas},
+            synchronize_session=False
+        )
+
+    def corregir(self, db: Session, actualizar: list[dict], crear: list[dict]) -> None:
+        """Reescribir filas desviadas y crear las que faltan (confirma la transacción)"""
+        if actualizar:
+            db.bulk_update_mappings(InventarioTipo, actualizar)
+        if crear:
+            db.bulk_insert_mappings(InventarioTipo, crear)
+        db.commit()
+
+    def ventas(self, db: Session, desde: date, hasta: date) -> list[tuple]:
+        """
+        (tipo, fecha_entrada, fecha_salida, cantidad) de las reservas que
+        ocupan habitaciones en el rango: el tipo de la habitación fija o el
+        de la reserva por tipo
+        """
+        return db.query(
+            func.coalesce(Reserva.tipo, Habitacion.tipo),
+            Reserva.fecha_entrada,
+            Reserva.fecha_salida,
+            Reserva.cantidad
+        ).outerjoin(Habitacion, Reserva.habitacion_id == Habitacion.id).filter(
+            Reserva.estado.in_(ESTADOS_OCUPAN),
+            filtro_solapamiento(desde, hasta)
+        ).all()
+
+
+# Instancia singleton
+inventario_repository = InventarioRepository()
@@ -0,0 +1,123 @@
+"""
+Repositorio de Lista de Espera
+"""
+
+from datetime import date, datetime
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+from app.models.lista_espera import ListaEspera
+from app.repositories.base_repository import BaseRepository
+
+# Estados de una inscripción en su forma canónica
+ESTADOS_LISTA_ESPERA = ["Pendiente", "Ofrecida", "Reservada", "Cancelada"]
+
+
+class ListaEsperaRepository(BaseRepository[ListaEspera]):
+    """
+    Repositorio para la entidad ListaEspera
+    """
+
+    def __init__(self):
+        super().__init__(ListaEspera)
+
+    def get_by_cliente(self, db: Session, cliente_id: int) -> list[ListaEspera]:
+        """Inscripciones de un cliente"""
+        return db.query(ListaEspera).filter(
+            ListaEspera.cliente_id == cliente_id
+        ).order_by(ListaEspera.id).all()
+
+    def get_by_estado(self, db: Session, estado: str, skip: int = 0, limit: int = 100) -> list[ListaEspera]:
+        """Inscripciones en un estado, por orden de prioridad"""
+        return db.query(ListaEspera).filter(
+            ListaEspera.estado == estado
+        ).order_by(
+            ListaEspera.prioridad.desc(), ListaEspera.created_at, ListaEspera.id
+        ).offset(skip).limit(limit).all()
+
+    def candidatas(
+        self,
+        db: Session,
+        tipo: str,
+        capacidad: int,
+        libre_desde: date,
+        libre_hasta: date,
+        liberado_desde: date,
+        liberado_hasta: date,
+        ahora: datetime,
+        limite: int
+    ) -> list[ListaEspera]:
+        """
+        Inscripciones que caben en el hueco libre [libre_desde, libre_hasta)
+        de una habitación y usan alguna noche de lo liberado
+        [liberado_desde, liberado_hasta), por orden de prioridad.
+
+        La condición principal es un rango sobre fecha_entrada, que recorre
+        el índice (estado, fecha_entrada) en lugar de toda la lista.
+        """
+        return db.query(ListaEspera).filter(
+            or_(
+                ListaEspera.estado == "Pendiente",
+                # Ofertas vencidas sin respuesta vuelven a competir
+                and_(ListaEspera.estado == "Ofrecida", ListaEspera.oferta_expira < ahora)
+            ),
+            ListaEspera.fecha_entrada >= libre_desde,
+            ListaEspera.fecha_entrada < min(liberado_hasta, libre_hasta),
+            ListaEspera.fecha_salida <= libre_hasta,
+            ListaEspera.fecha_salida > liberado_desde,
+            or_(ListaEspera.tipo.is_(None), ListaEspera.tipo == tipo),
+            ListaEspera.capacidad <= capacidad
+        ).order_by(
+            ListaEspera.prioridad.desc(), ListaEspera.created_at, ListaEspera.id
+        ).limit(limite).all()
+
+    def ofertas_vencidas(self, db: Session, ahora: datetime, limite: int) -> list[tuple]:
+        """
+        (id, habitacion_id, fecha_entrada, fecha_salida, bloqueo_token) de
+        las ofertas vencidas sin respuesta, las más antiguas primero
+        """
+        return db.query(
+            ListaEspera.id,
+            ListaEspera.habitacion_id,
+            ListaEspera.fecha_entrada,
+            ListaEspera.fecha_salida,
+            ListaEspera.bloqueo_token
+        ).filter(
+            ListaEspera.estado == "Ofrecida",
+            ListaEspera.oferta_expira < ahora
+        ).order_by(ListaEspera.oferta_expira).limit(limite).all()
+
+    def marcar(self, db: Session, lista_espera_id: int, valores: dict) -> None:
+        """Actualizar estado / oferta / reserva de una inscripción sin leerla"""
+        db.query(ListaEspera).filter(
+            ListaEspera.id == lista_espera_id
+        ).update(valores, synchronize_session=False)
+        db.commit()
+
+    def reasignar_cliente(self, db: Session, clientes_origen_ids: list[int], cliente_destino_id: int) -> int:
+        """
+        Pasar las inscripciones de varios clientes a otro cliente (no
+        confirma la transacción)
+        """
+        if not clientes_origen_ids:
+            return 0
+        return db.query(ListaEspera).filter(
+            ListaEspera.cliente_id.in_(clientes_origen_ids)
+        ).update({ListaEspera.cliente_id: cliente_destino_id}, synchronize_session=False)
+
+    def normalizar_estados(self, db: Session) -> int:
+        """
+        Reescribir con el formato canónico los estados guardados en
+        minúsculas por versiones anteriores. Devuelve las filas corregidas.
+        """
+        corregidas = 0
+        for estado in ESTADOS_LISTA_ESPERA:
+            corregidas += db.query(ListaEspera).filter(
+                func.lower(ListaEspera.estado) == estado.lower(),
+                ListaEspera.estado != estado
+            ).update({ListaEspera.estado: estado}, synchronize_session=False)
+        db.commit()
+        return corregidas
+
+
+# Instancia singleton
+lista_espera_repository = ListaEsperaRepository()
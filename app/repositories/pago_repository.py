@@ -3,8 +3,11 @@ Repositorio de Pagos
 """
 
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.pago import Pago
 from app.repositories.base_repository import BaseRepository
+from app.repositories.async_base_repository import AsyncBaseRepository
 
 
 class PagoRepository(BaseRepository[Pago]):
@@ -27,3 +30,27 @@ class PagoRepository(BaseRepository[Pago]):
 
 # Instancia singleton
 pago_repository = PagoRepository()
+
+
+class AsyncPagoRepository(AsyncBaseRepository[Pago]):
+    """
+    Repositorio asíncrono para la entidad Pago
+    """
+
+    def __init__(self):
+        super().__init__(Pago)
+
+    async def get_by_factura(self, db: AsyncSession, factura_id: int) -> list[Pago]:
+        """Obtener pagos de una factura"""
+        return await self._all(db, select(Pago).where(Pago.factura_id == factura_id))
+
+    async def get_total_pagado(self, db: AsyncSession, factura_id: int) -> float:
+        """Calcular total pagado de una factura"""
+        result = await db.execute(
+            select(func.coalesce(func.sum(Pago.monto), 0)).where(Pago.factura_id == factura_id)
+        )
+        return result.scalar_one()
+
+
+# Instancia singleton
+async_pago_repository = AsyncPagoRepository()
@@ -0,0 +1,104 @@
+"""
+Repositorio del Programador de Tareas
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.programador import ArriendoProgramador, EjecucionTarea
+from app.repositories.base_repository import BaseRepository
+
+
+class ProgramadorRepository(BaseRepository[EjecucionTarea]):
+    """
+    Repositorio del arriendo de liderazgo y del historial de ejecuciones
+    """
+
+    def __init__(self):
+        super().__init__(EjecucionTarea)
+
+    # ========== Arriendo ==========
+
+    def adquirir_arriendo(
+        self,
+        db: Session,
+        nombre: str,
+        titular: str,
+        ahora: datetime,
+        duracion: timedelta
+    ) -> bool:
+        """
+        Tomar o renovar el arriendo: un UPDATE condicional que solo aplica
+        si ya es del titular o ha vencido; si la fila no existe, se crea.
+        Devuelve True si el titular queda como líder.
+        """
+        filas = db.query(ArriendoProgramador).filter(
+            ArriendoProgramador.nombre == nombre,
+            or_(ArriendoProgramador.titular == titular, ArriendoProgramador.expira < ahora)
+        ).update(
+            {ArriendoProgramador.titular: titular, ArriendoProgramador.expira: ahora + duracion},
+            synchronize_session=False
+        )
+        if filas:
+            db.commit()
+            return True
+        db.rollback()
+        if db.query(ArriendoProgramador.nombre).filter(ArriendoProgramador.nombre == nombre).first():
+            return False
+        try:
+            db.add(ArriendoProgramador(nombre=nombre, titular=titular, expira=ahora + duracion))
+            db.commit()
+            return True
+        except IntegrityError:
+            # Otro worker lo creó a la vez
+            db.rollback()
+            return False
+
+    def soltar_arriendo(self, db: Session, nombre: str, titular: str, ahora: datetime) -> None:
+        """Dar por vencido el arriendo propio para que otro worker lo tome ya"""
+        db.query(ArriendoProgramador).filter(
+            ArriendoProgramador.nombre == nombre,
+            ArriendoProgramador.titular == titular
+        ).update({ArriendoProgramador.expira: ahora}, synchronize_session=False)
+        db.commit()
+
+    # ========== Historial ==========
+
+    def iniciar_ejecucion(self, db: Session, tarea: str, titular: str, inicio: datetime) -> EjecucionTarea:
+        """Registrar el comienzo de una ejecución"""
+        return self.create(db, {"tarea": tarea, "titular": titular, "inicio": inicio, "estado": "En_Curso"})
+
+    def terminar_ejecucion(
+        self,
+        db: Session,
+        ejecucion_id: int,
+        fin: datetime,
+        duracion: float,
+        estado: str,
+        error: Optional[str] = None
+    ) -> None:
+        """Registrar el final de una ejecución"""
+        db.query(EjecucionTarea).filter(EjecucionTarea.id == ejecucion_id).update({
+            EjecucionTarea.fin: fin,
+            EjecucionTarea.duracion: duracion,
+            EjecucionTarea.estado: estado,
+            EjecucionTarea.error: error
+        }, synchronize_session=False)
+        db.commit()
+
+    def ultimo_inicio(self, db: Session, tarea: str) -> Optional[datetime]:
+        """Inicio de la última ejecución registrada de una tarea"""
+        return db.query(func.max(EjecucionTarea.inicio)).filter(EjecucionTarea.tarea == tarea).scalar()
+
+    def get_ejecuciones(self, db: Session, tarea: Optional[str] = None, limite: int = 50) -> list[EjecucionTarea]:
+        """Ejecuciones más recientes, de todas las tareas o de una"""
+        query = db.query(EjecucionTarea)
+        if tarea:
+            query = query.filter(EjecucionTarea.tarea == tarea)
+        return query.order_by(EjecucionTarea.inicio.desc()).limit(limite).all()
+
+
+# Instancia singleton
+programador_repository = ProgramadorRepository()
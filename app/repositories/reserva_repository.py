@@ -3,11 +3,76 @@ Repositorio de Reservas
 """
 
 from typing import Optional
-from datetime import date
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from datetime import date, datetime, timezone
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Integer, and_, cast, null, or_, func, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.reserva import Reserva
-from app.repositories.base_repository import BaseRepository
+from app.models.factura import Factura
+from app.models.habitacion import Habitacion
+from app.models.asignacion_habitacion import AsignacionHabitacion
+from app.models.bloqueo_habitacion import BloqueoHabitacion
+from app.repositories.base_repository import BaseRepository, invalidar_totales
+from app.repositories.async_base_repository import AsyncBaseRepository
+
+
+# Estados de reserva que bloquean la habitación (mismo formato que escribe
+# ReservaService)
+ESTADOS_ACTIVOS = ["Pendiente", "Confirmada"]
+
+# Estados que ocupan la habitación: las activas y las estancias en curso
+ESTADOS_OCUPAN = ESTADOS_ACTIVOS + ["En_Curso"]
+
+# Formato canónico de los estados, para normalizar datos antiguos
+ESTADOS_RESERVA = ESTADOS_OCUPAN + ["Completada", "Cancelada", "No_Show"]
+
+
+def filtro_solapamiento(fecha_entrada: date, fecha_salida: date):
+    """
+    Condición de reservas cuyo rango de fechas se cruza con el indicado
+    """
+    return or_(
+        and_(Reserva.fecha_entrada <= fecha_entrada, Reserva.fecha_salida > fecha_entrada),
+        and_(Reserva.fecha_entrada < fecha_salida, Reserva.fecha_salida >= fecha_salida),
+        and_(Reserva.fecha_entrada >= fecha_entrada, Reserva.fecha_salida <= fecha_salida)
+    )
+
+
+def select_ocupacion(fecha_entrada: date, fecha_salida: date, excluir_bloqueo: Optional[str] = None):
+    """
+    (reserva_id, habitacion_id, fecha_entrada, fecha_salida) de lo que ocupa
+    habitaciones en las fechas: reservas activas o en curso con habitación
+    fija, habitaciones asignadas a reservas por tipo y bloqueos vigentes
+    (reserva_id nulo). `excluir_bloqueo` omite el bloqueo que se está
+    convirtiendo en reserva.
+    """
+    condiciones = (Reserva.estado.in_(ESTADOS_OCUPAN), filtro_solapamiento(fecha_entrada, fecha_salida))
+    directas = select(
+        Reserva.id.label("reserva_id"),
+        Reserva.habitacion_id.label("habitacion_id"),
+        Reserva.fecha_entrada,
+        Reserva.fecha_salida
+    ).where(Reserva.habitacion_id.isnot(None), *condiciones)
+    asignadas = select(
+        Reserva.id,
+        AsignacionHabitacion.habitacion_id,
+        Reserva.fecha_entrada,
+        Reserva.fecha_salida
+    ).join(Reserva, AsignacionHabitacion.reserva_id == Reserva.id).where(*condiciones)
+    # Los bloqueos vencidos se ignoran: caducan sin que nadie los borre
+    bloqueos = select(
+        cast(null(), Integer),
+        BloqueoHabitacion.habitacion_id,
+        BloqueoHabitacion.fecha_entrada,
+        BloqueoHabitacion.fecha_salida
+    ).where(
+        BloqueoHabitacion.expira > datetime.now(timezone.utc),
+        BloqueoHabitacion.fecha_entrada < fecha_salida,
+        BloqueoHabitacion.fecha_salida > fecha_entrada
+    )
+    if excluir_bloqueo is not None:
+        bloqueos = bloqueos.where(BloqueoHabitacion.token != excluir_bloqueo)
+    return union_all(directas, asignadas, bloqueos).subquery()
 
 
 class ReservaRepository(BaseRepository[Reserva]):
@@ -21,11 +86,56 @@ class ReservaRepository(BaseRepository[Reserva]):
     def get_by_cliente(self, db: Session, cliente_id: int) -> list[Reserva]:
         """Obtener reservas de un cliente"""
         return db.query(Reserva).filter(Reserva.cliente_id == cliente_id).all()
-    
+
+    def get_ultimas_by_cliente(self, db: Session, cliente_id: int, limite: int = 10) -> list[Reserva]:
+        """
+        Obtener las últimas reservas de un cliente con su factura y pagos
+        cargados en la misma consulta
+        """
+        return db.query(Reserva).options(
+            joinedload(Reserva.factura).joinedload(Factura.pagos)
+        ).filter(
+            Reserva.cliente_id == cliente_id
+        ).order_by(Reserva.fecha_entrada.desc(), Reserva.id.desc()).limit(limite).all()
+
+    def noches_expr(self, db: Session):
+        """
+        Expresión SQL con el número de noches de una reserva según el motor
+        """
+        dialecto = db.get_bind().dialect.name
+        if dialecto == "sqlite":
+            return func.julianday(Reserva.fecha_salida) - func.julianday(Reserva.fecha_entrada)
+        if dialecto in ("mysql", "mariadb"):
+            return func.datediff(Reserva.fecha_salida, Reserva.fecha_entrada)
+        return Reserva.fecha_salida - Reserva.fecha_entrada
+
+    def reasignar_cliente(self, db: Session, clientes_origen_ids: list[int], cliente_destino_id: int) -> int:
+        """
+        Reasignar en bloque las reservas de varios clientes a otro cliente
+        (no confirma la transacción)
+        """
+        if not clientes_origen_ids:
+            return 0
+        return db.query(Reserva).filter(
+            Reserva.cliente_id.in_(clientes_origen_ids)
+        ).update({Reserva.cliente_id: cliente_destino_id}, synchronize_session=False)
+
     def get_by_habitacion(self, db: Session, habitacion_id: int) -> list[Reserva]:
         """Obtener reservas de una habitación"""
         return db.query(Reserva).filter(Reserva.habitacion_id == habitacion_id).all()
     
+    def tiene_no_canceladas(self, db: Session, habitacion_id: int) -> bool:
+        """Indicar si la habitación tiene alguna reserva no cancelada (fija o asignada)"""
+        asignada = db.query(AsignacionHabitacion.reserva_id).filter(
+            AsignacionHabitacion.habitacion_id == habitacion_id
+        )
+        return db.query(Reserva.id).filter(
+            and_(
+                or_(Reserva.habitacion_id == habitacion_id, Reserva.id.in_(asignada)),
+                Reserva.estado != "Cancelada"
+            )
+        ).first() is not None
+    
     def get_by_estado(self, db: Session, estado: str) -> list[Reserva]:
         """Obtener reservas por estado"""
         return db.query(Reserva).filter(Reserva.estado == estado).all()
@@ -47,7 +157,7 @@ class ReservaRepository(BaseRepository[Reserva]):
     def get_activas(self, db: Session) -> list[Reserva]:
         """Obtener reservas activas (pendientes o confirmadas)"""
         return db.query(Reserva).filter(
-            Reserva.estado.in_(["pendiente", "confirmada"])
+            Reserva.estado.in_(ESTADOS_ACTIVOS)
         ).all()
     
     def verificar_disponibilidad(
@@ -56,30 +166,260 @@ class ReservaRepository(BaseRepository[Reserva]):
         habitacion_id: int,
         fecha_entrada: date,
         fecha_salida: date,
-        reserva_id: Optional[int] = None
+        reserva_id: Optional[int] = None,
+        bloqueo_token: Optional[str] = None
     ) -> bool:
         """
         Verificar si una habitación está disponible en un rango de fechas
         """
-        query = db.query(Reserva).filter(
-            and_(
-                Reserva.habitacion_id == habitacion_id,
-                Reserva.estado.in_(["pendiente", "confirmada"]),
-                # Conflicto de fechas
-                (
-                    (Reserva.fecha_entrada <= fecha_entrada) & (Reserva.fecha_salida > fecha_entrada) |
-                    (Reserva.fecha_entrada < fecha_salida) & (Reserva.fecha_salida >= fecha_salida) |
-                    (Reserva.fecha_entrada >= fecha_entrada) & (Reserva.fecha_salida <= fecha_salida)
-                )
-            )
-        )
+        # Reservas activas y bloqueos vigentes en conflicto, con la habitación
+        # fija o asignada
+        ocupacion = select_ocupacion(fecha_entrada, fecha_salida, bloqueo_token)
+        query = db.query(ocupacion.c.reserva_id).filter(ocupacion.c.habitacion_id == habitacion_id)
         
-        # Excluir la reserva actual si estamos actualizando
+        # Excluir la reserva actual si estamos actualizando (los bloqueos no
+        # tienen reserva y siempre cuentan)
         if reserva_id:
-            query = query.filter(Reserva.id != reserva_id)
+            query = query.filter(or_(ocupacion.c.reserva_id.is_(None), ocupacion.c.reserva_id != reserva_id))
         
-        return query.count() == 0
+        return query.first() is None
+    
+    def habitaciones_ocupadas(
+        self,
+        db: Session,
+        fecha_entrada: date,
+        fecha_salida: date,
+        habitacion_ids: Optional[list[int]] = None
+    ) -> set[int]:
+        """
+        IDs de habitaciones con reservas activas o bloqueos que se cruzan con
+        las fechas (solo entre `habitacion_ids` si se indican)
+        """
+        ocupacion = select_ocupacion(fecha_entrada, fecha_salida)
+        query = db.query(ocupacion.c.habitacion_id).distinct()
+        if habitacion_ids is not None:
+            query = query.filter(ocupacion.c.habitacion_id.in_(habitacion_ids))
+        return {fila[0] for fila in query.all()}
+
+    def intervalos_activos(self, db: Session, desde: date, hasta: date) -> list[tuple]:
+        """
+        (habitacion_id, fecha_entrada, fecha_salida) de las reservas activas
+        que se cruzan con el rango, en una sola consulta de columnas
+        """
+        ocupacion = select_ocupacion(desde, hasta)
+        return db.query(
+            ocupacion.c.habitacion_id,
+            ocupacion.c.fecha_entrada,
+            ocupacion.c.fecha_salida
+        ).all()
+
+    def intervalos_habitaciones(self, db: Session, habitacion_ids: list[int], desde: date, hasta: date) -> dict[int, list[tuple]]:
+        """
+        (fecha_entrada, fecha_salida) de las estancias activas de varias
+        habitaciones en el rango, por habitación y en orden de entrada
+        """
+        ocupacion = select_ocupacion(desde, hasta)
+        filas = db.query(ocupacion.c.habitacion_id, ocupacion.c.fecha_entrada, ocupacion.c.fecha_salida).filter(
+            ocupacion.c.habitacion_id.in_(habitacion_ids)
+        ).order_by(ocupacion.c.fecha_entrada).all()
+        intervalos = {habitacion_id: [] for habitacion_id in habitacion_ids}
+        for habitacion_id, entrada, salida in filas:
+            intervalos[habitacion_id].append((entrada, salida))
+        return intervalos
+
+    def create_con_asignaciones(
+        self,
+        db: Session,
+        obj_in: dict,
+        habitacion_ids: list[int],
+        movimientos: list[tuple[int, int]] = ()
+    ) -> Reserva:
+        """
+        Crear una reserva por tipo con sus habitaciones asignadas y aplicar,
+        en la misma transacción, los cambios de habitación de otras reservas
+        (pares asignación_id, habitacion_id) que el motor necesitó para
+        hacerle sitio
+        """
+        if movimientos:
+            db.bulk_update_mappings(
+                AsignacionHabitacion,
+                [{"id": asignacion_id, "habitacion_id": habitacion_id} for asignacion_id, habitacion_id in movimientos]
+            )
+        reserva = Reserva(**obj_in)
+        reserva.asignaciones = [AsignacionHabitacion(habitacion_id=h) for h in habitacion_ids]
+        db.add(reserva)
+        db.commit()
+        db.refresh(reserva)
+        invalidar_totales(Reserva.__tablename__)
+        return reserva
+
+    def get_by_grupo(self, db: Session, grupo_id: int) -> list[Reserva]:
+        """Reservas de un grupo"""
+        return db.query(Reserva).filter(Reserva.grupo_id == grupo_id).order_by(Reserva.id).all()
+
+    def cambiar_estado_grupo(self, db: Session, grupo_id: int, desde: str, hasta: str) -> int:
+        """
+        Pasar de un estado a otro todas las reservas de un grupo con un solo
+        UPDATE (sin confirmar la transacción). Devuelve las filas cambiadas.
+        """
+        filas = db.query(Reserva).filter(
+            Reserva.grupo_id == grupo_id,
+            Reserva.estado == desde
+        ).update({Reserva.estado: hasta}, synchronize_session=False)
+        invalidar_totales(Reserva.__tablename__)
+        return filas
+
+    # ========== Auditoría nocturna ==========
+
+    def liberaciones_no_show(self, db: Session, fecha: date) -> list[tuple]:
+        """
+        (tipo, fecha_entrada, fecha_salida, habitaciones) de las reservas
+        confirmadas que debían llegar hasta la fecha y no lo hicieron,
+        agrupadas para devolverlas al inventario con pocas actualizaciones
+        """
+        tipo = func.coalesce(Reserva.tipo, Habitacion.tipo)
+        return db.query(
+            tipo,
+            Reserva.fecha_entrada,
+            Reserva.fecha_salida,
+            func.sum(Reserva.cantidad)
+        ).outerjoin(Habitacion, Reserva.habitacion_id == Habitacion.id).filter(
+            Reserva.estado == "Confirmada",
+            Reserva.fecha_entrada <= fecha
+        ).group_by(tipo, Reserva.fecha_entrada, Reserva.fecha_salida).all()
+
+    def habitaciones_no_show(self, db: Session, fecha: date) -> list[int]:
+        """Habitaciones fijas de las reservas confirmadas que no llegaron"""
+        filas = db.query(Reserva.habitacion_id).filter(
+            Reserva.estado == "Confirmada",
+            Reserva.fecha_entrada <= fecha,
+            Reserva.habitacion_id.isnot(None)
+        ).distinct().all()
+        return [fila[0] for fila in filas]
+
+    def clientes_no_show(self, db: Session, fecha: date) -> list[int]:
+        """Clientes de las reservas confirmadas que no llegaron"""
+        filas = db.query(Reserva.cliente_id).filter(
+            Reserva.estado == "Confirmada",
+            Reserva.fecha_entrada <= fecha
+        ).distinct().all()
+        return [fila[0] for fila in filas]
+
+    def marcar_no_shows(self, db: Session, fecha: date) -> int:
+        """Pasar a No_Show las confirmadas que no llegaron, con un solo UPDATE (sin confirmar)"""
+        filas = db.query(Reserva).filter(
+            Reserva.estado == "Confirmada",
+            Reserva.fecha_entrada <= fecha
+        ).update({Reserva.estado: "No_Show"}, synchronize_session=False)
+        invalidar_totales(Reserva.__tablename__)
+        return filas
+
+    def estancias_noche(self, db: Session, fecha: date) -> list[tuple]:
+        """(id, precio_total, fecha_entrada, fecha_salida) de las estancias en curso que ocupan la noche"""
+        return db.query(
+            Reserva.id,
+            Reserva.precio_total,
+            Reserva.fecha_entrada,
+            Reserva.fecha_salida
+        ).filter(
+            Reserva.estado == "En_Curso",
+            Reserva.fecha_entrada <= fecha,
+            Reserva.fecha_salida > fecha
+        ).all()
+
+    def salidas_vencidas(self, db: Session, fecha: date) -> list[tuple]:
+        """(id, precio_total, habitacion_id, cliente_id) de las estancias en curso que debían salir hasta la fecha"""
+        return db.query(Reserva.id, Reserva.precio_total, Reserva.habitacion_id, Reserva.cliente_id).filter(
+            Reserva.estado == "En_Curso",
+            Reserva.fecha_salida <= fecha
+        ).all()
+
+    def completar_vencidas(self, db: Session, fecha: date) -> int:
+        """Pasar a Completada las estancias vencidas, con un solo UPDATE (sin confirmar)"""
+        filas = db.query(Reserva).filter(
+            Reserva.estado == "En_Curso",
+            Reserva.fecha_salida <= fecha
+        ).update({Reserva.estado: "Completada"}, synchronize_session=False)
+        invalidar_totales(Reserva.__tablename__)
+        return filas
+
+    def habitaciones_asignadas(self, db: Session, reserva_ids: list[int]) -> list[int]:
+        """Habitaciones asignadas por el motor a varias reservas por tipo"""
+        filas = db.query(AsignacionHabitacion.habitacion_id).filter(
+            AsignacionHabitacion.reserva_id.in_(reserva_ids)
+        ).distinct().all()
+        return [fila[0] for fila in filas]
+
+    def normalizar_estados(self, db: Session) -> int:
+        """
+        Reescribir con el formato canónico los estados guardados con otras
+        mayúsculas ("pendiente", "confirmada"...), que las consultas de
+        ocupación no reconocerían. Devuelve las filas corregidas.
+        """
+        corregidas = 0
+        for estado in ESTADOS_RESERVA:
+            corregidas += db.query(Reserva).filter(
+                func.lower(Reserva.estado) == estado.lower(),
+                Reserva.estado != estado
+            ).update({Reserva.estado: estado}, synchronize_session=False)
+        db.commit()
+        return corregidas
 
 
 # Instancia singleton
 reserva_repository = ReservaRepository()
+
+
+class AsyncReservaRepository(AsyncBaseRepository[Reserva]):
+    """
+    Repositorio asíncrono para la entidad Reserva
+    """
+
+    def __init__(self):
+        super().__init__(Reserva)
+
+    async def get_by_cliente(self, db: AsyncSession, cliente_id: int) -> list[Reserva]:
+        """Obtener reservas de un cliente"""
+        return await self._all(db, select(Reserva).where(Reserva.cliente_id == cliente_id))
+
+    async def get_by_habitacion(self, db: AsyncSession, habitacion_id: int) -> list[Reserva]:
+        """Obtener reservas de una habitación"""
+        return await self._all(db, select(Reserva).where(Reserva.habitacion_id == habitacion_id))
+
+    async def get_by_estado(self, db: AsyncSession, estado: str) -> list[Reserva]:
+        """Obtener reservas por estado"""
+        return await self._all(db, select(Reserva).where(Reserva.estado == estado))
+
+    async def get_activas(self, db: AsyncSession) -> list[Reserva]:
+        """Obtener reservas activas (pendientes o confirmadas)"""
+        return await self._all(db, select(Reserva).where(Reserva.estado.in_(ESTADOS_ACTIVOS)))
+
+    async def verificar_disponibilidad(
+        self,
+        db: AsyncSession,
+        habitacion_id: int,
+        fecha_entrada: date,
+        fecha_salida: date,
+        reserva_id: Optional[int] = None,
+        bloqueo_token: Optional[str] = None
+    ) -> bool:
+        """
+        Verificar si una habitación está disponible en un rango de fechas
+        """
+        ocupacion = select_ocupacion(fecha_entrada, fecha_salida, bloqueo_token)
+        stmt = select(ocupacion.c.reserva_id).where(ocupacion.c.habitacion_id == habitacion_id)
+        if reserva_id:
+            stmt = stmt.where(or_(ocupacion.c.reserva_id.is_(None), ocupacion.c.reserva_id != reserva_id))
+
+        result = await db.execute(stmt.limit(1))
+        return result.first() is None
+
+    async def habitaciones_ocupadas(self, db: AsyncSession, fecha_entrada: date, fecha_salida: date) -> set[int]:
+        """IDs de habitaciones con reservas activas que se cruzan con las fechas"""
+        ocupacion = select_ocupacion(fecha_entrada, fecha_salida)
+        result = await db.execute(select(ocupacion.c.habitacion_id).distinct())
+        return set(result.scalars().all())
+
+
+# Instancia singleton
+async_reserva_repository = AsyncReservaRepository()
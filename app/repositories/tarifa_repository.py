@@ -0,0 +1,32 @@
+"""
+Repositorio de Tarifas
+"""
+
+from sqlalchemy.orm import Session
+from app.models.tarifa import Tarifa
+from app.repositories.base_repository import BaseRepository
+
+
+class TarifaRepository(BaseRepository[Tarifa]):
+    """
+    Repositorio para la entidad Tarifa
+    """
+    
+    def __init__(self):
+        super().__init__(Tarifa)
+    
+    def get_vigentes(self, db: Session) -> list[Tarifa]:
+        """Todas las reglas, para compilar el calendario de precios"""
+        return db.query(Tarifa).order_by(Tarifa.id).all()
+    
+    def get_by_habitacion(self, db: Session, habitacion_id: int) -> list[Tarifa]:
+        """Reglas propias de una habitación"""
+        return db.query(Tarifa).filter(Tarifa.habitacion_id == habitacion_id).all()
+    
+    def get_by_tipo(self, db: Session, tipo: str) -> list[Tarifa]:
+        """Reglas de un tipo de habitación"""
+        return db.query(Tarifa).filter(Tarifa.tipo == tipo).all()
+
+
+# Instancia singleton
+tarifa_repository = TarifaRepository()
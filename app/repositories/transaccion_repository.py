@@ -3,10 +3,29 @@ Repositorio de Transacciones Contables
 """
 
 from datetime import date
+from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.transaccion import Transaccion
-from app.repositories.base_repository import BaseRepository
+from app.repositories.base_repository import BaseRepository, invalidar_totales
+from app.repositories.async_base_repository import AsyncBaseRepository
+
+
+def filtros_transacciones(
+    cuenta_id: Optional[int] = None,
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None
+) -> tuple:
+    """Criterios de filtrado del listado de transacciones"""
+    filtros = []
+    if cuenta_id:
+        filtros.append(Transaccion.cuenta_id == cuenta_id)
+    if fecha_desde:
+        filtros.append(Transaccion.fecha_transaccion >= fecha_desde)
+    if fecha_hasta:
+        filtros.append(Transaccion.fecha_transaccion <= fecha_hasta)
+    return tuple(filtros)
 
 
 class TransaccionRepository(BaseRepository[Transaccion]):
@@ -39,28 +58,78 @@ class TransaccionRepository(BaseRepository[Transaccion]):
             )
         ).all()
     
-    def get_total_ingresos(self, db: Session, fecha_inicio: date, fecha_fin: date) -> float:
+    def get_total_ingresos(self, db: Session, fecha_inicio: Optional[date], fecha_fin: Optional[date]) -> float:
         """Calcular total de ingresos en un período"""
         result = db.query(func.sum(Transaccion.monto)).filter(
-            and_(
-                Transaccion.tipo == "ingreso",
-                Transaccion.fecha_transaccion >= fecha_inicio,
-                Transaccion.fecha_transaccion <= fecha_fin
-            )
+            Transaccion.tipo == "ingreso",
+            *filtros_transacciones(fecha_desde=fecha_inicio, fecha_hasta=fecha_fin)
         ).scalar()
         return result if result else 0.0
     
-    def get_total_egresos(self, db: Session, fecha_inicio: date, fecha_fin: date) -> float:
+    def get_total_egresos(self, db: Session, fecha_inicio: Optional[date], fecha_fin: Optional[date]) -> float:
         """Calcular total de egresos en un período"""
         result = db.query(func.sum(Transaccion.monto)).filter(
-            and_(
-                Transaccion.tipo == "egreso",
-                Transaccion.fecha_transaccion >= fecha_inicio,
-                Transaccion.fecha_transaccion <= fecha_fin
-            )
+            Transaccion.tipo == "egreso",
+            *filtros_transacciones(fecha_desde=fecha_inicio, fecha_hasta=fecha_fin)
         ).scalar()
         return result if result else 0.0
+    
+    def create_lote(self, db: Session, transacciones: list[dict]) -> None:
+        """Insertar varias transacciones en bloque (sin confirmar la transacción)"""
+        if transacciones:
+            db.bulk_insert_mappings(Transaccion, transacciones)
+            invalidar_totales(Transaccion.__tablename__)
 
 
 # Instancia singleton
 transaccion_repository = TransaccionRepository()
+
+
+class AsyncTransaccionRepository(AsyncBaseRepository[Transaccion]):
+    """
+    Repositorio asíncrono para la entidad Transacción
+    """
+
+    def __init__(self):
+        super().__init__(Transaccion)
+
+    async def get_by_cuenta(self, db: AsyncSession, cuenta_id: int) -> list[Transaccion]:
+        """Obtener transacciones de una cuenta"""
+        return await self._all(db, select(Transaccion).where(Transaccion.cuenta_id == cuenta_id))
+
+    async def get_by_tipo(self, db: AsyncSession, tipo: str) -> list[Transaccion]:
+        """Obtener transacciones por tipo (ingreso/egreso)"""
+        return await self._all(db, select(Transaccion).where(Transaccion.tipo == tipo))
+
+    async def get_by_fecha_rango(
+        self,
+        db: AsyncSession,
+        fecha_inicio: date,
+        fecha_fin: date
+    ) -> list[Transaccion]:
+        """Obtener transacciones en un rango de fechas"""
+        return await self._all(db, select(Transaccion).where(
+            Transaccion.fecha_transaccion >= fecha_inicio,
+            Transaccion.fecha_transaccion <= fecha_fin
+        ))
+
+    async def _get_total(self, db: AsyncSession, tipo: str, fecha_inicio: Optional[date], fecha_fin: Optional[date]) -> float:
+        """Calcular el total de un tipo de transacción en un período"""
+        result = await db.execute(select(func.sum(Transaccion.monto)).where(
+            Transaccion.tipo == tipo,
+            *filtros_transacciones(fecha_desde=fecha_inicio, fecha_hasta=fecha_fin)
+        ))
+        total = result.scalar()
+        return total if total else 0.0
+
+    async def get_total_ingresos(self, db: AsyncSession, fecha_inicio: Optional[date], fecha_fin: Optional[date]) -> float:
+        """Calcular total de ingresos en un período"""
+        return await self._get_total(db, "ingreso", fecha_inicio, fecha_fin)
+
+    async def get_total_egresos(self, db: AsyncSession, fecha_inicio: Optional[date], fecha_fin: Optional[date]) -> float:
+        """Calcular total de egresos en un período"""
+        return await self._get_total(db, "egreso", fecha_inicio, fecha_fin)
+
+
+# Instancia singleton
+async_transaccion_repository = AsyncTransaccionRepository()
@@ -4,8 +4,11 @@ Repositorio de Usuarios
 
 from typing import Optional
 from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.usuario import Usuario
 from app.repositories.base_repository import BaseRepository
+from app.repositories.async_base_repository import AsyncBaseRepository
 
 
 class UsuarioRepository(BaseRepository[Usuario]):
@@ -19,13 +22,6 @@ class UsuarioRepository(BaseRepository[Usuario]):
     def get_by_username(self, db: Session, username: str):
         """Buscar usuario por username"""
         return db.query(Usuario).filter(Usuario.username == username).first()
-
-    def create(self, db: Session, usuario: Usuario):
-        """Crear un nuevo usuario"""
-        db.add(usuario)
-        db.commit()
-        db.refresh(usuario)
-        return usuario
     
     def get_by_email(self, db: Session, email: str) -> Optional[Usuario]:
         """Buscar usuario por email"""
@@ -42,3 +38,32 @@ class UsuarioRepository(BaseRepository[Usuario]):
 
 # Instancia singleton
 usuario_repository = UsuarioRepository()
+
+
+class AsyncUsuarioRepository(AsyncBaseRepository[Usuario]):
+    """
+    Repositorio asíncrono para la entidad Usuario
+    """
+
+    def __init__(self):
+        super().__init__(Usuario)
+
+    async def get_by_username(self, db: AsyncSession, username: str) -> Optional[Usuario]:
+        """Buscar usuario por username"""
+        return await self._first(db, select(Usuario).where(Usuario.username == username))
+
+    async def get_by_email(self, db: AsyncSession, email: str) -> Optional[Usuario]:
+        """Buscar usuario por email"""
+        return await self._first(db, select(Usuario).where(Usuario.email == email))
+
+    async def get_by_rol(self, db: AsyncSession, rol: str) -> list[Usuario]:
+        """Obtener usuarios por rol"""
+        return await self._all(db, select(Usuario).where(Usuario.rol == rol))
+
+    async def get_activos(self, db: AsyncSession) -> list[Usuario]:
+        """Obtener usuarios activos"""
+        return await self._all(db, select(Usuario).where(Usuario.activo == True))
+
+
+# Instancia singleton
+async_usuario_repository = AsyncUsuarioRepository()
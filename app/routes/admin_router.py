@@ -0,0 +1,250 @@
+"""
+Controlador de Administración
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse, PlainTextResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.config import consultas_lentas, database, perfilado, trazas
+from app.config.database import get_db, get_pool_status, snapshot_sqlite
+from app.config.security import require_role
+from app.repositories.programador_repository import programador_repository
+from app.schemas.common import ResponseData
+from app.services.programador import programador
+
+router = APIRouter(prefix="/admin", tags=["Administración"])
+
+
+@router.get("/db/pool", response_model=ResponseData[dict])
+def get_estado_pool(
+    current_user = Depends(require_role(["Administrador"]))
+):
+    """
+    Estadísticas del pool de conexiones a la base de datos
+    """
+    estado = get_pool_status()
+    if database.async_engine is not None:
+        estado["async"] = get_pool_status(database.async_engine.sync_engine)
+    estado["replicas"] = [get_pool_status(motor) for motor in database.replica_engines]
+    return ResponseData(
+        success=True,
+        message="Estado del pool obtenido",
+        data=estado
+    )
+
+
+@router.post("/db/replicas/snapshot", response_model=ResponseData[dict])
+def refrescar_replicas_sqlite(
+    current_user = Depends(require_role(["Administrador"]))
+):
+    """
+    Refrescar las réplicas que son copias locales de la base SQLite principal
+    """
+    copias = []
+    try:
+        for url in database.DATABASE_REPLICA_URLS:
+            if url.startswith("sqlite:///"):
+                copias.append(snapshot_sqlite(url.split("///", 1)[1]))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    if not copias:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No hay réplicas SQLite en archivo configuradas"
+        )
+
+    return ResponseData(
+        success=True,
+        message="Réplicas actualizadas correctamente",
+        data={"replicas": copias}
+    )
+
+
+@router.get("/db/consultas-lentas", response_model=ResponseData[dict])
+def get_consultas_lentas(
+    limite: int = Query(50, ge=1, le=1000),
+    current_user = Depends(require_role(["Administrador"]))
+):
+    """
+    Consultas lentas registradas (más recientes primero) con su plan de ejecución
+    """
+    return ResponseData(
+        success=True,
+        message="Consultas lentas obtenidas",
+        data={
+            "umbral_ms": consultas_lentas.SLOW_QUERY_MS,
+            "consultas": consultas_lentas.obtener(limite)
+        }
+    )
+
+
+@router.delete("/db/consultas-lentas", response_model=ResponseData[dict])
+def limpiar_consultas_lentas(
+    current_user = Depends(require_role(["Administrador"]))
+):
+    """
+    Vaciar el registro de consultas lentas y los planes guardados
+    """
+    consultas_lentas.limpiar()
+    return ResponseData(
+        success=True,
+        message="Registro de consultas lentas vaciado",
+        data={}
+    )
+
+
+@router.post("/perfiles/token", response_model=ResponseData[dict])
+def crear_token_perfilado(
+    current_user = Depends(require_role(["Administrador"]))
+):
+    """
+    Token firmado para perfilar peticiones (cabecera X-Perfilado o parámetro perfilado)
+    """
+    return ResponseData(
+        success=True,
+        message="Token de perfilado generado",
+        data={
+            "token": perfilado.crear_token(current_user.username),
+            "cabecera": "X-Perfilado",
+            "parametro": perfilado.PARAMETRO,
+            "expira_minutos": perfilado.PERFILADO_TOKEN_MINUTOS
+        }
+    )
+
+
+@router.get("/perfiles", response_model=ResponseData[dict])
+def get_perfiles(
+    current_user = Depends(require_role(["Administrador"]))
+):
+    """
+    Perfiles de peticiones guardados
+    """
+    return ResponseData(
+        success=True,
+        message="Perfiles obtenidos",
+        data={"perfiles": perfilado.listar()}
+    )
+
+
+@router.get("/perfiles/{nombre}")
+def descargar_perfil(
+    nombre: str,
+    current_user = Depends(require_role(["Administrador"]))
+):
+    """
+    Descargar un perfil en formato pstats (snakeviz, flameprof, gprof2dot)
+    """
+    ruta = perfilado.ruta_perfil(nombre)
+    if ruta is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Perfil no encontrado"
+        )
+    return FileResponse(ruta, media_type="application/octet-stream", filename=nombre)
+
+
+@router.get("/perfiles/{nombre}/resumen", response_class=PlainTextResponse)
+def get_resumen_perfil(
+    nombre: str,
+    lineas: int = Query(30, ge=1, le=500),
+    current_user = Depends(require_role(["Administrador"]))
+):
+    """
+    Funciones con mayor tiempo acumulado de un perfil
+    """
+    texto = perfilado.resumen(nombre, lineas)
+    if texto is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Perfil no encontrado"
+        )
+    return PlainTextResponse(texto)
+
+
+@router.get("/trazas", response_model=ResponseData[dict])
+def get_trazas(
+    limite: int = Query(20, ge=1, le=500),
+    current_user = Depends(require_role(["Administrador"]))
+):
+    """
+    Trazas recientes del exportador en memoria (spans en formato JSON de OTLP)
+    """
+    return ResponseData(
+        success=True,
+        message="Trazas obtenidas",
+        data={
+            "habilitadas": trazas.TRAZAS_HABILITADAS,
+            "exportador": trazas.TRAZAS_EXPORTADOR,
+            "muestreo": trazas.TRAZAS_MUESTREO,
+            "trazas": trazas.obtener(limite)
+        }
+    )
+
+
+@router.get("/programador", response_model=ResponseData[dict])
+def get_programador(
+    current_user = Depends(require_role(["Administrador"]))
+):
+    """
+    Estado del programador de tareas: liderazgo de este worker y próxima
+    ejecución de cada tarea
+    """
+    return ResponseData(
+        success=True,
+        message="Estado del programador obtenido",
+        data=programador.estado()
+    )
+
+
+@router.get("/programador/ejecuciones", response_model=ResponseData[dict])
+def get_ejecuciones_programador(
+    tarea: Optional[str] = Query(None),
+    limite: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador"]))
+):
+    """
+    Historial de ejecuciones de las tareas programadas (de todos los workers)
+    """
+    ejecuciones = programador_repository.get_ejecuciones(db, tarea, limite)
+    return ResponseData(
+        success=True,
+        message="Ejecuciones obtenidas",
+        data={
+            "ejecuciones": [
+                {
+                    "tarea": e.tarea,
+                    "titular": e.titular,
+                    "inicio": e.inicio.isoformat(),
+                    "fin": e.fin.isoformat() if e.fin else None,
+                    "duracion": e.duracion,
+                    "estado": e.estado,
+                    "error": e.error
+                }
+                for e in ejecuciones
+            ]
+        }
+    )
+
+
+@router.post("/programador/tareas/{nombre}/ejecutar", response_model=ResponseData[dict])
+def ejecutar_tarea(
+    nombre: str,
+    current_user = Depends(require_role(["Administrador"]))
+):
+    """
+    Lanzar una tarea programada ahora, en este worker (el resultado queda en
+    el historial de ejecuciones)
+    """
+    programador.ejecutar_ahora(nombre)
+    return ResponseData(
+        success=True,
+        message="Tarea lanzada",
+        data={"tarea": nombre}
+    )
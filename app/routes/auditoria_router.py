@@ -0,0 +1,52 @@
+"""
+Controlador de Auditoría Nocturna
+"""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date
+
+from app.config.database import get_db
+from app.config.security import require_role
+from app.services.auditoria_service import auditoria_service
+from app.schemas.common import ResponseData, ResponseList
+
+router = APIRouter(prefix="/auditoria", tags=["Auditoría"])
+
+
+@router.get("/fecha-negocio")
+def get_fecha_negocio(
+    limite: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista", "Gerencia"]))
+):
+    """
+    Día de negocio abierto y últimas auditorías nocturnas
+    """
+    estado = auditoria_service.get_estado(db, limite)
+    return ResponseData(
+        success=True,
+        message="Fecha de negocio obtenida correctamente",
+        data=estado
+    )
+
+
+@router.post("/ejecutar")
+def ejecutar_auditoria(
+    hasta: Optional[date] = Query(None, description="Último día a cerrar (por defecto ayer)"),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Gerencia"]))
+):
+    """
+    Ejecutar la auditoría nocturna de los días de negocio pendientes
+    (normalmente lo hace el proceso programado). Una auditoría interrumpida
+    se reanuda desde el paso en que quedó.
+    """
+    auditorias = auditoria_service.ejecutar(db, hasta)
+    return ResponseList(
+        success=True,
+        message="Auditoría nocturna ejecutada correctamente",
+        data=auditorias,
+        total=len(auditorias)
+    )
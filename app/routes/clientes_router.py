@@ -4,12 +4,14 @@ Controlador de Clientes
 
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
-from app.config.database import get_db
-from app.config.security import require_role
+from app.config.database import get_db, get_db_lectura, get_async_db, DB_ASYNC
+from app.config.security import require_role, require_role_async
 from app.services.cliente_service import cliente_service
-from app.schemas.cliente_schema import ClienteCreate, ClienteUpdate, ClienteResponse
+from app.services.deduplicacion_service import deduplicacion_service
+from app.schemas.cliente_schema import ClienteCreate, ClienteUpdate, ClienteFusionRequest
 from app.schemas.common import ResponseData, ResponseList
 
 router = APIRouter(prefix="/clientes", tags=["Clientes"])
@@ -34,24 +36,93 @@ def create_cliente(
     )
 
 
-@router.get(
-    "/clientes",
-)
 def get_clientes(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas"),
+    db: Session = Depends(get_db_lectura),
     current_user = Depends(require_role(["Administrador", "Recepcionista", "Gerencia"]))
 ):
     """
     Obtener todos los clientes
     """
-    clientes = cliente_service.get_all(db, skip, limit)
+    pagina = cliente_service.get_all(db, skip, limit, cursor, fields)
+    return ResponseList(
+        success=True,
+        message="Clientes obtenidos correctamente",
+        data=pagina.items,
+        total=pagina.total,
+        next_cursor=pagina.next_cursor
+    )
+
+
+async def get_clientes_async(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role_async(["Administrador", "Recepcionista", "Gerencia"]))
+):
+    """
+    Obtener todos los clientes (modo asíncrono)
+    """
+    pagina = await cliente_service.get_all_async(db, skip, limit, cursor, fields)
     return ResponseList(
         success=True,
         message="Clientes obtenidos correctamente",
-        data=clientes,
-        total=len(clientes)
+        data=pagina.items,
+        total=pagina.total,
+        next_cursor=pagina.next_cursor
+    )
+
+
+router.add_api_route(
+    "/clientes",
+    get_clientes_async if DB_ASYNC else get_clientes,
+    methods=["GET"]
+)
+
+
+@router.post(
+    "/clientes/deduplicar",
+)
+def deduplicar_clientes(
+    umbral: float = Query(0.85, ge=0, le=1),
+    fusionar: bool = Query(False),
+    limite: int = Query(100, ge=0, le=1000),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador"]))
+):
+    """
+    Detectar clientes duplicados y, opcionalmente, fusionarlos (solo Administrador)
+    """
+    resultado = deduplicacion_service.ejecutar(db, umbral, fusionar, limite)
+    return ResponseData(
+        success=True,
+        message="Deduplicación de clientes ejecutada",
+        data=resultado
+    )
+
+
+@router.post(
+    "/clientes/{cliente_id}/fusionar",
+)
+def fusionar_clientes(
+    cliente_id: int,
+    fusion_data: ClienteFusionRequest,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador"]))
+):
+    """
+    Fusionar clientes duplicados en el cliente indicado (solo Administrador)
+    """
+    cliente = deduplicacion_service.fusionar(db, cliente_id, fusion_data.clientes_origen_ids)
+    return ResponseData(
+        success=True,
+        message="Clientes fusionados correctamente",
+        data=cliente
     )
 
 
@@ -74,6 +145,27 @@ def get_cliente(
     )
 
 
+@router.get(
+    "/clientes/{cliente_id}/perfil",
+)
+def get_perfil_cliente(
+    cliente_id: int,
+    ultimas: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista", "Gerencia"]))
+):
+    """
+    Obtener perfil del cliente: estadías, noches, gasto, saldo pendiente
+    y últimas reservas con su factura y pagos
+    """
+    perfil = cliente_service.get_perfil(db, cliente_id, ultimas)
+    return ResponseData(
+        success=True,
+        message="Perfil del cliente obtenido correctamente",
+        data=perfil
+    )
+
+
 @router.put(
     "/clientes/{cliente_id}",
 )
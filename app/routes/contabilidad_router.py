@@ -4,11 +4,13 @@ Controlador de Contabilidad
 
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from datetime import date
 
-from app.config.database import get_db
-from app.config.security import require_role
+from app.config.database import get_db, get_db_lectura, get_async_db, DB_ASYNC
+from app.config.security import require_role, require_role_async
+from app.config.versiones import registrar_catalogo
 from app.services.contabilidad_service import contabilidad_service
 from app.schemas.cuenta_contable_schema import (
     CuentaContableCreate,
@@ -40,12 +42,11 @@ def create_cuenta(
     )
 
 
-@router.get("/cuentas", response_model=ResponseList[CuentaContableResponse])
 def get_cuentas(
     tipo: Optional[str] = Query(None),
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_lectura),
     current_user = Depends(require_role(["Administrador", "Contador", "Gerencia"]))
 ):
     """
@@ -60,10 +61,42 @@ def get_cuentas(
     )
 
 
+async def get_cuentas_async(
+    tipo: Optional[str] = Query(None),
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role_async(["Administrador", "Contador", "Gerencia"]))
+):
+    """
+    Obtener cuentas contables (modo asíncrono)
+    """
+    cuentas = await contabilidad_service.get_cuentas_async(db, tipo, skip, limit)
+    return ResponseList(
+        success=True,
+        message="Cuentas obtenidas correctamente",
+        data=cuentas,
+        total=len(cuentas)
+    )
+
+
+router.add_api_route(
+    "/cuentas",
+    get_cuentas_async if DB_ASYNC else get_cuentas,
+    methods=["GET"],
+    response_model=ResponseList[CuentaContableResponse]
+)
+registrar_catalogo(
+    router.prefix + "/cuentas",
+    ["cuentas_contables"],
+    ["Administrador", "Contador", "Gerencia"]
+)
+
+
 @router.get("/cuentas/{cuenta_id}", response_model=ResponseData[CuentaContableResponse])
 def get_cuenta(
     cuenta_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_lectura),
     current_user = Depends(require_role(["Administrador", "Contador", "Gerencia"]))
 ):
     """
@@ -114,40 +147,84 @@ def create_transaccion(
     )
 
 
-@router.get("/transacciones", response_model=ResponseList[TransaccionResponse])
 def get_transacciones(
     cuenta_id: Optional[int] = Query(None),
     fecha_desde: Optional[date] = Query(None),
     fecha_hasta: Optional[date] = Query(None),
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas"),
+    db: Session = Depends(get_db_lectura),
     current_user = Depends(require_role(["Administrador", "Contador", "Gerencia"]))
 ):
     """
     Obtener transacciones contables
     """
-    transacciones = contabilidad_service.get_transacciones(
+    pagina = contabilidad_service.get_transacciones(
         db,
         cuenta_id,
         fecha_desde,
         fecha_hasta,
         skip,
-        limit
+        limit,
+        cursor,
+        fields
     )
     return ResponseList(
         success=True,
         message="Transacciones obtenidas correctamente",
-        data=transacciones,
-        total=len(transacciones)
+        data=pagina.items,
+        total=pagina.total,
+        next_cursor=pagina.next_cursor
     )
 
 
+async def get_transacciones_async(
+    cuenta_id: Optional[int] = Query(None),
+    fecha_desde: Optional[date] = Query(None),
+    fecha_hasta: Optional[date] = Query(None),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role_async(["Administrador", "Contador", "Gerencia"]))
+):
+    """
+    Obtener transacciones contables (modo asíncrono)
+    """
+    pagina = await contabilidad_service.get_transacciones_async(
+        db,
+        cuenta_id,
+        fecha_desde,
+        fecha_hasta,
+        skip,
+        limit,
+        cursor,
+        fields
+    )
+    return ResponseList(
+        success=True,
+        message="Transacciones obtenidas correctamente",
+        data=pagina.items,
+        total=pagina.total,
+        next_cursor=pagina.next_cursor
+    )
+
+
+router.add_api_route(
+    "/transacciones",
+    get_transacciones_async if DB_ASYNC else get_transacciones,
+    methods=["GET"]
+)
+
+
 @router.get("/balance", response_model=ResponseData[dict])
 def get_balance(
     fecha_desde: Optional[date] = Query(None),
     fecha_hasta: Optional[date] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_lectura),
     current_user = Depends(require_role(["Administrador", "Contador", "Gerencia"]))
 ):
     """
@@ -2,14 +2,15 @@
 Controlador de Facturas
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
-from app.config.database import get_db
-from app.config.security import require_role
+from app.config.database import get_db, get_db_lectura, get_async_db, DB_ASYNC
+from app.config.security import require_role, require_role_async
 from app.services.factura_service import factura_service
-from app.schemas.factura_schema import FacturaCreate, FacturaResponse, FacturaUpdate  # Agrega FacturaUpdate
+from app.schemas.factura_schema import FacturaCreate, FacturaUpdate
 from app.schemas.common import ResponseData, ResponseList
 
 router = APIRouter(prefix="/facturas", tags=["Facturas"])
@@ -34,27 +35,55 @@ def create_factura(
     )
 
 
-@router.get(
-    "/facturas",
-)
 def get_facturas(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas"),
+    db: Session = Depends(get_db_lectura),
     current_user = Depends(require_role(["Administrador", "Contador", "Gerencia"]))
 ):
     """
     Obtener todas las facturas
     """
-    facturas = factura_service.get_all(db, skip, limit)
+    pagina = factura_service.get_all(db, skip, limit, cursor, fields)
     return ResponseList(
         success=True,
         message="Facturas obtenidas correctamente",
-        data=facturas,
-        total=len(facturas)
+        data=pagina.items,
+        total=pagina.total,
+        next_cursor=pagina.next_cursor
     )
 
 
+async def get_facturas_async(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role_async(["Administrador", "Contador", "Gerencia"]))
+):
+    """
+    Obtener todas las facturas (modo asíncrono)
+    """
+    pagina = await factura_service.get_all_async(db, skip, limit, cursor, fields)
+    return ResponseList(
+        success=True,
+        message="Facturas obtenidas correctamente",
+        data=pagina.items,
+        total=pagina.total,
+        next_cursor=pagina.next_cursor
+    )
+
+
+router.add_api_route(
+    "/facturas",
+    get_facturas_async if DB_ASYNC else get_facturas,
+    methods=["GET"]
+)
+
+
 @router.get(
     "/facturas/{factura_id}",
 )
@@ -4,13 +4,15 @@ Controlador de Habitaciones
 
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from datetime import date
 
-from app.config.database import get_db
-from app.config.security import require_role
+from app.config.database import get_db, get_db_lectura, get_async_db, DB_ASYNC
+from app.config.security import require_role, require_role_async
+from app.config.versiones import registrar_catalogo
 from app.services.habitacion_service import habitacion_service
-from app.schemas.habitacion_schema import HabitacionCreate, HabitacionUpdate, HabitacionResponse
+from app.schemas.habitacion_schema import HabitacionCreate, HabitacionUpdate
 from app.schemas.common import ResponseData, ResponseList
 
 router = APIRouter(prefix="/habitaciones", tags=["Habitaciones"])
@@ -42,13 +44,12 @@ def create_habitacion(
     )
 
 
-@router.get(
-    "/habitaciones",
-)
 def get_habitaciones(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas"),
+    db: Session = Depends(get_db_lectura),
     current_user = Depends(require_role(["Administrador", "Recepcionista", "Gerencia"]))
 ):
     """
@@ -62,18 +63,51 @@ def get_habitaciones(
     Retorna:
         Listado de todas las habitaciones registradas
     """
-    habitaciones = habitacion_service.get_all(db, skip, limit)
+    pagina = habitacion_service.get_all(db, skip, limit, cursor, fields)
     return ResponseList(
         success=True,
         message="Habitaciones obtenidas correctamente",
-        data=habitaciones,
-        total=len(habitaciones)
+        data=pagina.items,
+        total=pagina.total,
+        next_cursor=pagina.next_cursor
     )
 
 
-@router.get(
-    "/habitaciones/disponibles",
+async def get_habitaciones_async(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role_async(["Administrador", "Recepcionista", "Gerencia"]))
+):
+    """
+    Obtener todas las habitaciones (modo asíncrono)
+    """
+    pagina = await habitacion_service.get_all_async(db, skip, limit, cursor, fields)
+    return ResponseList(
+        success=True,
+        message="Habitaciones obtenidas correctamente",
+        data=pagina.items,
+        total=pagina.total,
+        next_cursor=pagina.next_cursor
+    )
+
+
+router.add_api_route(
+    "/habitaciones",
+    get_habitaciones_async if DB_ASYNC else get_habitaciones,
+    methods=["GET"]
+)
+# El listado devuelve el estado operativo, así que el ETag sigue también
+# a los cambios de estado que hacen las reservas
+registrar_catalogo(
+    router.prefix + "/habitaciones",
+    ["habitaciones", "estados_habitacion"],
+    ["Administrador", "Recepcionista", "Gerencia"]
 )
+
+
 def get_habitaciones_disponibles(
     fecha_entrada: Optional[date] = Query(None),
     fecha_salida: Optional[date] = Query(None),
@@ -107,9 +141,37 @@ def get_habitaciones_disponibles(
     )
 
 
-@router.get(
-    "/habitaciones/{habitacion_id}",
+async def get_habitaciones_disponibles_async(
+    fecha_entrada: Optional[date] = Query(None),
+    fecha_salida: Optional[date] = Query(None),
+    tipo: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role_async(["Administrador", "Recepcionista"]))
+):
+    """
+    Obtener habitaciones disponibles (modo asíncrono)
+    """
+    habitaciones = await habitacion_service.get_disponibles_async(
+        db,
+        fecha_entrada,
+        fecha_salida,
+        tipo
+    )
+    return ResponseList(
+        success=True,
+        message="Habitaciones disponibles obtenidas",
+        data=habitaciones,
+        total=len(habitaciones)
+    )
+
+
+router.add_api_route(
+    "/habitaciones/disponibles",
+    get_habitaciones_disponibles_async if DB_ASYNC else get_habitaciones_disponibles,
+    methods=["GET"]
 )
+
+
 def get_habitacion(
     habitacion_id: int,
     db: Session = Depends(get_db),
@@ -133,6 +195,29 @@ def get_habitacion(
     )
 
 
+async def get_habitacion_async(
+    habitacion_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role_async(["Administrador", "Recepcionista", "Gerencia"]))
+):
+    """
+    Obtener habitación por ID (modo asíncrono)
+    """
+    habitacion = await habitacion_service.get_by_id_async(db, habitacion_id)
+    return ResponseData(
+        success=True,
+        message="Habitación obtenida correctamente",
+        data=habitacion
+    )
+
+
+router.add_api_route(
+    "/habitaciones/{habitacion_id}",
+    get_habitacion_async if DB_ASYNC else get_habitacion,
+    methods=["GET"]
+)
+
+
 @router.put(
     "/habitaciones/{habitacion_id}",
 )
@@ -0,0 +1,55 @@
+"""
+Controlador de Inventario por Tipo
+"""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date
+
+from app.config.database import get_db
+from app.config.security import require_role
+from app.services.inventario_service import inventario_service
+from app.schemas.common import ResponseData
+
+router = APIRouter(prefix="/inventario", tags=["Inventario"])
+
+
+@router.get("/disponibilidad")
+def get_disponibilidad_tipo(
+    tipo: str = Query(...),
+    fecha_entrada: date = Query(...),
+    fecha_salida: date = Query(...),
+    cantidad: int = Query(1, ge=1),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista", "Gerencia"]))
+):
+    """
+    Consultar si se pueden vender `cantidad` habitaciones de un tipo en unas
+    fechas, a partir de los contadores de inventario
+    """
+    disponibilidad = inventario_service.consultar(db, tipo, fecha_entrada, fecha_salida, cantidad)
+    return ResponseData(
+        success=True,
+        message="Disponibilidad obtenida correctamente",
+        data=disponibilidad
+    )
+
+
+@router.post("/reconciliar")
+def reconciliar_inventario(
+    dias: Optional[int] = Query(None, ge=1, le=730, description="Noches a revisar desde hoy"),
+    corregir: bool = Query(True, description="Reescribir los contadores desviados"),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador"]))
+):
+    """
+    Recalcular los contadores de inventario desde reservas y habitaciones e
+    informar de las desviaciones
+    """
+    resultado = inventario_service.reconciliar(db, dias, corregir)
+    return ResponseData(
+        success=True,
+        message=f"Reconciliación completada: {len(resultado.desviaciones)} desviaciones",
+        data=resultado
+    )
@@ -0,0 +1,103 @@
+"""
+Controlador de Lista de Espera
+"""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.config.database import get_db
+from app.config.security import require_role
+from app.services.lista_espera_service import lista_espera_service
+from app.schemas.lista_espera_schema import ListaEsperaCreate
+from app.schemas.common import ResponseData, ResponseList
+
+router = APIRouter(prefix="/lista-espera", tags=["Lista de espera"])
+
+
+@router.post("")
+def create_inscripcion(
+    datos: ListaEsperaCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista"]))
+):
+    """
+    Inscribir una estadía en la lista de espera
+    """
+    inscripcion = lista_espera_service.create(db, datos)
+    return ResponseData(
+        success=True,
+        message="Inscripción creada correctamente",
+        data=inscripcion
+    )
+
+
+@router.get("")
+def get_inscripciones(
+    estado: str = Query("Pendiente"),
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista", "Gerencia"]))
+):
+    """
+    Obtener las inscripciones en un estado, por orden de prioridad
+    """
+    inscripciones = lista_espera_service.get_all(db, estado, skip, limit)
+    return ResponseList(
+        success=True,
+        message="Inscripciones obtenidas correctamente",
+        data=inscripciones,
+        total=len(inscripciones)
+    )
+
+
+@router.get("/cliente/{cliente_id}")
+def get_inscripciones_cliente(
+    cliente_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista", "Gerencia"]))
+):
+    """
+    Obtener las inscripciones de un cliente
+    """
+    inscripciones = lista_espera_service.get_by_cliente(db, cliente_id)
+    return ResponseList(
+        success=True,
+        message="Inscripciones obtenidas correctamente",
+        data=inscripciones,
+        total=len(inscripciones)
+    )
+
+
+@router.post("/{lista_espera_id}/aceptar")
+def aceptar_oferta(
+    lista_espera_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista"]))
+):
+    """
+    Aceptar la habitación ofrecida a una inscripción y reservarla
+    """
+    reserva = lista_espera_service.aceptar(db, lista_espera_id)
+    return ResponseData(
+        success=True,
+        message="Oferta aceptada y reserva creada correctamente",
+        data=reserva
+    )
+
+
+@router.delete("/{lista_espera_id}")
+def cancelar_inscripcion(
+    lista_espera_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista"]))
+):
+    """
+    Retirar una inscripción de la lista de espera
+    """
+    lista_espera_service.cancelar(db, lista_espera_id)
+    return ResponseData(
+        success=True,
+        message="Inscripción cancelada correctamente",
+        data=None
+    )
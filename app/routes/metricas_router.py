@@ -0,0 +1,22 @@
+"""
+Controlador de Métricas
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.config.metricas import exportar_prometheus
+from app.services.programador import programador
+
+router = APIRouter(tags=["Métricas"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metricas():
+    """
+    Métricas de la API en formato de texto de Prometheus
+    """
+    return PlainTextResponse(
+        exportar_prometheus() + programador.exportar_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -2,12 +2,13 @@
 Controlador de Pagos
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
-from app.config.database import get_db
-from app.config.security import require_role
+from app.config.database import get_db, get_db_lectura, get_async_db, DB_ASYNC
+from app.config.security import require_role, require_role_async
 from app.services.pago_service import pago_service
 from app.schemas.pago_schema import PagoCreate, PagoResponse
 from app.schemas.common import ResponseData, ResponseList
@@ -32,29 +33,59 @@ def create_pago(
     )
 
 
-@router.get("", response_model=ResponseList[PagoResponse])
 def get_pagos(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas"),
+    db: Session = Depends(get_db_lectura),
     current_user = Depends(require_role(["Administrador", "Contador", "Gerencia"]))
 ):
     """
     Obtener todos los pagos
     """
-    pagos = pago_service.get_all(db, skip, limit)
+    pagina = pago_service.get_all(db, skip, limit, cursor, fields)
     return ResponseList(
         success=True,
         message="Pagos obtenidos correctamente",
-        data=pagos,
-        total=len(pagos)
+        data=pagina.items,
+        total=pagina.total,
+        next_cursor=pagina.next_cursor
     )
 
 
+async def get_pagos_async(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role_async(["Administrador", "Contador", "Gerencia"]))
+):
+    """
+    Obtener todos los pagos (modo asíncrono)
+    """
+    pagina = await pago_service.get_all_async(db, skip, limit, cursor, fields)
+    return ResponseList(
+        success=True,
+        message="Pagos obtenidos correctamente",
+        data=pagina.items,
+        total=pagina.total,
+        next_cursor=pagina.next_cursor
+    )
+
+
+router.add_api_route(
+    "",
+    get_pagos_async if DB_ASYNC else get_pagos,
+    methods=["GET"]
+)
+
+
 @router.get("/factura/{factura_id}", response_model=ResponseList[PagoResponse])
 def get_pagos_factura(
     factura_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_lectura),
     current_user = Depends(require_role(["Administrador", "Contador", "Gerencia"]))
 ):
     """
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from datetime import date
 
-from app.config.database import get_db
+from app.config.database import get_db_lectura
 from app.config.security import require_role
 from app.services.reporte_service import reporte_service
 from app.schemas.common import ResponseData
@@ -18,7 +18,7 @@ router = APIRouter(prefix="/reportes", tags=["Reportes"])
 def reporte_ocupacion(
     fecha_desde: date = Query(...),
     fecha_hasta: date = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_lectura),
     current_user = Depends(require_role(["Administrador", "Gerencia"]))
 ):
     """
@@ -36,7 +36,7 @@ def reporte_ocupacion(
 def reporte_revpar(
     fecha_desde: date = Query(...),
     fecha_hasta: date = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_lectura),
     current_user = Depends(require_role(["Administrador", "Gerencia"]))
 ):
     """
@@ -54,7 +54,7 @@ def reporte_revpar(
 def reporte_ingresos(
     fecha_desde: date = Query(...),
     fecha_hasta: date = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_lectura),
     current_user = Depends(require_role(["Administrador", "Gerencia", "Contador"]))
 ):
     """
@@ -72,7 +72,7 @@ def reporte_ingresos(
 def libro_diario(
     fecha_desde: date = Query(...),
     fecha_hasta: date = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_lectura),
     current_user = Depends(require_role(["Administrador", "Contador", "Gerencia"]))
 ):
     """
@@ -88,7 +88,7 @@ def libro_diario(
 
 @router.get("/habitaciones", response_model=ResponseData[dict])
 def reporte_habitaciones(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_lectura),
     current_user = Depends(require_role(["Administrador", "Gerencia"]))
 ):
     """
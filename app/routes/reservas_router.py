@@ -2,14 +2,23 @@
 Controlador de Reservas
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
-from app.config.database import get_db
-from app.config.security import require_role
+from app.config.database import get_db, get_db_lectura, get_async_db, DB_ASYNC
+from app.config.security import require_role, require_role_async
 from app.services.reserva_service import reserva_service
-from app.schemas.reserva_schema import ReservaCreate, ReservaUpdate, ReservaResponse
+from app.services.bloqueo_service import bloqueo_service
+from app.services.grupo_reserva_service import grupo_reserva_service
+from app.schemas.reserva_schema import (
+    ReservaCreate,
+    ReservaUpdate,
+    BloqueoCreate,
+    BloqueoConfirmarRequest,
+    GrupoReservaCreate
+)
 from app.schemas.common import ResponseData, ResponseList
 
 router = APIRouter(prefix="/reservas", tags=["Reservas"])
@@ -34,27 +43,55 @@ def create_reserva(
     )
 
 
-@router.get(
-    "/reservas",
-)
 def get_reservas(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas"),
+    db: Session = Depends(get_db_lectura),
     current_user = Depends(require_role(["Administrador", "Recepcionista", "Gerencia"]))
 ):
     """
     Obtener todas las reservas
     """
-    reservas = reserva_service.get_all(db, skip, limit)
+    pagina = reserva_service.get_all(db, skip, limit, cursor, fields)
     return ResponseList(
         success=True,
         message="Reservas obtenidas correctamente",
-        data=reservas,
-        total=len(reservas)
+        data=pagina.items,
+        total=pagina.total,
+        next_cursor=pagina.next_cursor
     )
 
 
+async def get_reservas_async(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor opaco de la página siguiente"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(require_role_async(["Administrador", "Recepcionista", "Gerencia"]))
+):
+    """
+    Obtener todas las reservas (modo asíncrono)
+    """
+    pagina = await reserva_service.get_all_async(db, skip, limit, cursor, fields)
+    return ResponseList(
+        success=True,
+        message="Reservas obtenidas correctamente",
+        data=pagina.items,
+        total=pagina.total,
+        next_cursor=pagina.next_cursor
+    )
+
+
+router.add_api_route(
+    "/reservas",
+    get_reservas_async if DB_ASYNC else get_reservas,
+    methods=["GET"]
+)
+
+
 @router.get(
     "/reservas/{reserva_id}",
 )
@@ -102,3 +139,181 @@ def cancel_reserva(reserva_id: int, db: Session = Depends(get_db)):
         message="Reserva cancelada correctamente",
         data=None
     )
+
+
+@router.get(
+    "/reservas/{reserva_id}/habitaciones",
+)
+def get_habitaciones_reserva(
+    reserva_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista", "Gerencia"]))
+):
+    """
+    Habitaciones de una reserva: la fija o las asignadas por el motor a una
+    reserva por tipo
+    """
+    asignacion = reserva_service.get_asignaciones(db, reserva_id)
+    return ResponseData(
+        success=True,
+        message="Habitaciones obtenidas correctamente",
+        data=asignacion
+    )
+
+
+@router.post(
+    "/asignaciones/reoptimizar",
+)
+def reoptimizar_asignaciones(
+    dias: Optional[int] = Query(None, ge=1, le=365, description="Días a reoptimizar desde hoy"),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Gerencia"]))
+):
+    """
+    Reoptimizar las habitaciones asignadas a las reservas por tipo para
+    reducir los huecos invendibles (normalmente lo ejecuta el proceso nocturno)
+    """
+    resultados = reserva_service.reoptimizar_asignaciones(db, dias)
+    return ResponseList(
+        success=True,
+        message="Asignaciones reoptimizadas correctamente",
+        data=resultados,
+        total=len(resultados)
+    )
+
+
+@router.post(
+    "/bloqueos",
+)
+def create_bloqueo(
+    bloqueo_data: BloqueoCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista"]))
+):
+    """
+    Bloquear una habitación unos minutos mientras el cliente completa el
+    pago. Devuelve el token para confirmar o liberar el bloqueo y su
+    vencimiento.
+    """
+    bloqueo = bloqueo_service.create(db, bloqueo_data)
+    return ResponseData(
+        success=True,
+        message="Habitación bloqueada correctamente",
+        data=bloqueo
+    )
+
+
+@router.delete(
+    "/bloqueos/{token}",
+)
+def delete_bloqueo(
+    token: str,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista"]))
+):
+    """
+    Liberar un bloqueo antes de que venza
+    """
+    bloqueo_service.liberar(db, token)
+    return ResponseData(
+        success=True,
+        message="Bloqueo liberado correctamente",
+        data=None
+    )
+
+
+@router.post(
+    "/bloqueos/{token}/confirmar",
+)
+def confirmar_bloqueo(
+    token: str,
+    datos: BloqueoConfirmarRequest,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista"]))
+):
+    """
+    Convertir un bloqueo en reserva confirmada, en una sola transacción
+    """
+    reserva = reserva_service.confirmar_bloqueo(db, token, datos)
+    return ResponseData(
+        success=True,
+        message="Reserva creada correctamente",
+        data=reserva
+    )
+
+
+@router.post(
+    "/grupos",
+)
+def create_grupo(
+    grupo_data: GrupoReservaCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista"]))
+):
+    """
+    Reservar varias habitaciones para las mismas fechas en una sola
+    transacción: se reservan todas o ninguna
+    """
+    grupo = grupo_reserva_service.create(db, grupo_data)
+    return ResponseData(
+        success=True,
+        message="Grupo reservado correctamente",
+        data=grupo
+    )
+
+
+@router.get(
+    "/grupos/{grupo_id}",
+)
+def get_grupo(
+    grupo_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista", "Gerencia"]))
+):
+    """
+    Obtener un grupo con sus reservas
+    """
+    grupo = grupo_reserva_service.get_by_id(db, grupo_id)
+    return ResponseData(
+        success=True,
+        message="Grupo obtenido correctamente",
+        data=grupo
+    )
+
+
+@router.post(
+    "/grupos/{grupo_id}/check-in",
+)
+def check_in_grupo(
+    grupo_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista"]))
+):
+    """
+    Check-in de todas las reservas confirmadas del grupo
+    """
+    grupo = grupo_reserva_service.check_in(db, grupo_id)
+    return ResponseData(
+        success=True,
+        message="Check-in del grupo realizado correctamente",
+        data=grupo
+    )
+
+
+@router.post(
+    "/grupos/{grupo_id}/check-out",
+)
+def check_out_grupo(
+    grupo_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista"]))
+):
+    """
+    Check-out de todas las reservas en curso del grupo (genera sus facturas)
+    """
+    grupo = grupo_reserva_service.check_out(db, grupo_id)
+    return ResponseData(
+        success=True,
+        message="Check-out del grupo realizado correctamente",
+        data=grupo
+    )
@@ -0,0 +1,128 @@
+"""
+Controlador de Tarifas
+"""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.config.database import get_db
+from app.config.security import require_role
+from app.services.tarifa_service import tarifa_service
+from app.schemas.tarifa_schema import TarifaCreate, TarifaUpdate, CotizacionRequest, CotizacionLoteRequest
+from app.schemas.common import ResponseData, ResponseList
+
+router = APIRouter(prefix="/tarifas", tags=["Tarifas"])
+
+
+@router.post("/tarifas")
+def create_tarifa(
+    tarifa_data: TarifaCreate,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Gerencia"]))
+):
+    """
+    Crear nueva regla de tarifa (temporada, fin de semana, precio por tipo...)
+    """
+    tarifa = tarifa_service.create(db, tarifa_data)
+    return ResponseData(
+        success=True,
+        message="Tarifa creada correctamente",
+        data=tarifa
+    )
+
+
+@router.get("/tarifas")
+def get_tarifas(
+    habitacion_id: Optional[int] = Query(None),
+    tipo: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista", "Gerencia"]))
+):
+    """
+    Obtener las reglas de tarifa, opcionalmente filtradas por habitación o tipo
+    """
+    tarifas = tarifa_service.get_all(db, habitacion_id, tipo)
+    return ResponseList(
+        success=True,
+        message="Tarifas obtenidas correctamente",
+        data=tarifas,
+        total=len(tarifas)
+    )
+
+
+@router.put("/tarifas/{tarifa_id}")
+def update_tarifa(
+    tarifa_id: int,
+    tarifa_data: TarifaUpdate,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Gerencia"]))
+):
+    """
+    Actualizar regla de tarifa
+    """
+    tarifa = tarifa_service.update(db, tarifa_id, tarifa_data)
+    return ResponseData(
+        success=True,
+        message="Tarifa actualizada correctamente",
+        data=tarifa
+    )
+
+
+@router.delete("/tarifas/{tarifa_id}")
+def delete_tarifa(
+    tarifa_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Gerencia"]))
+):
+    """
+    Eliminar regla de tarifa
+    """
+    tarifa_service.delete(db, tarifa_id)
+    return ResponseData(
+        success=True,
+        message="Tarifa eliminada correctamente",
+        data=None
+    )
+
+
+@router.post("/cotizaciones")
+def cotizar(
+    cotizacion: CotizacionRequest,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista", "Gerencia"]))
+):
+    """
+    Cotizar una estadía en varias habitaciones a la vez
+
+    Usa el motor principal: la tabla compilada se construye con las tarifas
+    recién escritas, no con las de una réplica atrasada.
+    """
+    cotizaciones = tarifa_service.cotizar(db, cotizacion)
+    return ResponseList(
+        success=True,
+        message="Cotización calculada correctamente",
+        data=cotizaciones,
+        total=len(cotizaciones)
+    )
+
+
+@router.post("/cotizaciones/lote")
+def cotizar_lote(
+    lote: CotizacionLoteRequest,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_role(["Administrador", "Recepcionista", "Gerencia"]))
+):
+    """
+    Cotizar varias estadías candidatas (fechas, personas y tipo) en todas las
+    habitaciones libres, ordenadas por precio
+
+    - **lote.top_k**: opciones más baratas a devolver por estadía (todas si se omite)
+    """
+    cotizaciones = tarifa_service.cotizar_lote(db, lote)
+    return ResponseList(
+        success=True,
+        message="Cotización calculada correctamente",
+        data=cotizaciones,
+        total=len(cotizaciones)
+    )
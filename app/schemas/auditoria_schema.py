@@ -0,0 +1,28 @@
+"""
+Schemas para Auditoría Nocturna
+"""
+
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date, datetime
+
+
+class AuditoriaResponse(BaseModel):
+    """Resultado del cierre de un día de negocio"""
+    fecha: date
+    paso: int
+    estado: str
+    no_shows: int
+    noches_cargadas: int
+    ingreso_habitaciones: float
+    salidas_vencidas: int
+    finalizada_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class FechaNegocioResponse(BaseModel):
+    """Día de negocio abierto y últimas auditorías"""
+    fecha_negocio: date
+    auditorias: List[AuditoriaResponse]
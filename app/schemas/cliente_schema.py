@@ -3,9 +3,12 @@ Schemas para Cliente
 """
 
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
+from app.schemas.reserva_schema import ReservaResponse
+from app.schemas.pago_schema import PagoResponse
+
 
 class ClienteBase(BaseModel):
     """Base de Cliente"""
@@ -38,3 +41,43 @@ class ClienteResponse(ClienteBase):
     
     class Config:
         from_attributes = True
+
+
+class ClienteDuplicadoResponse(BaseModel):
+    """Par de clientes candidatos a ser duplicados"""
+    cliente_a_id: int
+    cliente_b_id: int
+    puntaje: float
+    claves: List[str]
+
+
+class ClienteFusionRequest(BaseModel):
+    """Request para fusionar clientes duplicados en un cliente destino"""
+    clientes_origen_ids: List[int]
+
+
+class FacturaResumen(BaseModel):
+    """Resumen de factura con sus pagos para el perfil del cliente"""
+    id: int
+    numero_factura: str
+    total: float
+    pagos: List[PagoResponse] = []
+
+    class Config:
+        from_attributes = True
+
+
+class ReservaHistorialResponse(ReservaResponse):
+    """Reserva del historial del cliente con su factura"""
+    factura: Optional[FacturaResumen] = None
+
+
+class ClientePerfilResponse(BaseModel):
+    """Perfil del cliente con los agregados de todo su historial"""
+    cliente: ClienteResponse
+    total_reservas: int
+    total_estadias: int
+    total_noches: int
+    gasto_total: float
+    saldo_pendiente: float
+    ultimas_reservas: List[ReservaHistorialResponse]
@@ -23,6 +23,14 @@ class ResponseList(ResponseBase, Generic[T]):
     """Respuesta con lista de datos"""
     data: List[T]
     total: int
+    next_cursor: Optional[str] = None
+
+
+class Pagina(BaseModel, Generic[T]):
+    """Página de resultados con el total real y el cursor de la siguiente"""
+    items: List[T]
+    total: int
+    next_cursor: Optional[str] = None
 
 
 class ErrorResponse(BaseModel):
@@ -1,58 +1,36 @@
 """
-Schemas para Reserva
+Schemas para Factura
 """
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel
 from typing import Optional
-from datetime import date, datetime
-
-
-class ReservaBase(BaseModel):
-    """Base de Reserva"""
-    cliente_id: int
-    habitacion_id: int
-    fecha_entrada: date
-    fecha_salida: date
-    observaciones: Optional[str] = None
-    
-    @validator('fecha_salida')
-    def validar_fechas(cls, fecha_salida, values):
-        if 'fecha_entrada' in values and fecha_salida <= values['fecha_entrada']:
-            raise ValueError('La fecha de salida debe ser posterior a la fecha de entrada')
-        return fecha_salida
-
-
-class ReservaCreate(ReservaBase):
-    """Schema para crear reserva"""
-    pass
-
-
-class ReservaUpdate(BaseModel):
-    """Schema para actualizar reserva"""
-    fecha_entrada: Optional[date] = None
-    fecha_salida: Optional[date] = None
-    estado: Optional[str] = None
-    observaciones: Optional[str] = None
-    
-    @validator('fecha_salida')
-    def validar_fechas(cls, fecha_salida, values):
-        if 'fecha_entrada' in values and fecha_salida and values['fecha_entrada']:
-            if fecha_salida <= values['fecha_entrada']:
-                raise ValueError('La fecha de salida debe ser posterior a la fecha de entrada')
-        return fecha_salida
-
-
-class ReservaResponse(ReservaBase):
-    """Schema de respuesta de reserva"""
+from datetime import datetime
+
+
+class FacturaBase(BaseModel):
+    """Base de Factura"""
+    reserva_id: int
+
+
+class FacturaCreate(FacturaBase):
+    """Schema para crear factura"""
+    descuentos: Optional[float] = None
+
+
+class FacturaUpdate(BaseModel):
+    """Schema para actualizar factura"""
+    descuentos: Optional[float] = None
+
+
+class FacturaResponse(FacturaBase):
+    """Schema de respuesta de factura"""
     id: int
-    precio_total: float
-    estado: str
-    created_at: datetime
-    
+    numero_factura: str
+    subtotal: float
+    impuestos: float
+    descuentos: float
+    total: float
+    fecha_emision: Optional[datetime] = None
+
     class Config:
         from_attributes = True
-
-
-class ReservaCancelRequest(BaseModel):
-    """Request para cancelar reserva"""
-    motivo: Optional[str] = None
@@ -0,0 +1,38 @@
+"""
+Schemas para Inventario por Tipo
+"""
+
+from pydantic import BaseModel
+from typing import List
+from datetime import date
+
+
+class DisponibilidadTipoResponse(BaseModel):
+    """Cupo de un tipo de habitación para un rango de noches"""
+    tipo: str
+    fecha_entrada: date
+    fecha_salida: date
+    disponibles: int  # mínimo de habitaciones libres en el rango
+    solicitadas: int
+    vendible: bool
+
+
+class DesviacionInventario(BaseModel):
+    """Diferencia entre los contadores guardados y los recalculados"""
+    tipo: str
+    fecha: date
+    total_registrado: int
+    total_esperado: int
+    vendidas_registradas: int
+    vendidas_esperadas: int
+    bloqueadas_registradas: int
+    bloqueadas_esperadas: int
+
+
+class ReconciliacionInventarioResponse(BaseModel):
+    """Resultado de reconstruir los contadores desde las reservas"""
+    desde: date
+    hasta: date
+    filas_revisadas: int
+    desviaciones: List[DesviacionInventario]
+    corregidas: bool
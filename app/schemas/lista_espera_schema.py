@@ -0,0 +1,49 @@
+"""
+Schemas para Lista de Espera
+"""
+
+from pydantic import BaseModel, validator
+from typing import Optional
+from datetime import date, datetime
+
+
+class ListaEsperaBase(BaseModel):
+    """Base de Lista de Espera"""
+    cliente_id: int
+    fecha_entrada: date
+    fecha_salida: date
+    tipo: Optional[str] = None
+    capacidad: int = 1
+    prioridad: int = 0
+    auto_reservar: bool = False
+    
+    @validator('fecha_salida')
+    def validar_fechas(cls, fecha_salida, values):
+        if 'fecha_entrada' in values and fecha_salida <= values['fecha_entrada']:
+            raise ValueError('La fecha de salida debe ser posterior a la fecha de entrada')
+        return fecha_salida
+    
+    @validator('capacidad')
+    def validar_capacidad(cls, capacidad):
+        if capacidad <= 0:
+            raise ValueError('La capacidad debe ser mayor a 0')
+        return capacidad
+
+
+class ListaEsperaCreate(ListaEsperaBase):
+    """Schema para inscribir una estadía en la lista de espera"""
+    pass
+
+
+class ListaEsperaResponse(ListaEsperaBase):
+    """Schema de respuesta de lista de espera"""
+    id: int
+    estado: str
+    habitacion_id: Optional[int] = None
+    oferta_expira: Optional[datetime] = None
+    bloqueo_token: Optional[str] = None
+    reserva_id: Optional[int] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
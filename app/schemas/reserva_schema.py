@@ -3,18 +3,30 @@ Schemas para Reserva
 """
 
 from pydantic import BaseModel, validator
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 
 
 class ReservaBase(BaseModel):
     """Base de Reserva"""
     cliente_id: int
-    habitacion_id: int
+    habitacion_id: Optional[int] = None
+    tipo: Optional[str] = None  # reserva por tipo: el motor asigna las habitaciones
+    cantidad: int = 1
     fecha_entrada: date
     fecha_salida: date
     observaciones: Optional[str] = None
     
+    @validator('cantidad', always=True)
+    def validar_habitacion_o_tipo(cls, cantidad, values):
+        if (values.get('habitacion_id') is None) == (values.get('tipo') is None):
+            raise ValueError('Indique habitacion_id o tipo (solo uno de los dos)')
+        if cantidad <= 0:
+            raise ValueError('La cantidad de habitaciones debe ser mayor a 0')
+        if cantidad > 1 and values.get('tipo') is None:
+            raise ValueError('Solo una reserva por tipo puede incluir varias habitaciones')
+        return cantidad
+    
     @validator('fecha_salida')
     def validar_fechas(cls, fecha_salida, values):
         if 'fecha_entrada' in values and fecha_salida <= values['fecha_entrada']:
@@ -47,12 +59,102 @@ class ReservaResponse(ReservaBase):
     id: int
     precio_total: float
     estado: str
+    grupo_id: Optional[int] = None
     created_at: datetime
     
     class Config:
         from_attributes = True
 
 
+class AsignacionResponse(BaseModel):
+    """Habitaciones asignadas a una reserva por tipo"""
+    reserva_id: int
+    tipo: Optional[str] = None
+    habitacion_ids: List[int]
+
+
+class ReoptimizacionTipoResponse(BaseModel):
+    """Resultado de la reoptimización de un tipo de habitación"""
+    tipo: str
+    habitaciones: int
+    unidades: int
+    movimientos: int
+    huecos_antes: int
+    huecos_despues: int
+    aplicada: bool
+
+
+class BloqueoCreate(BaseModel):
+    """Schema para bloquear una habitación mientras se completa el pago"""
+    habitacion_id: int
+    fecha_entrada: date
+    fecha_salida: date
+    cliente_id: Optional[int] = None
+    
+    @validator('fecha_salida')
+    def validar_fechas(cls, fecha_salida, values):
+        if 'fecha_entrada' in values and fecha_salida <= values['fecha_entrada']:
+            raise ValueError('La fecha de salida debe ser posterior a la fecha de entrada')
+        return fecha_salida
+
+
+class BloqueoResponse(BaseModel):
+    """Schema de respuesta de bloqueo"""
+    token: str
+    habitacion_id: int
+    fecha_entrada: date
+    fecha_salida: date
+    cliente_id: Optional[int] = None
+    expira: datetime
+    precio_total: float
+    
+    class Config:
+        from_attributes = True
+
+
+class BloqueoConfirmarRequest(BaseModel):
+    """Datos para convertir un bloqueo en reserva"""
+    cliente_id: Optional[int] = None  # obligatorio si el bloqueo no tiene cliente
+    observaciones: Optional[str] = None
+
+
+class GrupoReservaCreate(BaseModel):
+    """Schema para reservar varias habitaciones de una vez (todas o ninguna)"""
+    cliente_id: int
+    nombre: str
+    habitacion_ids: List[int]
+    fecha_entrada: date
+    fecha_salida: date
+    observaciones: Optional[str] = None
+    
+    @validator('habitacion_ids')
+    def validar_habitaciones(cls, habitacion_ids):
+        if not habitacion_ids:
+            raise ValueError('Indique al menos una habitación')
+        if len(set(habitacion_ids)) != len(habitacion_ids):
+            raise ValueError('Hay habitaciones repetidas')
+        return habitacion_ids
+    
+    @validator('fecha_salida')
+    def validar_fechas(cls, fecha_salida, values):
+        if 'fecha_entrada' in values and fecha_salida <= values['fecha_entrada']:
+            raise ValueError('La fecha de salida debe ser posterior a la fecha de entrada')
+        return fecha_salida
+
+
+class GrupoReservaResponse(BaseModel):
+    """Schema de respuesta de grupo de reservas"""
+    id: int
+    nombre: str
+    cliente_id: int
+    fecha_entrada: date
+    fecha_salida: date
+    observaciones: Optional[str] = None
+    precio_total: float
+    reservas: List[ReservaResponse]
+    created_at: datetime
+
+
 class ReservaCancelRequest(BaseModel):
     """Request para cancelar reserva"""
     motivo: Optional[str] = None
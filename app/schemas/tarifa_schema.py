@@ -0,0 +1,149 @@
+"""
+Schemas para Tarifa y cotizaciones
+"""
+
+from pydantic import BaseModel, validator
+from typing import List, Optional
+from datetime import date, datetime
+
+
+class TarifaBase(BaseModel):
+    """Base de Tarifa"""
+    nombre: str
+    habitacion_id: Optional[int] = None
+    tipo: Optional[str] = None
+    fecha_desde: Optional[date] = None
+    fecha_hasta: Optional[date] = None
+    dias_semana: Optional[str] = None  # lunes a domingo, p. ej. "0000011"
+    precio: Optional[float] = None
+    factor: Optional[float] = None
+    prioridad: int = 0
+    
+    @validator('dias_semana')
+    def validar_dias_semana(cls, dias_semana):
+        if dias_semana is not None and (len(dias_semana) != 7 or set(dias_semana) - {"0", "1"}):
+            raise ValueError('dias_semana debe tener 7 caracteres 0/1 de lunes a domingo')
+        return dias_semana
+    
+    @validator('fecha_hasta')
+    def validar_fechas(cls, fecha_hasta, values):
+        fecha_desde = values.get('fecha_desde')
+        if fecha_hasta and fecha_desde and fecha_hasta < fecha_desde:
+            raise ValueError('La fecha final de la tarifa no puede ser anterior a la inicial')
+        return fecha_hasta
+    
+    @validator('factor', always=True)
+    def validar_precio_o_factor(cls, factor, values):
+        precio = values.get('precio')
+        if (precio is None) == (factor is None):
+            raise ValueError('Indique precio o factor (solo uno de los dos)')
+        if (precio is not None and precio <= 0) or (factor is not None and factor <= 0):
+            raise ValueError('El precio y el factor deben ser mayores a 0')
+        return factor
+
+
+class TarifaCreate(TarifaBase):
+    """Schema para crear tarifa"""
+    pass
+
+
+class TarifaUpdate(BaseModel):
+    """Schema para actualizar tarifa"""
+    nombre: Optional[str] = None
+    fecha_desde: Optional[date] = None
+    fecha_hasta: Optional[date] = None
+    dias_semana: Optional[str] = None
+    precio: Optional[float] = None
+    factor: Optional[float] = None
+    prioridad: Optional[int] = None
+
+
+class TarifaResponse(TarifaBase):
+    """Schema de respuesta de tarifa"""
+    id: int
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class CotizacionRequest(BaseModel):
+    """Request para cotizar una estadía en varias habitaciones"""
+    fecha_entrada: date
+    fecha_salida: date
+    habitacion_ids: Optional[List[int]] = None  # todas las activas si no se indica
+    
+    @validator('fecha_salida')
+    def validar_fechas(cls, fecha_salida, values):
+        if 'fecha_entrada' in values and fecha_salida <= values['fecha_entrada']:
+            raise ValueError('La fecha de salida debe ser posterior a la fecha de entrada')
+        return fecha_salida
+
+
+class EstadiaCotizacion(BaseModel):
+    """Estadía candidata de una cotización por lotes"""
+    fecha_entrada: date
+    fecha_salida: date
+    personas: int = 1
+    tipo: Optional[str] = None
+    
+    @validator('fecha_salida')
+    def validar_fechas(cls, fecha_salida, values):
+        if 'fecha_entrada' in values and fecha_salida <= values['fecha_entrada']:
+            raise ValueError('La fecha de salida debe ser posterior a la fecha de entrada')
+        return fecha_salida
+    
+    @validator('personas')
+    def validar_personas(cls, personas):
+        if personas <= 0:
+            raise ValueError('El número de personas debe ser mayor a 0')
+        return personas
+
+
+class CotizacionLoteRequest(BaseModel):
+    """Request para cotizar varias estadías en todas las habitaciones libres"""
+    estadias: List[EstadiaCotizacion]
+    top_k: Optional[int] = None  # opciones más baratas por estadía; todas si no se indica
+    
+    @validator('estadias')
+    def validar_estadias(cls, estadias):
+        if not estadias:
+            raise ValueError('Indique al menos una estadía')
+        if len(estadias) > 100:
+            raise ValueError('Como máximo 100 estadías por cotización')
+        return estadias
+    
+    @validator('top_k')
+    def validar_top_k(cls, top_k):
+        if top_k is not None and top_k <= 0:
+            raise ValueError('top_k debe ser mayor a 0')
+        return top_k
+
+
+class OpcionCotizacion(BaseModel):
+    """Habitación libre para una estadía y su precio"""
+    habitacion_id: int
+    numero: str
+    tipo: str
+    capacidad: int
+    total: float
+    promedio_noche: float
+
+
+class CotizacionEstadiaResponse(BaseModel):
+    """Opciones de una estadía, de la más barata a la más cara"""
+    fecha_entrada: date
+    fecha_salida: date
+    personas: int
+    tipo: Optional[str] = None
+    noches: int
+    disponibles: int
+    opciones: List[OpcionCotizacion]
+
+
+class CotizacionResponse(BaseModel):
+    """Precio de una estadía en una habitación"""
+    habitacion_id: int
+    noches: int
+    total: float
+    promedio_noche: float
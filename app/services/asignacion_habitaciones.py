@@ -0,0 +1,351 @@
+"""
+Motor de asignación de habitaciones para reservas por tipo
+
+Una reserva por tipo guarda el tipo y la cantidad de habitaciones; las
+habitaciones concretas las elige este motor (tabla asignaciones_habitacion)
+y puede cambiarlas mientras el huésped no haya llegado.
+
+Heurística (interval scheduling con best-fit): las estancias se colocan por
+fecha de entrada y, para cada una, se elige la habitación libre que menos
+fragmenta el calendario:
+
+1. menos huecos huérfanos creados (1..HUECO_HUERFANO_NOCHES noches entre dos
+   estancias, difíciles de vender),
+2. no mover la estancia de la habitación que ya tenía,
+3. menor holgura antes y después (la que deja la estancia más pegada a sus
+   vecinas).
+
+Cada habitación guarda sus estancias ordenadas por entrada: comprobar si
+una estancia cabe y medir los huecos es una búsqueda binaria.
+
+- Incremental (cada reserva nueva): se colocan sus unidades sin mover a
+  nadie; si no caben, se reoptimizan las estancias movibles del tipo que se
+  cruzan con sus fechas.
+- Completa (nocturna): se recolocan las estancias movibles de los próximos
+  ASIGNACION_HORIZONTE_DIAS y el plan se aplica solo si deja menos huecos
+  huérfanos que el actual.
+
+Las estancias en curso y las que empiezan antes de hoy +
+ASIGNACION_BLOQUEO_DIAS no se mueven.
+
+Entre workers (y frente a las reservas con habitación fija) la asignación
+se serializa con las filas de las habitaciones: la incremental bloquea las
+del plan y vuelve a planificar con ellas tomadas; la completa bloquea todas
+las del tipo.
+"""
+
+import os
+import threading
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Hashable, Iterable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.repositories.asignacion_repository import asignacion_repository
+from app.repositories.habitacion_repository import habitacion_repository
+from app.repositories.reserva_repository import ESTADOS_ACTIVOS
+from app.services.catalogo_habitaciones import catalogo_habitaciones
+
+# Huecos de hasta estas noches entre dos estancias cuentan como invendibles
+HUECO_HUERFANO_NOCHES = int(os.getenv("HUECO_HUERFANO_NOCHES", 2))
+
+# Días que cubre la reoptimización nocturna
+ASIGNACION_HORIZONTE_DIAS = int(os.getenv("ASIGNACION_HORIZONTE_DIAS", 30))
+
+# Las estancias que empiezan antes de hoy + estos días ya no se mueven
+ASIGNACION_BLOQUEO_DIAS = int(os.getenv("ASIGNACION_BLOQUEO_DIAS", 1))
+
+_ESTADOS_MOVIBLES = set(ESTADOS_ACTIVOS)
+
+
+@dataclass(frozen=True)
+class Estancia:
+    """Unidad a colocar: una habitación durante unas fechas"""
+    clave: Hashable
+    fecha_entrada: date
+    fecha_salida: date
+    actual: Optional[int] = None
+
+
+class Planificador:
+    """
+    Calendario de ocupación de las habitaciones de un tipo, con las
+    estancias de cada habitación ordenadas por fecha de entrada
+    """
+
+    def __init__(self, habitacion_ids: Iterable[int], ocupadas: Iterable[tuple] = ()):
+        self._entradas: dict[int, list] = {h: [] for h in habitacion_ids}
+        self._salidas: dict[int, list] = {h: [] for h in self._entradas}
+        for habitacion_id, fecha_entrada, fecha_salida in ocupadas:
+            if habitacion_id in self._entradas:
+                self.ocupar(habitacion_id, fecha_entrada, fecha_salida)
+
+    def ocupar(self, habitacion_id: int, fecha_entrada: date, fecha_salida: date) -> None:
+        entradas = self._entradas[habitacion_id]
+        posicion = bisect_right(entradas, fecha_entrada)
+        entradas.insert(posicion, fecha_entrada)
+        self._salidas[habitacion_id].insert(posicion, fecha_salida)
+
+    def holguras(self, habitacion_id: int, fecha_entrada: date, fecha_salida: date) -> Optional[tuple]:
+        """
+        Noches libres antes y después de la estancia en la habitación (None si
+        no hay estancia a ese lado), o None si la estancia no cabe
+        """
+        entradas = self._entradas[habitacion_id]
+        salidas = self._salidas[habitacion_id]
+        posicion = bisect_right(entradas, fecha_entrada)
+        antes = (fecha_entrada - salidas[posicion - 1]).days if posicion else None
+        if antes is not None and antes < 0:
+            return None
+        despues = (entradas[posicion] - fecha_salida).days if posicion < len(entradas) else None
+        if despues is not None and despues < 0:
+            return None
+        return antes, despues
+
+    def colocar(self, estancias: Iterable[Estancia]) -> tuple[dict, list]:
+        """
+        Colocar las estancias por orden de entrada (las más largas primero a
+        igual entrada). Devuelve {clave: habitacion_id} y las que no cupieron.
+        """
+        colocadas = {}
+        sin_sitio = []
+        orden = sorted(estancias, key=lambda e: (e.fecha_entrada, e.fecha_entrada - e.fecha_salida))
+        for estancia in orden:
+            mejor = None
+            for habitacion_id in self._entradas:
+                holguras = self.holguras(habitacion_id, estancia.fecha_entrada, estancia.fecha_salida)
+                if holguras is None:
+                    continue
+                coste = _coste(holguras, habitacion_id != estancia.actual)
+                if mejor is None or coste < mejor[0]:
+                    mejor = (coste, habitacion_id)
+                    if coste == (0, 0, 0):
+                        break
+            if mejor is None:
+                sin_sitio.append(estancia)
+                continue
+            self.ocupar(mejor[1], estancia.fecha_entrada, estancia.fecha_salida)
+            colocadas[estancia.clave] = mejor[1]
+        return colocadas, sin_sitio
+
+    def huecos_huerfanos(self, desde: date, hasta: date) -> int:
+        """Huecos entre estancias de 1..HUECO_HUERFANO_NOCHES noches que empiezan en [desde, hasta)"""
+        huecos = 0
+        for habitacion_id, entradas in self._entradas.items():
+            salidas = self._salidas[habitacion_id]
+            for salida, siguiente in zip(salidas, entradas[1:]):
+                if desde <= salida < hasta and 0 < (siguiente - salida).days <= HUECO_HUERFANO_NOCHES:
+                    huecos += 1
+        return huecos
+
+
+def _coste(holguras: tuple, movida: bool) -> tuple:
+    huerfanos = 0
+    holgura = 0
+    for hueco in holguras:
+        if hueco is None:
+            # Lado libre hasta el final del calendario: el peor ajuste
+            holgura += ASIGNACION_HORIZONTE_DIAS
+        else:
+            holgura += min(hueco, ASIGNACION_HORIZONTE_DIAS)
+            if 0 < hueco <= HUECO_HUERFANO_NOCHES:
+                huerfanos += 1
+    return huerfanos, int(movida), holgura
+
+
+@dataclass
+class PlanAsignacion:
+    """Habitaciones para las unidades de una reserva nueva y cambios de otras"""
+    habitacion_ids: list[int]
+    movimientos: list[tuple[int, int]] = field(default_factory=list)
+
+    def habitaciones_ocupadas(self) -> set[int]:
+        """Habitaciones que el plan llena: las de la reserva y los destinos de los movimientos"""
+        return set(self.habitacion_ids) | {habitacion_id for _, habitacion_id in self.movimientos}
+
+
+class AsignacionHabitaciones:
+    """
+    Motor de asignación. Serializa por tipo, dentro del proceso, la
+    planificación y la escritura del plan; entre procesos, con las filas de
+    las habitaciones hasta el commit.
+    """
+
+    def __init__(self):
+        self._locks: dict[str, threading.Lock] = defaultdict(threading.Lock)
+
+    def bloqueo(self, tipo: str) -> threading.Lock:
+        """Lock del tipo: tomarlo mientras se planifica y se guarda el plan"""
+        return self._locks[tipo]
+
+    def _habitaciones(self, db: Session, tipo: str) -> list[int]:
+        # Las habitaciones en mantenimiento no se venden (igual que en el inventario)
+        return [
+            h.id for h in catalogo_habitaciones.por_tipo(db, tipo)
+            if h.activa and h.estado != "Mantenimiento"
+        ]
+
+    def planificar_reserva(
+        self,
+        db: Session,
+        tipo: str,
+        fecha_entrada: date,
+        fecha_salida: date,
+        cantidad: int
+    ) -> PlanAsignacion:
+        """
+        Habitaciones para una reserva nueva: sin mover a nadie si cabe; si no,
+        reoptimizando las estancias movibles que se cruzan con sus fechas.
+        Las habitaciones del plan quedan bloqueadas hasta el fin de la
+        transacción.
+        """
+        plan = self._planificar(db, tipo, fecha_entrada, fecha_salida, cantidad)
+        # Otro worker o una reserva con habitación fija pudo tomar alguna
+        # habitación desde que se leyó la ocupación: se bloquean las del plan
+        # y se vuelve a planificar. Si el plan nuevo usa otras, se bloquean
+        # también, hasta que todas las del plan estén tomadas.
+        bloqueadas: set[int] = set()
+        while True:
+            faltan = plan.habitaciones_ocupadas() - bloqueadas
+            if not faltan:
+                return plan
+            habitacion_repository.bloquear_filas(db, sorted(faltan))
+            bloqueadas |= faltan
+            plan = self._planificar(db, tipo, fecha_entrada, fecha_salida, cantidad)
+
+    def _planificar(
+        self,
+        db: Session,
+        tipo: str,
+        fecha_entrada: date,
+        fecha_salida: date,
+        cantidad: int
+    ) -> PlanAsignacion:
+        habitacion_ids = self._habitaciones(db, tipo)
+        nuevas = [Estancia(("nueva", i), fecha_entrada, fecha_salida) for i in range(cantidad)]
+
+        directas, asignadas = asignacion_repository.ocupacion_tipo(
+            db, tipo, habitacion_ids, fecha_entrada, fecha_salida
+        )
+        planificador = Planificador(
+            habitacion_ids,
+            list(directas) + [(a.habitacion_id, a.fecha_entrada, a.fecha_salida) for a in asignadas]
+        )
+        colocadas, sin_sitio = planificador.colocar(nuevas)
+        if not sin_sitio:
+            return PlanAsignacion([colocadas[e.clave] for e in nuevas])
+
+        plan = self._reoptimizar_tipo(db, tipo, habitacion_ids, fecha_entrada, fecha_salida, nuevas)
+        if plan is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"No hay {cantidad} habitaciones de tipo {tipo} disponibles para las fechas seleccionadas"
+            )
+        colocadas, movimientos, _, _ = plan
+        return PlanAsignacion([colocadas[e.clave] for e in nuevas], movimientos)
+
+    def reoptimizar(self, db: Session, dias: Optional[int] = None) -> list[dict]:
+        """
+        Reoptimización completa sobre los próximos días de los tipos que
+        tienen alguna estancia movible (los demás no pueden cambiar).
+        Pensada para ejecutarse cada noche.
+        """
+        dias = dias or ASIGNACION_HORIZONTE_DIAS
+        desde = date.today()
+        hasta = desde + timedelta(days=dias)
+        movibles = asignacion_repository.tipos_movibles(
+            db, list(_ESTADOS_MOVIBLES), desde, hasta, desde + timedelta(days=ASIGNACION_BLOQUEO_DIAS)
+        )
+        resultados = []
+        for tipo in sorted(movibles & set(catalogo_habitaciones.instantanea(db).por_tipo)):
+            with self.bloqueo(tipo):
+                habitacion_ids = self._habitaciones(db, tipo)
+                # Todas las habitaciones del tipo: nadie las reserva ni las
+                # asigna mientras se recoloca su calendario
+                habitacion_repository.bloquear_filas(db, habitacion_ids)
+                plan = self._reoptimizar_tipo(db, tipo, habitacion_ids, desde, hasta, [])
+                if plan is None:
+                    db.rollback()
+                    continue
+                _, movimientos, huecos_antes, huecos_despues = plan
+                aplicada = bool(movimientos) and huecos_despues < huecos_antes
+                if aplicada:
+                    asignacion_repository.mover(db, movimientos)
+                else:
+                    # Soltar las filas sin escribir nada
+                    db.rollback()
+                resultados.append({
+                    "tipo": tipo,
+                    "habitaciones": len(habitacion_ids),
+                    "unidades": len(plan[0]),
+                    "movimientos": len(movimientos) if aplicada else 0,
+                    "huecos_antes": huecos_antes,
+                    "huecos_despues": huecos_despues if aplicada else huecos_antes,
+                    "aplicada": aplicada
+                })
+        return resultados
+
+    def _reoptimizar_tipo(
+        self,
+        db: Session,
+        tipo: str,
+        habitacion_ids: list[int],
+        desde: date,
+        hasta: date,
+        nuevas: list[Estancia]
+    ) -> Optional[tuple]:
+        """
+        Recolocar desde cero las estancias movibles del tipo que se cruzan con
+        [desde, hasta) junto con las nuevas. Devuelve (colocadas, movimientos,
+        huecos antes, huecos después) o None si alguna no cabe.
+        """
+        limite_bloqueo = date.today() + timedelta(days=ASIGNACION_BLOQUEO_DIAS)
+        habitaciones = set(habitacion_ids)
+
+        def movible(asignacion) -> bool:
+            return asignacion.estado in _ESTADOS_MOVIBLES and asignacion.fecha_entrada >= limite_bloqueo
+
+        _, asignadas = asignacion_repository.ocupacion_tipo(db, tipo, habitacion_ids, desde, hasta)
+        movibles = {a.id: a for a in asignadas if movible(a)}
+
+        # Las estancias movibles pueden salirse del rango: ampliarlo para ver
+        # todo lo que ocupa las habitaciones mientras duran
+        inicio = min([desde] + [a.fecha_entrada for a in movibles.values()])
+        fin = max([hasta] + [a.fecha_salida for a in movibles.values()])
+        directas, asignadas = asignacion_repository.ocupacion_tipo(db, tipo, habitacion_ids, inicio, fin)
+        fijas = list(directas) + [
+            (a.habitacion_id, a.fecha_entrada, a.fecha_salida) for a in asignadas if a.id not in movibles
+        ]
+
+        actual = Planificador(habitacion_ids, fijas + [
+            (a.habitacion_id, a.fecha_entrada, a.fecha_salida) for a in movibles.values()
+        ])
+        planificador = Planificador(habitacion_ids, fijas)
+        colocadas, sin_sitio = planificador.colocar(
+            [
+                Estancia(a.id, a.fecha_entrada, a.fecha_salida, a.habitacion_id if a.habitacion_id in habitaciones else None)
+                for a in movibles.values()
+            ] + nuevas
+        )
+        if sin_sitio:
+            return None
+
+        movimientos = [
+            (asignacion_id, colocadas[asignacion_id])
+            for asignacion_id, asignacion in movibles.items()
+            if colocadas[asignacion_id] != asignacion.habitacion_id
+        ]
+        return (
+            colocadas,
+            movimientos,
+            actual.huecos_huerfanos(desde, hasta),
+            planificador.huecos_huerfanos(desde, hasta)
+        )
+
+
+# Instancia singleton
+asignacion_habitaciones = AsignacionHabitaciones()
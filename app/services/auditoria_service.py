@@ -0,0 +1,184 @@
+"""
+Servicio de Auditoría Nocturna
+
+Cierra cada día de negocio en cuatro pasos, todos en operaciones de
+conjunto (un UPDATE o un INSERT en bloque, no una consulta por reserva):
+
+1. No-shows: las reservas confirmadas cuya entrada era hasta ese día y no
+   hicieron check-in pasan a No_Show; sus noches vuelven al inventario y sus
+   habitaciones quedan disponibles.
+2. Ingresos: se carga en el libro contable la noche de cada estancia en
+   curso, con un solo INSERT en bloque.
+3. Salidas vencidas: las estancias en curso que debían salir hasta ese día
+   se completan, con sus facturas y habitaciones.
+4. Cierre: la auditoría queda completada y la fecha de negocio avanza al
+   día siguiente.
+
+Cada paso se confirma junto con el número de paso en la fila de la
+auditoría (AuditoriaNocturna.paso). Si el proceso falla, la siguiente
+ejecución retoma desde el primer paso sin terminar, y un paso no se aplica
+dos veces aunque dos procesos lo intenten a la vez.
+"""
+
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.repositories.auditoria_repository import auditoria_repository
+from app.repositories.factura_repository import factura_repository
+from app.repositories.reserva_repository import reserva_repository
+from app.repositories.transaccion_repository import transaccion_repository
+from app.schemas.auditoria_schema import AuditoriaResponse, FechaNegocioResponse
+from app.services.cliente_service import cliente_service
+from app.services.contabilidad_service import contabilidad_service
+from app.services.habitacion_service import habitacion_service
+from app.services.inventario_service import inventario_service
+from app.services.reserva_service import reserva_service
+
+# Primer día de negocio a auditar si aún no hay ninguna auditoría (ISO,
+# por defecto ayer)
+AUDITORIA_FECHA_INICIAL = os.getenv("AUDITORIA_FECHA_INICIAL")
+
+# Días pendientes que se cierran como máximo en una ejecución
+AUDITORIA_MAX_DIAS = int(os.getenv("AUDITORIA_MAX_DIAS", 31))
+
+
+class AuditoriaService:
+    """
+    Servicio de auditoría nocturna y fecha de negocio
+    """
+
+    def fecha_negocio(self, db: Session) -> date:
+        """
+        Día de negocio abierto: el siguiente a la última auditoría completada
+        """
+        ultima = auditoria_repository.get_ultima_completada(db)
+        if ultima is not None:
+            return ultima.fecha + timedelta(days=1)
+        if AUDITORIA_FECHA_INICIAL:
+            return date.fromisoformat(AUDITORIA_FECHA_INICIAL)
+        return date.today() - timedelta(days=1)
+    
+    def get_estado(self, db: Session, limite: int = 10) -> FechaNegocioResponse:
+        """
+        Fecha de negocio abierta y últimas auditorías
+        """
+        return FechaNegocioResponse(
+            fecha_negocio=self.fecha_negocio(db),
+            auditorias=[AuditoriaResponse.model_validate(a) for a in auditoria_repository.get_ultimas(db, limite)]
+        )
+    
+    def ejecutar(self, db: Session, hasta: Optional[date] = None) -> List[AuditoriaResponse]:
+        """
+        Cerrar los días de negocio pendientes hasta `hasta` (por defecto
+        ayer: el día en curso no se puede cerrar), empezando por el abierto
+        """
+        ayer = date.today() - timedelta(days=1)
+        hasta = min(hasta, ayer) if hasta is not None else ayer
+        
+        resultados = []
+        fecha = self.fecha_negocio(db)
+        while fecha <= hasta and len(resultados) < AUDITORIA_MAX_DIAS:
+            resultados.append(self.cerrar_dia(db, fecha))
+            fecha += timedelta(days=1)
+        return resultados
+    
+    def cerrar_dia(self, db: Session, fecha: date) -> AuditoriaResponse:
+        """
+        Ejecutar (o reanudar) la auditoría de un día de negocio
+        """
+        auditoria = auditoria_repository.iniciar(db, fecha)
+        pasos = (self._no_shows, self._ingresos, self._salidas_vencidas, self._cierre)
+        # Cada paso confirma la transacción y expira la auditoría: se leen
+        # una vez y se recarga al final
+        auditoria_id, ultimo_paso = auditoria.id, auditoria.paso
+        
+        for numero, paso in enumerate(pasos, start=1):
+            if ultimo_paso >= numero:
+                continue
+            valores, habitaciones_liberadas, clientes = paso(db, fecha)
+            if not auditoria_repository.avanzar(db, auditoria_id, numero, valores):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Otro proceso está ejecutando la auditoría del {fecha.isoformat()}"
+                )
+            if habitaciones_liberadas:
+                habitacion_service.publicar_estados(habitaciones_liberadas, "Disponible")
+            for cliente_id in clientes:
+                cliente_service.invalidar_perfil(cliente_id)
+        
+        return AuditoriaResponse.model_validate(auditoria)
+    
+    # ========== Pasos (preparan la transacción; avanzar la confirma) ==========
+    # Cada paso devuelve los valores de la auditoría, las habitaciones que
+    # quedaron libres y los clientes cuyo perfil cambió
+    
+    def _no_shows(self, db: Session, fecha: date) -> tuple[dict, list, list]:
+        for tipo, entrada, salida, cantidad in reserva_repository.liberaciones_no_show(db, fecha):
+            if tipo is not None:
+                inventario_service.registrar_liberacion(db, tipo, entrada, salida, int(cantidad))
+        
+        habitaciones = reserva_repository.habitaciones_no_show(db, fecha)
+        if habitaciones:
+            habitacion_service.cambiar_estados(db, habitaciones, "Disponible")
+        clientes = reserva_repository.clientes_no_show(db, fecha)
+        
+        return {"no_shows": reserva_repository.marcar_no_shows(db, fecha)}, habitaciones, clientes
+    
+    def _ingresos(self, db: Session, fecha: date) -> tuple[dict, list, list]:
+        estancias = reserva_repository.estancias_noche(db, fecha)
+        if not estancias:
+            return {"noches_cargadas": 0, "ingreso_habitaciones": 0.0}, [], []
+        
+        cuenta = contabilidad_service.cuenta_hospedaje(db)
+        referencia = f"AUDITORIA-{fecha.isoformat()}"
+        transacciones = []
+        for reserva_id, precio_total, entrada, salida in estancias:
+            monto = round(precio_total / (salida - entrada).days, 2)
+            if monto:
+                transacciones.append({
+                    "cuenta_id": cuenta.id,
+                    "tipo": "ingreso",
+                    "concepto": f"Hospedaje noche {fecha.isoformat()} - Reserva #{reserva_id}",
+                    "monto": monto,
+                    "fecha_transaccion": fecha,
+                    "referencia": referencia
+                })
+        transaccion_repository.create_lote(db, transacciones)
+        
+        return {
+            "noches_cargadas": len(transacciones),
+            "ingreso_habitaciones": round(sum(t["monto"] for t in transacciones), 2)
+        }, [], []
+    
+    def _salidas_vencidas(self, db: Session, fecha: date) -> tuple[dict, list, list]:
+        vencidas = reserva_repository.salidas_vencidas(db, fecha)
+        if not vencidas:
+            return {"salidas_vencidas": 0}, [], []
+        
+        # Habitaciones fijas y las asignadas a reservas por tipo
+        habitaciones = {r.habitacion_id for r in vencidas if r.habitacion_id is not None}
+        por_tipo = [r.id for r in vencidas if r.habitacion_id is None]
+        if por_tipo:
+            habitaciones.update(reserva_repository.habitaciones_asignadas(db, por_tipo))
+        habitaciones = sorted(habitaciones)
+        habitacion_service.cambiar_estados(db, habitaciones, "Disponible")
+        
+        # Facturas de las que aún no la tienen, en un solo INSERT
+        facturadas = factura_repository.get_reservas_facturadas(db, [r.id for r in vencidas])
+        factura_repository.create_lote(
+            db, reserva_service._datos_facturas(db, [r for r in vencidas if r.id not in facturadas])
+        )
+        
+        clientes = sorted({r.cliente_id for r in vencidas})
+        return {"salidas_vencidas": reserva_repository.completar_vencidas(db, fecha)}, habitaciones, clientes
+    
+    def _cierre(self, db: Session, fecha: date) -> tuple[dict, list, list]:
+        return {"estado": "Completada", "finalizada_at": datetime.now(timezone.utc)}, [], []
+
+
+# Instancia singleton
+auditoria_service = AuditoriaService()
@@ -91,7 +91,7 @@ class AuthService:
             )
         
         # Verificar contraseña actual
-        if not verify_password(old_password, user.password_hash):
+        if not verify_password(old_password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Contraseña actual incorrecta"
@@ -99,7 +99,7 @@ class AuthService:
         
         # Actualizar contraseña
         new_hash = get_password_hash(new_password)
-        usuario_repository.update(db, user_id, {"password_hash": new_hash})
+        usuario_repository.update(db, user_id, {"hashed_password": new_hash})
         
         return True
 
@@ -0,0 +1,98 @@
+"""
+Servicio de Bloqueos de Habitación
+"""
+
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.repositories.bloqueo_repository import bloqueo_repository
+from app.repositories.cliente_repository import cliente_repository
+from app.repositories.habitacion_repository import habitacion_repository
+from app.repositories.reserva_repository import reserva_repository
+from app.schemas.reserva_schema import BloqueoCreate, BloqueoResponse
+from app.services.catalogo_habitaciones import catalogo_habitaciones
+from app.services.tarifa_service import tarifa_service
+
+# Vida de un bloqueo: tiempo que tiene el cliente para completar el pago
+BLOQUEO_TTL_SEGUNDOS = int(os.getenv("BLOQUEO_TTL_SEGUNDOS", 600))
+
+
+class BloqueoService:
+    """
+    Servicio de bloqueos provisionales de habitación durante el pago
+
+    Un bloqueo ocupa la habitación para las consultas de disponibilidad hasta
+    que vence. El vencimiento es perezoso: las consultas comparan `expira`
+    con la hora actual y los bloqueos vencidos de una habitación se borran al
+    bloquearla de nuevo, sin recorrer la tabla periódicamente. Los bloqueos
+    no descuentan de los contadores de inventario por tipo (la venta se
+    registra al confirmarlos), pero la disponibilidad por tipo resta los
+    vigentes.
+    """
+
+    def create(self, db: Session, bloqueo_data: BloqueoCreate, ttl_segundos: Optional[int] = None) -> BloqueoResponse:
+        """
+        Bloquear una habitación para unas fechas durante `ttl_segundos`
+        (BLOQUEO_TTL_SEGUNDOS por defecto)
+        """
+        habitacion = catalogo_habitaciones.obtener(db, bloqueo_data.habitacion_id)
+        if not habitacion or not habitacion.activa:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Habitación no encontrada"
+            )
+        if bloqueo_data.cliente_id is not None and not cliente_repository.get_by_id(db, bloqueo_data.cliente_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Cliente no encontrado"
+            )
+        
+        precio_total = tarifa_service.precio_estadia(
+            db, habitacion.id, bloqueo_data.fecha_entrada, bloqueo_data.fecha_salida
+        )
+        
+        # La fila de la habitación serializa a quienes la bloquean o reservan
+        # a la vez; el commit del bloqueo la suelta
+        habitacion_repository.bloquear_fila(db, habitacion.id)
+        ahora = datetime.now(timezone.utc)
+        bloqueo_repository.purgar_vencidos(db, habitacion.id, ahora)
+        
+        if not reserva_repository.verificar_disponibilidad(
+            db, habitacion.id, bloqueo_data.fecha_entrada, bloqueo_data.fecha_salida
+        ):
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La habitación no está disponible para las fechas seleccionadas"
+            )
+        
+        bloqueo = bloqueo_repository.create(db, {
+            **bloqueo_data.model_dump(),
+            "token": uuid.uuid4().hex,
+            "precio_total": precio_total,
+            "expira": ahora + timedelta(seconds=ttl_segundos or BLOQUEO_TTL_SEGUNDOS)
+        })
+        return BloqueoResponse.model_validate(bloqueo)
+    
+    def liberar(self, db: Session, token: str) -> bool:
+        """
+        Liberar un bloqueo antes de que venza (pago abandonado)
+        """
+        bloqueo = bloqueo_repository.get_by_token(db, token)
+        if not bloqueo:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Bloqueo no encontrado"
+            )
+        bloqueo_repository.eliminar(db, bloqueo)
+        db.commit()
+        return True
+
+
+# Instancia singleton
+bloqueo_service = BloqueoService()
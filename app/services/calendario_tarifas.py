@@ -0,0 +1,186 @@
+"""
+Calendario de tarifas compilado
+
+Las reglas de la tabla ``tarifas`` se compilan en una tabla con el precio de
+cada noche de cada habitación (en céntimos) dentro de un horizonte de
+fechas, guardada como sumas acumuladas: el total de una estadía es la
+diferencia entre dos posiciones, sin recorrer las noches, y cotizar cientos
+de habitaciones es una resta por habitación.
+
+Precedencia: para cada noche gana la regla más específica (habitación >
+tipo > general); a igual alcance, la de mayor prioridad y, a igual
+prioridad, la más reciente. Un factor se aplica sobre el precio base de la
+habitación, no sobre otra regla. Sin reglas, cada noche vale precio_noche.
+
+La tabla compilada se reutiliza mientras no cambien ni el catálogo de
+habitaciones ni las tarifas (contadores de app.config.versiones, compartidos
+entre workers). Los cambios de estado que hacen las reservas tienen su propio
+contador y no la recompilan.
+Las habitaciones con el mismo tipo, precio base y sin reglas propias
+comparten la misma fila.
+"""
+
+import os
+import threading
+from array import array
+from collections import defaultdict
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.config.versiones import versiones
+from app.repositories.tarifa_repository import tarifa_repository
+from app.services.catalogo_habitaciones import catalogo_habitaciones
+
+# Días hacia adelante y hacia atrás (desde hoy) que cubre la tabla compilada
+TARIFAS_HORIZONTE_DIAS = int(os.getenv("TARIFAS_HORIZONTE_DIAS", 730))
+TARIFAS_HISTORIA_DIAS = int(os.getenv("TARIFAS_HISTORIA_DIAS", 30))
+
+
+def _centimos(valor: float) -> int:
+    return int(round(valor * 100))
+
+
+def _alcance(regla) -> int:
+    if regla.habitacion_id is not None:
+        return 2
+    if regla.tipo is not None:
+        return 1
+    return 0
+
+
+class TablaTarifas:
+    """Sumas acumuladas del precio por noche de cada habitación"""
+
+    __slots__ = ("inicio", "dias", "version", "acumulados")
+
+    def __init__(self, inicio: date, dias: int, version: tuple, habitaciones, reglas):
+        self.inicio = inicio
+        self.dias = dias
+        self.version = version
+        self.acumulados: dict[int, array] = {}
+
+        generales = []
+        por_tipo = defaultdict(list)
+        por_habitacion = defaultdict(list)
+        for regla in sorted(reglas, key=lambda r: (_alcance(r), r.prioridad, r.id)):
+            if regla.habitacion_id is not None:
+                por_habitacion[regla.habitacion_id].append(regla)
+            elif regla.tipo is not None:
+                por_tipo[regla.tipo].append(regla)
+            else:
+                generales.append(regla)
+
+        compartidas: dict[tuple, array] = {}
+        for habitacion in habitaciones:
+            propias = por_habitacion.get(habitacion.id)
+            clave = (habitacion.tipo, habitacion.precio_noche)
+            if propias is None and clave in compartidas:
+                self.acumulados[habitacion.id] = compartidas[clave]
+                continue
+            acumulado = self._compilar(
+                habitacion.precio_noche,
+                generales + por_tipo.get(habitacion.tipo, []) + (propias or [])
+            )
+            if propias is None:
+                compartidas[clave] = acumulado
+            self.acumulados[habitacion.id] = acumulado
+
+    def _compilar(self, precio_base: float, reglas: list) -> array:
+        """
+        Pintar las reglas, de menor a mayor precedencia, sobre la fila de
+        precios base y devolver sus sumas acumuladas. Cada regla es una
+        asignación por rebanadas (con paso 7 si se limita a ciertos días).
+        """
+        noches = [_centimos(precio_base)] * self.dias
+        dia_semana_inicio = self.inicio.weekday()
+        for regla in reglas:
+            desde = max(0, (regla.fecha_desde - self.inicio).days) if regla.fecha_desde else 0
+            hasta = min(self.dias - 1, (regla.fecha_hasta - self.inicio).days) if regla.fecha_hasta else self.dias - 1
+            if desde > hasta:
+                continue
+            valor = _centimos(regla.precio) if regla.precio is not None else _centimos(precio_base * regla.factor)
+            if not regla.dias_semana or regla.dias_semana == "1111111":
+                noches[desde:hasta + 1] = [valor] * (hasta - desde + 1)
+                continue
+            for dia_semana, activo in enumerate(regla.dias_semana):
+                if activo != "1":
+                    continue
+                primero = desde + (dia_semana - dia_semana_inicio - desde) % 7
+                if primero <= hasta:
+                    rango = range(primero, hasta + 1, 7)
+                    noches[rango.start:rango.stop:7] = [valor] * len(rango)
+        return array("q", accumulate(noches, initial=0))
+
+    def cubre(self, desde: date, hasta: date) -> bool:
+        return self.inicio <= desde and (hasta - self.inicio).days <= self.dias
+
+    def total(self, habitacion_id: int, fecha_entrada: date, fecha_salida: date) -> Optional[int]:
+        """Precio de la estadía en céntimos (None si la habitación no existe)"""
+        acumulado = self.acumulados.get(habitacion_id)
+        if acumulado is None:
+            return None
+        return acumulado[(fecha_salida - self.inicio).days] - acumulado[(fecha_entrada - self.inicio).days]
+
+
+class CalendarioTarifas:
+    """
+    Caché de la tabla de tarifas compilada. Las lecturas no bloquean; la
+    compilación se hace una sola vez por cambio de versión.
+    """
+
+    def __init__(self):
+        self._tabla: Optional[TablaTarifas] = None
+        self._lock = threading.Lock()
+
+    def _version(self) -> tuple:
+        # Solo las altas, cambios y bajas de habitaciones (tipo, precio_noche)
+        # y las tarifas afectan a los precios; el estado no
+        return versiones.leer("habitaciones")[0], versiones.leer("tarifas")[0]
+
+    def tabla(self, db: Session, desde: date, hasta: date) -> TablaTarifas:
+        """
+        Tabla vigente que cubre [desde, hasta]. Si el rango queda fuera del
+        horizonte se recompila ampliándolo.
+        """
+        version = self._version()
+        actual = self._tabla
+        if actual is not None and actual.version == version and actual.cubre(desde, hasta):
+            return actual
+        with self._lock:
+            actual = self._tabla
+            if actual is not None and actual.version == version and actual.cubre(desde, hasta):
+                return actual
+            hoy = date.today()
+            inicio = min(desde, hoy - timedelta(days=TARIFAS_HISTORIA_DIAS))
+            fin = max(hasta, hoy + timedelta(days=TARIFAS_HORIZONTE_DIAS))
+            if actual is not None:
+                inicio, fin = min(inicio, actual.inicio), max(fin, actual.inicio + timedelta(days=actual.dias))
+            # La versión se leyó antes que los datos: un cambio concurrente
+            # deja la tabla marcada como vieja y se recompila en la próxima
+            actual = TablaTarifas(
+                inicio,
+                (fin - inicio).days,
+                version,
+                catalogo_habitaciones.instantanea(db).todas(),
+                tarifa_repository.get_vigentes(db)
+            )
+            self._tabla = actual
+            return actual
+
+    def cotizar(
+        self,
+        db: Session,
+        habitacion_ids: list[int],
+        fecha_entrada: date,
+        fecha_salida: date
+    ) -> dict[int, Optional[int]]:
+        """Precio en céntimos de la misma estadía en varias habitaciones"""
+        tabla = self.tabla(db, fecha_entrada, fecha_salida)
+        return {h: tabla.total(h, fecha_entrada, fecha_salida) for h in habitacion_ids}
+
+
+# Instancia singleton
+calendario_tarifas = CalendarioTarifas()
@@ -0,0 +1,248 @@
+"""
+Catálogo de habitaciones en memoria
+
+Instantánea inmutable de todas las habitaciones, indexada por id, número y
+tipo. Las lecturas no toman ningún bloqueo: leen la referencia a la
+instantánea vigente, que nunca se modifica. Las escrituras (altas, cambios
+y cambios de estado hechos por HabitacionService) construyen una instantánea
+nueva con el cambio aplicado y reemplazan la referencia.
+
+Cada instantánea recuerda dos versiones (app.config.versiones): la del
+catálogo, que avanza al crear, modificar o eliminar habitaciones, y la de
+los estados, que avanza cada vez que una reserva cambia el estado de una
+habitación. Si otro worker cambia el catálogo, la siguiente lectura lo
+recarga entero; si solo cambió estados, se relee únicamente (id, estado) y
+se aplican sobre la instantánea. Con CATALOGO_INVALIDACION_COMPARTIDA=false
+esas comprobaciones se omiten y solo se ven los cambios del propio proceso.
+"""
+
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.database import SessionLocal, _env_bool
+from app.config.versiones import versiones
+from app.repositories.habitacion_repository import habitacion_repository, async_habitacion_repository
+
+# Recargar cuando otro worker modifica el catálogo
+CATALOGO_INVALIDACION_COMPARTIDA = _env_bool("CATALOGO_INVALIDACION_COMPARTIDA", True)
+
+
+@dataclass(frozen=True)
+class HabitacionCatalogo:
+    """Copia inmutable de una habitación"""
+    id: int
+    numero: str
+    tipo: str
+    precio_noche: float
+    capacidad: int
+    caracteristicas: Optional[str]
+    estado: str
+    activa: bool
+    created_at: Optional[datetime]
+
+    @classmethod
+    def de_modelo(cls, habitacion) -> "HabitacionCatalogo":
+        return cls(
+            id=habitacion.id,
+            numero=habitacion.numero,
+            tipo=habitacion.tipo,
+            precio_noche=habitacion.precio_noche,
+            capacidad=habitacion.capacidad,
+            caracteristicas=habitacion.caracteristicas,
+            estado=habitacion.estado,
+            activa=habitacion.activa,
+            created_at=habitacion.created_at
+        )
+
+
+class Instantanea:
+    """Índices de solo lectura sobre un conjunto fijo de habitaciones"""
+
+    __slots__ = ("version", "version_estados", "por_id", "por_numero", "por_tipo")
+
+    def __init__(self, habitaciones, version: int, version_estados: int):
+        ordenadas = sorted(habitaciones, key=lambda h: h.id)
+        por_tipo: dict[str, list] = {}
+        for habitacion in ordenadas:
+            por_tipo.setdefault(habitacion.tipo, []).append(habitacion)
+        self.version = version
+        self.version_estados = version_estados
+        self.por_id: Mapping[int, HabitacionCatalogo] = MappingProxyType({h.id: h for h in ordenadas})
+        self.por_numero: Mapping[str, HabitacionCatalogo] = MappingProxyType({h.numero: h for h in ordenadas})
+        self.por_tipo: Mapping[str, tuple] = MappingProxyType({t: tuple(hs) for t, hs in por_tipo.items()})
+
+    def todas(self) -> tuple:
+        return tuple(self.por_id.values())
+
+    def con(self, habitacion: HabitacionCatalogo, version: int) -> "Instantanea":
+        """Nueva instantánea con una habitación añadida o reemplazada"""
+        habitaciones = dict(self.por_id)
+        habitaciones[habitacion.id] = habitacion
+        return Instantanea(habitaciones.values(), version, self.version_estados)
+
+    def sin(self, habitacion_id: int, version: int) -> "Instantanea":
+        """Nueva instantánea sin una habitación"""
+        return Instantanea(
+            [h for h in self.por_id.values() if h.id != habitacion_id], version, self.version_estados
+        )
+
+    def con_estados(self, estados: Mapping[int, str], version_estados: int) -> "Instantanea":
+        """Nueva instantánea con los estados indicados, misma versión de catálogo"""
+        return Instantanea(
+            [
+                replace(h, estado=estados[h.id]) if h.id in estados and estados[h.id] != h.estado else h
+                for h in self.por_id.values()
+            ],
+            self.version,
+            version_estados
+        )
+
+
+class CatalogoHabitaciones:
+    """
+    Caché compartida del catálogo de habitaciones del proceso
+    """
+
+    def __init__(self):
+        self._instantanea: Optional[Instantanea] = None
+        # Solo serializa recargas y escrituras; las lecturas no lo toman
+        self._lock = threading.Lock()
+
+    def _pendiente(self, actual: Optional[Instantanea]) -> Optional[str]:
+        """
+        Qué le falta a la instantánea para estar al día: "catalogo" (recargar
+        todo), "estados" (releer solo los estados) o None
+        """
+        if actual is None:
+            return "catalogo"
+        if not CATALOGO_INVALIDACION_COMPARTIDA:
+            return None
+        if actual.version != versiones.leer("habitaciones")[0]:
+            return "catalogo"
+        if actual.version_estados != versiones.leer("estados_habitacion")[0]:
+            return "estados"
+        return None
+
+    def instantanea(self, db: Session) -> Instantanea:
+        """Instantánea vigente, recargándola de la base de datos si hace falta"""
+        actual = self._instantanea
+        if self._pendiente(actual) is None:
+            return actual
+        with self._lock:
+            actual = self._instantanea
+            pendiente = self._pendiente(actual)
+            # Las versiones se leen antes que las filas: un cambio concurrente
+            # deja la instantánea vieja (y se recarga), nunca adelantada
+            if pendiente == "catalogo":
+                version, version_estados = versiones.leer("habitaciones")[0], versiones.leer("estados_habitacion")[0]
+                actual = Instantanea(self._leer_principal(db, self._leer_catalogo), version, version_estados)
+            elif pendiente == "estados":
+                version_estados = versiones.leer("estados_habitacion")[0]
+                actual = actual.con_estados(self._leer_principal(db, habitacion_repository.get_estados), version_estados)
+            self._instantanea = actual
+            return actual
+
+    def _leer_catalogo(self, db: Session) -> list:
+        return [HabitacionCatalogo.de_modelo(h) for h in habitacion_repository.get_catalogo(db)]
+
+    def _leer_principal(self, db: Session, lectura):
+        """
+        Ejecutar una lectura del catálogo en el motor principal: una réplica
+        atrasada dejaría la instantánea sin un cambio que ya no volverá a
+        invalidarla
+        """
+        if not db.info.get("solo_lectura"):
+            return lectura(db)
+        sesion = SessionLocal()
+        try:
+            return lectura(sesion)
+        finally:
+            sesion.close()
+
+    async def instantanea_async(self, db: AsyncSession) -> Instantanea:
+        """Instantánea vigente (sesión asíncrona)"""
+        actual = self._instantanea
+        pendiente = self._pendiente(actual)
+        if pendiente is None:
+            return actual
+        if pendiente == "catalogo":
+            version, version_estados = versiones.leer("habitaciones")[0], versiones.leer("estados_habitacion")[0]
+            filas = await async_habitacion_repository.get_catalogo(db)
+            actual = Instantanea([HabitacionCatalogo.de_modelo(h) for h in filas], version, version_estados)
+        else:
+            version_estados = versiones.leer("estados_habitacion")[0]
+            actual = actual.con_estados(await async_habitacion_repository.get_estados(db), version_estados)
+        with self._lock:
+            self._instantanea = actual
+        return actual
+
+    def obtener(self, db: Session, habitacion_id: int) -> Optional[HabitacionCatalogo]:
+        """Habitación por ID"""
+        return self.instantanea(db).por_id.get(habitacion_id)
+
+    def por_numero(self, db: Session, numero: str) -> Optional[HabitacionCatalogo]:
+        """Habitación por número"""
+        return self.instantanea(db).por_numero.get(numero)
+
+    def por_tipo(self, db: Session, tipo: str) -> tuple:
+        """Habitaciones de un tipo, ordenadas por ID"""
+        return self.instantanea(db).por_tipo.get(tipo, ())
+
+    # ========== Escritura ==========
+
+    def _aplicar(self, version: int, cambio) -> None:
+        """
+        Aplicar un cambio local sobre la instantánea si estaba al día con la
+        versión anterior; si no, descartarla para que se recargue
+        """
+        with self._lock:
+            actual = self._instantanea
+            if actual is not None and actual.version == version - 1:
+                self._instantanea = cambio(actual)
+            else:
+                self._instantanea = None
+
+    def escribir(self, habitacion, version: int) -> None:
+        """Reflejar el alta o la modificación de una habitación"""
+        copia = HabitacionCatalogo.de_modelo(habitacion)
+        self._aplicar(version, lambda actual: actual.con(copia, version))
+
+    def cambiar_estado(self, habitacion_id: int, estado: str, version_estados: int) -> None:
+        """Reflejar un cambio de estado de una habitación"""
+        self.cambiar_estados([habitacion_id], estado, version_estados)
+
+    def cambiar_estados(self, habitacion_ids, estado: str, version_estados: int) -> None:
+        """
+        Reflejar el cambio de estado de varias habitaciones en una sola
+        instantánea nueva, sin tocar la versión del catálogo. Si la
+        instantánea no estaba al día con los estados, el cambio se aplica
+        igual y la siguiente lectura relee los que falten.
+        """
+        with self._lock:
+            actual = self._instantanea
+            if actual is None:
+                return
+            al_dia = actual.version_estados == version_estados - 1
+            self._instantanea = actual.con_estados(
+                {habitacion_id: estado for habitacion_id in habitacion_ids},
+                version_estados if al_dia else actual.version_estados
+            )
+
+    def quitar(self, habitacion_id: int, version: int) -> None:
+        """Reflejar la eliminación de una habitación"""
+        self._aplicar(version, lambda actual: actual.sin(habitacion_id, version))
+
+    def invalidar(self) -> None:
+        """Descartar la instantánea (la siguiente lectura recarga)"""
+        with self._lock:
+            self._instantanea = None
+
+
+# Instancia singleton
+catalogo_habitaciones = CatalogoHabitaciones()
@@ -2,12 +2,28 @@
 Servicio de Clientes
 """
 
+import os
+import time
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from typing import List, Optional
 
-from app.repositories.cliente_repository import cliente_repository
-from app.schemas.cliente_schema import ClienteCreate, ClienteUpdate, ClienteResponse
+from app.repositories.cliente_repository import cliente_repository, async_cliente_repository
+from app.repositories.reserva_repository import reserva_repository
+from app.schemas.cliente_schema import (
+    ClienteCreate,
+    ClienteUpdate,
+    ClienteResponse,
+    ClientePerfilResponse,
+    ReservaHistorialResponse
+)
+from app.schemas.common import Pagina
+from app.services.paginacion import paginar, paginar_async
+
+# Segundos que se conserva en memoria un perfil calculado (0 = sin caché)
+PERFIL_CACHE_TTL = int(os.getenv("PERFIL_CACHE_TTL", 0))
+PERFIL_CACHE_MAX = int(os.getenv("PERFIL_CACHE_MAX", 1024))
 
 
 class ClienteService:
@@ -15,6 +31,10 @@ class ClienteService:
     Servicio de gestión de clientes
     """
     
+    def __init__(self):
+        # (cliente_id, ultimas) -> (expira, perfil)
+        self._perfiles = {}
+    
     def create(self, db: Session, cliente_data: ClienteCreate) -> ClienteResponse:
         """
         Crear nuevo cliente
@@ -38,12 +58,17 @@ class ClienteService:
         cliente = cliente_repository.create(db, cliente_data.model_dump())
         return ClienteResponse.model_validate(cliente)
     
-    def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[ClienteResponse]:
+    def get_all(self, db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None) -> Pagina[ClienteResponse]:
         """
         Obtener todos los clientes
         """
-        clientes = cliente_repository.get_all(db, skip, limit)
-        return [ClienteResponse.model_validate(c) for c in clientes]
+        return paginar(cliente_repository, db, ClienteResponse, limit, cursor, skip, fields=fields)
+    
+    async def get_all_async(self, db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None) -> Pagina[ClienteResponse]:
+        """
+        Obtener todos los clientes (sesión asíncrona)
+        """
+        return await paginar_async(async_cliente_repository, db, ClienteResponse, limit, cursor, skip, fields=fields)
     
     def get_by_id(self, db: Session, cliente_id: int) -> ClienteResponse:
         """
@@ -57,6 +82,56 @@ class ClienteService:
             )
         return ClienteResponse.model_validate(cliente)
     
+    def get_perfil(
+        self,
+        db: Session,
+        cliente_id: int,
+        ultimas: int = 10
+    ) -> ClientePerfilResponse:
+        """
+        Obtener el perfil del cliente: agregados de todo su historial (una
+        consulta) y sus últimas reservas con factura y pagos (otra consulta)
+        """
+        clave = (cliente_id, ultimas)
+        if PERFIL_CACHE_TTL > 0:
+            en_cache = self._perfiles.get(clave)
+            if en_cache and en_cache[0] > time.monotonic():
+                return en_cache[1]
+        
+        fila = cliente_repository.get_con_historial(db, cliente_id)
+        if not fila:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Cliente no encontrado"
+            )
+        
+        reservas = reserva_repository.get_ultimas_by_cliente(db, cliente_id, ultimas)
+        
+        perfil = ClientePerfilResponse(
+            cliente=ClienteResponse.model_validate(fila.Cliente),
+            total_reservas=fila.total_reservas,
+            total_estadias=int(fila.total_estadias),
+            total_noches=int(fila.total_noches),
+            gasto_total=float(fila.gasto_total),
+            saldo_pendiente=round(float(fila.gasto_total) - float(fila.total_pagado), 2),
+            ultimas_reservas=[ReservaHistorialResponse.model_validate(r) for r in reservas]
+        )
+        
+        if PERFIL_CACHE_TTL > 0:
+            if len(self._perfiles) >= PERFIL_CACHE_MAX:
+                # Descartar la entrada más antigua
+                self._perfiles.pop(next(iter(self._perfiles)), None)
+            self._perfiles[clave] = (time.monotonic() + PERFIL_CACHE_TTL, perfil)
+        
+        return perfil
+    
+    def invalidar_perfil(self, cliente_id: int) -> None:
+        """
+        Descartar los perfiles en caché de un cliente tras un cambio
+        """
+        for clave in [k for k in list(self._perfiles) if k[0] == cliente_id]:
+            self._perfiles.pop(clave, None)
+    
     def search(self, db: Session, query: str) -> List[ClienteResponse]:
         """
         Buscar clientes por nombre, apellido o identificación
@@ -93,6 +168,7 @@ class ClienteService:
         # Actualizar
         update_data = cliente_data.model_dump(exclude_unset=True)
         updated_cliente = cliente_repository.update(db, cliente_id, update_data)
+        self.invalidar_perfil(cliente_id)
         return ClienteResponse.model_validate(updated_cliente)
     
     def delete(self, db: Session, cliente_id: int) -> bool:
@@ -117,6 +193,7 @@ class ClienteService:
         
         # Eliminar
         cliente_repository.delete(db, cliente_id)
+        self.invalidar_perfil(cliente_id)
         return True
 
 
@@ -3,19 +3,30 @@ Servicio de Contabilidad
 """
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from typing import List, Optional
 from datetime import date, datetime
 from decimal import Decimal
 
-from app.repositories.cuenta_contable_repository import cuenta_contable_repository
-from app.repositories.transaccion_repository import transaccion_repository
+from app.repositories.cuenta_contable_repository import (
+    cuenta_contable_repository,
+    async_cuenta_contable_repository
+)
+from app.repositories.transaccion_repository import (
+    transaccion_repository,
+    async_transaccion_repository,
+    filtros_transacciones
+)
 from app.schemas.cuenta_contable_schema import (
     CuentaContableCreate,
     CuentaContableUpdate,
     CuentaContableResponse
 )
 from app.schemas.transaccion_schema import TransaccionCreate, TransaccionResponse
+from app.schemas.common import Pagina
+from app.config.versiones import versiones
+from app.services.paginacion import paginar, paginar_async
 
 
 class ContabilidadService:
@@ -51,6 +62,7 @@ class ContabilidadService:
         
         # Crear cuenta
         cuenta = cuenta_contable_repository.create(db, cuenta_data.model_dump())
+        versiones.incrementar("cuentas_contables")
         return CuentaContableResponse.model_validate(cuenta)
     
     def get_cuentas(
@@ -70,6 +82,23 @@ class ContabilidadService:
         
         return [CuentaContableResponse.model_validate(c) for c in cuentas]
     
+    async def get_cuentas_async(
+        self,
+        db: AsyncSession,
+        tipo: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[CuentaContableResponse]:
+        """
+        Obtener cuentas contables (sesión asíncrona)
+        """
+        if tipo:
+            cuentas = await async_cuenta_contable_repository.get_by_tipo(db, tipo)
+        else:
+            cuentas = await async_cuenta_contable_repository.get_all(db, skip, limit)
+        
+        return [CuentaContableResponse.model_validate(c) for c in cuentas]
+    
     def get_cuenta_by_id(self, db: Session, cuenta_id: int) -> CuentaContableResponse:
         """
         Obtener cuenta por ID
@@ -100,6 +129,7 @@ class ContabilidadService:
         
         update_data = cuenta_data.model_dump(exclude_unset=True)
         updated_cuenta = cuenta_contable_repository.update(db, cuenta_id, update_data)
+        versiones.incrementar("cuentas_contables")
         return CuentaContableResponse.model_validate(updated_cuenta)
     
     # ========== Transacciones ==========
@@ -148,23 +178,50 @@ class ContabilidadService:
         fecha_desde: Optional[date] = None,
         fecha_hasta: Optional[date] = None,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[TransaccionResponse]:
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Pagina[TransaccionResponse]:
         """
-        Obtener transacciones
+        Obtener transacciones (filtros combinables, paginación por cursor)
         """
-        if cuenta_id:
-            transacciones = transaccion_repository.get_by_cuenta(db, cuenta_id)
-        elif fecha_desde and fecha_hasta:
-            transacciones = transaccion_repository.get_by_fecha_rango(
-                db,
-                fecha_desde,
-                fecha_hasta
-            )
-        else:
-            transacciones = transaccion_repository.get_all(db, skip, limit)
-        
-        return [TransaccionResponse.model_validate(t) for t in transacciones]
+        return paginar(
+            transaccion_repository,
+            db,
+            TransaccionResponse,
+            limit,
+            cursor,
+            skip,
+            filtros_transacciones(cuenta_id, fecha_desde, fecha_hasta),
+            f"cuenta={cuenta_id};desde={fecha_desde};hasta={fecha_hasta}",
+            fields
+        )
+    
+    async def get_transacciones_async(
+        self,
+        db: AsyncSession,
+        cuenta_id: Optional[int] = None,
+        fecha_desde: Optional[date] = None,
+        fecha_hasta: Optional[date] = None,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Pagina[TransaccionResponse]:
+        """
+        Obtener transacciones (sesión asíncrona)
+        """
+        return await paginar_async(
+            async_transaccion_repository,
+            db,
+            TransaccionResponse,
+            limit,
+            cursor,
+            skip,
+            filtros_transacciones(cuenta_id, fecha_desde, fecha_hasta),
+            f"cuenta={cuenta_id};desde={fecha_desde};hasta={fecha_hasta}",
+            fields
+        )
     
     def get_balance(
         self,
@@ -209,18 +266,7 @@ class ContabilidadService:
         """
         Registrar automáticamente ingreso por reserva
         """
-        # Buscar cuenta de ingresos por hospedaje
-        cuenta = cuenta_contable_repository.get_by_codigo(db, "4.1.01")  # Ingresos por hospedaje
-        
-        if not cuenta:
-            # Si no existe, crearla
-            cuenta_data = {
-                "codigo": "4.1.01",
-                "nombre": "Ingresos por Hospedaje",
-                "tipo": "Ingreso",
-                "cuenta_padre_id": None
-            }
-            cuenta = cuenta_contable_repository.create(db, cuenta_data)
+        cuenta = self.cuenta_hospedaje(db)
         
         # Registrar transacción
         transaccion_data = {
@@ -232,6 +278,24 @@ class ContabilidadService:
         }
         
         transaccion_repository.create(db, transaccion_data)
+    
+    def cuenta_hospedaje(self, db: Session):
+        """
+        Cuenta de ingresos por hospedaje (4.1.01), creándola si no existe
+        """
+        cuenta = cuenta_contable_repository.get_by_codigo(db, "4.1.01")  # Ingresos por hospedaje
+        
+        if not cuenta:
+            # Si no existe, crearla
+            cuenta_data = {
+                "codigo": "4.1.01",
+                "nombre": "Ingresos por Hospedaje",
+                "tipo": "Ingreso",
+                "cuenta_padre_id": None
+            }
+            cuenta = cuenta_contable_repository.create(db, cuenta_data)
+            versiones.incrementar("cuentas_contables")
+        return cuenta
 
 
 # Instancia singleton
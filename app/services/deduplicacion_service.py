@@ -0,0 +1,334 @@
+"""
+Servicio de Deduplicación de Clientes
+"""
+
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.models.cliente import Cliente
+from app.repositories.base_repository import invalidar_totales
+from app.repositories.bloqueo_repository import bloqueo_repository
+from app.repositories.cliente_repository import cliente_repository
+from app.repositories.clave_deduplicacion_repository import clave_deduplicacion_repository
+from app.repositories.grupo_reserva_repository import grupo_reserva_repository
+from app.repositories.lista_espera_repository import lista_espera_repository
+from app.repositories.reserva_repository import reserva_repository
+from app.schemas.cliente_schema import ClienteResponse, ClienteDuplicadoResponse
+from app.services.cliente_service import cliente_service
+
+# Repositorios cuyas filas apuntan a un cliente (columna cliente_id): la
+# fusión las pasa al cliente destino antes de borrar los clientes origen.
+# Toda tabla nueva con clave foránea a clientes debe figurar aquí.
+REFERENCIAS_CLIENTE = (
+    reserva_repository,
+    grupo_reserva_repository,
+    lista_espera_repository,
+    bloqueo_repository,
+)
+
+
+class DeduplicacionService:
+    """
+    Servicio de detección y fusión de clientes duplicados
+
+    En lugar de comparar todos los clientes entre sí (O(n²)), cada cliente
+    genera varias claves de bloqueo (nombre normalizado, teléfono, parte local
+    del email) que se guardan en una tabla de trabajo; solo se comparan los
+    clientes que comparten alguna clave.
+    """
+
+    # Clientes leídos por lote al generar las claves
+    TAMANO_LOTE = 5000
+
+    # Bloques más grandes se comparan solo por vecindad ordenada
+    MAX_BLOQUE = 50
+    VENTANA = 10
+
+    # Pesos de cada señal en el puntaje de similitud
+    PESO_NOMBRE = 0.5
+    PESO_EMAIL = 0.3
+    PESO_TELEFONO = 0.2
+
+    # ========== Normalización ==========
+
+    def _tokens(self, texto: Optional[str]) -> List[str]:
+        """Quitar acentos y signos, pasar a minúsculas y separar en palabras"""
+        texto = unicodedata.normalize("NFKD", texto or "")
+        texto = "".join(c for c in texto if not unicodedata.combining(c))
+        return re.sub(r"[^a-z0-9 ]", " ", texto.lower()).split()
+
+    def _perfil(self, cliente: Cliente) -> Dict:
+        """
+        Obtener los datos normalizados de un cliente y sus claves de bloqueo
+        """
+        nombres = self._tokens(cliente.nombre)
+        apellidos = self._tokens(cliente.apellido)
+        nombre_completo = " ".join(sorted(nombres + apellidos))
+
+        telefono = re.sub(r"\D", "", cliente.telefono or "")[-9:]
+        if len(telefono) < 7:
+            telefono = ""
+
+        email_local = (cliente.email or "").lower().split("@")[0]
+        email_local = email_local.split("+")[0].replace(".", "")
+        if len(email_local) < 3:
+            email_local = ""
+
+        identificacion = re.sub(r"[^0-9a-z]", "", (cliente.identificacion or "").lower())
+
+        claves = set()
+        if nombre_completo:
+            claves.add(f"nom:{nombre_completo}")
+        if nombres and apellidos:
+            # Primer apellido + inicial del nombre: tolera segundos nombres
+            claves.add(f"ape:{apellidos[0]}|{nombres[0][0]}")
+        if telefono:
+            claves.add(f"tel:{telefono}")
+        if email_local:
+            claves.add(f"eml:{email_local}")
+
+        return {
+            "id": cliente.id,
+            "nombre": nombre_completo,
+            "telefono": telefono,
+            "email": email_local,
+            "identificacion": identificacion,
+            "claves": {clave[:150] for clave in claves}
+        }
+
+    def _puntaje(self, a: Dict, b: Dict) -> float:
+        """
+        Calcular la similitud (0 a 1) entre dos perfiles normalizados
+        """
+        if a["identificacion"] and b["identificacion"]:
+            # Dos documentos distintos son dos personas, aunque coincida el resto
+            return 1.0 if a["identificacion"] == b["identificacion"] else 0.0
+
+        total = 0.0
+        pesos = 0.0
+        if a["nombre"] and b["nombre"]:
+            total += self.PESO_NOMBRE * SequenceMatcher(None, a["nombre"], b["nombre"]).ratio()
+            pesos += self.PESO_NOMBRE
+        if a["email"] and b["email"]:
+            total += self.PESO_EMAIL * SequenceMatcher(None, a["email"], b["email"]).ratio()
+            pesos += self.PESO_EMAIL
+        if a["telefono"] and b["telefono"]:
+            total += self.PESO_TELEFONO * (1.0 if a["telefono"] == b["telefono"] else 0.0)
+            pesos += self.PESO_TELEFONO
+
+        return round(total / pesos, 4) if pesos else 0.0
+
+    def _pares(self, perfiles: List[Dict]) -> Iterator[tuple]:
+        """
+        Generar los pares a comparar dentro de un bloque; los bloques grandes
+        (nombres muy comunes) se recorren con una ventana deslizante
+        """
+        if len(perfiles) <= self.MAX_BLOQUE:
+            for i in range(len(perfiles)):
+                for j in range(i + 1, len(perfiles)):
+                    yield perfiles[i], perfiles[j]
+            return
+
+        ordenados = sorted(perfiles, key=lambda p: (p["nombre"], p["email"]))
+        for i in range(len(ordenados)):
+            for j in range(i + 1, min(i + 1 + self.VENTANA, len(ordenados))):
+                yield ordenados[i], ordenados[j]
+
+    # ========== Detección ==========
+
+    def generar_claves(self, db: Session) -> int:
+        """
+        Regenerar la tabla de claves de bloqueo recorriendo los clientes por lotes
+        """
+        clave_deduplicacion_repository.limpiar(db)
+
+        procesados = 0
+        for lote in cliente_repository.iter_lotes(db, self.TAMANO_LOTE):
+            filas = []
+            for cliente in lote:
+                for clave in self._perfil(cliente)["claves"]:
+                    filas.append({"clave": clave, "cliente_id": cliente.id})
+            clave_deduplicacion_repository.insertar_lote(db, filas)
+            procesados += len(lote)
+
+        return procesados
+
+    def buscar_duplicados(
+        self,
+        db: Session,
+        umbral: float = 0.85
+    ) -> Iterator[ClienteDuplicadoResponse]:
+        """
+        Recorrer los bloques generados y producir los pares candidatos cuyo
+        puntaje supera el umbral. Requiere haber ejecutado generar_claves.
+
+        Un par que comparte varias claves se evalúa en el primer bloque que
+        lo compara: un bloque grande solo compara vecinos, así que no puede
+        dejarse a uno fijo (p. ej. el de la menor clave común). Solo se
+        recuerdan los pares con más de una clave común, los únicos que
+        pueden repetirse. Los clientes de cada página de bloques se cargan
+        con una sola consulta.
+        """
+        vistos: set[tuple] = set()
+        for pagina in clave_deduplicacion_repository.iter_paginas(db):
+            ids = sorted({cliente_id for _, miembros in pagina for cliente_id in miembros})
+            perfiles_por_id = {
+                c.id: self._perfil(c) for c in cliente_repository.get_by_ids(db, ids)
+            }
+            db.expunge_all()
+
+            for _, miembros in pagina:
+                perfiles = [perfiles_por_id[i] for i in miembros if i in perfiles_por_id]
+                for a, b in self._pares(perfiles):
+                    comunes = a["claves"] & b["claves"]
+                    if not comunes:
+                        continue
+                    if len(comunes) > 1:
+                        par = (min(a["id"], b["id"]), max(a["id"], b["id"]))
+                        if par in vistos:
+                            continue
+                        vistos.add(par)
+                    puntaje = self._puntaje(a, b)
+                    if puntaje >= umbral:
+                        cliente_a_id, cliente_b_id = sorted((a["id"], b["id"]))
+                        yield ClienteDuplicadoResponse(
+                            cliente_a_id=cliente_a_id,
+                            cliente_b_id=cliente_b_id,
+                            puntaje=puntaje,
+                            claves=sorted(comunes)
+                        )
+
+    # ========== Fusión ==========
+
+    def fusionar(
+        self,
+        db: Session,
+        cliente_destino_id: int,
+        clientes_origen_ids: List[int]
+    ) -> ClienteResponse:
+        """
+        Fusionar varios clientes en uno: sus reservas pasan al cliente destino
+        con un único UPDATE y los clientes origen se eliminan
+        """
+        origen_ids = sorted(set(clientes_origen_ids) - {cliente_destino_id})
+        if not origen_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Debe indicar al menos un cliente distinto del destino"
+            )
+
+        destino = cliente_repository.get_by_id(db, cliente_destino_id)
+        if not destino:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Cliente no encontrado"
+            )
+
+        origenes = cliente_repository.get_by_ids(db, origen_ids)
+        if len(origenes) != len(origen_ids):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Alguno de los clientes a fusionar no existe"
+            )
+
+        self._fusionar_grupo(db, destino, origenes)
+        db.commit()
+        db.refresh(destino)
+        return ClienteResponse.model_validate(destino)
+
+    def _fusionar_grupo(self, db: Session, destino: Cliente, origenes: List[Cliente]) -> int:
+        """
+        Reasignar las filas que apuntan a los clientes origen (reservas y
+        REFERENCIAS_CLIENTE), completar datos faltantes del destino y
+        eliminar los clientes origen (no confirma la transacción). Devuelve
+        las reservas reasignadas.
+        """
+        origen_ids = [c.id for c in origenes]
+        reasignadas = {
+            repositorio.model.__tablename__: repositorio.reasignar_cliente(db, origen_ids, destino.id)
+            for repositorio in REFERENCIAS_CLIENTE
+        }
+
+        for origen in origenes:
+            if not destino.telefono and origen.telefono:
+                destino.telefono = origen.telefono
+            if not destino.direccion and origen.direccion:
+                destino.direccion = origen.direccion
+
+        db.query(Cliente).filter(Cliente.id.in_(origen_ids)).delete(synchronize_session=False)
+        invalidar_totales(Cliente.__tablename__)
+        for cliente_id in [destino.id] + origen_ids:
+            cliente_service.invalidar_perfil(cliente_id)
+        return reasignadas["reservas"]
+
+    # ========== Proceso por lotes ==========
+
+    def ejecutar(
+        self,
+        db: Session,
+        umbral: float = 0.85,
+        fusionar: bool = False,
+        limite_pares: int = 100
+    ) -> Dict:
+        """
+        Ejecutar el proceso completo: generar claves, detectar pares y,
+        opcionalmente, fusionar cada grupo en su cliente más antiguo
+        """
+        procesados = self.generar_claves(db)
+
+        # Unión-búsqueda sobre los pares detectados (solo crece con los duplicados)
+        padre: Dict[int, int] = {}
+
+        def raiz(x: int) -> int:
+            while padre.setdefault(x, x) != x:
+                padre[x] = padre[padre[x]]
+                x = padre[x]
+            return x
+
+        pares = []
+        total_pares = 0
+        for par in self.buscar_duplicados(db, umbral):
+            total_pares += 1
+            if len(pares) < limite_pares:
+                pares.append(par)
+            if fusionar:
+                a, b = raiz(par.cliente_a_id), raiz(par.cliente_b_id)
+                if a != b:
+                    padre[max(a, b)] = min(a, b)
+
+        fusionados = 0
+        reservas_reasignadas = 0
+        if fusionar and padre:
+            grupos: Dict[int, List[int]] = {}
+            for cliente_id in list(padre):
+                r = raiz(cliente_id)
+                if r != cliente_id:
+                    grupos.setdefault(r, []).append(cliente_id)
+
+            for destino_id, origen_ids in grupos.items():
+                cargados = cliente_repository.get_by_ids(db, [destino_id] + origen_ids)
+                destino = next(c for c in cargados if c.id == destino_id)
+                origenes = [c for c in cargados if c.id != destino_id]
+                reservas_reasignadas += self._fusionar_grupo(db, destino, origenes)
+                fusionados += len(origenes)
+                db.commit()
+                db.expunge_all()
+
+        clave_deduplicacion_repository.limpiar(db)
+
+        return {
+            "clientes_procesados": procesados,
+            "pares_candidatos": total_pares,
+            "clientes_fusionados": fusionados,
+            "reservas_reasignadas": reservas_reasignadas,
+            "pares": pares
+        }
+
+
+# Instancia singleton
+deduplicacion_service = DeduplicacionService()
@@ -3,13 +3,18 @@ Servicio de Facturación
 """
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from typing import List
+from typing import List, Optional
 from decimal import Decimal
 
-from app.repositories.factura_repository import factura_repository
+from app.repositories.factura_repository import factura_repository, async_factura_repository
 from app.repositories.reserva_repository import reserva_repository
-from app.schemas.factura_schema import FacturaCreate, FacturaResponse
+from app.repositories.pago_repository import pago_repository
+from app.schemas.factura_schema import FacturaCreate, FacturaUpdate, FacturaResponse
+from app.schemas.common import Pagina
+from app.services.cliente_service import cliente_service
+from app.services.paginacion import paginar, paginar_async
 
 
 class FacturaService:
@@ -37,14 +42,6 @@ class FacturaService:
                 detail="Ya existe una factura para esta reserva"
             )
         
-        # Generar número de factura consecutivo
-        ultimo_numero = factura_repository.get_ultimo_numero(db)
-        if ultimo_numero:
-            numero_int = int(ultimo_numero.split("-")[1]) + 1
-            nuevo_numero = f"FAC-{numero_int:06d}"
-        else:
-            nuevo_numero = "FAC-000001"
-        
         # Calcular totales
         subtotal = reserva.precio_total
         subtotal = Decimal(str(subtotal))  # Asegura que subtotal sea Decimal
@@ -52,9 +49,8 @@ class FacturaService:
         descuentos = factura_data.descuentos if factura_data.descuentos else Decimal("0.00")
         total = subtotal + impuestos - descuentos
         
-        # Crear factura
+        # Crear factura (el repositorio le da el número consecutivo)
         factura_dict = {
-            "numero_factura": nuevo_numero,
             "reserva_id": factura_data.reserva_id,
             "subtotal": subtotal,
             "impuestos": impuestos,
@@ -62,15 +58,22 @@ class FacturaService:
             "total": total
         }
         
-        factura = factura_repository.create(db, factura_dict)
+        cliente_id = reserva.cliente_id
+        factura = factura_repository.create_numerada(db, factura_dict)
+        cliente_service.invalidar_perfil(cliente_id)
         return FacturaResponse.model_validate(factura)
     
-    def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[FacturaResponse]:
+    def get_all(self, db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None) -> Pagina[FacturaResponse]:
         """
         Obtener todas las facturas
         """
-        facturas = factura_repository.get_all(db, skip, limit)
-        return [FacturaResponse.model_validate(f) for f in facturas]
+        return paginar(factura_repository, db, FacturaResponse, limit, cursor, skip, fields=fields)
+    
+    async def get_all_async(self, db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None) -> Pagina[FacturaResponse]:
+        """
+        Obtener todas las facturas (sesión asíncrona)
+        """
+        return await paginar_async(async_factura_repository, db, FacturaResponse, limit, cursor, skip, fields=fields)
     
     def get_by_id(self, db: Session, factura_id: int) -> FacturaResponse:
         """
@@ -84,6 +87,58 @@ class FacturaService:
             )
         return FacturaResponse.model_validate(factura)
     
+    def update(self, db: Session, factura_id: int, factura_data: FacturaUpdate) -> FacturaResponse:
+        """
+        Actualizar una factura (descuentos) y recalcular su total
+        """
+        factura = factura_repository.get_by_id(db, factura_id)
+        if not factura:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Factura no encontrada"
+            )
+        
+        if factura_data.descuentos is None:
+            return FacturaResponse.model_validate(factura)
+        
+        descuentos = Decimal(str(factura_data.descuentos))
+        bruto = Decimal(str(factura.subtotal)) + Decimal(str(factura.impuestos))
+        if descuentos < 0 or descuentos > bruto:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Los descuentos deben estar entre 0 y el total de la factura"
+            )
+        
+        cliente_id = factura.reserva.cliente_id
+        factura = factura_repository.update(db, factura_id, {
+            "descuentos": descuentos,
+            "total": bruto - descuentos
+        })
+        cliente_service.invalidar_perfil(cliente_id)
+        return FacturaResponse.model_validate(factura)
+    
+    def delete(self, db: Session, factura_id: int) -> bool:
+        """
+        Eliminar una factura sin pagos registrados
+        """
+        factura = factura_repository.get_by_id(db, factura_id)
+        if not factura:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Factura no encontrada"
+            )
+        
+        if pago_repository.get_by_factura(db, factura_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No se puede eliminar una factura con pagos registrados"
+            )
+        
+        cliente_id = factura.reserva.cliente_id
+        eliminada = factura_repository.delete(db, factura_id)
+        cliente_service.invalidar_perfil(cliente_id)
+        return eliminada
+    
     def get_by_numero(self, db: Session, numero_factura: str) -> FacturaResponse:
         """
         Obtener factura por número
@@ -0,0 +1,218 @@
+"""
+Servicio de Reservas de Grupo
+
+Una agencia reserva decenas de habitaciones para las mismas fechas. En vez
+de repetir ReservaService.create por habitación (una consulta de
+disponibilidad y varios commits cada vez), el grupo:
+
+1. toma las filas de todas las habitaciones con un SELECT ... FOR UPDATE,
+2. comprueba su disponibilidad con una sola consulta de ocupación,
+3. las cotiza con una sola tabla del calendario de tarifas,
+4. guarda el grupo, sus reservas, los contadores de inventario y el estado
+   de las habitaciones en un único commit: o se reservan todas o ninguna.
+
+El check-in y el check-out del grupo cambian todas sus reservas y
+habitaciones con un UPDATE cada una, y el check-out emite las facturas en
+bloque.
+"""
+
+import os
+from collections import Counter
+from datetime import date
+
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.repositories.cliente_repository import cliente_repository
+from app.repositories.factura_repository import factura_repository
+from app.repositories.grupo_reserva_repository import grupo_reserva_repository
+from app.repositories.habitacion_repository import habitacion_repository
+from app.repositories.reserva_repository import reserva_repository
+from app.schemas.reserva_schema import GrupoReservaCreate, GrupoReservaResponse, ReservaResponse
+from app.services.calendario_tarifas import calendario_tarifas
+from app.services.catalogo_habitaciones import catalogo_habitaciones
+from app.services.cliente_service import cliente_service
+from app.services.habitacion_service import habitacion_service
+from app.services.inventario_service import inventario_service
+from app.services.lista_espera_service import lista_espera_service
+from app.services.reserva_service import reserva_service
+
+# Habitaciones como máximo en un grupo
+GRUPO_MAX_HABITACIONES = int(os.getenv("GRUPO_MAX_HABITACIONES", 200))
+
+
+class GrupoReservaService:
+    """
+    Servicio de reservas de varias habitaciones en una sola transacción
+    """
+
+    def create(self, db: Session, datos: GrupoReservaCreate) -> GrupoReservaResponse:
+        """
+        Reservar todas las habitaciones del grupo o ninguna
+        """
+        if len(datos.habitacion_ids) > GRUPO_MAX_HABITACIONES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Un grupo admite como máximo {GRUPO_MAX_HABITACIONES} habitaciones"
+            )
+        if not cliente_repository.get_by_id(db, datos.cliente_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Cliente no encontrado"
+            )
+        
+        catalogo = catalogo_habitaciones.instantanea(db)
+        habitaciones = [catalogo.por_id.get(h) for h in datos.habitacion_ids]
+        desconocidas = [h for h, habitacion in zip(datos.habitacion_ids, habitaciones) if not habitacion or not habitacion.activa]
+        if desconocidas:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Habitaciones no encontradas: {desconocidas}"
+            )
+        
+        # Precio de todas las habitaciones con una sola tabla de tarifas
+        precios = calendario_tarifas.cotizar(db, datos.habitacion_ids, datos.fecha_entrada, datos.fecha_salida)
+        
+        # Las filas quedan tomadas hasta el commit: nadie reserva ni bloquea
+        # estas habitaciones entre la comprobación y la inserción
+        habitacion_repository.bloquear_filas(db, datos.habitacion_ids)
+        ocupadas = reserva_repository.habitaciones_ocupadas(
+            db, datos.fecha_entrada, datos.fecha_salida, datos.habitacion_ids
+        )
+        if ocupadas:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Habitaciones no disponibles para las fechas seleccionadas: {sorted(ocupadas)}"
+            )
+        
+        # Contadores de inventario y estado de las habitaciones, en la misma
+        # transacción que las reservas
+        for tipo, cantidad in Counter(h.tipo for h in habitaciones).items():
+            inventario_service.registrar_venta(db, tipo, datos.fecha_entrada, datos.fecha_salida, cantidad)
+        habitacion_service.cambiar_estados(db, datos.habitacion_ids, "Reservada")
+        
+        grupo = grupo_reserva_repository.create_con_reservas(
+            db,
+            {
+                "nombre": datos.nombre,
+                "cliente_id": datos.cliente_id,
+                "fecha_entrada": datos.fecha_entrada,
+                "fecha_salida": datos.fecha_salida,
+                "observaciones": datos.observaciones
+            },
+            [
+                {
+                    "cliente_id": datos.cliente_id,
+                    "habitacion_id": habitacion_id,
+                    "fecha_entrada": datos.fecha_entrada,
+                    "fecha_salida": datos.fecha_salida,
+                    "precio_total": precios[habitacion_id] / 100,
+                    "estado": "Confirmada",
+                    "observaciones": datos.observaciones
+                }
+                for habitacion_id in datos.habitacion_ids
+            ]
+        )
+        
+        habitacion_service.publicar_estados(datos.habitacion_ids, "Reservada")
+        cliente_service.invalidar_perfil(datos.cliente_id)
+        return self._respuesta(grupo)
+    
+    def get_by_id(self, db: Session, grupo_id: int) -> GrupoReservaResponse:
+        """
+        Obtener grupo con sus reservas
+        """
+        return self._respuesta(self._obtener(db, grupo_id))
+    
+    def check_in(self, db: Session, grupo_id: int) -> GrupoReservaResponse:
+        """
+        Check-in de todas las reservas confirmadas del grupo
+        """
+        grupo = self._obtener(db, grupo_id)
+        if date.today() < grupo.fecha_entrada:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No se puede hacer check-in antes de la fecha de entrada"
+            )
+        confirmadas = [r for r in grupo.reservas if r.estado == "Confirmada"]
+        if not confirmadas:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El grupo no tiene reservas confirmadas"
+            )
+        
+        habitacion_ids = [r.habitacion_id for r in confirmadas]
+        habitacion_service.cambiar_estados(db, habitacion_ids, "Ocupada")
+        reserva_repository.cambiar_estado_grupo(db, grupo_id, "Confirmada", "En_Curso")
+        db.commit()
+        
+        habitacion_service.publicar_estados(habitacion_ids, "Ocupada")
+        cliente_service.invalidar_perfil(grupo.cliente_id)
+        return self.get_by_id(db, grupo_id)
+    
+    def check_out(self, db: Session, grupo_id: int) -> GrupoReservaResponse:
+        """
+        Check-out de todas las reservas en curso del grupo, con sus facturas
+        """
+        grupo = self._obtener(db, grupo_id)
+        en_curso = [r for r in grupo.reservas if r.estado == "En_Curso"]
+        if not en_curso:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El grupo no tiene reservas en curso"
+            )
+        
+        habitacion_ids = [r.habitacion_id for r in en_curso]
+        catalogo = catalogo_habitaciones.instantanea(db)
+        
+        # Una salida anticipada devuelve las noches restantes al inventario
+        tipos = Counter(catalogo.por_id[h].tipo for h in habitacion_ids if h in catalogo.por_id)
+        for tipo, cantidad in tipos.items():
+            inventario_service.registrar_liberacion(db, tipo, grupo.fecha_entrada, grupo.fecha_salida, cantidad)
+        habitacion_service.cambiar_estados(db, habitacion_ids, "Disponible")
+        
+        # Facturas de las reservas que aún no la tienen, en un solo INSERT
+        facturadas = factura_repository.get_reservas_facturadas(db, [r.id for r in en_curso])
+        factura_repository.create_lote(
+            db, reserva_service._datos_facturas(db, [r for r in en_curso if r.id not in facturadas])
+        )
+        reserva_repository.cambiar_estado_grupo(db, grupo_id, "En_Curso", "Completada")
+        db.commit()
+        
+        habitacion_service.publicar_estados(habitacion_ids, "Disponible")
+        cliente_service.invalidar_perfil(grupo.cliente_id)
+        
+        # Salida anticipada: las noches restantes pasan a la lista de espera
+        hoy = date.today()
+        if hoy < grupo.fecha_salida:
+            lista_espera_service.procesar_liberacion(db, habitacion_ids, hoy, grupo.fecha_salida)
+        
+        return self.get_by_id(db, grupo_id)
+    
+    def _obtener(self, db: Session, grupo_id: int):
+        grupo = grupo_reserva_repository.get_con_reservas(db, grupo_id)
+        if not grupo:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Grupo no encontrado"
+            )
+        return grupo
+    
+    def _respuesta(self, grupo) -> GrupoReservaResponse:
+        reservas = [ReservaResponse.model_validate(r) for r in grupo.reservas]
+        return GrupoReservaResponse(
+            id=grupo.id,
+            nombre=grupo.nombre,
+            cliente_id=grupo.cliente_id,
+            fecha_entrada=grupo.fecha_entrada,
+            fecha_salida=grupo.fecha_salida,
+            observaciones=grupo.observaciones,
+            precio_total=sum(r.precio_total for r in reservas if r.estado != "Cancelada"),
+            reservas=reservas,
+            created_at=grupo.created_at
+        )
+
+
+# Instancia singleton
+grupo_reserva_service = GrupoReservaService()
@@ -3,16 +3,23 @@ Servicio de Habitaciones
 """
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from typing import List, Optional
 from datetime import date
 
-from app.repositories.habitacion_repository import habitacion_repository
+from app.repositories.habitacion_repository import habitacion_repository, async_habitacion_repository
+from app.repositories.reserva_repository import reserva_repository, async_reserva_repository
 from app.schemas.habitacion_schema import (
     HabitacionCreate,
     HabitacionUpdate,
     HabitacionResponse
 )
+from app.schemas.common import Pagina
+from app.config.versiones import versiones
+from app.services.catalogo_habitaciones import catalogo_habitaciones, Instantanea
+from app.services.inventario_service import inventario_service
+from app.services.paginacion import paginar, paginar_async
 
 
 class HabitacionService:
@@ -25,33 +32,63 @@ class HabitacionService:
         Crear nueva habitación
         """
         # Verificar número único
-        if habitacion_repository.get_by_numero(db, habitacion_data.numero):
+        if catalogo_habitaciones.por_numero(db, habitacion_data.numero):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Ya existe una habitación con ese número"
             )
         
-        # Crear habitación
+        # Crear habitación (con la capacidad de su tipo en el inventario)
+        inventario_service.preparar_cambio_habitacion(
+            db, None, {"tipo": habitacion_data.tipo, "activa": True, "estado": "Disponible"}
+        )
         habitacion = habitacion_repository.create(db, habitacion_data.model_dump())
+        self._publicar(habitacion)
         return HabitacionResponse.model_validate(habitacion)
     
     def get_all(
         self,
         db: Session,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[HabitacionResponse]:
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Pagina[HabitacionResponse]:
         """
         Obtener todas las habitaciones
         """
-        habitaciones = habitacion_repository.get_all(db, skip, limit)
-        return [HabitacionResponse.model_validate(h) for h in habitaciones]
+        return paginar(habitacion_repository, db, HabitacionResponse, limit, cursor, skip, fields=fields)
+    
+    async def get_all_async(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Pagina[HabitacionResponse]:
+        """
+        Obtener todas las habitaciones (sesión asíncrona)
+        """
+        return await paginar_async(async_habitacion_repository, db, HabitacionResponse, limit, cursor, skip, fields=fields)
     
     def get_by_id(self, db: Session, habitacion_id: int) -> HabitacionResponse:
         """
         Obtener habitación por ID
         """
-        habitacion = habitacion_repository.get_by_id(db, habitacion_id)
+        habitacion = catalogo_habitaciones.obtener(db, habitacion_id)
+        if not habitacion:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Habitación no encontrada"
+            )
+        return HabitacionResponse.model_validate(habitacion)
+    
+    async def get_by_id_async(self, db: AsyncSession, habitacion_id: int) -> HabitacionResponse:
+        """
+        Obtener habitación por ID (sesión asíncrona)
+        """
+        habitacion = (await catalogo_habitaciones.instantanea_async(db)).por_id.get(habitacion_id)
         if not habitacion:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -77,18 +114,74 @@ class HabitacionService:
                     detail="La fecha de entrada debe ser anterior a la fecha de salida"
                 )
             
-            habitaciones = habitacion_repository.get_disponibles_por_fechas(
-                db,
-                fecha_entrada,
-                fecha_salida,
+            ocupadas = reserva_repository.habitaciones_ocupadas(db, fecha_entrada, fecha_salida)
+            habitaciones = self._disponibles_por_fechas(catalogo_habitaciones.instantanea(db), ocupadas, tipo)
+        else:
+            habitaciones = self._disponibles(catalogo_habitaciones.instantanea(db), tipo)
+        
+        return [HabitacionResponse.model_validate(h) for h in habitaciones]
+    
+    async def get_disponibles_async(
+        self,
+        db: AsyncSession,
+        fecha_entrada: Optional[date] = None,
+        fecha_salida: Optional[date] = None,
+        tipo: Optional[str] = None
+    ) -> List[HabitacionResponse]:
+        """
+        Obtener habitaciones disponibles (sesión asíncrona)
+        """
+        if fecha_entrada and fecha_salida:
+            if fecha_entrada >= fecha_salida:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="La fecha de entrada debe ser anterior a la fecha de salida"
+                )
+            
+            ocupadas = await async_reserva_repository.habitaciones_ocupadas(db, fecha_entrada, fecha_salida)
+            habitaciones = self._disponibles_por_fechas(
+                await catalogo_habitaciones.instantanea_async(db),
+                ocupadas,
                 tipo
             )
         else:
-            # Asegúrate de que la llamada sea así:
-            habitaciones = habitacion_repository.get_disponibles(db, tipo)
+            habitaciones = self._disponibles(await catalogo_habitaciones.instantanea_async(db), tipo)
         
         return [HabitacionResponse.model_validate(h) for h in habitaciones]
     
+    def _candidatas(self, catalogo: Instantanea, tipo: Optional[str]) -> tuple:
+        return catalogo.por_tipo.get(tipo, ()) if tipo else catalogo.todas()
+    
+    def _disponibles(self, catalogo: Instantanea, tipo: Optional[str] = None) -> list:
+        """Habitaciones activas en estado Disponible (mismo criterio que el repositorio)"""
+        return [
+            h for h in self._candidatas(catalogo, tipo)
+            if h.activa and h.estado == "Disponible"
+        ]
+    
+    def _disponibles_por_fechas(self, catalogo: Instantanea, ocupadas: set, tipo: Optional[str] = None) -> list:
+        """
+        Habitaciones activas sin reservas en las fechas: la base de datos solo
+        aporta los IDs ocupados, el resto se filtra sobre el catálogo
+        (mismo criterio que filtro_disponibles_por_fechas)
+        """
+        return [
+            h for h in self._candidatas(catalogo, tipo)
+            if h.activa and h.estado == "Disponible" and h.id not in ocupadas
+        ]
+    
+    def libres_por_fechas(self, catalogo: Instantanea, ocupadas: set, tipo: Optional[str] = None) -> list:
+        """
+        Habitaciones que se pueden vender para unas fechas: activas, fuera de
+        mantenimiento y sin ocupación en ellas. El estado operativo
+        (Reservada, Ocupada) describe esta noche y no cuenta, igual que al
+        crear una reserva.
+        """
+        return [
+            h for h in self._candidatas(catalogo, tipo)
+            if h.activa and h.estado != "Mantenimiento" and h.id not in ocupadas
+        ]
+    
     def update(
         self,
         db: Session,
@@ -99,23 +192,29 @@ class HabitacionService:
         Actualizar habitación
         """
         # Verificar que existe
-        habitacion = habitacion_repository.get_by_id(db, habitacion_id)
+        habitacion = catalogo_habitaciones.obtener(db, habitacion_id)
         if not habitacion:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Habitación no encontrada"
             )
         
-        # Actualizar
+        # Actualizar (tipo, activa o mantenimiento cambian la capacidad del inventario)
         update_data = habitacion_data.model_dump(exclude_unset=True)
+        inventario_service.preparar_cambio_habitacion(db, habitacion, {
+            "tipo": update_data.get("tipo") or habitacion.tipo,
+            "activa": update_data.get("activa", habitacion.activa),
+            "estado": update_data.get("estado") or habitacion.estado
+        })
         updated_habitacion = habitacion_repository.update(db, habitacion_id, update_data)
+        self._publicar(updated_habitacion)
         return HabitacionResponse.model_validate(updated_habitacion)
     
     def delete(self, db: Session, habitacion_id: int) -> bool:
         """
         Eliminar habitación
         """
-        habitacion = habitacion_repository.get_by_id(db, habitacion_id)
+        habitacion = catalogo_habitaciones.obtener(db, habitacion_id)
         if not habitacion:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -123,17 +222,61 @@ class HabitacionService:
             )
         
         # Verificar que no tenga reservas activas
-        if habitacion.reservas:
-            reservas_activas = [r for r in habitacion.reservas if r.estado != "Cancelada"]
-            if reservas_activas:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="No se puede eliminar una habitación con reservas activas"
-                )
+        if reserva_repository.tiene_no_canceladas(db, habitacion_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No se puede eliminar una habitación con reservas activas"
+            )
         
         # Eliminar
+        inventario_service.preparar_cambio_habitacion(db, habitacion, None)
         habitacion_repository.delete(db, habitacion_id)
+        catalogo_habitaciones.quitar(habitacion_id, versiones.incrementar("habitaciones"))
         return True
+    
+    def cambiar_estado(self, db: Session, habitacion_id: int, estado: str) -> None:
+        """
+        Cambiar el estado de una habitación (reservas, check-in, check-out)
+        sin volver a leerla, y reflejarlo en el catálogo
+        """
+        habitacion = catalogo_habitaciones.obtener(db, habitacion_id)
+        if habitacion is not None:
+            inventario_service.preparar_cambio_habitacion(db, habitacion, {
+                "tipo": habitacion.tipo,
+                "activa": habitacion.activa,
+                "estado": estado
+            })
+        habitacion_repository.actualizar_estado(db, habitacion_id, estado)
+        catalogo_habitaciones.cambiar_estado(habitacion_id, estado, versiones.incrementar("estados_habitacion"))
+    
+    def cambiar_estados(self, db: Session, habitacion_ids: List[int], estado: str) -> None:
+        """
+        Cambiar el estado de varias habitaciones con un solo UPDATE, dentro
+        de la transacción del llamador (reservas de grupo). Tras el commit
+        hay que llamar a publicar_estados.
+        """
+        catalogo = catalogo_habitaciones.instantanea(db)
+        for habitacion_id in habitacion_ids:
+            habitacion = catalogo.por_id.get(habitacion_id)
+            if habitacion is not None:
+                inventario_service.preparar_cambio_habitacion(db, habitacion, {
+                    "tipo": habitacion.tipo,
+                    "activa": habitacion.activa,
+                    "estado": estado
+                })
+        habitacion_repository.actualizar_estados(db, habitacion_ids, estado)
+    
+    def publicar_estados(self, habitacion_ids: List[int], estado: str) -> None:
+        """Reflejar en el catálogo un cambio de estado en bloque ya confirmado"""
+        catalogo_habitaciones.cambiar_estados(habitacion_ids, estado, versiones.incrementar("estados_habitacion"))
+    
+    def _publicar(self, habitacion) -> None:
+        """
+        Incrementar la versión del catálogo (invalida el ETag del listado y
+        las instantáneas de los demás workers) y escribir el cambio en la
+        instantánea local
+        """
+        catalogo_habitaciones.escribir(habitacion, versiones.incrementar("habitaciones"))
 
 
 # Instancia singleton
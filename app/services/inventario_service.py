@@ -0,0 +1,257 @@
+"""
+Servicio de Inventario por Tipo
+
+Contadores (total, vendidas, bloqueadas) por tipo de habitación y noche.
+"¿Puedo vender 3 Dobles del 10 al 14?" es el mínimo de las habitaciones
+libres en cuatro filas, sin recorrer reservas ni habitaciones. Los bloqueos
+de pago vigentes no se cuentan como vendidas (se venden al confirmarlos),
+pero la consulta de disponibilidad los resta.
+
+Las reservas (alta, cancelación, check-out) y los cambios de habitaciones
+(alta, baja, activa, tipo, mantenimiento) actualizan los contadores antes
+de confirmar su propia transacción, así que ambos cambian juntos. La
+reconciliación los recalcula desde reservas y habitaciones y devuelve las
+desviaciones encontradas.
+"""
+
+import os
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.repositories.bloqueo_repository import bloqueo_repository
+from app.repositories.inventario_repository import inventario_repository
+from app.schemas.inventario_schema import (
+    DisponibilidadTipoResponse,
+    DesviacionInventario,
+    ReconciliacionInventarioResponse
+)
+from app.services.catalogo_habitaciones import catalogo_habitaciones
+
+# Noches desde hoy que revisa la reconciliación
+INVENTARIO_HORIZONTE_DIAS = int(os.getenv("INVENTARIO_HORIZONTE_DIAS", 365))
+
+
+def _bloqueada(activa: bool, estado: Optional[str]) -> bool:
+    return bool(activa) and estado == "Mantenimiento"
+
+
+def _capacidad(habitaciones: Iterable) -> tuple[int, int]:
+    """(total, bloqueadas) de un conjunto de habitaciones"""
+    total = bloqueadas = 0
+    for habitacion in habitaciones:
+        if habitacion.activa:
+            total += 1
+            bloqueadas += _bloqueada(habitacion.activa, habitacion.estado)
+    return total, bloqueadas
+
+
+class InventarioService:
+    """
+    Servicio de contadores de inventario por tipo y noche
+    """
+
+    def capacidad(self, db: Session, tipo: str) -> tuple[int, int]:
+        """(total, bloqueadas) actuales de un tipo según el catálogo"""
+        return _capacidad(catalogo_habitaciones.por_tipo(db, tipo))
+
+    def disponibles(self, db: Session, tipo: str, fecha_entrada: date, fecha_salida: date) -> int:
+        """
+        Mínimo de habitaciones libres del tipo en las noches de la estadía,
+        sin contar las retenidas por bloqueos vigentes
+        """
+        noches = (fecha_salida - fecha_entrada).days
+        libres = {
+            fila.fecha: fila.total - fila.vendidas - fila.bloqueadas
+            for fila in inventario_repository.get_rango(db, tipo, fecha_entrada, fecha_salida)
+        }
+        if len(libres) < noches:
+            # Noches sin fila: nada vendido todavía
+            total, bloqueadas = self.capacidad(db, tipo)
+            for i in range(noches):
+                libres.setdefault(fecha_entrada + timedelta(days=i), total - bloqueadas)
+
+        habitacion_ids = [
+            h.id for h in catalogo_habitaciones.por_tipo(db, tipo)
+            if h.activa and not _bloqueada(h.activa, h.estado)
+        ]
+        for entrada, salida in bloqueo_repository.vigentes(db, habitacion_ids, fecha_entrada, fecha_salida):
+            noche = max(entrada, fecha_entrada)
+            while noche < min(salida, fecha_salida):
+                libres[noche] -= 1
+                noche += timedelta(days=1)
+        return max(0, min(libres.values()))
+
+    def consultar(
+        self,
+        db: Session,
+        tipo: str,
+        fecha_entrada: date,
+        fecha_salida: date,
+        cantidad: int = 1
+    ) -> DisponibilidadTipoResponse:
+        """
+        Consultar si se pueden vender `cantidad` habitaciones del tipo
+        """
+        if fecha_entrada >= fecha_salida:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La fecha de entrada debe ser anterior a la fecha de salida"
+            )
+        if not catalogo_habitaciones.por_tipo(db, tipo):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tipo de habitación no encontrado"
+            )
+        disponibles = self.disponibles(db, tipo, fecha_entrada, fecha_salida)
+        return DisponibilidadTipoResponse(
+            tipo=tipo,
+            fecha_entrada=fecha_entrada,
+            fecha_salida=fecha_salida,
+            disponibles=disponibles,
+            solicitadas=cantidad,
+            vendible=disponibles >= cantidad
+        )
+
+    # ========== Mantenimiento de contadores (no confirman la transacción) ==========
+
+    def registrar_venta(
+        self,
+        db: Session,
+        tipo: str,
+        fecha_entrada: date,
+        fecha_salida: date,
+        cantidad: int,
+        exigir_cupo: bool = False
+    ) -> bool:
+        """
+        Sumar una venta a las noches de la estadía. Con exigir_cupo devuelve
+        False si alguna noche no tenía cupo; en ese caso hay que deshacer la
+        transacción.
+        """
+        total, bloqueadas = self.capacidad(db, tipo)
+        inventario_repository.asegurar_filas(db, tipo, fecha_entrada, fecha_salida, total, bloqueadas)
+        return inventario_repository.vender(db, tipo, fecha_entrada, fecha_salida, cantidad, exigir_cupo)
+
+    def registrar_liberacion(
+        self,
+        db: Session,
+        tipo: str,
+        fecha_entrada: date,
+        fecha_salida: date,
+        cantidad: int
+    ) -> None:
+        """
+        Devolver al inventario las noches de una estadía que aún no han
+        pasado (cancelación o salida anticipada)
+        """
+        inventario_repository.liberar(db, tipo, max(fecha_entrada, date.today()), fecha_salida, cantidad)
+
+    def preparar_cambio_habitacion(self, db: Session, anterior, nueva: Optional[dict]) -> None:
+        """
+        Ajustar total y bloqueadas de las noches futuras antes de guardar el
+        alta (anterior=None), la modificación o la baja (nueva=None) de una
+        habitación. `nueva` son los datos resultantes (tipo, activa, estado).
+        """
+        if anterior is not None and nueva is not None:
+            antes = (anterior.tipo, anterior.activa, _bloqueada(anterior.activa, anterior.estado))
+            despues = (nueva["tipo"], nueva["activa"], _bloqueada(nueva["activa"], nueva["estado"]))
+            if antes == despues:
+                return
+
+        tipos = {anterior.tipo} if anterior is not None else set()
+        if nueva is not None:
+            tipos.add(nueva["tipo"])
+        hoy = date.today()
+        for tipo in tipos:
+            total, bloqueadas = _capacidad(
+                h for h in catalogo_habitaciones.por_tipo(db, tipo)
+                if anterior is None or h.id != anterior.id
+            )
+            if nueva is not None and nueva["tipo"] == tipo and nueva["activa"]:
+                total += 1
+                bloqueadas += _bloqueada(nueva["activa"], nueva["estado"])
+            inventario_repository.fijar_capacidad(db, tipo, hoy, total, bloqueadas)
+
+    # ========== Reconciliación ==========
+
+    def reconciliar(
+        self,
+        db: Session,
+        dias: Optional[int] = None,
+        corregir: bool = True
+    ) -> ReconciliacionInventarioResponse:
+        """
+        Recalcular los contadores de las próximas noches desde reservas y
+        habitaciones, informar de las diferencias y, si se pide, corregirlas
+        """
+        dias = dias or INVENTARIO_HORIZONTE_DIAS
+        desde = date.today()
+        hasta = desde + timedelta(days=dias)
+
+        # Vendidas esperadas por tipo y noche (diferencias acumuladas)
+        cambios: dict[str, list] = defaultdict(lambda: [0] * (dias + 1))
+        for tipo, fecha_entrada, fecha_salida, cantidad in inventario_repository.ventas(db, desde, hasta):
+            if tipo is None:
+                continue
+            cambios[tipo][max(0, (fecha_entrada - desde).days)] += cantidad
+            cambios[tipo][min(dias, (fecha_salida - desde).days)] -= cantidad
+
+        catalogo = catalogo_habitaciones.instantanea(db)
+        filas = {(fila.tipo, fila.fecha): fila for fila in inventario_repository.get_desde(db, desde, hasta)}
+        tipos = set(cambios) | {tipo for tipo, _ in filas}
+
+        desviaciones = []
+        actualizar = []
+        crear = []
+        for tipo in sorted(tipos):
+            total, bloqueadas = _capacidad(catalogo.por_tipo.get(tipo, ()))
+            vendidas = 0
+            diferencias = cambios.get(tipo)
+            for dia in range(dias):
+                fecha = desde + timedelta(days=dia)
+                if diferencias is not None:
+                    vendidas += diferencias[dia]
+                fila = filas.get((tipo, fecha))
+                if fila is None:
+                    if vendidas:
+                        desviaciones.append(DesviacionInventario(
+                            tipo=tipo, fecha=fecha,
+                            total_registrado=total, total_esperado=total,
+                            vendidas_registradas=0, vendidas_esperadas=vendidas,
+                            bloqueadas_registradas=bloqueadas, bloqueadas_esperadas=bloqueadas
+                        ))
+                        crear.append({
+                            "tipo": tipo, "fecha": fecha, "total": total,
+                            "vendidas": vendidas, "bloqueadas": bloqueadas
+                        })
+                    continue
+                if (fila.total, fila.vendidas, fila.bloqueadas) != (total, vendidas, bloqueadas):
+                    desviaciones.append(DesviacionInventario(
+                        tipo=tipo, fecha=fecha,
+                        total_registrado=fila.total, total_esperado=total,
+                        vendidas_registradas=fila.vendidas, vendidas_esperadas=vendidas,
+                        bloqueadas_registradas=fila.bloqueadas, bloqueadas_esperadas=bloqueadas
+                    ))
+                    actualizar.append({
+                        "id": fila.id, "total": total,
+                        "vendidas": vendidas, "bloqueadas": bloqueadas
+                    })
+
+        if corregir and desviaciones:
+            inventario_repository.corregir(db, actualizar, crear)
+
+        return ReconciliacionInventarioResponse(
+            desde=desde,
+            hasta=hasta,
+            filas_revisadas=len(filas),
+            desviaciones=desviaciones,
+            corregidas=corregir and bool(desviaciones)
+        )
+
+
+# Instancia singleton
+inventario_service = InventarioService()
@@ -0,0 +1,322 @@
+"""
+Servicio de Lista de Espera
+
+Los clientes inscriben estadías que no encontraron libres (fechas, tipo y
+capacidad). Cuando una cancelación o una salida anticipada libera una
+habitación, el emparejador:
+
+1. calcula el hueco libre de esa habitación alrededor de las noches
+   liberadas (una consulta con sus estancias cercanas),
+2. busca las inscripciones que caben en ese hueco y usan alguna noche
+   liberada, con un rango sobre el índice (estado, fecha_entrada),
+3. las recorre por prioridad y antigüedad, quedándose con las que no se
+   pisan entre sí: reserva directamente las marcadas auto_reservar y ofrece
+   la habitación a las demás durante LISTA_ESPERA_OFERTA_HORAS, con un
+   bloqueo que la retiene hasta que la oferta se acepta o vence.
+
+Como las candidatas caben en el hueco libre, no hace falta comprobar la
+disponibilidad de cada una.
+
+Una oferta que se cancela o vence sin respuesta también libera su
+habitación: al cancelarla se empareja en el acto, y las vencidas las
+recoge una tarea periódica (reofrecer_vencidas).
+"""
+
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, List
+
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.config.database import a_utc
+from app.repositories.bloqueo_repository import bloqueo_repository
+from app.repositories.cliente_repository import cliente_repository
+from app.repositories.lista_espera_repository import lista_espera_repository
+from app.repositories.reserva_repository import reserva_repository
+from app.schemas.lista_espera_schema import ListaEsperaCreate, ListaEsperaResponse
+from app.schemas.reserva_schema import BloqueoConfirmarRequest, BloqueoCreate, ReservaCreate, ReservaResponse
+from app.services.bloqueo_service import bloqueo_service
+from app.services.catalogo_habitaciones import catalogo_habitaciones
+
+# Horas que dura una oferta antes de pasar a la siguiente inscripción
+LISTA_ESPERA_OFERTA_HORAS = int(os.getenv("LISTA_ESPERA_OFERTA_HORAS", 24))
+
+# Noches antes y después de lo liberado en que se busca el hueco libre
+LISTA_ESPERA_VENTANA_DIAS = int(os.getenv("LISTA_ESPERA_VENTANA_DIAS", 30))
+
+# Inscripciones revisadas como máximo por habitación liberada
+LISTA_ESPERA_CANDIDATAS = int(os.getenv("LISTA_ESPERA_CANDIDATAS", 100))
+
+
+class ListaEsperaService:
+    """
+    Servicio de lista de espera y emparejamiento con habitaciones liberadas
+    """
+
+    def create(self, db: Session, datos: ListaEsperaCreate) -> ListaEsperaResponse:
+        """
+        Inscribir una estadía en la lista de espera
+        """
+        if not cliente_repository.get_by_id(db, datos.cliente_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Cliente no encontrado"
+            )
+        if datos.tipo is not None and not catalogo_habitaciones.por_tipo(db, datos.tipo):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tipo de habitación no encontrado"
+            )
+        inscripcion = lista_espera_repository.create(db, datos.model_dump())
+        return ListaEsperaResponse.model_validate(inscripcion)
+
+    def get_all(
+        self,
+        db: Session,
+        estado: str = "Pendiente",
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[ListaEsperaResponse]:
+        """
+        Obtener las inscripciones en un estado, por orden de prioridad
+        """
+        inscripciones = lista_espera_repository.get_by_estado(db, estado, skip, limit)
+        return [ListaEsperaResponse.model_validate(i) for i in inscripciones]
+
+    def get_by_cliente(self, db: Session, cliente_id: int) -> List[ListaEsperaResponse]:
+        """
+        Obtener las inscripciones de un cliente
+        """
+        inscripciones = lista_espera_repository.get_by_cliente(db, cliente_id)
+        return [ListaEsperaResponse.model_validate(i) for i in inscripciones]
+
+    def cancelar(self, db: Session, lista_espera_id: int) -> None:
+        """
+        Retirar una inscripción de la lista de espera (y soltar la habitación
+        que tuviera ofrecida)
+        """
+        inscripcion = self._obtener(db, lista_espera_id)
+        if inscripcion.estado not in ("Pendiente", "Ofrecida"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"No se puede cancelar una inscripción en estado {inscripcion.estado}"
+            )
+        ofrecida = inscripcion.estado == "Ofrecida"
+        habitacion_id = inscripcion.habitacion_id
+        fecha_entrada, fecha_salida = inscripcion.fecha_entrada, inscripcion.fecha_salida
+        bloqueo = self._bloqueo_oferta(db, inscripcion)
+        if bloqueo is not None:
+            bloqueo_repository.eliminar(db, bloqueo)
+        lista_espera_repository.marcar(db, lista_espera_id, {"estado": "Cancelada", "bloqueo_token": None})
+
+        # La habitación ofrecida queda libre: pasar a la siguiente inscripción
+        if ofrecida and habitacion_id is not None:
+            self.procesar_liberacion(db, [habitacion_id], fecha_entrada, fecha_salida)
+
+    def reofrecer_vencidas(self, db: Session) -> List[ListaEsperaResponse]:
+        """
+        Devolver a Pendiente las ofertas vencidas sin respuesta y ofrecer su
+        habitación a la siguiente inscripción (tarea periódica). La
+        inscripción vencida sigue en la lista, pero en esta pasada no recibe
+        otra vez la misma habitación. Devuelve las inscripciones ofrecidas o
+        reservadas.
+        """
+        resultados = []
+        vencidas = lista_espera_repository.ofertas_vencidas(db, datetime.now(timezone.utc), LISTA_ESPERA_CANDIDATAS)
+        for lista_espera_id, habitacion_id, fecha_entrada, fecha_salida, bloqueo_token in vencidas:
+            if bloqueo_token is not None:
+                bloqueo = bloqueo_repository.get_by_token(db, bloqueo_token)
+                if bloqueo is not None:
+                    bloqueo_repository.eliminar(db, bloqueo)
+            lista_espera_repository.marcar(db, lista_espera_id, {
+                "estado": "Pendiente",
+                "oferta_expira": None,
+                "bloqueo_token": None
+            })
+            if habitacion_id is not None:
+                resultados += self.procesar_liberacion(
+                    db, [habitacion_id], fecha_entrada, fecha_salida, excluir=[lista_espera_id]
+                )
+        return resultados
+
+    def aceptar(self, db: Session, lista_espera_id: int) -> ReservaResponse:
+        """
+        Aceptar la oferta de una inscripción: confirma el bloqueo que retiene
+        la habitación ofrecida (o la reserva si sigue libre, en ofertas sin
+        bloqueo)
+        """
+        inscripcion = self._obtener(db, lista_espera_id)
+        if inscripcion.estado != "Ofrecida":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La inscripción no tiene una oferta pendiente"
+            )
+        if inscripcion.oferta_expira and a_utc(inscripcion.oferta_expira) < datetime.now(timezone.utc):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La oferta ha vencido"
+            )
+        if self._bloqueo_oferta(db, inscripcion) is not None:
+            # Importación diferida: ReservaService avisa a este servicio al liberar
+            from app.services.reserva_service import reserva_service
+            reserva = reserva_service.confirmar_bloqueo(db, inscripcion.bloqueo_token, BloqueoConfirmarRequest(
+                cliente_id=inscripcion.cliente_id,
+                observaciones=f"Lista de espera #{inscripcion.id}"
+            ))
+        else:
+            reserva = self._reservar(db, inscripcion, inscripcion.habitacion_id)
+        lista_espera_repository.marcar(db, lista_espera_id, {
+            "estado": "Reservada",
+            "reserva_id": reserva.id,
+            "bloqueo_token": None
+        })
+        return reserva
+
+    def procesar_liberacion(
+        self,
+        db: Session,
+        habitacion_ids: List[int],
+        fecha_entrada: date,
+        fecha_salida: date,
+        excluir: Iterable[int] = ()
+    ) -> List[ListaEsperaResponse]:
+        """
+        Emparejar la lista de espera con las noches [fecha_entrada,
+        fecha_salida) que quedaron libres en unas habitaciones, sin contar
+        las inscripciones de `excluir`. Devuelve las inscripciones ofrecidas
+        o reservadas.
+        """
+        desde = max(fecha_entrada, date.today())
+        if desde >= fecha_salida:
+            return []
+
+        ahora = datetime.now(timezone.utc)
+        usadas: set[int] = set(excluir)
+        resultados = []
+
+        # Habitaciones del mismo tipo y capacidad con el mismo hueco (la
+        # salida anticipada de un grupo, por ejemplo) comparten la consulta
+        # de candidatas
+        inicio = max(date.today(), desde - timedelta(days=LISTA_ESPERA_VENTANA_DIAS))
+        fin = fecha_salida + timedelta(days=LISTA_ESPERA_VENTANA_DIAS)
+        intervalos = reserva_repository.intervalos_habitaciones(db, habitacion_ids, inicio, fin)
+        por_hueco: dict[tuple, list[int]] = {}
+        for habitacion_id in habitacion_ids:
+            habitacion = catalogo_habitaciones.obtener(db, habitacion_id)
+            if habitacion is None or not habitacion.activa:
+                continue
+            for hueco in self._huecos(intervalos[habitacion_id], inicio, fin, desde, fecha_salida):
+                por_hueco.setdefault((habitacion.tipo, habitacion.capacidad) + hueco, []).append(habitacion_id)
+
+        for (tipo, capacidad, libre_desde, libre_hasta), habitaciones in por_hueco.items():
+            candidatas = lista_espera_repository.candidatas(
+                db,
+                tipo,
+                capacidad,
+                libre_desde,
+                libre_hasta,
+                desde,
+                fecha_salida,
+                ahora,
+                LISTA_ESPERA_CANDIDATAS * len(habitaciones)
+            )
+            # Las fechas se leen antes de que los commits de _asignar expiren
+            # las inscripciones
+            candidatas = [(c.id, c.fecha_entrada, c.fecha_salida, c) for c in candidatas]
+            for habitacion_id in habitaciones:
+                tomadas: list[tuple] = []
+                for inscripcion_id, entrada_candidata, salida_candidata, inscripcion in candidatas:
+                    if inscripcion_id in usadas or any(
+                        entrada_candidata < salida and salida_candidata > entrada
+                        for entrada, salida in tomadas
+                    ):
+                        continue
+                    if not self._asignar(db, inscripcion, habitacion_id):
+                        continue
+                    usadas.add(inscripcion_id)
+                    tomadas.append((entrada_candidata, salida_candidata))
+                    resultados.append(ListaEsperaResponse.model_validate(self._obtener(db, inscripcion_id)))
+        return resultados
+
+    def _huecos(self, intervalos: List[tuple], inicio: date, fin: date, desde: date, hasta: date) -> List[tuple]:
+        """
+        Huecos libres de una habitación dentro de [inicio, fin), dadas sus
+        estancias en orden de entrada, que tocan las noches liberadas
+        [desde, hasta)
+        """
+        huecos = []
+        cursor = inicio
+        for entrada, salida in intervalos:
+            if entrada > cursor:
+                huecos.append((cursor, entrada))
+            cursor = max(cursor, salida)
+        if cursor < fin:
+            huecos.append((cursor, fin))
+        return [(a, b) for a, b in huecos if a < hasta and b > desde]
+
+    def _asignar(self, db: Session, inscripcion, habitacion_id: int) -> bool:
+        """
+        Reservar u ofrecer la habitación a una inscripción. La oferta bloquea
+        la habitación durante LISTA_ESPERA_OFERTA_HORAS para que nadie más
+        la reserve mientras el cliente decide.
+        """
+        if inscripcion.auto_reservar:
+            try:
+                reserva = self._reservar(db, inscripcion, habitacion_id)
+            except HTTPException:
+                db.rollback()
+                return False
+            lista_espera_repository.marcar(db, inscripcion.id, {
+                "estado": "Reservada",
+                "habitacion_id": habitacion_id,
+                "reserva_id": reserva.id
+            })
+            return True
+        try:
+            bloqueo = bloqueo_service.create(db, BloqueoCreate(
+                habitacion_id=habitacion_id,
+                fecha_entrada=inscripcion.fecha_entrada,
+                fecha_salida=inscripcion.fecha_salida,
+                cliente_id=inscripcion.cliente_id
+            ), ttl_segundos=LISTA_ESPERA_OFERTA_HORAS * 3600)
+        except HTTPException:
+            db.rollback()
+            return False
+        lista_espera_repository.marcar(db, inscripcion.id, {
+            "estado": "Ofrecida",
+            "habitacion_id": habitacion_id,
+            "oferta_expira": bloqueo.expira,
+            "bloqueo_token": bloqueo.token
+        })
+        return True
+
+    def _reservar(self, db: Session, inscripcion, habitacion_id: int) -> ReservaResponse:
+        # Importación diferida: ReservaService avisa a este servicio al liberar
+        from app.services.reserva_service import reserva_service
+        return reserva_service.create(db, ReservaCreate(
+            cliente_id=inscripcion.cliente_id,
+            habitacion_id=habitacion_id,
+            fecha_entrada=inscripcion.fecha_entrada,
+            fecha_salida=inscripcion.fecha_salida,
+            observaciones=f"Lista de espera #{inscripcion.id}"
+        ))
+
+    def _bloqueo_oferta(self, db: Session, inscripcion):
+        """Bloqueo que retiene la habitación ofrecida, si existe"""
+        if inscripcion.bloqueo_token is None:
+            return None
+        return bloqueo_repository.get_by_token(db, inscripcion.bloqueo_token)
+
+    def _obtener(self, db: Session, lista_espera_id: int):
+        inscripcion = lista_espera_repository.get_by_id(db, lista_espera_id)
+        if not inscripcion:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Inscripción no encontrada"
+            )
+        return inscripcion
+
+
+# Instancia singleton
+lista_espera_service = ListaEsperaService()
@@ -0,0 +1,121 @@
+"""
+Paginación por clave compartida por los servicios
+"""
+
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter
+
+from app.repositories.base_repository import codificar_cursor, decodificar_cursor
+from app.schemas.common import Pagina
+
+# Validadores de filas por (esquema, campos), construidos una sola vez
+_adaptadores: dict = {}
+
+
+def _ultimo_id(cursor: Optional[str]) -> Optional[int]:
+    if not cursor:
+        return None
+    try:
+        return decodificar_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def campos_proyeccion(esquema, fields: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Campos pedidos en el parámetro fields (separados por comas), en el orden
+    del esquema; sin fields, todos los del esquema
+    """
+    if not fields:
+        return tuple(esquema.model_fields)
+    pedidos = {campo.strip() for campo in fields.split(",") if campo.strip()}
+    desconocidos = sorted(pedidos - esquema.model_fields.keys())
+    if desconocidos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos no disponibles: {', '.join(desconocidos)}"
+        )
+    return tuple(campo for campo in esquema.model_fields if campo in pedidos)
+
+
+def _adaptador(esquema, campos: Tuple[str, ...]) -> TypeAdapter:
+    clave = (esquema, campos)
+    adaptador = _adaptadores.get(clave)
+    if adaptador is None:
+        tipos = tuple(esquema.model_fields[campo].annotation for campo in campos)
+        adaptador = TypeAdapter(List[Tuple[tipos]])
+        _adaptadores[clave] = adaptador
+    return adaptador
+
+
+def serializar_filas(esquema, campos: Tuple[str, ...], filas) -> List[dict]:
+    """
+    Validar filas de columnas con los tipos del esquema en una sola llamada
+    al validador, sin construir objetos ORM ni modelos Pydantic por fila.
+    Las filas pueden traer columnas extra al final (p. ej. el id del cursor).
+    """
+    n = len(campos)
+    valores = _adaptador(esquema, campos).validate_python([tuple(fila)[:n] for fila in filas])
+    return [dict(zip(campos, fila)) for fila in valores]
+
+
+def _columnas(campos: Tuple[str, ...]) -> Tuple[str, ...]:
+    # El id siempre se selecciona: el cursor de la página siguiente lo necesita
+    return campos if "id" in campos else campos + ("id",)
+
+
+def paginar(
+    repositorio,
+    db,
+    esquema,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    filtros: tuple = (),
+    clave: str = "",
+    fields: Optional[str] = None
+) -> Pagina:
+    """
+    Obtener una página del repositorio con su total real y el cursor opaco
+    de la página siguiente. Solo se seleccionan las columnas de los campos
+    pedidos, así las columnas de texto largo no viajan si no se piden.
+    """
+    campos = campos_proyeccion(esquema, fields)
+    filas, siguiente = repositorio.get_pagina(
+        db, limit, _ultimo_id(cursor), skip, filtros, _columnas(campos)
+    )
+    return Pagina(
+        items=serializar_filas(esquema, campos, filas),
+        total=repositorio.count_total(db, filtros, clave),
+        next_cursor=codificar_cursor(siguiente) if siguiente is not None else None
+    )
+
+
+async def paginar_async(
+    repositorio,
+    db,
+    esquema,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    filtros: tuple = (),
+    clave: str = "",
+    fields: Optional[str] = None
+) -> Pagina:
+    """
+    Variante de paginar para repositorios asíncronos
+    """
+    campos = campos_proyeccion(esquema, fields)
+    filas, siguiente = await repositorio.get_pagina(
+        db, limit, _ultimo_id(cursor), skip, filtros, _columnas(campos)
+    )
+    return Pagina(
+        items=serializar_filas(esquema, campos, filas),
+        total=await repositorio.count_total(db, filtros, clave),
+        next_cursor=codificar_cursor(siguiente) if siguiente is not None else None
+    )
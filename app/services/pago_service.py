@@ -3,13 +3,17 @@ Servicio de Pagos
 """
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from typing import List
+from typing import List, Optional
 from decimal import Decimal
 
-from app.repositories.pago_repository import pago_repository
+from app.repositories.pago_repository import pago_repository, async_pago_repository
 from app.repositories.factura_repository import factura_repository
 from app.schemas.pago_schema import PagoCreate, PagoResponse
+from app.schemas.common import Pagina
+from app.services.cliente_service import cliente_service
+from app.services.paginacion import paginar, paginar_async
 
 
 class PagoService:
@@ -39,16 +43,23 @@ class PagoService:
                 detail=f"El monto excede el saldo pendiente de {total_pendiente}"
             )
         
-        # Crear pago
+        # Crear pago (el cliente se lee antes de que el commit expire la factura)
+        cliente_id = factura.reserva.cliente_id
         pago = pago_repository.create(db, pago_data.model_dump())
+        cliente_service.invalidar_perfil(cliente_id)
         return PagoResponse.model_validate(pago)
     
-    def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[PagoResponse]:
+    def get_all(self, db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None) -> Pagina[PagoResponse]:
         """
         Obtener todos los pagos
         """
-        pagos = pago_repository.get_all(db, skip, limit)
-        return [PagoResponse.model_validate(p) for p in pagos]
+        return paginar(pago_repository, db, PagoResponse, limit, cursor, skip, fields=fields)
+    
+    async def get_all_async(self, db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None) -> Pagina[PagoResponse]:
+        """
+        Obtener todos los pagos (sesión asíncrona)
+        """
+        return await paginar_async(async_pago_repository, db, PagoResponse, limit, cursor, skip, fields=fields)
     
     def get_by_id(self, db: Session, pago_id: int) -> PagoResponse:
         """
@@ -0,0 +1,331 @@
+"""
+Programador de tareas periódicas
+
+Ejecuta dentro del proceso de la API las tareas registradas con una
+expresión cron de cinco campos (minuto hora día mes día_semana, en hora
+local). Solo arranca con PROGRAMADOR_HABILITADO=true. Con varios workers solo uno ejecuta: el que tiene el arriendo de la
+fila "programador" en arriendos_programador. Cada worker intenta tomarlo o
+renovarlo cada PROGRAMADOR_INTERVALO_SEGUNDOS con un UPDATE condicional; si
+el líder muere, otro lo toma cuando vence (PROGRAMADOR_ARRIENDO_SEGUNDOS).
+
+Las tareas corren en un ThreadPoolExecutor propio de PROGRAMADOR_HILOS
+hilos, nunca en el threadpool que atiende las peticiones, y una tarea no se
+lanza otra vez mientras sigue en curso. Cada ejecución queda en
+ejecuciones_tareas (se crea al empezar, para que un líder nuevo no repita
+la que está en marcha) y en las métricas de /metrics.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.config.database import SessionLocal, _env_bool
+from app.config.metricas import _etiquetas
+from app.repositories.programador_repository import programador_repository
+
+logger = logging.getLogger(__name__)
+
+# Arrancar el programador con la aplicación. Desactivado por defecto: se
+# activa solo en los workers de producción, para que pruebas, benchmarks y
+# scripts que importan la aplicación no lancen tareas sobre sus datos
+PROGRAMADOR_HABILITADO = _env_bool("PROGRAMADOR_HABILITADO", False)
+
+# Hilos del ejecutor de tareas (independiente del de las peticiones)
+PROGRAMADOR_HILOS = int(os.getenv("PROGRAMADOR_HILOS", 2))
+
+# Cada cuánto se renueva el arriendo y se revisan las tareas pendientes
+PROGRAMADOR_INTERVALO_SEGUNDOS = float(os.getenv("PROGRAMADOR_INTERVALO_SEGUNDOS", 15))
+
+# Vida del arriendo: tiempo sin renovar tras el que otro worker toma el mando
+PROGRAMADOR_ARRIENDO_SEGUNDOS = int(os.getenv("PROGRAMADOR_ARRIENDO_SEGUNDOS", 60))
+
+# Nombre de la fila de arriendo compartida por todos los workers
+ARRIENDO = "programador"
+
+
+def _parsear_campo(texto: str, minimo: int, maximo: int) -> frozenset:
+    """Valores de un campo cron: *, n, a-b, listas con comas y pasos /n"""
+    valores = set()
+    for parte in texto.split(","):
+        rango, _, paso = parte.partition("/")
+        paso = int(paso) if paso else 1
+        if rango == "*":
+            inicio, fin = minimo, maximo
+        elif "-" in rango:
+            inicio, fin = (int(v) for v in rango.split("-", 1))
+        else:
+            inicio = int(rango)
+            fin = maximo if paso != 1 else inicio
+        if paso <= 0 or inicio < minimo or fin > maximo or inicio > fin:
+            raise ValueError(f"Campo cron fuera de rango: {texto}")
+        valores.update(range(inicio, fin + 1, paso))
+    return frozenset(valores)
+
+
+class Cron:
+    """
+    Expresión cron de cinco campos. Como en cron, si se restringen el día
+    del mes y el de la semana basta con que coincida uno de los dos; el
+    domingo es 0 (o 7).
+    """
+
+    def __init__(self, expresion: str):
+        campos = expresion.split()
+        if len(campos) != 5:
+            raise ValueError(f"La expresión cron debe tener cinco campos: {expresion}")
+        self.expresion = expresion
+        self.minutos = _parsear_campo(campos[0], 0, 59)
+        self.horas = _parsear_campo(campos[1], 0, 23)
+        self.dias = _parsear_campo(campos[2], 1, 31)
+        self.meses = _parsear_campo(campos[3], 1, 12)
+        self.dias_semana = frozenset(d % 7 for d in _parsear_campo(campos[4], 0, 7))
+        self._dia_libre = campos[2].startswith("*")
+        self._semana_libre = campos[4].startswith("*")
+
+    def _dia_coincide(self, dia: date) -> bool:
+        del_mes = dia.day in self.dias
+        de_la_semana = (dia.weekday() + 1) % 7 in self.dias_semana
+        if self._dia_libre or self._semana_libre:
+            return del_mes and de_la_semana
+        return del_mes or de_la_semana
+
+    def siguiente(self, desde: datetime) -> datetime:
+        """Primer minuto que coincide estrictamente después de `desde`"""
+        momento = desde.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limite = momento + timedelta(days=366 * 5)
+        while momento < limite:
+            if momento.month not in self.meses:
+                momento = (momento.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._dia_coincide(momento.date()):
+                momento = momento.replace(hour=0, minute=0) + timedelta(days=1)
+            elif momento.hour not in self.horas:
+                momento = momento.replace(minute=0) + timedelta(hours=1)
+            elif momento.minute not in self.minutos:
+                momento += timedelta(minutes=1)
+            else:
+                return momento
+        raise ValueError(f"La expresión cron no coincide con ninguna fecha: {self.expresion}")
+
+
+@dataclass
+class Tarea:
+    """Tarea registrada y su próxima ejecución (hora local)"""
+    nombre: str
+    cron: Cron
+    funcion: Callable[[Session], object]
+    descripcion: str = ""
+    proxima: Optional[datetime] = None
+    en_curso: bool = False
+
+
+def _a_local(momento: datetime) -> datetime:
+    """Hora local sin zona de un instante guardado (UTC si llega sin zona)"""
+    if momento.tzinfo is None:
+        momento = momento.replace(tzinfo=timezone.utc)
+    return momento.astimezone().replace(tzinfo=None)
+
+
+class Programador:
+    """
+    Programador de tareas del proceso
+    """
+
+    def __init__(self):
+        self.titular = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lider = False
+        self._tareas: dict[str, Tarea] = {}
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+        self._ejecutor: Optional[ThreadPoolExecutor] = None
+        # tarea -> {"Completada": n, "Error": n, "duracion": s, "ultima_ok": epoch}
+        self._metricas: dict[str, dict] = {}
+
+    def registrar(self, nombre: str, expresion: str, funcion: Callable[[Session], object], descripcion: str = "") -> None:
+        """Registrar una tarea: `funcion` recibe una sesión propia de la ejecución"""
+        self._tareas[nombre] = Tarea(nombre, Cron(expresion), funcion, descripcion)
+
+    # ========== Ciclo de vida ==========
+
+    def iniciar(self) -> None:
+        """Arrancar el hilo del programador (evento startup)"""
+        if self._hilo is not None:
+            return
+        self._parar.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="programador", daemon=True)
+        self._hilo.start()
+
+    def detener(self) -> None:
+        """Parar el hilo, el ejecutor y ceder el arriendo (evento shutdown)"""
+        if self._hilo is None:
+            return
+        self._parar.set()
+        self._hilo.join(timeout=PROGRAMADOR_INTERVALO_SEGUNDOS)
+        self._hilo = None
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(wait=False, cancel_futures=True)
+            self._ejecutor = None
+        if self.lider:
+            db = SessionLocal()
+            try:
+                programador_repository.soltar_arriendo(db, ARRIENDO, self.titular, datetime.now(timezone.utc))
+            finally:
+                db.close()
+            self.lider = False
+
+    def _bucle(self) -> None:
+        while not self._parar.is_set():
+            try:
+                self._revisar(datetime.now())
+            except Exception:
+                logger.exception("Error en el ciclo del programador de tareas")
+            self._parar.wait(PROGRAMADOR_INTERVALO_SEGUNDOS)
+
+    def _revisar(self, ahora: datetime) -> None:
+        """Renovar el arriendo y, si este worker es el líder, lanzar las tareas vencidas"""
+        db = SessionLocal()
+        try:
+            lider = programador_repository.adquirir_arriendo(
+                db, ARRIENDO, self.titular, datetime.now(timezone.utc),
+                timedelta(seconds=PROGRAMADOR_ARRIENDO_SEGUNDOS)
+            )
+            if lider and not self.lider:
+                # Recién elegido: las próximas ejecuciones salen del historial,
+                # para no repetir lo que acaba de lanzar el líder anterior
+                for tarea in self._tareas.values():
+                    tarea.proxima = None
+            self.lider = lider
+            if not lider:
+                return
+
+            for tarea in self._tareas.values():
+                if tarea.proxima is None:
+                    ultimo = programador_repository.ultimo_inicio(db, tarea.nombre)
+                    tarea.proxima = tarea.cron.siguiente(_a_local(ultimo) if ultimo else ahora)
+                if tarea.proxima <= ahora and not tarea.en_curso:
+                    tarea.proxima = tarea.cron.siguiente(ahora)
+                    self._lanzar(tarea)
+        finally:
+            db.close()
+
+    # ========== Ejecución ==========
+
+    def _lanzar(self, tarea: Tarea) -> None:
+        with self._lock:
+            if tarea.en_curso:
+                return
+            tarea.en_curso = True
+            if self._ejecutor is None:
+                self._ejecutor = ThreadPoolExecutor(max_workers=PROGRAMADOR_HILOS, thread_name_prefix="programador")
+            self._ejecutor.submit(self._ejecutar, tarea)
+
+    def _ejecutar(self, tarea: Tarea) -> None:
+        inicio = time.perf_counter()
+        db = SessionLocal()
+        try:
+            ejecucion = programador_repository.iniciar_ejecucion(
+                db, tarea.nombre, self.titular, datetime.now(timezone.utc)
+            )
+            estado, error = "Completada", None
+            try:
+                tarea.funcion(db)
+            except Exception as exc:
+                db.rollback()
+                estado, error = "Error", f"{type(exc).__name__}: {getattr(exc, 'detail', exc)}"
+            duracion = time.perf_counter() - inicio
+            programador_repository.terminar_ejecucion(
+                db, ejecucion.id, datetime.now(timezone.utc), duracion, estado, error
+            )
+            self._registrar_metrica(tarea.nombre, estado, duracion)
+        except Exception:
+            logger.exception("No se pudo registrar la ejecución de la tarea %s", tarea.nombre)
+        finally:
+            db.close()
+            tarea.en_curso = False
+
+    def ejecutar_ahora(self, nombre: str) -> None:
+        """
+        Lanzar una tarea fuera de su horario (en este worker, sea o no el líder)
+        """
+        tarea = self._tareas.get(nombre)
+        if tarea is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tarea no encontrada"
+            )
+        if tarea.en_curso:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="La tarea ya se está ejecutando"
+            )
+        self._lanzar(tarea)
+
+    # ========== Estado y métricas ==========
+
+    def estado(self) -> dict:
+        """Liderazgo y tareas registradas con su próxima ejecución"""
+        return {
+            "habilitado": self._hilo is not None,
+            "titular": self.titular,
+            "lider": self.lider,
+            "tareas": [
+                {
+                    "nombre": tarea.nombre,
+                    "cron": tarea.cron.expresion,
+                    "descripcion": tarea.descripcion,
+                    "proxima": tarea.proxima.isoformat() if tarea.proxima else None,
+                    "en_curso": tarea.en_curso
+                }
+                for tarea in self._tareas.values()
+            ]
+        }
+
+    def _registrar_metrica(self, nombre: str, estado: str, duracion: float) -> None:
+        with self._lock:
+            datos = self._metricas.setdefault(nombre, {"Completada": 0, "Error": 0, "duracion": 0.0, "ultima_ok": 0.0})
+            datos[estado] += 1
+            datos["duracion"] += duracion
+            if estado == "Completada":
+                datos["ultima_ok"] = time.time()
+
+    def exportar_prometheus(self) -> str:
+        """Métricas del programador en formato de texto de Prometheus"""
+        with self._lock:
+            metricas = {nombre: dict(datos) for nombre, datos in self._metricas.items()}
+        lineas = [
+            "# HELP scheduler_leader 1 si este worker tiene el arriendo del programador",
+            "# TYPE scheduler_leader gauge",
+            f"scheduler_leader{_etiquetas(worker=self.titular)} {int(self.lider)}",
+            "# HELP scheduler_job_runs_total Ejecuciones de tareas programadas por estado",
+            "# TYPE scheduler_job_runs_total counter"
+        ]
+        for nombre, datos in sorted(metricas.items()):
+            for estado in ("Completada", "Error"):
+                lineas.append(f"scheduler_job_runs_total{_etiquetas(job=nombre, status=estado)} {datos[estado]}")
+        lineas += [
+            "# HELP scheduler_job_duration_seconds_total Tiempo total de ejecución por tarea",
+            "# TYPE scheduler_job_duration_seconds_total counter"
+        ]
+        for nombre, datos in sorted(metricas.items()):
+            lineas.append(f"scheduler_job_duration_seconds_total{_etiquetas(job=nombre)} {datos['duracion']}")
+        lineas += [
+            "# HELP scheduler_job_last_success_timestamp_seconds Última ejecución correcta por tarea",
+            "# TYPE scheduler_job_last_success_timestamp_seconds gauge"
+        ]
+        for nombre, datos in sorted(metricas.items()):
+            lineas.append(f"scheduler_job_last_success_timestamp_seconds{_etiquetas(job=nombre)} {datos['ultima_ok']}")
+        return "\n".join(lineas) + "\n"
+
+
+# Instancia singleton
+programador = Programador()
@@ -2,7 +2,7 @@
 Servicio de Reportes
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 from sqlalchemy import func, and_
 from typing import List, Optional, Dict, Any
 from datetime import date, datetime, timedelta
@@ -186,7 +186,10 @@ class ReporteService:
         Libro diario contable
         """
         # Obtener transacciones del periodo
-        transacciones = db.query(Transaccion).join(CuentaContable).filter(
+        transacciones = db.query(Transaccion).join(CuentaContable).options(
+            # La cuenta llega en el mismo JOIN, sin una consulta por fila
+            contains_eager(Transaccion.cuenta)
+        ).filter(
             and_(
                 func.date(Transaccion.fecha_transaccion) >= fecha_desde,
                 func.date(Transaccion.fecha_transaccion) <= fecha_hasta
@@ -230,22 +233,15 @@ class ReporteService:
         """
         Reporte de estado de habitaciones
         """
-        # Habitaciones por estado
-        disponibles = db.query(func.count(Habitacion.id)).filter(
-            Habitacion.estado == "Disponible"
-        ).scalar()
-        
-        ocupadas = db.query(func.count(Habitacion.id)).filter(
-            Habitacion.estado == "Ocupada"
-        ).scalar()
-        
-        reservadas = db.query(func.count(Habitacion.id)).filter(
-            Habitacion.estado == "Reservada"
-        ).scalar()
-        
-        mantenimiento = db.query(func.count(Habitacion.id)).filter(
-            Habitacion.estado == "Mantenimiento"
-        ).scalar()
+        # Habitaciones por estado, en una sola consulta agrupada
+        por_estado = dict(db.query(
+            Habitacion.estado,
+            func.count(Habitacion.id)
+        ).group_by(Habitacion.estado).all())
+        disponibles = por_estado.get("Disponible", 0)
+        ocupadas = por_estado.get("Ocupada", 0)
+        reservadas = por_estado.get("Reservada", 0)
+        mantenimiento = por_estado.get("Mantenimiento", 0)
         
         # Habitaciones por tipo
         habitaciones_tipo = db.query(
@@ -3,16 +3,36 @@ Servicio de Reservas (Lógica de Negocio Principal)
 """
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from typing import List
-from datetime import date, datetime
+from typing import List, Optional
+from datetime import date, datetime, timezone
 from decimal import Decimal
 
-from app.repositories.reserva_repository import reserva_repository
-from app.repositories.habitacion_repository import habitacion_repository
+from app.config.database import a_utc
+from app.repositories.reserva_repository import ESTADOS_OCUPAN, reserva_repository, async_reserva_repository
 from app.repositories.cliente_repository import cliente_repository
 from app.repositories.factura_repository import factura_repository
-from app.schemas.reserva_schema import ReservaCreate, ReservaUpdate, ReservaResponse
+from app.repositories.asignacion_repository import asignacion_repository
+from app.repositories.bloqueo_repository import bloqueo_repository
+from app.repositories.habitacion_repository import habitacion_repository
+from app.schemas.reserva_schema import (
+    ReservaCreate,
+    ReservaUpdate,
+    ReservaResponse,
+    AsignacionResponse,
+    ReoptimizacionTipoResponse,
+    BloqueoConfirmarRequest
+)
+from app.schemas.common import Pagina
+from app.services.cliente_service import cliente_service
+from app.services.habitacion_service import habitacion_service
+from app.services.catalogo_habitaciones import catalogo_habitaciones
+from app.services.paginacion import paginar, paginar_async
+from app.services.tarifa_service import tarifa_service
+from app.services.asignacion_habitaciones import asignacion_habitaciones
+from app.services.inventario_service import inventario_service
+from app.services.lista_espera_service import lista_espera_service
 
 
 class ReservaService:
@@ -32,55 +52,243 @@ class ReservaService:
                 detail="Cliente no encontrado"
             )
         
+        # Reserva por tipo: el motor elige las habitaciones
+        if reserva_data.tipo is not None:
+            return self._create_por_tipo(db, reserva_data)
+        
         # Validar que la habitación existe
-        habitacion = habitacion_repository.get_by_id(db, reserva_data.habitacion_id)
+        habitacion = catalogo_habitaciones.obtener(db, reserva_data.habitacion_id)
+        if not habitacion:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Habitación no encontrada"
+            )
+        
+        # Calcular precio total según el calendario de tarifas
+        precio_total = tarifa_service.precio_estadia(
+            db, reserva_data.habitacion_id, reserva_data.fecha_entrada, reserva_data.fecha_salida
+        )
+        
+        return self._create_en_habitacion(db, reserva_data.model_dump(), habitacion, precio_total)
+    
+    def confirmar_bloqueo(self, db: Session, token: str, datos: BloqueoConfirmarRequest) -> ReservaResponse:
+        """
+        Convertir un bloqueo en reserva: el bloqueo se borra, la venta se
+        registra en el inventario y la reserva se crea en una sola
+        transacción. Confirmado a tiempo se cobra el precio cotizado; si ya
+        venció, se confirma igualmente si la habitación sigue libre, al
+        precio actual.
+        """
+        bloqueo = bloqueo_repository.get_by_token(db, token, bloquear=True)
+        if not bloqueo:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Bloqueo no encontrado"
+            )
+        
+        cliente_id = datos.cliente_id if datos.cliente_id is not None else bloqueo.cliente_id
+        if cliente_id is None or not cliente_repository.get_by_id(db, cliente_id):
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Cliente no encontrado"
+            )
+        habitacion = catalogo_habitaciones.obtener(db, bloqueo.habitacion_id)
         if not habitacion:
+            db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Habitación no encontrada"
             )
         
-        # Verificar disponibilidad
+        if a_utc(bloqueo.expira) > datetime.now(timezone.utc):
+            precio_total = bloqueo.precio_total
+        else:
+            precio_total = tarifa_service.precio_estadia(
+                db, bloqueo.habitacion_id, bloqueo.fecha_entrada, bloqueo.fecha_salida
+            )
+        
+        reserva_dict = {
+            "cliente_id": cliente_id,
+            "habitacion_id": bloqueo.habitacion_id,
+            "fecha_entrada": bloqueo.fecha_entrada,
+            "fecha_salida": bloqueo.fecha_salida,
+            "observaciones": datos.observaciones
+        }
+        return self._create_en_habitacion(db, reserva_dict, habitacion, precio_total, bloqueo)
+    
+    def _create_en_habitacion(self, db: Session, reserva_dict: dict, habitacion, precio_total: float, bloqueo=None) -> ReservaResponse:
+        """
+        Crear una reserva con habitación fija. La fila de la habitación queda
+        tomada hasta el commit, para no venderla dos veces a la vez que otra
+        reserva o un bloqueo; si la reserva viene de un bloqueo, este se borra
+        en la misma transacción.
+        """
+        habitacion_repository.bloquear_fila(db, habitacion.id)
+        
+        # Verificar disponibilidad (sin contar el bloqueo que se confirma)
         disponible = reserva_repository.verificar_disponibilidad(
             db,
-            reserva_data.habitacion_id,
-            reserva_data.fecha_entrada,
-            reserva_data.fecha_salida
+            habitacion.id,
+            reserva_dict["fecha_entrada"],
+            reserva_dict["fecha_salida"],
+            bloqueo_token=bloqueo.token if bloqueo is not None else None
         )
         
         if not disponible:
+            db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="La habitación no está disponible para las fechas seleccionadas"
             )
         
-        # Calcular precio total
-        num_noches = (reserva_data.fecha_salida - reserva_data.fecha_entrada).days
-        precio_total = habitacion.precio_noche * num_noches
-        
-        # Crear reserva
-        reserva_dict = reserva_data.model_dump()
+        # Crear reserva (los contadores de inventario se confirman con ella)
         reserva_dict["precio_total"] = precio_total
         reserva_dict["estado"] = "Confirmada"  # Estado inicial
         
+        inventario_service.registrar_venta(
+            db, habitacion.tipo, reserva_dict["fecha_entrada"], reserva_dict["fecha_salida"], 1
+        )
+        if bloqueo is not None:
+            bloqueo_repository.eliminar(db, bloqueo)
         reserva = reserva_repository.create(db, reserva_dict)
         
         # Actualizar estado de habitación
-        habitacion_repository.update(db, habitacion.id, {"estado": "Reservada"})
+        habitacion_service.cambiar_estado(db, habitacion.id, "Reservada")
+        cliente_service.invalidar_perfil(reserva.cliente_id)
         
         return ReservaResponse.model_validate(reserva)
     
+    def _create_por_tipo(self, db: Session, reserva_data: ReservaCreate) -> ReservaResponse:
+        """
+        Crear una reserva por tipo: el motor de asignación elige las
+        habitaciones (moviendo otras reservas por tipo si hace falta) y el
+        precio es la suma de las tarifas de las habitaciones asignadas
+        """
+        habitaciones = [h for h in catalogo_habitaciones.por_tipo(db, reserva_data.tipo) if h.activa]
+        if not habitaciones:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tipo de habitación no encontrado"
+            )
+        
+        # Comprobación rápida sobre los contadores antes de planificar
+        if inventario_service.disponibles(
+            db, reserva_data.tipo, reserva_data.fecha_entrada, reserva_data.fecha_salida
+        ) < reserva_data.cantidad:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"No hay {reserva_data.cantidad} habitaciones de tipo {reserva_data.tipo} disponibles para las fechas seleccionadas"
+            )
+        
+        with asignacion_habitaciones.bloqueo(reserva_data.tipo):
+            plan = asignacion_habitaciones.planificar_reserva(
+                db,
+                reserva_data.tipo,
+                reserva_data.fecha_entrada,
+                reserva_data.fecha_salida,
+                reserva_data.cantidad
+            )
+            
+            reserva_dict = reserva_data.model_dump()
+            reserva_dict["precio_total"] = sum(
+                tarifa_service.precio_estadia(db, h, reserva_data.fecha_entrada, reserva_data.fecha_salida)
+                for h in plan.habitacion_ids
+            )
+            reserva_dict["estado"] = "Confirmada"  # Estado inicial
+            
+            # El cupo se descuenta con un UPDATE condicional: si otro worker
+            # vendió la última habitación entre medias, no se confirma nada
+            if not inventario_service.registrar_venta(
+                db,
+                reserva_data.tipo,
+                reserva_data.fecha_entrada,
+                reserva_data.fecha_salida,
+                reserva_data.cantidad,
+                exigir_cupo=True
+            ):
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"No hay {reserva_data.cantidad} habitaciones de tipo {reserva_data.tipo} disponibles para las fechas seleccionadas"
+                )
+            reserva = reserva_repository.create_con_asignaciones(
+                db, reserva_dict, plan.habitacion_ids, plan.movimientos
+            )
+        
+        cliente_service.invalidar_perfil(reserva.cliente_id)
+        return ReservaResponse.model_validate(reserva)
+    
+    def get_asignaciones(self, db: Session, reserva_id: int) -> AsignacionResponse:
+        """
+        Habitaciones de una reserva (la fija o las asignadas por el motor)
+        """
+        reserva = reserva_repository.get_by_id(db, reserva_id)
+        if not reserva:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Reserva no encontrada"
+            )
+        return AsignacionResponse(
+            reserva_id=reserva.id,
+            tipo=reserva.tipo,
+            habitacion_ids=self._habitaciones_de(db, reserva)
+        )
+    
+    def reoptimizar_asignaciones(self, db: Session, dias: Optional[int] = None) -> List[ReoptimizacionTipoResponse]:
+        """
+        Reoptimizar las habitaciones asignadas a las reservas por tipo de los
+        próximos días (proceso nocturno)
+        """
+        return [
+            ReoptimizacionTipoResponse(**resultado)
+            for resultado in asignacion_habitaciones.reoptimizar(db, dias)
+        ]
+    
+    def _tipo_de(self, db: Session, reserva) -> Optional[str]:
+        if reserva.tipo is not None:
+            return reserva.tipo
+        habitacion = catalogo_habitaciones.obtener(db, reserva.habitacion_id)
+        return habitacion.tipo if habitacion else None
+    
+    def _liberar_inventario(self, db: Session, reserva) -> None:
+        """Devolver al inventario las noches pendientes (sin confirmar)"""
+        tipo = self._tipo_de(db, reserva)
+        if tipo is not None and reserva.estado in ESTADOS_OCUPAN:
+            inventario_service.registrar_liberacion(
+                db, tipo, reserva.fecha_entrada, reserva.fecha_salida, reserva.cantidad
+            )
+    
+    def _habitaciones_de(self, db: Session, reserva) -> List[int]:
+        if reserva.habitacion_id is not None:
+            return [reserva.habitacion_id]
+        return [a.habitacion_id for a in asignacion_repository.get_by_reserva(db, reserva.id)]
+    
     def get_all(
         self,
         db: Session,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[ReservaResponse]:
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Pagina[ReservaResponse]:
         """
         Obtener todas las reservas
         """
-        reservas = reserva_repository.get_all(db, skip, limit)
-        return [ReservaResponse.model_validate(r) for r in reservas]
+        return paginar(reserva_repository, db, ReservaResponse, limit, cursor, skip, fields=fields)
+    
+    async def get_all_async(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Pagina[ReservaResponse]:
+        """
+        Obtener todas las reservas (sesión asíncrona)
+        """
+        return await paginar_async(async_reserva_repository, db, ReservaResponse, limit, cursor, skip, fields=fields)
     
     def get_by_id(self, db: Session, reserva_id: int) -> ReservaResponse:
         """
@@ -101,6 +309,84 @@ class ReservaService:
         reservas = reserva_repository.get_by_cliente(db, cliente_id)
         return [ReservaResponse.model_validate(r) for r in reservas]
     
+    def update(self, db: Session, reserva_id: int, reserva_data: ReservaUpdate) -> ReservaResponse:
+        """
+        Actualizar una reserva. Las fechas solo cambian en reservas
+        confirmadas con habitación fija: se comprueba la disponibilidad sin
+        contar la propia reserva y se recalculan precio e inventario. Los
+        cambios de estado pasan por check-in, check-out o cancelación.
+        """
+        reserva = reserva_repository.get_by_id(db, reserva_id)
+        if not reserva:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Reserva no encontrada"
+            )
+        
+        if reserva.estado not in ESTADOS_OCUPAN:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"No se puede modificar una reserva en estado {reserva.estado}"
+            )
+        
+        datos = reserva_data.model_dump(exclude_unset=True, exclude_none=True)
+        estado = datos.pop("estado", None)
+        if estado is not None and estado != reserva.estado and estado not in ("En_Curso", "Completada", "Cancelada"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Estado de reserva no válido: {estado}"
+            )
+        
+        fecha_entrada = datos.get("fecha_entrada", reserva.fecha_entrada)
+        fecha_salida = datos.get("fecha_salida", reserva.fecha_salida)
+        fechas_anteriores = (reserva.fecha_entrada, reserva.fecha_salida)
+        cambia_fechas = (fecha_entrada, fecha_salida) != fechas_anteriores
+        if cambia_fechas:
+            if reserva.estado != "Confirmada" or reserva.habitacion_id is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Solo se pueden cambiar las fechas de una reserva confirmada con habitación fija"
+                )
+            if fecha_salida <= fecha_entrada:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="La fecha de salida debe ser posterior a la fecha de entrada"
+                )
+            
+            habitacion_repository.bloquear_fila(db, reserva.habitacion_id)
+            if not reserva_repository.verificar_disponibilidad(
+                db, reserva.habitacion_id, fecha_entrada, fecha_salida, reserva_id=reserva.id
+            ):
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="La habitación no está disponible para las fechas seleccionadas"
+                )
+            
+            # Las noches anteriores vuelven al inventario y se venden las nuevas
+            self._liberar_inventario(db, reserva)
+            inventario_service.registrar_venta(db, self._tipo_de(db, reserva), fecha_entrada, fecha_salida, 1)
+            datos["precio_total"] = tarifa_service.precio_estadia(
+                db, reserva.habitacion_id, fecha_entrada, fecha_salida
+            )
+        
+        if datos:
+            reserva = reserva_repository.update(db, reserva_id, datos)
+            cliente_service.invalidar_perfil(reserva.cliente_id)
+        respuesta = ReservaResponse.model_validate(reserva)
+        
+        # Noches que la reserva dejó libres al cambiar de fechas
+        if cambia_fechas:
+            lista_espera_service.procesar_liberacion(db, [respuesta.habitacion_id], *fechas_anteriores)
+        
+        if estado == "En_Curso" and respuesta.estado != "En_Curso":
+            return self.check_in(db, reserva_id)
+        if estado == "Completada":
+            return self.check_out(db, reserva_id)
+        if estado == "Cancelada":
+            return self.cancelar(db, reserva_id)
+        return respuesta
+    
     def check_in(self, db: Session, reserva_id: int) -> ReservaResponse:
         """
         Realizar check-in de una reserva
@@ -134,12 +420,10 @@ class ReservaService:
             {"estado": "En_Curso"}
         )
         
-        # Actualizar habitación
-        habitacion_repository.update(
-            db,
-            reserva.habitacion_id,
-            {"estado": "Ocupada"}
-        )
+        # Actualizar habitaciones
+        for habitacion_id in self._habitaciones_de(db, reserva):
+            habitacion_service.cambiar_estado(db, habitacion_id, "Ocupada")
+        cliente_service.invalidar_perfil(reserva.cliente_id)
         
         return ReservaResponse.model_validate(updated_reserva)
     
@@ -161,24 +445,28 @@ class ReservaService:
                 detail=f"No se puede hacer check-out de una reserva en estado {reserva.estado}"
             )
         
-        # Actualizar reserva
+        # Actualizar reserva; una salida anticipada devuelve las noches restantes
+        self._liberar_inventario(db, reserva)
         updated_reserva = reserva_repository.update(
             db,
             reserva_id,
             {"estado": "Completada"}
         )
         
-        # Actualizar habitación
-        habitacion_repository.update(
-            db,
-            reserva.habitacion_id,
-            {"estado": "Disponible"}
-        )
+        # Actualizar habitaciones
+        habitaciones = self._habitaciones_de(db, reserva)
+        for habitacion_id in habitaciones:
+            habitacion_service.cambiar_estado(db, habitacion_id, "Disponible")
         
         # Generar factura automáticamente si no existe
         factura_existente = factura_repository.get_by_reserva(db, reserva_id)
         if not factura_existente:
             self._generar_factura(db, reserva)
+        cliente_service.invalidar_perfil(reserva.cliente_id)
+        
+        # Salida anticipada: las noches restantes pasan a la lista de espera
+        if date.today() < reserva.fecha_salida:
+            lista_espera_service.procesar_liberacion(db, habitaciones, date.today(), reserva.fecha_salida)
         
         return ReservaResponse.model_validate(updated_reserva)
     
@@ -201,46 +489,57 @@ class ReservaService:
             )
         
         # Actualizar reserva
-        updated_reserva = reserva_repository.update(
+        estado_anterior = reserva.estado
+        self._liberar_inventario(db, reserva)
+        # La respuesta se toma antes de los siguientes commits, que expiran
+        # la reserva y obligarían a recargarla
+        respuesta = ReservaResponse.model_validate(reserva_repository.update(
             db,
             reserva_id,
             {"estado": "Cancelada"}
-        )
+        ))
         
-        # Liberar habitación si estaba reservada
-        if reserva.estado == "Confirmada":
-            habitacion_repository.update(
-                db,
-                reserva.habitacion_id,
-                {"estado": "Disponible"}
+        # Liberar habitación si estaba reservada (las reservas por tipo no
+        # cambian el estado de sus habitaciones hasta el check-in)
+        if estado_anterior == "Confirmada" and respuesta.habitacion_id is not None:
+            habitacion_service.cambiar_estado(db, respuesta.habitacion_id, "Disponible")
+        cliente_service.invalidar_perfil(respuesta.cliente_id)
+        
+        # Ofrecer las noches liberadas a la lista de espera
+        if estado_anterior in ESTADOS_OCUPAN:
+            lista_espera_service.procesar_liberacion(
+                db, self._habitaciones_de(db, respuesta), respuesta.fecha_entrada, respuesta.fecha_salida
             )
         
-        return ReservaResponse.model_validate(updated_reserva)
+        return respuesta
     
     def _generar_factura(self, db: Session, reserva):
         """
         Generar factura automáticamente (uso interno)
         """
-        # Obtener último número de factura
-        ultimo_numero = factura_repository.get_ultimo_numero(db)
-        nuevo_numero = f"FAC-{int(ultimo_numero.split('-')[1]) + 1:06d}" if ultimo_numero else "FAC-000001"
-        
-        # Calcular impuestos (15% IVA)
-        subtotal = reserva.precio_total
-        impuestos = subtotal * Decimal("0.15")
-        total = subtotal + impuestos
-        
-        # Crear factura
-        factura_data = {
-            "numero_factura": nuevo_numero,
-            "reserva_id": reserva.id,
-            "subtotal": subtotal,
-            "impuestos": impuestos,
-            "descuentos": Decimal("0.00"),
-            "total": total
-        }
-        
-        factura_repository.create(db, factura_data)
+        factura_repository.create_lote(db, self._datos_facturas(db, [reserva]))
+        db.commit()
+    
+    def _datos_facturas(self, db: Session, reservas) -> List[dict]:
+        """
+        Datos de las facturas de varias reservas; el número lo pone
+        factura_repository al insertarlas
+        """
+        facturas = []
+        for reserva in reservas:
+            # Calcular impuestos (15% IVA)
+            subtotal = Decimal(str(reserva.precio_total))
+            impuestos = subtotal * Decimal("0.15")
+            total = subtotal + impuestos
+            
+            facturas.append({
+                "reserva_id": reserva.id,
+                "subtotal": subtotal,
+                "impuestos": impuestos,
+                "descuentos": Decimal("0.00"),
+                "total": total
+            })
+        return facturas
 
 
 # Instancia singleton
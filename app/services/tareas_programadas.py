@@ -0,0 +1,65 @@
+"""
+Tareas periódicas del hotel
+
+Registra en el programador los procesos nocturnos y periódicos. Los
+horarios se pueden cambiar con variables de entorno (expresiones cron en
+hora local).
+"""
+
+import os
+
+from sqlalchemy.orm import Session
+
+from app.services.asignacion_habitaciones import asignacion_habitaciones
+from app.services.auditoria_service import auditoria_service
+from app.services.inventario_service import inventario_service
+from app.services.lista_espera_service import lista_espera_service
+from app.services.programador import programador
+
+# Cierre del día de negocio (no-shows, ingresos, salidas vencidas)
+TAREA_AUDITORIA_CRON = os.getenv("TAREA_AUDITORIA_CRON", "30 2 * * *")
+
+# Reoptimización de las habitaciones asignadas a reservas por tipo
+TAREA_ASIGNACIONES_CRON = os.getenv("TAREA_ASIGNACIONES_CRON", "0 3 * * *")
+
+# Reconstrucción de los contadores de inventario por tipo
+TAREA_INVENTARIO_CRON = os.getenv("TAREA_INVENTARIO_CRON", "30 3 * * *")
+
+# Ofertas de lista de espera vencidas: pasar a la siguiente inscripción
+TAREA_LISTA_ESPERA_CRON = os.getenv("TAREA_LISTA_ESPERA_CRON", "*/15 * * * *")
+
+
+def _auditoria(db: Session) -> None:
+    auditoria_service.ejecutar(db)
+
+
+def _asignaciones(db: Session) -> None:
+    asignacion_habitaciones.reoptimizar(db)
+
+
+def _inventario(db: Session) -> None:
+    inventario_service.reconciliar(db)
+
+
+def _lista_espera(db: Session) -> None:
+    lista_espera_service.reofrecer_vencidas(db)
+
+
+def registrar_tareas() -> None:
+    """Registrar las tareas del hotel en el programador"""
+    programador.registrar(
+        "auditoria_nocturna", TAREA_AUDITORIA_CRON, _auditoria,
+        "Cierre del día de negocio"
+    )
+    programador.registrar(
+        "reoptimizar_asignaciones", TAREA_ASIGNACIONES_CRON, _asignaciones,
+        "Reoptimizar habitaciones de las reservas por tipo"
+    )
+    programador.registrar(
+        "reconciliar_inventario", TAREA_INVENTARIO_CRON, _inventario,
+        "Reconciliar contadores de inventario por tipo"
+    )
+    programador.registrar(
+        "ofertas_lista_espera", TAREA_LISTA_ESPERA_CRON, _lista_espera,
+        "Ofrecer a la siguiente inscripción las ofertas vencidas"
+    )
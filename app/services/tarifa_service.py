@@ -0,0 +1,259 @@
+"""
+Servicio de Tarifas
+"""
+
+import heapq
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import accumulate
+
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from typing import List, Optional
+from datetime import date
+
+from app.repositories.reserva_repository import reserva_repository
+from app.repositories.tarifa_repository import tarifa_repository
+from app.schemas.tarifa_schema import (
+    TarifaCreate,
+    TarifaUpdate,
+    TarifaResponse,
+    CotizacionRequest,
+    CotizacionResponse,
+    CotizacionLoteRequest,
+    CotizacionEstadiaResponse,
+    OpcionCotizacion
+)
+from app.config.versiones import versiones
+from app.services.calendario_tarifas import calendario_tarifas
+from app.services.catalogo_habitaciones import catalogo_habitaciones
+from app.services.habitacion_service import habitacion_service
+
+
+class IndiceOcupacion:
+    """
+    Reservas activas de un rango agrupadas por habitación: entradas
+    ordenadas y máximo acumulado de las salidas, para saber con una búsqueda
+    binaria si una habitación tiene alguna reserva que se cruce con [a, b)
+    """
+
+    def __init__(self, intervalos):
+        por_habitacion = defaultdict(list)
+        for habitacion_id, entrada, salida in intervalos:
+            por_habitacion[habitacion_id].append((entrada, salida))
+        self._indice = {}
+        for habitacion_id, reservas in por_habitacion.items():
+            reservas.sort()
+            self._indice[habitacion_id] = (
+                [entrada for entrada, _ in reservas],
+                list(accumulate((salida for _, salida in reservas), max))
+            )
+
+    def ocupadas(self, fecha_entrada: date, fecha_salida: date) -> set[int]:
+        """IDs de habitaciones con alguna reserva que se cruza con la estadía"""
+        ocupadas = set()
+        for habitacion_id, (entradas, salidas_max) in self._indice.items():
+            # Reservas que empiezan antes de la salida; basta con que la que
+            # más tarde termina lo haga después de la entrada
+            posicion = bisect_left(entradas, fecha_salida)
+            if posicion and salidas_max[posicion - 1] > fecha_entrada:
+                ocupadas.add(habitacion_id)
+        return ocupadas
+
+
+class TarifaService:
+    """
+    Servicio de gestión de tarifas y cálculo de precios de estadías
+    """
+
+    def create(self, db: Session, tarifa_data: TarifaCreate) -> TarifaResponse:
+        """
+        Crear nueva regla de tarifa
+        """
+        self._validar_alcance(db, tarifa_data.habitacion_id, tarifa_data.tipo)
+        tarifa = tarifa_repository.create(db, tarifa_data.model_dump())
+        versiones.incrementar("tarifas")
+        return TarifaResponse.model_validate(tarifa)
+
+    def get_all(
+        self,
+        db: Session,
+        habitacion_id: Optional[int] = None,
+        tipo: Optional[str] = None
+    ) -> List[TarifaResponse]:
+        """
+        Obtener las reglas de tarifa, opcionalmente de una habitación o tipo
+        """
+        if habitacion_id is not None:
+            tarifas = tarifa_repository.get_by_habitacion(db, habitacion_id)
+        elif tipo:
+            tarifas = tarifa_repository.get_by_tipo(db, tipo)
+        else:
+            tarifas = tarifa_repository.get_vigentes(db)
+        return [TarifaResponse.model_validate(t) for t in tarifas]
+
+    def update(self, db: Session, tarifa_id: int, tarifa_data: TarifaUpdate) -> TarifaResponse:
+        """
+        Actualizar regla de tarifa
+        """
+        tarifa = self._obtener(db, tarifa_id)
+        update_data = tarifa_data.model_dump(exclude_unset=True)
+
+        # La regla resultante debe seguir teniendo precio o factor, no ambos
+        precio = update_data.get("precio", tarifa.precio)
+        factor = update_data.get("factor", tarifa.factor)
+        if (precio is None) == (factor is None):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La tarifa debe tener precio o factor (solo uno de los dos)"
+            )
+        fecha_desde = update_data.get("fecha_desde", tarifa.fecha_desde)
+        fecha_hasta = update_data.get("fecha_hasta", tarifa.fecha_hasta)
+        if fecha_desde and fecha_hasta and fecha_hasta < fecha_desde:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La fecha final de la tarifa no puede ser anterior a la inicial"
+            )
+
+        updated_tarifa = tarifa_repository.update(db, tarifa_id, update_data)
+        versiones.incrementar("tarifas")
+        return TarifaResponse.model_validate(updated_tarifa)
+
+    def delete(self, db: Session, tarifa_id: int) -> bool:
+        """
+        Eliminar regla de tarifa
+        """
+        self._obtener(db, tarifa_id)
+        eliminada = tarifa_repository.delete(db, tarifa_id)
+        versiones.incrementar("tarifas")
+        return eliminada
+
+    def precio_estadia(
+        self,
+        db: Session,
+        habitacion_id: int,
+        fecha_entrada: date,
+        fecha_salida: date
+    ) -> float:
+        """
+        Precio total de una estadía según el calendario de tarifas
+        """
+        total = calendario_tarifas.cotizar(db, [habitacion_id], fecha_entrada, fecha_salida)[habitacion_id]
+        if total is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Habitación no encontrada"
+            )
+        return total / 100
+
+    def cotizar(self, db: Session, cotizacion: CotizacionRequest) -> List[CotizacionResponse]:
+        """
+        Cotizar la misma estadía en varias habitaciones (todas las activas
+        si no se indican) con una sola consulta al calendario compilado
+        """
+        if cotizacion.habitacion_ids is None:
+            habitacion_ids = [h.id for h in catalogo_habitaciones.instantanea(db).todas() if h.activa]
+        else:
+            habitacion_ids = list(dict.fromkeys(cotizacion.habitacion_ids))
+
+        totales = calendario_tarifas.cotizar(
+            db, habitacion_ids, cotizacion.fecha_entrada, cotizacion.fecha_salida
+        )
+        desconocidas = [h for h, total in totales.items() if total is None]
+        if desconocidas:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Habitaciones no encontradas: {desconocidas}"
+            )
+
+        noches = (cotizacion.fecha_salida - cotizacion.fecha_entrada).days
+        return [
+            CotizacionResponse(
+                habitacion_id=habitacion_id,
+                noches=noches,
+                total=total / 100,
+                promedio_noche=round(total / noches) / 100
+            )
+            for habitacion_id, total in totales.items()
+        ]
+
+    def cotizar_lote(self, db: Session, lote: CotizacionLoteRequest) -> List[CotizacionEstadiaResponse]:
+        """
+        Disponibilidad y precio de varias estadías candidatas en una sola
+        pasada: una consulta de reservas para el rango que cubre todas las
+        estadías, una tabla de tarifas para el mismo rango y, por estadía,
+        las habitaciones libres ordenadas por precio (las top_k más baratas
+        si se indica)
+        """
+        desde = min(e.fecha_entrada for e in lote.estadias)
+        hasta = max(e.fecha_salida for e in lote.estadias)
+
+        catalogo = catalogo_habitaciones.instantanea(db)
+        indice = IndiceOcupacion(reserva_repository.intervalos_activos(db, desde, hasta))
+        tabla = calendario_tarifas.tabla(db, desde, hasta)
+
+        resultados = []
+        for estadia in lote.estadias:
+            noches = (estadia.fecha_salida - estadia.fecha_entrada).days
+            libres = habitacion_service.libres_por_fechas(
+                catalogo,
+                indice.ocupadas(estadia.fecha_entrada, estadia.fecha_salida),
+                estadia.tipo
+            )
+            candidatas = [
+                (tabla.total(h.id, estadia.fecha_entrada, estadia.fecha_salida), h.id, h)
+                for h in libres
+                if h.capacidad >= estadia.personas
+            ]
+            disponibles = len(candidatas)
+            if lote.top_k is not None:
+                candidatas = heapq.nsmallest(lote.top_k, candidatas, key=lambda c: c[:2])
+            else:
+                candidatas.sort(key=lambda c: c[:2])
+
+            resultados.append(CotizacionEstadiaResponse(
+                fecha_entrada=estadia.fecha_entrada,
+                fecha_salida=estadia.fecha_salida,
+                personas=estadia.personas,
+                tipo=estadia.tipo,
+                noches=noches,
+                disponibles=disponibles,
+                opciones=[
+                    OpcionCotizacion(
+                        habitacion_id=h.id,
+                        numero=h.numero,
+                        tipo=h.tipo,
+                        capacidad=h.capacidad,
+                        total=total / 100,
+                        promedio_noche=round(total / noches) / 100
+                    )
+                    for total, _, h in candidatas
+                ]
+            ))
+        return resultados
+
+    def _obtener(self, db: Session, tarifa_id: int):
+        tarifa = tarifa_repository.get_by_id(db, tarifa_id)
+        if not tarifa:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tarifa no encontrada"
+            )
+        return tarifa
+
+    def _validar_alcance(self, db: Session, habitacion_id: Optional[int], tipo: Optional[str]) -> None:
+        """Una regla aplica a una habitación, a un tipo o a todo el hotel"""
+        if habitacion_id is not None and tipo:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Indique habitación o tipo, no ambos"
+            )
+        if habitacion_id is not None and not catalogo_habitaciones.obtener(db, habitacion_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Habitación no encontrada"
+            )
+
+
+# Instancia singleton
+tarifa_service = TarifaService()
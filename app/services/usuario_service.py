@@ -39,7 +39,7 @@ class UsuarioService:
         
         # Preparar datos
         usuario_dict = usuario_data.model_dump(exclude={"password"})
-        usuario_dict["password_hash"] = password_hash
+        usuario_dict["hashed_password"] = password_hash
         
         # Crear usuario
         usuario = usuario_repository.create(db, usuario_dict)
@@ -0,0 +1,310 @@
+"""
+Benchmark de carga de la API
+
+Ejecuta escenarios de uso reales contra la aplicación FastAPI, en proceso
+(httpx sobre ASGI, sin red) o por HTTP contra un servidor local, y reporta
+latencias p50/p95/p99 y throughput por escenario. Los resultados pueden
+guardarse como línea base y compararse en ejecuciones posteriores para
+detectar regresiones (código de salida 1).
+
+Escenarios:
+    crear_reserva   POST /reservas/reservas con fechas futuras aleatorias
+    disponibilidad  GET  /habitaciones/habitaciones/disponibles
+    check_in_out    crear + check-in + check-out (capa de servicio, solo en proceso)
+    ocupacion       GET  /reportes/ocupacion (un mes)
+    ingresos        GET  /reportes/ingresos (un mes)
+    libro_diario    GET  /reportes/libro-diario (una semana)
+
+Uso (sobre datos de benchmarks.generar_datos):
+    DATABASE_URL=sqlite:///./bench_hotel.db python -m benchmarks.bench_carga --modo proceso
+    python -m benchmarks.bench_carga --modo http --url http://127.0.0.1:8000 --guardar-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+import httpx
+
+CARPETA_BASELINES = os.path.join(os.path.dirname(__file__), "baselines")
+
+ESCENARIOS = ("crear_reserva", "disponibilidad", "check_in_out", "ocupacion", "ingresos", "libro_diario")
+
+
+def percentil(valores: list[float], p: float) -> float:
+    """Percentil por rango más cercano sobre valores ordenados"""
+    if not valores:
+        return 0.0
+    indice = max(0, min(len(valores) - 1, int(round(p / 100 * len(valores))) - 1))
+    return valores[indice]
+
+
+class Contexto:
+    """Datos compartidos por los escenarios: rangos de IDs y fechas"""
+
+    def __init__(self, max_cliente: int, max_habitacion: int, semilla: int):
+        self.max_cliente = max_cliente
+        self.max_habitacion = max_habitacion
+        self.rng = random.Random(semilla)
+        self.hoy = date.today()
+        # Habitaciones con una estadía de check_in_out en curso
+        self.en_uso: set[int] = set()
+        self.lock = threading.Lock()
+
+    def fechas_futuras(self, horizonte: int = 900) -> tuple[date, date]:
+        entrada = self.hoy + timedelta(days=self.rng.randint(200, horizonte))
+        return entrada, entrada + timedelta(days=self.rng.randint(1, 7))
+
+    def mes_pasado(self) -> tuple[date, date]:
+        desde = self.hoy - timedelta(days=self.rng.randint(30, 365 * 4))
+        return desde, desde + timedelta(days=30)
+
+
+# ========== Escenarios HTTP ==========
+
+async def _crear_reserva(cliente: httpx.AsyncClient, ctx: Contexto) -> httpx.Response:
+    entrada, salida = ctx.fechas_futuras()
+    return await cliente.post("/reservas/reservas", json={
+        "cliente_id": ctx.rng.randint(1, ctx.max_cliente),
+        "habitacion_id": ctx.rng.randint(1, ctx.max_habitacion),
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": salida.isoformat(),
+    })
+
+
+async def _disponibilidad(cliente: httpx.AsyncClient, ctx: Contexto) -> httpx.Response:
+    entrada, salida = ctx.fechas_futuras(400)
+    return await cliente.get("/habitaciones/habitaciones/disponibles", params={
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": salida.isoformat(),
+    })
+
+
+def _reporte(ruta: str, dias: int):
+    async def escenario(cliente: httpx.AsyncClient, ctx: Contexto) -> httpx.Response:
+        desde, _ = ctx.mes_pasado()
+        return await cliente.get(ruta, params={
+            "fecha_desde": desde.isoformat(),
+            "fecha_hasta": (desde + timedelta(days=dias)).isoformat(),
+        })
+    return escenario
+
+
+def _check_in_out_en_proceso(ctx: Contexto) -> int:
+    """
+    Ciclo completo de estadía en la capa de servicio: la API no expone
+    check-in/check-out como rutas HTTP. La habitación se elige entre las
+    que se pueden vender esta noche (mismo criterio que al crear la reserva:
+    /disponibles exige estado Disponible, que las reservas futuras de
+    crear_reserva cambian a Reservada) y que no use otra estadía del
+    benchmark en curso; si no queda ninguna cuenta como 409
+    """
+    from fastapi import HTTPException
+
+    from app.config.database import SessionLocal
+    from app.repositories.reserva_repository import reserva_repository
+    from app.schemas.reserva_schema import ReservaCreate
+    from app.services.catalogo_habitaciones import catalogo_habitaciones
+    from app.services.habitacion_service import habitacion_service
+    from app.services.reserva_service import reserva_service
+
+    db = SessionLocal()
+    habitacion_id = None
+    try:
+        salida = ctx.hoy + timedelta(days=1)
+        libres = habitacion_service.libres_por_fechas(
+            catalogo_habitaciones.instantanea(db),
+            reserva_repository.habitaciones_ocupadas(db, ctx.hoy, salida)
+        )
+        with ctx.lock:
+            candidatas = [h.id for h in libres if h.id not in ctx.en_uso]
+            if not candidatas:
+                return 409
+            habitacion_id = ctx.rng.choice(candidatas)
+            ctx.en_uso.add(habitacion_id)
+            cliente_id = ctx.rng.randint(1, ctx.max_cliente)
+        reserva = reserva_service.create(db, ReservaCreate(
+            cliente_id=cliente_id,
+            habitacion_id=habitacion_id,
+            fecha_entrada=ctx.hoy,
+            fecha_salida=salida,
+        ))
+        reserva_service.check_in(db, reserva.id)
+        reserva_service.check_out(db, reserva.id)
+        return 200
+    except HTTPException as e:
+        db.rollback()
+        return e.status_code
+    finally:
+        db.close()
+        with ctx.lock:
+            ctx.en_uso.discard(habitacion_id)
+
+
+# ========== Ejecución ==========
+
+async def _correr_escenario(
+    nombre: str,
+    cliente: httpx.AsyncClient,
+    ctx: Contexto,
+    peticiones: int,
+    concurrencia: int
+) -> dict:
+    if nombre == "check_in_out":
+        async def accion():
+            return await asyncio.to_thread(_check_in_out_en_proceso, ctx)
+    else:
+        funciones = {
+            "crear_reserva": _crear_reserva,
+            "disponibilidad": _disponibilidad,
+            "ocupacion": _reporte("/reportes/ocupacion", 30),
+            "ingresos": _reporte("/reportes/ingresos", 30),
+            "libro_diario": _reporte("/reportes/libro-diario", 7),
+        }
+        funcion = funciones[nombre]
+
+        async def accion():
+            return (await funcion(cliente, ctx)).status_code
+
+    latencias: list[float] = []
+    codigos: dict[int, int] = {}
+    pendientes = iter(range(peticiones))
+
+    async def trabajador():
+        for _ in pendientes:
+            inicio = time.perf_counter()
+            codigo = await accion()
+            latencias.append(time.perf_counter() - inicio)
+            codigos[codigo] = codigos.get(codigo, 0) + 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    duracion = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "peticiones": len(latencias),
+        "p50_ms": round(percentil(latencias, 50) * 1000, 2),
+        "p95_ms": round(percentil(latencias, 95) * 1000, 2),
+        "p99_ms": round(percentil(latencias, 99) * 1000, 2),
+        "throughput_s": round(len(latencias) / duracion, 1) if duracion else 0.0,
+        "errores": sum(n for codigo, n in codigos.items() if codigo >= 500),
+        "rechazos": sum(n for codigo, n in codigos.items() if 400 <= codigo < 500),
+    }
+
+
+def _rangos() -> tuple[int, int]:
+    """Máximos IDs de clientes y habitaciones de la base de datos configurada"""
+    from sqlalchemy import func
+
+    from app.config.database import SessionLocal
+    from app.models.cliente import Cliente
+    from app.models.habitacion import Habitacion
+
+    db = SessionLocal()
+    try:
+        return (
+            db.query(func.max(Cliente.id)).scalar() or 1,
+            db.query(func.max(Habitacion.id)).scalar() or 1,
+        )
+    finally:
+        db.close()
+
+
+async def ejecutar(args) -> dict:
+    if args.modo == "proceso":
+        from app.main import app
+        transporte = httpx.ASGITransport(app=app)
+        base_url = "http://bench"
+    else:
+        transporte = None
+        base_url = args.url
+
+    max_cliente, max_habitacion = (args.max_cliente, args.max_habitacion)
+    if args.modo == "proceso" and not (max_cliente and max_habitacion):
+        max_cliente, max_habitacion = _rangos()
+    ctx = Contexto(max_cliente or 1000, max_habitacion or 100, args.semilla)
+
+    async with httpx.AsyncClient(transport=transporte, base_url=base_url, timeout=60) as cliente:
+        respuesta = await cliente.post("/auth/login", json={"username": args.usuario, "password": args.clave})
+        respuesta.raise_for_status()
+        cliente.headers["Authorization"] = f"Bearer {respuesta.json()['data']['access_token']}"
+
+        resultados = {}
+        for nombre in args.escenarios:
+            if nombre == "check_in_out" and args.modo != "proceso":
+                print(f"{nombre}: omitido (solo disponible en modo proceso)", file=sys.stderr)
+                continue
+            # Calentamiento: conexiones del pool y cachés de sentencias
+            await _correr_escenario(nombre, cliente, ctx, min(20, args.peticiones), 1)
+            resultados[nombre] = await _correr_escenario(nombre, cliente, ctx, args.peticiones, args.concurrencia)
+    return resultados
+
+
+def comparar(resultados: dict, baseline: dict, tolerancia: float) -> list[str]:
+    """Regresiones respecto a la línea base: p95 más alto o throughput más bajo"""
+    regresiones = []
+    for nombre, actual in resultados.items():
+        previo = baseline.get(nombre)
+        if not previo:
+            continue
+        if actual["p95_ms"] > previo["p95_ms"] * (1 + tolerancia):
+            regresiones.append(f"{nombre}: p95 {actual['p95_ms']} ms (base {previo['p95_ms']} ms)")
+        if actual["throughput_s"] < previo["throughput_s"] * (1 - tolerancia):
+            regresiones.append(f"{nombre}: {actual['throughput_s']} req/s (base {previo['throughput_s']} req/s)")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modo", choices=("proceso", "http"), default="proceso")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--escenarios", nargs="+", choices=ESCENARIOS, default=list(ESCENARIOS))
+    parser.add_argument("--peticiones", type=int, default=500, help="Peticiones por escenario")
+    parser.add_argument("--concurrencia", type=int, default=8)
+    parser.add_argument("--usuario", default="bench_admin")
+    parser.add_argument("--clave", default="bench_admin")
+    parser.add_argument("--max-cliente", type=int, default=0, help="Mayor ID de cliente (modo http)")
+    parser.add_argument("--max-habitacion", type=int, default=0, help="Mayor ID de habitación (modo http)")
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--baseline", help="Archivo de línea base (por defecto baselines/<modo>.json)")
+    parser.add_argument("--guardar-baseline", action="store_true")
+    parser.add_argument("--tolerancia", type=float, default=0.20, help="Margen antes de marcar regresión")
+    args = parser.parse_args()
+
+    resultados = asyncio.run(ejecutar(args))
+
+    print(f"{'escenario':<16}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'5xx':>6}{'4xx':>6}")
+    for nombre, r in resultados.items():
+        print(
+            f"{nombre:<16}{r['peticiones']:>7}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+            f"{r['p99_ms']:>10}{r['throughput_s']:>10}{r['errores']:>6}{r['rechazos']:>6}"
+        )
+
+    ruta_baseline = args.baseline or os.path.join(CARPETA_BASELINES, f"{args.modo}.json")
+    if args.guardar_baseline:
+        os.makedirs(os.path.dirname(ruta_baseline), exist_ok=True)
+        with open(ruta_baseline, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, indent=2, sort_keys=True)
+        print(f"Línea base guardada en {ruta_baseline}")
+        return
+
+    if os.path.exists(ruta_baseline):
+        with open(ruta_baseline, encoding="utf-8") as archivo:
+            regresiones = comparar(resultados, json.load(archivo), args.tolerancia)
+        if regresiones:
+            print("Regresiones detectadas:")
+            for regresion in regresiones:
+                print(f"  {regresion}")
+            sys.exit(1)
+        print("Sin regresiones respecto a la línea base")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark de serialización y compresión de respuestas
+
+Compara, para respuestas grandes de reservas y del libro diario, el coste de
+CPU del renderizado por defecto de FastAPI (jsonable_encoder + json.dumps)
+con el renderizado rápido de app.config.respuestas (model_dump + orjson), y
+el tamaño del cuerpo sin comprimir, con gzip y con brotli.
+
+No necesita base de datos: los datos se generan en memoria.
+
+Uso:
+    python -m benchmarks.bench_serializacion --filas 5000 --repeticiones 20
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+import zlib
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+
+from app.config import respuestas
+from app.schemas.common import ResponseData, ResponseList
+from app.schemas.reserva_schema import ReservaResponse
+
+
+def _reservas(filas: int, rng: random.Random) -> ResponseList:
+    hoy = date.today()
+    datos = []
+    for i in range(1, filas + 1):
+        entrada = hoy + timedelta(days=rng.randint(-700, 300))
+        datos.append(ReservaResponse(
+            id=i,
+            cliente_id=rng.randint(1, 20000),
+            habitacion_id=rng.randint(1, 300),
+            fecha_entrada=entrada,
+            fecha_salida=entrada + timedelta(days=rng.randint(1, 7)),
+            observaciones=rng.choice([None, "Cliente frecuente", "Llegada tarde, cama extra solicitada"]),
+            precio_total=round(rng.uniform(40, 900), 2),
+            estado=rng.choice(["Confirmada", "Completada", "Cancelada"]),
+            created_at=datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)
+        ))
+    return ResponseList(success=True, message="Reservas obtenidas correctamente", data=datos, total=filas)
+
+
+def _libro_diario(filas: int, rng: random.Random) -> ResponseData:
+    cuentas = [("1.1.01", "Caja"), ("1.1.02", "Bancos"), ("2.1.01", "IVA por pagar"), ("4.1.01", "Ingresos por hospedaje")]
+    inicio = date(2024, 1, 1)
+    transacciones = []
+    for i in range(filas):
+        codigo, nombre = rng.choice(cuentas)
+        tipo = rng.choice(["Débito", "Crédito"])
+        monto = round(rng.uniform(10, 2000), 2)
+        transacciones.append({
+            "fecha": (inicio + timedelta(days=i // 50)).isoformat(),
+            "cuenta_codigo": codigo,
+            "cuenta_nombre": nombre,
+            "concepto": f"Factura FAC-{i:08d}",
+            "tipo": tipo,
+            "debe": monto if tipo == "Débito" else 0.0,
+            "haber": monto if tipo == "Crédito" else 0.0
+        })
+    total_debe = sum(t["debe"] for t in transacciones)
+    total_haber = sum(t["haber"] for t in transacciones)
+    return ResponseData(success=True, message="Libro diario generado correctamente", data={
+        "periodo": {"desde": transacciones[0]["fecha"], "hasta": transacciones[-1]["fecha"]},
+        "transacciones": transacciones,
+        "totales": {
+            "debe": round(total_debe, 2),
+            "haber": round(total_haber, 2),
+            "balance": round(total_debe - total_haber, 2)
+        }
+    })
+
+
+def render_fastapi(contenido) -> bytes:
+    """Camino por defecto: jsonable_encoder y JSONResponse.render"""
+    return json.dumps(
+        jsonable_encoder(contenido),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _medir(funcion, repeticiones: int) -> tuple[float, object]:
+    """Mediana en milisegundos y último resultado"""
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000, resultado
+
+
+def _comprimir(cuerpo: bytes, codificacion: str) -> bytes:
+    if codificacion == "br":
+        return respuestas.brotli.compress(cuerpo, quality=respuestas.COMPRESION_CALIDAD_BROTLI)
+    compresor = zlib.compressobj(respuestas.COMPRESION_NIVEL_GZIP, zlib.DEFLATED, 31)
+    return compresor.compress(cuerpo) + compresor.flush()
+
+
+def ejecutar(filas: int, repeticiones: int, semilla: int) -> dict:
+    rng = random.Random(semilla)
+    casos = {"reservas": _reservas(filas, rng), "libro_diario": _libro_diario(filas, rng)}
+    codificaciones = ["gzip"] + (["br"] if respuestas.brotli is not None else [])
+
+    resultados = {}
+    for nombre, contenido in casos.items():
+        ms_fastapi, cuerpo_fastapi = _medir(lambda: render_fastapi(contenido), repeticiones)
+        ms_rapido, cuerpo_rapido = _medir(lambda: respuestas.renderizar(contenido), repeticiones)
+        if json.loads(cuerpo_fastapi) != json.loads(cuerpo_rapido):
+            raise SystemExit(f"{nombre}: los dos renderizados no producen el mismo JSON")
+
+        resultado = {
+            "fastapi_ms": round(ms_fastapi, 2),
+            "rapido_ms": round(ms_rapido, 2),
+            "aceleracion": round(ms_fastapi / ms_rapido, 1) if ms_rapido else None,
+            "bytes": len(cuerpo_rapido),
+        }
+        for codificacion in codificaciones:
+            ms, comprimido = _medir(lambda: _comprimir(cuerpo_rapido, codificacion), max(3, repeticiones // 4))
+            resultado[f"{codificacion}_bytes"] = len(comprimido)
+            resultado[f"{codificacion}_ms"] = round(ms, 2)
+        resultados[nombre] = resultado
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filas", type=int, default=5000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--semilla", type=int, default=7)
+    args = parser.parse_args()
+
+    if respuestas.orjson is None:
+        print("Aviso: orjson no está instalado; el renderizado rápido usa model_dump_json")
+    resultados = ejecutar(args.filas, args.repeticiones, args.semilla)
+
+    for nombre, r in resultados.items():
+        print(f"{nombre} ({args.filas} filas)")
+        print(f"  render FastAPI   {r['fastapi_ms']:>9} ms")
+        print(f"  render rápido    {r['rapido_ms']:>9} ms   x{r['aceleracion']}")
+        print(f"  cuerpo           {r['bytes']:>9} bytes")
+        for codificacion in ("gzip", "br"):
+            if f"{codificacion}_bytes" in r:
+                proporcion = r[f"{codificacion}_bytes"] / r["bytes"] * 100
+                print(
+                    f"  {codificacion:<16} {r[f'{codificacion}_bytes']:>9} bytes "
+                    f"({proporcion:.1f}%) en {r[f'{codificacion}_ms']} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
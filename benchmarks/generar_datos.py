@@ -0,0 +1,346 @@
+"""
+Generador de datos sintéticos para benchmarks
+
+Crea un hotel realista sobre una base vacía: habitaciones por tipo y piso,
+clientes con huéspedes frecuentes, reservas a lo largo de varios años con
+estacionalidad (ocupación y estancias lognormales por habitación, sin
+solapamientos), facturas con 15% de IVA, pagos por método y los asientos
+contables de cada cobro. Las filas se insertan por lotes con SQLAlchemy
+Core, sin pasar por el ORM.
+
+Uso:
+    python -m benchmarks.generar_datos --url sqlite:///./bench.db --reiniciar \\
+        --habitaciones 2000 --clientes 1000000 --anios 5
+"""
+
+import argparse
+import math
+import random
+import time
+from datetime import date, datetime, time as hora, timedelta
+
+from sqlalchemy import func, select
+
+import app.models  # noqa: F401  (registra todas las tablas en Base.metadata)
+from app.config.database import Base, crear_engine
+from app.config.security import get_password_hash
+from app.models.cliente import Cliente
+from app.models.cuenta_contable import CuentaContable
+from app.models.factura import Factura
+from app.models.habitacion import Habitacion
+from app.models.pago import Pago
+from app.models.reserva import Reserva
+from app.models.transaccion import Transaccion
+from app.models.usuario import Usuario
+
+# tipo: (proporción, precio base, capacidad)
+TIPOS_HABITACION = {
+    "Simple": (0.35, 60.0, 1),
+    "Doble": (0.40, 95.0, 2),
+    "Familiar": (0.15, 140.0, 4),
+    "Suite": (0.10, 260.0, 3),
+}
+
+# Factor de ocupación por mes (temporada alta en verano y diciembre)
+ESTACIONALIDAD = {
+    1: 0.80, 2: 0.75, 3: 0.85, 4: 0.90, 5: 0.90, 6: 1.05,
+    7: 1.25, 8: 1.30, 9: 0.95, 10: 0.90, 11: 0.80, 12: 1.15,
+}
+
+METODOS_PAGO = (("tarjeta", 0.60), ("efectivo", 0.25), ("transferencia", 0.15))
+
+IVA = 0.15
+
+NOMBRES = (
+    "Ana", "Luis", "María", "José", "Carmen", "Juan", "Lucía", "Carlos", "Elena", "Pedro",
+    "Sofía", "Miguel", "Laura", "Diego", "Paula", "Andrés", "Valeria", "Jorge", "Camila", "Pablo",
+    "Isabel", "Fernando", "Daniela", "Ricardo", "Gabriela", "Sergio", "Natalia", "Manuel", "Andrea", "Raúl",
+)
+
+APELLIDOS = (
+    "García", "Rodríguez", "González", "Fernández", "López", "Martínez", "Sánchez", "Pérez", "Gómez", "Martín",
+    "Jiménez", "Ruiz", "Hernández", "Díaz", "Moreno", "Álvarez", "Muñoz", "Romero", "Alonso", "Gutiérrez",
+    "Navarro", "Torres", "Domínguez", "Vázquez", "Ramos", "Gil", "Ramírez", "Serrano", "Blanco", "Molina",
+)
+
+DOMINIOS = ("correo.com", "mail.com", "empresa.com", "hotmail.com", "gmail.com")
+
+# Plan de cuentas mínimo usado por los asientos de cobro
+CUENTAS = (
+    ("1.1.01", "Caja", "Activo"),
+    ("1.1.02", "Bancos", "Activo"),
+    ("2.1.01", "IVA por pagar", "Pasivo"),
+    ("4.1.01", "Ingresos por hospedaje", "Ingreso"),
+)
+
+
+class Lotes:
+    """Acumula filas por tabla y las inserta en bloques"""
+
+    def __init__(self, conexion, tamano: int):
+        self.conexion = conexion
+        self.tamano = tamano
+        self.pendientes = {}
+        self.totales = {}
+
+    def agregar(self, tabla, fila: dict) -> None:
+        filas = self.pendientes.setdefault(tabla, [])
+        filas.append(fila)
+        if len(filas) >= self.tamano:
+            self.vaciar(tabla)
+
+    def vaciar(self, tabla=None) -> None:
+        for actual in ([tabla] if tabla is not None else list(self.pendientes)):
+            filas = self.pendientes.get(actual)
+            if filas:
+                self.conexion.execute(actual.insert(), filas)
+                self.totales[actual.name] = self.totales.get(actual.name, 0) + len(filas)
+                filas.clear()
+
+
+def _elegir(rng: random.Random, opciones) -> str:
+    umbral = rng.random()
+    acumulado = 0.0
+    for valor, peso in opciones:
+        acumulado += peso
+        if umbral < acumulado:
+            return valor
+    return opciones[-1][0]
+
+
+def generar_habitaciones(rng: random.Random, lotes: Lotes, cantidad: int) -> list[tuple[int, float]]:
+    """Habitaciones numeradas por piso (piso * 100 + n); devuelve (id, precio)"""
+    tabla = Habitacion.__table__
+    por_piso = 40
+    habitaciones = []
+    tipos = [(tipo, datos[0]) for tipo, datos in TIPOS_HABITACION.items()]
+    for indice in range(cantidad):
+        tipo = _elegir(rng, tipos)
+        _, precio_base, capacidad = TIPOS_HABITACION[tipo]
+        precio = round(precio_base * rng.uniform(0.9, 1.2), 2)
+        id_habitacion = indice + 1
+        lotes.agregar(tabla, {
+            "id": id_habitacion,
+            "numero": str((indice // por_piso + 1) * 100 + indice % por_piso + 1),
+            "tipo": tipo,
+            "precio_noche": precio,
+            "capacidad": capacidad,
+            "caracteristicas": None,
+            "estado": "Disponible",
+            "activa": True,
+        })
+        habitaciones.append((id_habitacion, precio))
+    return habitaciones
+
+
+def generar_clientes(rng: random.Random, lotes: Lotes, cantidad: int) -> None:
+    """Clientes con identificación y email únicos"""
+    tabla = Cliente.__table__
+    for indice in range(1, cantidad + 1):
+        nombre = rng.choice(NOMBRES)
+        apellido = f"{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+        lotes.agregar(tabla, {
+            "id": indice,
+            "nombre": nombre,
+            "apellido": apellido,
+            "identificacion": f"{10000000 + indice}",
+            "email": f"{nombre.lower()}.{apellido.split()[0].lower()}.{indice}@{rng.choice(DOMINIOS)}",
+            "telefono": f"09{rng.randint(10000000, 99999999)}",
+            "direccion": None,
+        })
+
+
+def generar_cuentas(lotes: Lotes) -> dict[str, int]:
+    """Plan de cuentas; devuelve {codigo: id}"""
+    tabla = CuentaContable.__table__
+    ids = {}
+    for indice, (codigo, nombre, tipo) in enumerate(CUENTAS, start=1):
+        lotes.agregar(tabla, {"id": indice, "codigo": codigo, "nombre": nombre, "tipo": tipo, "activa": True})
+        ids[codigo] = indice
+    lotes.vaciar(tabla)
+    return ids
+
+
+def generar_reservas(
+    rng: random.Random,
+    lotes: Lotes,
+    habitaciones: list[tuple[int, float]],
+    num_clientes: int,
+    cuentas: dict[str, int],
+    anios: int,
+    ocupacion: float,
+    estancia_media: float
+) -> None:
+    """
+    Línea de tiempo por habitación: huecos exponenciales calibrados para la
+    ocupación de cada mes y estancias lognormales. Las reservas pasadas se
+    completan (con factura, pagos y asientos), las que cubren hoy están en
+    curso y las futuras confirmadas; una fracción se cancela.
+    """
+    hoy = date.today()
+    inicio = hoy - timedelta(days=365 * anios)
+    fin = hoy + timedelta(days=180)
+    sigma = 0.6
+    mu = math.log(estancia_media) - sigma ** 2 / 2
+    frecuentes = max(1, num_clientes // 20)
+
+    t_reservas, t_facturas = Reserva.__table__, Factura.__table__
+    t_pagos, t_transacciones = Pago.__table__, Transaccion.__table__
+    t_habitaciones = Habitacion.__table__
+
+    id_reserva = id_factura = 0
+    for id_habitacion, precio in habitaciones:
+        dia = inicio + timedelta(days=rng.randint(0, 10))
+        while dia < fin:
+            ocupacion_mes = min(0.97, ocupacion * ESTACIONALIDAD[dia.month])
+            dia += timedelta(days=int(rng.expovariate(ocupacion_mes / (estancia_media * (1 - ocupacion_mes)))))
+            noches = max(1, int(round(rng.lognormvariate(mu, sigma))))
+            entrada, salida = dia, dia + timedelta(days=noches)
+            dia = salida
+            if entrada >= fin:
+                break
+
+            # Huéspedes frecuentes: una cuarta parte de las reservas
+            if rng.random() < 0.25:
+                cliente_id = rng.randint(1, frecuentes)
+            else:
+                cliente_id = rng.randint(1, num_clientes)
+
+            if salida <= hoy:
+                estado = "Cancelada" if rng.random() < 0.05 else "Completada"
+            elif entrada <= hoy:
+                estado = "En_Curso"
+                lotes.conexion.execute(
+                    t_habitaciones.update().where(t_habitaciones.c.id == id_habitacion).values(estado="Ocupada")
+                )
+            else:
+                estado = "Cancelada" if rng.random() < 0.08 else "Confirmada"
+
+            id_reserva += 1
+            precio_total = round(precio * noches, 2)
+            antelacion = timedelta(days=int(rng.expovariate(1 / 21)))
+            lotes.agregar(t_reservas, {
+                "id": id_reserva,
+                "cliente_id": cliente_id,
+                "habitacion_id": id_habitacion,
+                "fecha_entrada": entrada,
+                "fecha_salida": salida,
+                "precio_total": precio_total,
+                "estado": estado,
+                "observaciones": None,
+                "created_at": datetime.combine(min(entrada - antelacion, hoy), hora(rng.randint(7, 22))),
+            })
+
+            if estado != "Completada":
+                continue
+
+            id_factura += 1
+            impuestos = round(precio_total * IVA, 2)
+            total = round(precio_total + impuestos, 2)
+            emision = datetime.combine(salida, hora(11))
+            lotes.agregar(t_facturas, {
+                "id": id_factura,
+                "numero_factura": f"F-{salida.year}-{id_factura:08d}",
+                "reserva_id": id_reserva,
+                "subtotal": precio_total,
+                "impuestos": impuestos,
+                "descuentos": 0.0,
+                "total": total,
+                "fecha_emision": emision,
+            })
+
+            # Pago único en la mayoría de los casos; a veces anticipo + saldo
+            partes = [total] if rng.random() < 0.85 else [round(total * 0.3, 2), round(total - round(total * 0.3, 2), 2)]
+            for monto in partes:
+                metodo = _elegir(rng, METODOS_PAGO)
+                lotes.agregar(t_pagos, {
+                    "factura_id": id_factura,
+                    "monto": monto,
+                    "metodo_pago": metodo,
+                    "referencia": None,
+                    "fecha_pago": emision,
+                })
+                lotes.agregar(t_transacciones, {
+                    "cuenta_id": cuentas["1.1.01" if metodo == "efectivo" else "1.1.02"],
+                    "tipo": "Débito",
+                    "concepto": f"Cobro factura F-{salida.year}-{id_factura:08d}",
+                    "monto": monto,
+                    "fecha_transaccion": salida,
+                    "referencia": f"FAC-{id_factura}",
+                })
+
+            for codigo, monto, concepto in (
+                ("4.1.01", precio_total, "Ingreso por hospedaje"),
+                ("2.1.01", impuestos, "IVA facturado"),
+            ):
+                lotes.agregar(t_transacciones, {
+                    "cuenta_id": cuentas[codigo],
+                    "tipo": "Crédito",
+                    "concepto": f"{concepto} F-{salida.year}-{id_factura:08d}",
+                    "monto": monto,
+                    "fecha_transaccion": salida,
+                    "referencia": f"FAC-{id_factura}",
+                })
+
+
+def generar_usuario(lotes: Lotes, usuario: str, clave: str) -> None:
+    """Usuario administrador con el que se autentican los benchmarks HTTP"""
+    lotes.agregar(Usuario.__table__, {
+        "username": usuario,
+        "nombre": "Benchmark",
+        "apellido": "Carga",
+        "email": f"{usuario}@bench.local",
+        "hashed_password": get_password_hash(clave),
+        "rol": "Administrador",
+        "activo": True,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="sqlite:///./bench_hotel.db")
+    parser.add_argument("--reiniciar", action="store_true", help="Borrar y recrear todas las tablas")
+    parser.add_argument("--habitaciones", type=int, default=2000)
+    parser.add_argument("--clientes", type=int, default=1000000)
+    parser.add_argument("--anios", type=int, default=5)
+    parser.add_argument("--ocupacion", type=float, default=0.72, help="Ocupación media anual")
+    parser.add_argument("--estancia-media", type=float, default=2.4, help="Noches medias por reserva")
+    parser.add_argument("--lote", type=int, default=10000)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--usuario", default="bench_admin")
+    parser.add_argument("--clave", default="bench_admin")
+    args = parser.parse_args()
+
+    motor = crear_engine(args.url)
+    if args.reiniciar:
+        Base.metadata.drop_all(bind=motor)
+    Base.metadata.create_all(bind=motor)
+
+    with motor.connect() as conexion:
+        if conexion.execute(select(func.count()).select_from(Habitacion.__table__)).scalar():
+            raise SystemExit("La base no está vacía: use --reiniciar o una URL nueva")
+
+    rng = random.Random(args.semilla)
+    inicio = time.perf_counter()
+    with motor.begin() as conexion:
+        lotes = Lotes(conexion, args.lote)
+        generar_usuario(lotes, args.usuario, args.clave)
+        cuentas = generar_cuentas(lotes)
+        habitaciones = generar_habitaciones(rng, lotes, args.habitaciones)
+        lotes.vaciar()
+        generar_clientes(rng, lotes, args.clientes)
+        lotes.vaciar()
+        generar_reservas(
+            rng, lotes, habitaciones, args.clientes, cuentas,
+            args.anios, args.ocupacion, args.estancia_media
+        )
+        lotes.vaciar()
+
+    print(f"Datos generados en {time.perf_counter() - inicio:.1f} s")
+    for tabla, total in sorted(lotes.totales.items()):
+        print(f"{tabla:<22}{total:>12,}")
+    motor.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Configuración común de las pruebas
+
+Cada sesión de pytest trabaja sobre una base SQLite temporal, con el
+programador de tareas apagado y los contadores de versión en un archivo
+propio, para no tocar los datos ni los procesos de una instancia local.
+"""
+
+import itertools
+import os
+import tempfile
+
+_CARPETA = tempfile.mkdtemp(prefix="hotel_pruebas_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_CARPETA, 'pruebas.db')}"
+os.environ.setdefault("DATABASE_REPLICA_URLS", "")
+os.environ["VERSIONES_ARCHIVO"] = os.path.join(_CARPETA, "versiones.bin")
+os.environ["PERFILADO_DIR"] = os.path.join(_CARPETA, "perfiles")
+os.environ["PROGRAMADOR_HABILITADO"] = "false"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.config.database import SessionLocal  # noqa: E402
+from app.config.presupuesto_consultas import presupuesto_ruta, rutas_sin_presupuesto  # noqa: E402
+from app.config.security import create_access_token, get_password_hash  # noqa: E402
+from app.config.versiones import versiones  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.cliente import Cliente  # noqa: E402
+from app.models.habitacion import Habitacion  # noqa: E402
+from app.models.usuario import Usuario  # noqa: E402
+
+_secuencia = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Cliente de la API con los eventos de arranque y parada ejecutados"""
+    with TestClient(app) as cliente:
+        yield cliente
+
+
+@pytest.fixture
+def db(client):
+    """Sesión de base de datos para preparar y comprobar datos"""
+    sesion = SessionLocal()
+    try:
+        yield sesion
+    finally:
+        sesion.close()
+
+
+@pytest.fixture(scope="session")
+def admin(client):
+    """Usuario administrador de las pruebas"""
+    sesion = SessionLocal()
+    try:
+        usuario = Usuario(
+            username="admin_pruebas",
+            nombre="Admin",
+            apellido="Pruebas",
+            email="admin@pruebas.com",
+            hashed_password=get_password_hash("admin_pruebas"),
+            rol="Administrador",
+            activo=True
+        )
+        sesion.add(usuario)
+        sesion.commit()
+        return usuario.username
+    finally:
+        sesion.close()
+
+
+@pytest.fixture(scope="session")
+def auth(admin):
+    """Cabeceras con un token de acceso del administrador"""
+    return {"Authorization": f"Bearer {create_access_token({'sub': admin, 'rol': 'Administrador'})}"}
+
+
+@pytest.fixture
+def crear_habitacion(db):
+    """Fábrica de habitaciones activas"""
+    def crear(tipo: str = "Doble", precio_noche: float = 100.0, estado: str = "Disponible") -> Habitacion:
+        habitacion = Habitacion(
+            numero=f"P{next(_secuencia)}",
+            tipo=tipo,
+            precio_noche=precio_noche,
+            capacidad=2,
+            estado=estado,
+            activa=True
+        )
+        db.add(habitacion)
+        db.commit()
+        db.refresh(habitacion)
+        # Inserción directa: el catálogo en memoria debe recargarse
+        versiones.incrementar("habitaciones")
+        return habitacion
+    return crear
+
+
+@pytest.fixture
+def crear_cliente(db):
+    """Fábrica de clientes"""
+    def crear() -> Cliente:
+        numero = next(_secuencia)
+        cliente = Cliente(
+            nombre="Huésped",
+            apellido=f"Prueba{numero}",
+            identificacion=f"ID{numero:08d}",
+            email=f"huesped{numero}@pruebas.com"
+        )
+        db.add(cliente)
+        db.commit()
+        db.refresh(cliente)
+        return cliente
+    return crear
+
+
+@pytest.fixture
+def presupuesto_consultas():
+    """
+    Devuelve ``presupuesto_ruta`` y comprueba antes que todos los endpoints
+    de la aplicación tengan presupuesto declarado
+    """
+    faltantes = rutas_sin_presupuesto(app)
+    if faltantes:
+        pytest.fail("Endpoints sin presupuesto de consultas: " + ", ".join(faltantes))
+    return presupuesto_ruta
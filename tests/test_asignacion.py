@@ -0,0 +1,99 @@
+"""
+Pruebas de reservas por tipo con asignación de habitaciones
+"""
+
+from datetime import date, timedelta
+
+from app.config.database import SessionLocal
+from app.repositories.habitacion_repository import habitacion_repository
+from app.schemas.reserva_schema import ReservaCreate
+from app.services.reserva_service import reserva_service
+
+
+def test_reserva_por_tipo_no_asigna_habitaciones_en_mantenimiento(client, auth, crear_habitacion, crear_cliente):
+    crear_habitacion(tipo="AsigMant", estado="Mantenimiento")
+    libre = crear_habitacion(tipo="AsigMant")
+    entrada = date.today() + timedelta(days=30)
+    datos = {
+        "cliente_id": crear_cliente().id,
+        "tipo": "AsigMant",
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": (entrada + timedelta(days=2)).isoformat()
+    }
+
+    respuesta = client.post("/reservas/reservas", headers=auth, json=datos)
+    assert respuesta.status_code == 200, respuesta.text
+    reserva_id = respuesta.json()["data"]["id"]
+    asignacion = client.get(f"/reservas/reservas/{reserva_id}/habitaciones", headers=auth).json()["data"]
+    assert asignacion["habitacion_ids"] == [libre.id]
+
+    # Con la única habitación vendible ocupada, no queda sitio
+    respuesta = client.post("/reservas/reservas", headers=auth, json=datos)
+    assert respuesta.status_code == 400
+
+
+def test_reserva_por_tipo_replanifica_si_otra_toma_la_habitacion(
+    client, auth, crear_habitacion, crear_cliente, monkeypatch
+):
+    habitaciones = {crear_habitacion(tipo="AsigCarrera").id, crear_habitacion(tipo="AsigCarrera").id}
+    entrada = date.today() + timedelta(days=40)
+    salida = entrada + timedelta(days=2)
+    tomadas = []
+    bloquear_filas = habitacion_repository.bloquear_filas
+
+    def bloquear_con_carrera(db, habitacion_ids):
+        # Antes de tomar las filas, otro worker vende con habitación fija la
+        # primera habitación del plan
+        if not tomadas:
+            tomadas.append(habitacion_ids[0])
+            otra = SessionLocal()
+            try:
+                reserva_service.create(otra, ReservaCreate(
+                    cliente_id=crear_cliente().id,
+                    habitacion_id=habitacion_ids[0],
+                    fecha_entrada=entrada,
+                    fecha_salida=salida
+                ))
+            finally:
+                otra.close()
+        return bloquear_filas(db, habitacion_ids)
+
+    monkeypatch.setattr(habitacion_repository, "bloquear_filas", bloquear_con_carrera)
+    respuesta = client.post("/reservas/reservas", headers=auth, json={
+        "cliente_id": crear_cliente().id,
+        "tipo": "AsigCarrera",
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": salida.isoformat()
+    })
+    assert respuesta.status_code == 200, respuesta.text
+
+    reserva_id = respuesta.json()["data"]["id"]
+    asignacion = client.get(f"/reservas/reservas/{reserva_id}/habitaciones", headers=auth).json()["data"]
+    assert asignacion["habitacion_ids"] == list(habitaciones - set(tomadas))
+
+
+def test_reoptimizacion_bloquea_las_habitaciones_del_tipo(db, crear_habitacion, crear_cliente, monkeypatch):
+    habitaciones = sorted([crear_habitacion(tipo="AsigNoche").id, crear_habitacion(tipo="AsigNoche").id])
+    vacia = crear_habitacion(tipo="AsigVacia").id
+    entrada = date.today() + timedelta(days=5)
+    reserva_service.create(db, ReservaCreate(
+        cliente_id=crear_cliente().id,
+        tipo="AsigNoche",
+        fecha_entrada=entrada,
+        fecha_salida=entrada + timedelta(days=2)
+    ))
+    bloqueos = []
+    bloquear_filas = habitacion_repository.bloquear_filas
+
+    def registrar(sesion, habitacion_ids):
+        bloqueos.append(sorted(habitacion_ids))
+        return bloquear_filas(sesion, habitacion_ids)
+
+    monkeypatch.setattr(habitacion_repository, "bloquear_filas", registrar)
+    resultados = reserva_service.reoptimizar_asignaciones(db)
+
+    assert habitaciones in bloqueos
+    assert "AsigNoche" in {r.tipo for r in resultados}
+    # Un tipo sin estancias movibles no se recalcula ni se bloquea
+    assert "AsigVacia" not in {r.tipo for r in resultados}
+    assert not any(vacia in ids for ids in bloqueos)
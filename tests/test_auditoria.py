@@ -0,0 +1,12 @@
+"""
+Pruebas de la auditoría nocturna
+"""
+
+
+def test_cierre_sin_recargar_la_auditoria_en_cada_paso(client, auth, presupuesto_consultas):
+    with presupuesto_consultas("POST", "/auditoria/ejecutar"):
+        respuesta = client.post("/auditoria/ejecutar", headers=auth)
+    assert respuesta.status_code == 200
+    auditorias = respuesta.json()["data"]
+    assert auditorias
+    assert all(a["paso"] == 4 for a in auditorias)
@@ -0,0 +1,74 @@
+"""
+Pruebas de bloqueos temporales de habitación
+"""
+
+from datetime import date, timedelta
+
+
+def _fechas(dias: int = 40):
+    entrada = date.today() + timedelta(days=dias)
+    return entrada.isoformat(), (entrada + timedelta(days=2)).isoformat()
+
+
+def test_crear_y_confirmar_bloqueo(client, auth, crear_habitacion, crear_cliente):
+    habitacion = crear_habitacion(precio_noche=80.0)
+    cliente = crear_cliente()
+    entrada, salida = _fechas()
+
+    respuesta = client.post("/reservas/bloqueos", headers=auth, json={
+        "habitacion_id": habitacion.id,
+        "fecha_entrada": entrada,
+        "fecha_salida": salida,
+        "cliente_id": cliente.id
+    })
+    assert respuesta.status_code == 200, respuesta.text
+    bloqueo = respuesta.json()["data"]
+
+    respuesta = client.post(f"/reservas/bloqueos/{bloqueo['token']}/confirmar", headers=auth, json={})
+    assert respuesta.status_code == 200, respuesta.text
+    reserva = respuesta.json()["data"]
+    assert reserva["habitacion_id"] == habitacion.id
+    assert reserva["precio_total"] == bloqueo["precio_total"]
+
+    # El bloqueo desaparece al confirmarse
+    respuesta = client.post(f"/reservas/bloqueos/{bloqueo['token']}/confirmar", headers=auth, json={})
+    assert respuesta.status_code == 404
+
+
+def test_bloqueo_impide_otra_reserva(client, auth, crear_habitacion, crear_cliente):
+    habitacion = crear_habitacion()
+    entrada, salida = _fechas(50)
+    respuesta = client.post("/reservas/bloqueos", headers=auth, json={
+        "habitacion_id": habitacion.id,
+        "fecha_entrada": entrada,
+        "fecha_salida": salida
+    })
+    assert respuesta.status_code == 200, respuesta.text
+
+    respuesta = client.post("/reservas/reservas", headers=auth, json={
+        "cliente_id": crear_cliente().id,
+        "habitacion_id": habitacion.id,
+        "fecha_entrada": entrada,
+        "fecha_salida": salida
+    })
+    assert respuesta.status_code == 400
+
+
+def test_disponibilidad_por_tipo_resta_los_bloqueos(client, auth, crear_habitacion, crear_cliente):
+    habitacion = crear_habitacion(tipo="SuiteBloqueo")
+    entrada, salida = _fechas(70)
+    consulta = {"tipo": "SuiteBloqueo", "fecha_entrada": entrada, "fecha_salida": salida}
+    assert client.get("/inventario/disponibilidad", headers=auth, params=consulta).json()["data"]["disponibles"] == 1
+
+    respuesta = client.post("/reservas/bloqueos", headers=auth, json={
+        "habitacion_id": habitacion.id,
+        "fecha_entrada": entrada,
+        "fecha_salida": salida
+    })
+    assert respuesta.status_code == 200, respuesta.text
+
+    disponibilidad = client.get("/inventario/disponibilidad", headers=auth, params=consulta).json()["data"]
+    assert disponibilidad["disponibles"] == 0
+    assert disponibilidad["vendible"] is False
+    respuesta = client.post("/reservas/reservas", headers=auth, json={"cliente_id": crear_cliente().id, **consulta})
+    assert respuesta.status_code == 400
@@ -0,0 +1,55 @@
+"""
+Pruebas del calendario de tarifas compilado
+"""
+
+from datetime import date, timedelta
+
+from app.services.calendario_tarifas import calendario_tarifas
+
+
+def test_reservar_no_recompila_la_tabla_de_tarifas(client, auth, db, crear_habitacion, crear_cliente):
+    habitacion = crear_habitacion(precio_noche=90.0)
+    cliente = crear_cliente()
+    entrada = date.today() + timedelta(days=20)
+    salida = entrada + timedelta(days=2)
+    tabla = calendario_tarifas.tabla(db, entrada, salida)
+    assert tabla.total(habitacion.id, entrada, salida) == 18000
+
+    respuesta = client.post("/reservas/reservas", headers=auth, json={
+        "cliente_id": cliente.id,
+        "habitacion_id": habitacion.id,
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": salida.isoformat()
+    })
+    assert respuesta.status_code == 200, respuesta.text
+
+    assert calendario_tarifas.tabla(db, entrada, salida) is tabla
+
+
+def test_cambiar_el_precio_recompila_la_tabla(client, auth, db, crear_habitacion):
+    habitacion = crear_habitacion(precio_noche=90.0)
+    entrada = date.today() + timedelta(days=20)
+    salida = entrada + timedelta(days=1)
+    calendario_tarifas.tabla(db, entrada, salida)
+
+    respuesta = client.put(f"/habitaciones/habitaciones/{habitacion.id}", headers=auth, json={"precio_noche": 110.0})
+    assert respuesta.status_code == 200, respuesta.text
+
+    assert calendario_tarifas.tabla(db, entrada, salida).total(habitacion.id, entrada, salida) == 11000
+
+
+def test_cotizar_lote_ignora_el_estado_de_esta_noche(client, auth, crear_habitacion):
+    ocupada = crear_habitacion(tipo="CotizaLote", estado="Ocupada")
+    crear_habitacion(tipo="CotizaLote", estado="Mantenimiento")
+    entrada = date.today() + timedelta(days=30)
+
+    respuesta = client.post("/tarifas/cotizaciones/lote", headers=auth, json={
+        "estadias": [{
+            "fecha_entrada": entrada.isoformat(),
+            "fecha_salida": (entrada + timedelta(days=2)).isoformat(),
+            "tipo": "CotizaLote"
+        }]
+    })
+    assert respuesta.status_code == 200, respuesta.text
+    estadia = respuesta.json()["data"][0]
+    assert [o["habitacion_id"] for o in estadia["opciones"]] == [ocupada.id]
@@ -0,0 +1,34 @@
+"""
+Pruebas del catálogo de habitaciones en memoria
+"""
+
+from app.config.versiones import versiones
+from app.repositories.habitacion_repository import habitacion_repository
+from app.services.catalogo_habitaciones import catalogo_habitaciones
+from app.services.habitacion_service import habitacion_service
+
+
+def test_cambio_de_estado_no_cambia_la_version_del_catalogo(db, crear_habitacion):
+    habitacion = crear_habitacion()
+    antes = catalogo_habitaciones.instantanea(db)
+
+    habitacion_service.cambiar_estado(db, habitacion.id, "Reservada")
+
+    despues = catalogo_habitaciones.instantanea(db)
+    assert despues.version == antes.version == versiones.leer("habitaciones")[0]
+    assert despues.por_id[habitacion.id].estado == "Reservada"
+
+
+def test_estado_cambiado_por_otro_worker_se_relee_sin_recargar(db, crear_habitacion):
+    habitacion, otra = crear_habitacion(), crear_habitacion()
+    antes = catalogo_habitaciones.instantanea(db)
+
+    # Otro worker: UPDATE y versión de estados, sin pasar por este catálogo
+    habitacion_repository.actualizar_estado(db, habitacion.id, "Ocupada")
+    versiones.incrementar("estados_habitacion")
+
+    despues = catalogo_habitaciones.instantanea(db)
+    assert despues.por_id[habitacion.id].estado == "Ocupada"
+    assert despues.version == antes.version
+    # Las habitaciones sin cambios conservan su copia: no hubo recarga completa
+    assert despues.por_id[otra.id] is antes.por_id[otra.id]
@@ -0,0 +1,92 @@
+"""
+Pruebas del registro de consultas lentas
+"""
+
+from collections import deque
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.config import consultas_lentas
+
+
+@pytest.fixture
+def motor(tmp_path, monkeypatch):
+    """Motor SQLite con el registro activo y un buffer propio"""
+    monkeypatch.setattr(consultas_lentas, "registros", deque(maxlen=3))
+    consultas_lentas.limpiar()
+    motor = create_engine(f"sqlite:///{tmp_path / 'registro.db'}")
+    with motor.begin() as conn:
+        conn.execute(text("CREATE TABLE huespedes (id INTEGER, nombre TEXT)"))
+    consultas_lentas.registrar(motor)
+    yield motor
+    motor.dispose()
+    consultas_lentas.limpiar()
+
+
+def test_solo_se_registran_las_consultas_sobre_el_umbral(motor, monkeypatch):
+    monkeypatch.setattr(consultas_lentas, "SLOW_QUERY_MS", 60_000)
+    with motor.connect() as conn:
+        conn.execute(text("SELECT * FROM huespedes WHERE id = :id"), {"id": 1})
+    assert consultas_lentas.obtener() == []
+
+    monkeypatch.setattr(consultas_lentas, "SLOW_QUERY_MS", 0)
+    with motor.connect() as conn:
+        conn.execute(text("SELECT * FROM huespedes WHERE nombre = :nombre"), {"nombre": "Ana Lopez"})
+    [registro] = consultas_lentas.obtener()
+    assert registro["sql"] == "SELECT * FROM huespedes WHERE nombre = ?"
+    # Tipos, no valores: el registro no guarda datos personales
+    assert registro["parametros"] == ["str"]
+    assert registro["plan"] and "huespedes" in registro["plan"][0]
+
+
+def test_el_buffer_conserva_las_mas_recientes(motor, monkeypatch):
+    monkeypatch.setattr(consultas_lentas, "SLOW_QUERY_MS", 0)
+    with motor.connect() as conn:
+        for i in range(5):
+            conn.execute(text(f"SELECT id AS c{i} FROM huespedes"))
+    assert [r["sql"] for r in consultas_lentas.obtener()] == [
+        f"SELECT id AS c{i} FROM huespedes" for i in (4, 3, 2)
+    ]
+
+
+def test_explain_una_vez_por_forma_de_sentencia(motor, monkeypatch):
+    monkeypatch.setattr(consultas_lentas, "SLOW_QUERY_MS", 0)
+    explicadas = []
+    explicar = consultas_lentas._explicar
+
+    def registrar_explain(conn, cursor, sentencia, parametros, executemany):
+        explicadas.append(sentencia)
+        return explicar(conn, cursor, sentencia, parametros, executemany)
+
+    monkeypatch.setattr(consultas_lentas, "_explicar", registrar_explain)
+    with motor.connect() as conn:
+        for i in range(3):
+            conn.execute(text("SELECT * FROM huespedes WHERE id = :id"), {"id": i})
+        conn.execute(text("SELECT nombre FROM huespedes"))
+
+    assert len(explicadas) == 2
+    planes = [r["plan"] for r in consultas_lentas.obtener()]
+    assert planes[1] == planes[2]
+
+
+def test_explain_fallido_no_afecta_a_la_transaccion(tmp_path):
+    motor = create_engine(f"sqlite:///{tmp_path / 'lentas.db'}")
+    with motor.begin() as conn:
+        conn.execute(text("CREATE TABLE registros (id INTEGER)"))
+
+    with motor.connect() as conn:
+        conn.execute(text("INSERT INTO registros VALUES (1)"))
+        conexion = conn.connection.dbapi_connection
+        sentencias = []
+        conexion.set_trace_callback(sentencias.append)
+        plan = consultas_lentas._explicar(conn, conexion.cursor(), "SELECT * FROM no_existe", (), False)
+        conexion.set_trace_callback(None)
+        conn.commit()
+
+    assert plan[0].startswith("Error al obtener el plan")
+    assert sentencias[0] == "SAVEPOINT plan_consulta_lenta"
+    assert "ROLLBACK TO SAVEPOINT plan_consulta_lenta" in sentencias
+    with motor.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM registros")).scalar() == 1
+    motor.dispose()
@@ -0,0 +1,35 @@
+"""
+Pruebas del balance contable
+"""
+
+from datetime import date
+
+from app.models.cuenta_contable import CuentaContable
+from app.models.transaccion import Transaccion
+
+
+def test_balance_con_y_sin_rango_de_fechas(client, auth, db):
+    cuenta = CuentaContable(codigo="9.9.01", nombre="Cuenta de pruebas", tipo="ingreso")
+    db.add(cuenta)
+    db.flush()
+    db.add_all([
+        Transaccion(cuenta_id=cuenta.id, tipo="ingreso", concepto="Hospedaje", monto=500.0,
+                    fecha_transaccion=date(2001, 3, 10)),
+        Transaccion(cuenta_id=cuenta.id, tipo="egreso", concepto="Lavandería", monto=200.0,
+                    fecha_transaccion=date(2001, 3, 20))
+    ])
+    db.commit()
+
+    resp = client.get("/contabilidad/balance", headers=auth, params={
+        "fecha_desde": "2001-03-01", "fecha_hasta": "2001-03-15"
+    })
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["data"]["total_ingresos"] == 500.0
+    assert resp.json()["data"]["total_egresos"] == 0.0
+
+    resp = client.get("/contabilidad/balance", headers=auth)
+    assert resp.status_code == 200, resp.text
+    balance = resp.json()["data"]
+    assert balance["total_ingresos"] >= 500.0
+    assert balance["total_egresos"] >= 200.0
+    assert balance["periodo"] == {"desde": None, "hasta": None}
@@ -0,0 +1,150 @@
+"""
+Pruebas de la configuración de la base de datos
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import QueuePool
+
+from app.config import database
+from app.models.cliente import Cliente
+from app.models.factura import Factura
+from app.models.habitacion import Habitacion
+
+def _pragma(conexion, nombre: str):
+    return conexion.exec_driver_sql(f"PRAGMA {nombre}").scalar()
+
+
+def test_conexiones_sqlite_aplican_los_pragmas_del_entorno(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "SQLITE_SYNCHRONOUS", "FULL")
+    monkeypatch.setattr(database, "SQLITE_CACHE_SIZE", -2000)
+    monkeypatch.setattr(database, "SQLITE_BUSY_TIMEOUT", 1234)
+    motor = database.crear_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+    try:
+        with motor.connect() as conexion:
+            assert _pragma(conexion, "journal_mode") == "wal"
+            assert _pragma(conexion, "synchronous") == 2  # FULL
+            assert _pragma(conexion, "cache_size") == -2000
+            assert _pragma(conexion, "busy_timeout") == 1234
+            assert _pragma(conexion, "query_only") == 0
+    finally:
+        motor.dispose()
+
+
+def test_replica_sqlite_es_de_solo_lectura_y_memoria_sin_wal(tmp_path):
+    replica = database.crear_engine(f"sqlite:///{tmp_path / 'replica.db'}", solo_lectura=True)
+    memoria = database.crear_engine("sqlite://")
+    try:
+        with replica.connect() as conexion:
+            assert _pragma(conexion, "query_only") == 1
+        with memoria.connect() as conexion:
+            assert _pragma(conexion, "journal_mode") == "memory"
+    finally:
+        replica.dispose()
+        memoria.dispose()
+
+
+def test_motores_servidor_usan_el_pool_del_entorno(monkeypatch):
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 20)
+    monkeypatch.setattr(database, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(database, "DB_POOL_TIMEOUT", 3)
+    monkeypatch.setattr(database, "DB_POOL_RECYCLE", 600)
+    monkeypatch.setattr(database, "DB_POOL_PRE_PING", False)
+
+    assert database.engine_kwargs("postgresql://hotel@db/hotel") == {
+        "pool_size": 20,
+        "max_overflow": 0,
+        "pool_timeout": 3,
+        "pool_recycle": 600,
+        "pool_pre_ping": False
+    }
+    # SQLite no admite esas opciones con su pool por defecto
+    assert "pool_size" not in database.engine_kwargs("sqlite:///hotel.db")
+
+
+def test_estado_del_pool_cuenta_las_conexiones_en_uso(tmp_path):
+    motor = database.crear_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=2, max_overflow=1
+    )
+    try:
+        with motor.connect():
+            estado = database.get_pool_status(motor)
+        assert estado["motor"] == "sqlite"
+        assert estado["pool"] == "QueuePool"
+        assert (estado["size"], estado["checkedout"]) == (2, 1)
+        assert database.get_pool_status(motor)["checkedout"] == 0
+    finally:
+        motor.dispose()
+
+
+# Tabla reservas tal como la creaba la versión anterior a las reservas por tipo
+RESERVAS_ANTERIOR = """
+CREATE TABLE reservas (
+    id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    cliente_id INTEGER NOT NULL REFERENCES clientes (id),
+    habitacion_id INTEGER NOT NULL REFERENCES habitaciones (id),
+    fecha_entrada DATE NOT NULL,
+    fecha_salida DATE NOT NULL,
+    precio_total FLOAT NOT NULL,
+    estado VARCHAR(20) NOT NULL,
+    observaciones TEXT,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP),
+    updated_at DATETIME,
+    CONSTRAINT check_fechas_validas CHECK (fecha_salida > fecha_entrada)
+)
+"""
+
+
+def test_init_db_actualiza_una_tabla_reservas_anterior(tmp_path):
+    motor = create_engine(f"sqlite:///{tmp_path / 'anterior.db'}")
+    with motor.begin() as conexion:
+        database.Base.metadata.create_all(conexion, tables=[Cliente.__table__, Habitacion.__table__])
+        conexion.exec_driver_sql(RESERVAS_ANTERIOR)
+        conexion.exec_driver_sql("CREATE INDEX ix_reservas_id ON reservas (id)")
+        Factura.__table__.create(conexion)
+        conexion.exec_driver_sql(
+            "INSERT INTO clientes (id, nombre, apellido, identificacion, email) "
+            "VALUES (1, 'Ana', 'Lopez', 'ANT-1', 'ana@anterior.com')"
+        )
+        conexion.exec_driver_sql(
+            "INSERT INTO habitaciones (id, numero, tipo, precio_noche, capacidad, estado, activa) "
+            "VALUES (1, '101', 'Doble', 80, 2, 'Disponible', 1)"
+        )
+        conexion.exec_driver_sql(
+            "INSERT INTO reservas (id, cliente_id, habitacion_id, fecha_entrada, fecha_salida, precio_total, estado) "
+            "VALUES (7, 1, 1, '2026-01-10', '2026-01-12', 160, 'Confirmada')"
+        )
+
+    database.init_db(motor)
+    # Una segunda ejecución no cambia nada
+    database.init_db(motor)
+
+    inspector = inspect(motor)
+    columnas = {c["name"]: c for c in inspector.get_columns("reservas")}
+    assert {"tipo", "cantidad", "grupo_id"} <= set(columnas)
+    assert columnas["habitacion_id"]["nullable"]
+    assert {"ix_reservas_tipo", "ix_reservas_grupo_id", "ix_reservas_estado_entrada"} <= {
+        i["name"] for i in inspector.get_indexes("reservas")
+    }
+    assert not inspector.has_table("reservas_anterior")
+    assert [c["referred_table"] for c in inspector.get_foreign_keys("facturas")] == ["reservas"]
+    assert "grupos_reserva" in {c["referred_table"] for c in inspector.get_foreign_keys("reservas")}
+
+    with motor.begin() as conexion:
+        fila = conexion.exec_driver_sql(
+            "SELECT habitacion_id, fecha_entrada, cantidad FROM reservas WHERE id = 7"
+        ).one()
+        assert (fila[0], fila[1], fila[2]) == (1, str(date(2026, 1, 10)), 1)
+        # Reserva por tipo, sin habitación
+        conexion.exec_driver_sql(
+            "INSERT INTO reservas (cliente_id, tipo, fecha_entrada, fecha_salida, precio_total, estado) "
+            "VALUES (1, 'Doble', '2026-02-01', '2026-02-03', 160, 'Confirmada')"
+        )
+    with pytest.raises(IntegrityError), motor.begin() as conexion:
+        conexion.exec_driver_sql(
+            "INSERT INTO reservas (cliente_id, fecha_entrada, fecha_salida, precio_total, estado) "
+            "VALUES (1, '2026-02-01', '2026-02-03', 160, 'Confirmada')"
+        )
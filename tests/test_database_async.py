@@ -0,0 +1,74 @@
+"""
+Pruebas del modo asíncrono de la base de datos
+"""
+
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import database
+from app.models.reserva import Reserva
+from app.repositories.habitacion_repository import async_habitacion_repository, habitacion_repository
+
+
+def test_url_async_usa_el_driver_asincrono_equivalente():
+    assert database.url_async("sqlite:///./hotel.db") == "sqlite+aiosqlite:///./hotel.db"
+    assert database.url_async("postgresql://u:c@db/hotel") == "postgresql+asyncpg://u:c@db/hotel"
+    assert database.url_async("mysql+pymysql://u:c@db/hotel") == "mysql+aiomysql://u:c@db/hotel"
+    # Un driver ya asíncrono (o desconocido) no se toca
+    assert database.url_async("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+
+def test_motor_asincrono_aplica_los_pragmas_y_expone_su_pool(tmp_path):
+    async def consultar():
+        motor = database.crear_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+        try:
+            async with motor.connect() as conexion:
+                modo = (await conexion.exec_driver_sql("PRAGMA journal_mode")).scalar()
+                espera = (await conexion.exec_driver_sql("PRAGMA busy_timeout")).scalar()
+                estado = database.get_pool_status(motor.sync_engine)
+            return modo, espera, estado
+        finally:
+            await motor.dispose()
+
+    modo, espera, estado = asyncio.run(consultar())
+    assert modo == "wal"
+    assert espera == database.SQLITE_BUSY_TIMEOUT
+    assert estado["motor"] == "sqlite"
+
+
+def test_sesion_asincrona_requiere_db_async(monkeypatch):
+    monkeypatch.setattr(database, "AsyncSessionLocal", None)
+    with pytest.raises(RuntimeError):
+        asyncio.run(anext(database.get_async_db()))
+
+
+def test_disponibilidad_asincrona_coincide_con_la_sincrona(db, crear_habitacion, crear_cliente):
+    libre, ocupada = crear_habitacion(tipo="AsyncDisp"), crear_habitacion(tipo="AsyncDisp")
+    entrada = date.today() + timedelta(days=150)
+    salida = entrada + timedelta(days=2)
+    db.add(Reserva(
+        cliente_id=crear_cliente().id,
+        habitacion_id=ocupada.id,
+        fecha_entrada=entrada,
+        fecha_salida=salida,
+        precio_total=200,
+        estado="Confirmada"
+    ))
+    db.commit()
+
+    async def consultar():
+        motor = database.crear_async_engine(database.url_async(database.DATABASE_URL))
+        try:
+            async with async_sessionmaker(bind=motor)() as sesion:
+                return await async_habitacion_repository.get_disponibles_por_fechas(
+                    sesion, entrada, salida, "AsyncDisp"
+                )
+        finally:
+            await motor.dispose()
+
+    sincronas = habitacion_repository.get_disponibles_por_fechas(db, entrada, salida, "AsyncDisp")
+    asincronas = asyncio.run(consultar())
+    assert [h.id for h in asincronas] == [h.id for h in sincronas] == [libre.id]
@@ -0,0 +1,177 @@
+"""
+Pruebas de la detección y fusión de clientes duplicados
+"""
+
+from datetime import date, timedelta
+
+from app.models.bloqueo_habitacion import BloqueoHabitacion
+from app.config.database import Base
+from app.models.cliente import Cliente
+from app.models.grupo_reserva import GrupoReserva
+from app.models.lista_espera import ListaEspera
+from app.models.reserva import Reserva
+from app.repositories.clave_deduplicacion_repository import clave_deduplicacion_repository
+from app.repositories.cliente_repository import cliente_repository
+from app.services.deduplicacion_service import REFERENCIAS_CLIENTE, deduplicacion_service
+
+
+def _cliente(id: int, nombre: str, apellido: str, telefono: str = None, identificacion: str = None) -> Cliente:
+    return Cliente(id=id, nombre=nombre, apellido=apellido, telefono=telefono, identificacion=identificacion)
+
+
+def test_documentos_distintos_no_son_duplicados():
+    a = deduplicacion_service._perfil(_cliente(1, "Juan", "Perez", "0991234567", "1"))
+    b = deduplicacion_service._perfil(_cliente(2, "Juan", "Perez", "0991234567", "2"))
+    mismo = deduplicacion_service._perfil(_cliente(3, "Juan", "Perez", "0991234567", "1"))
+
+    assert deduplicacion_service._puntaje(a, b) == 0.0
+    assert deduplicacion_service._puntaje(a, mismo) == 1.0
+
+
+def test_par_lejano_en_bloque_grande_se_compara_en_el_bloque_pequeno(db, monkeypatch):
+    # Comparten el bloque grande del apellido (solo compara vecinos, y entre
+    # ellos quedan 15 clientes) y el bloque de su teléfono
+    a = _cliente(1, "Juan", "Perez", "0991234567")
+    b = _cliente(2, "Juan", "Perez Zz", "0991234567")
+    entre = [_cliente(10 + i, "Juan", f"Perez Q{i:02d}") for i in range(15)]
+    antes = [_cliente(100 + i, "Juan", f"Perez A{i:02d}") for i in range(40)]
+    clientes = {c.id: c for c in [a, b] + entre + antes}
+    bloque_grande = sorted(clientes)
+    assert len(bloque_grande) > deduplicacion_service.MAX_BLOQUE
+
+    monkeypatch.setattr(clave_deduplicacion_repository, "iter_paginas", lambda db: iter([[
+        ("ape:perez|j", bloque_grande),
+        ("tel:991234567", [a.id, b.id]),
+    ]]))
+    monkeypatch.setattr(cliente_repository, "get_by_ids", lambda db, ids: [clientes[i] for i in ids])
+
+    pares = [(p.cliente_a_id, p.cliente_b_id) for p in deduplicacion_service.buscar_duplicados(db)]
+    assert pares.count((a.id, b.id)) == 1
+
+
+def test_cada_pagina_de_bloques_carga_sus_clientes_una_vez(db, monkeypatch):
+    clientes = {c.id: c for c in [
+        _cliente(1, "Ana", "Lopez", "0990000001"),
+        _cliente(2, "Ana", "Lopez", "0990000001"),
+        _cliente(3, "Luis", "Mora", "0990000003"),
+        _cliente(4, "Luis", "Mora", "0990000003"),
+    ]}
+    monkeypatch.setattr(clave_deduplicacion_repository, "iter_paginas", lambda db: iter([[
+        ("ape:lopez|a", [1, 2]),
+        ("ape:mora|l", [3, 4]),
+        ("tel:990000001", [1, 2]),
+    ]]))
+    cargas = []
+
+    def get_by_ids(db, ids):
+        cargas.append(ids)
+        return [clientes[i] for i in ids]
+
+    monkeypatch.setattr(cliente_repository, "get_by_ids", get_by_ids)
+
+    pares = [(p.cliente_a_id, p.cliente_b_id) for p in deduplicacion_service.buscar_duplicados(db)]
+    assert sorted(pares) == [(1, 2), (3, 4)]
+    assert cargas == [[1, 2, 3, 4]]
+
+
+def test_fusion_cubre_todas_las_referencias_a_clientes():
+    # Las claves de deduplicación son una tabla de trabajo que se regenera
+    referencias = {
+        fk.parent.table.name
+        for tabla in Base.metadata.tables.values()
+        for fk in tabla.foreign_keys
+        if fk.column.table.name == "clientes" and fk.ondelete != "CASCADE"
+    }
+    assert referencias == {repositorio.model.__tablename__ for repositorio in REFERENCIAS_CLIENTE}
+
+
+def test_fusion_pasa_las_reservas_al_destino(client, auth, db, crear_habitacion, crear_cliente):
+    destino_id, origen_id = crear_cliente().id, crear_cliente().id
+    entrada = date.today() + timedelta(days=90)
+    respuesta = client.post("/reservas/reservas", headers=auth, json={
+        "cliente_id": origen_id,
+        "habitacion_id": crear_habitacion().id,
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": (entrada + timedelta(days=1)).isoformat()
+    })
+    reserva_id = respuesta.json()["data"]["id"]
+
+    respuesta = client.post(
+        f"/clientes/clientes/{destino_id}/fusionar",
+        headers=auth,
+        json={"clientes_origen_ids": [origen_id]}
+    )
+    assert respuesta.status_code == 200, respuesta.text
+
+    db.expire_all()
+    assert db.get(Reserva, reserva_id).cliente_id == destino_id
+    assert db.get(Cliente, origen_id) is None
+
+
+def test_fusion_pasa_la_lista_de_espera_al_destino(client, auth, db, crear_cliente):
+    destino_id, origen_id = crear_cliente().id, crear_cliente().id
+    entrada = date.today() + timedelta(days=90)
+    respuesta = client.post("/lista-espera", headers=auth, json={
+        "cliente_id": origen_id,
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": (entrada + timedelta(days=1)).isoformat()
+    })
+    inscripcion_id = respuesta.json()["data"]["id"]
+
+    respuesta = client.post(
+        f"/clientes/clientes/{destino_id}/fusionar",
+        headers=auth,
+        json={"clientes_origen_ids": [origen_id]}
+    )
+    assert respuesta.status_code == 200, respuesta.text
+
+    db.expire_all()
+    assert db.get(ListaEspera, inscripcion_id).cliente_id == destino_id
+
+
+def test_fusion_pasa_los_bloqueos_al_destino(client, auth, db, crear_habitacion, crear_cliente):
+    destino_id, origen_id = crear_cliente().id, crear_cliente().id
+    entrada = date.today() + timedelta(days=90)
+    respuesta = client.post("/reservas/bloqueos", headers=auth, json={
+        "cliente_id": origen_id,
+        "habitacion_id": crear_habitacion().id,
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": (entrada + timedelta(days=1)).isoformat()
+    })
+    token = respuesta.json()["data"]["token"]
+
+    respuesta = client.post(
+        f"/clientes/clientes/{destino_id}/fusionar",
+        headers=auth,
+        json={"clientes_origen_ids": [origen_id]}
+    )
+    assert respuesta.status_code == 200, respuesta.text
+
+    db.expire_all()
+    assert db.query(BloqueoHabitacion).filter_by(token=token).one().cliente_id == destino_id
+
+
+def test_fusion_pasa_los_grupos_al_destino(client, auth, db, crear_habitacion, crear_cliente):
+    destino_id, origen_id = crear_cliente().id, crear_cliente().id
+    entrada = date.today() + timedelta(days=90)
+    respuesta = client.post("/reservas/grupos", headers=auth, json={
+        "cliente_id": origen_id,
+        "nombre": "Congreso",
+        "habitacion_ids": [crear_habitacion().id, crear_habitacion().id],
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": (entrada + timedelta(days=2)).isoformat()
+    })
+    assert respuesta.status_code == 200, respuesta.text
+    grupo_id = respuesta.json()["data"]["id"]
+
+    respuesta = client.post(
+        f"/clientes/clientes/{destino_id}/fusionar",
+        headers=auth,
+        json={"clientes_origen_ids": [origen_id]}
+    )
+    assert respuesta.status_code == 200, respuesta.text
+
+    db.expire_all()
+    grupo = db.get(GrupoReserva, grupo_id)
+    assert grupo.cliente_id == destino_id
+    assert {reserva.cliente_id for reserva in grupo.reservas} == {destino_id}
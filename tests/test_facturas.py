@@ -0,0 +1,74 @@
+"""
+Pruebas de facturación
+"""
+
+from datetime import date, timedelta
+
+from app.models.pago import Pago
+from app.repositories.factura_repository import factura_repository
+
+
+def _facturar(client, auth, habitacion_id: int, cliente_id: int, dias: int) -> dict:
+    entrada = date.today() + timedelta(days=dias)
+    respuesta = client.post("/reservas/reservas", headers=auth, json={
+        "cliente_id": cliente_id,
+        "habitacion_id": habitacion_id,
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": (entrada + timedelta(days=1)).isoformat()
+    })
+    assert respuesta.status_code == 200, respuesta.text
+    respuesta = client.post("/facturas/facturas", headers=auth, json={"reserva_id": respuesta.json()["data"]["id"]})
+    assert respuesta.status_code == 200, respuesta.text
+    return respuesta.json()["data"]
+
+
+def _numero(factura: dict) -> int:
+    return int(factura["numero_factura"].split("-")[1])
+
+
+def test_actualizar_descuentos_recalcula_el_total(client, auth, crear_habitacion, crear_cliente):
+    factura = _facturar(client, auth, crear_habitacion(precio_noche=200.0).id, crear_cliente().id, 110)
+    bruto = factura["subtotal"] + factura["impuestos"]
+
+    resp = client.put(f"/facturas/facturas/{factura['id']}", json={"descuentos": 30})
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["data"]["descuentos"] == 30
+    assert resp.json()["data"]["total"] == bruto - 30
+
+    for descuentos in (-1, bruto + 1):
+        resp = client.put(f"/facturas/facturas/{factura['id']}", json={"descuentos": descuentos})
+        assert resp.status_code == 400
+    assert client.put("/facturas/facturas/999999", json={"descuentos": 1}).status_code == 404
+
+
+def test_eliminar_factura_con_pagos_se_rechaza(client, auth, db, crear_habitacion, crear_cliente):
+    habitacion_id, cliente_id = crear_habitacion().id, crear_cliente().id
+    sin_pagos = _facturar(client, auth, habitacion_id, cliente_id, 112)
+    con_pagos = _facturar(client, auth, habitacion_id, cliente_id, 114)
+    db.add(Pago(factura_id=con_pagos["id"], monto=10.0, metodo_pago="efectivo"))
+    db.commit()
+
+    assert client.delete(f"/facturas/facturas/{con_pagos['id']}").status_code == 400
+    assert client.delete(f"/facturas/facturas/{sin_pagos['id']}").status_code == 200
+    assert client.get(f"/facturas/facturas/{sin_pagos['id']}", headers=auth).status_code == 404
+
+
+def test_numeracion_reintenta_si_otra_transaccion_toma_el_numero(
+    client, auth, crear_habitacion, crear_cliente, monkeypatch
+):
+    habitacion_id, cliente_id = crear_habitacion().id, crear_cliente().id
+    primera = _facturar(client, auth, habitacion_id, cliente_id, 100)
+
+    # La primera lectura es anterior a que otra transacción confirmara `primera`
+    get_ultimo_numero = factura_repository.get_ultimo_numero
+    lecturas = []
+
+    def ultimo_numero_viejo(db):
+        lecturas.append(len(lecturas))
+        return f"FAC-{_numero(primera) - 1:06d}" if len(lecturas) == 1 else get_ultimo_numero(db)
+
+    monkeypatch.setattr(factura_repository, "get_ultimo_numero", ultimo_numero_viejo)
+    segunda = _facturar(client, auth, habitacion_id, cliente_id, 102)
+
+    assert _numero(segunda) == _numero(primera) + 1
+    assert len(lecturas) == 2
@@ -0,0 +1,75 @@
+"""
+Pruebas de los contadores de inventario por tipo
+"""
+
+from datetime import date, timedelta
+
+from app.models.inventario_tipo import InventarioTipo
+from app.repositories.inventario_repository import inventario_repository
+from app.services.inventario_service import inventario_service
+
+
+def _vendidas(db, tipo: str, desde: date, hasta: date) -> list[int]:
+    db.expire_all()
+    return [fila.vendidas for fila in inventario_repository.get_rango(db, tipo, desde, hasta)]
+
+
+def test_exigir_cupo_rechaza_la_venta_sin_habitaciones_libres(db, crear_habitacion):
+    for _ in range(2):
+        crear_habitacion(tipo="InvCupo")
+    entrada = date.today() + timedelta(days=40)
+    salida = entrada + timedelta(days=3)
+
+    assert inventario_service.registrar_venta(db, "InvCupo", entrada, salida, 2, exigir_cupo=True)
+    db.commit()
+    assert _vendidas(db, "InvCupo", entrada, salida) == [2, 2, 2]
+
+    # Sin cupo: la venta falla y se deshace la transacción
+    assert not inventario_service.registrar_venta(db, "InvCupo", entrada, salida, 1, exigir_cupo=True)
+    db.rollback()
+    assert _vendidas(db, "InvCupo", entrada, salida) == [2, 2, 2]
+
+    # Sin exigir cupo se registra igualmente (sobreventa deliberada)
+    assert inventario_service.registrar_venta(db, "InvCupo", entrada, salida, 1)
+    db.commit()
+    assert _vendidas(db, "InvCupo", entrada, salida) == [3, 3, 3]
+
+
+def test_liberar_solo_devuelve_las_noches_que_no_han_pasado(db, crear_habitacion):
+    crear_habitacion(tipo="InvLiberar")
+    hoy = date.today()
+    entrada, salida = hoy - timedelta(days=1), hoy + timedelta(days=2)
+    inventario_service.registrar_venta(db, "InvLiberar", entrada, salida, 1)
+    db.commit()
+
+    inventario_service.registrar_liberacion(db, "InvLiberar", entrada, salida, 1)
+    db.commit()
+    assert _vendidas(db, "InvLiberar", entrada, salida) == [1, 0, 0]
+
+
+def test_reconciliar_corrige_contadores_desviados(client, auth, db, crear_habitacion, crear_cliente):
+    habitacion = crear_habitacion(tipo="InvDesvio")
+    entrada = date.today() + timedelta(days=5)
+    salida = entrada + timedelta(days=2)
+    respuesta = client.post("/reservas/reservas", headers=auth, json={
+        "cliente_id": crear_cliente().id,
+        "habitacion_id": habitacion.id,
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": salida.isoformat()
+    })
+    assert respuesta.status_code == 200, respuesta.text
+    assert _vendidas(db, "InvDesvio", entrada, salida) == [1, 1]
+
+    # Un contador desviado (p. ej. por una escritura directa en la base)
+    fila = inventario_repository.get_rango(db, "InvDesvio", entrada, entrada + timedelta(days=1))[0]
+    db.query(InventarioTipo).filter(InventarioTipo.id == fila.id).update({"vendidas": 4})
+    db.commit()
+
+    informe = inventario_service.reconciliar(db, dias=30)
+    desviaciones = [d for d in informe.desviaciones if d.tipo == "InvDesvio"]
+    assert [(d.fecha, d.vendidas_registradas, d.vendidas_esperadas) for d in desviaciones] == [(entrada, 4, 1)]
+    assert informe.corregidas
+    assert _vendidas(db, "InvDesvio", entrada, salida) == [1, 1]
+
+    informe = inventario_service.reconciliar(db, dias=30)
+    assert not [d for d in informe.desviaciones if d.tipo == "InvDesvio"]
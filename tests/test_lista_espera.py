@@ -0,0 +1,166 @@
+"""
+Pruebas de la lista de espera
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+from app.models.bloqueo_habitacion import BloqueoHabitacion
+from app.models.lista_espera import ListaEspera
+from app.repositories.lista_espera_repository import lista_espera_repository
+from app.services.lista_espera_service import lista_espera_service
+
+
+def _reservar(client, auth, habitacion_id: int, cliente_id: int, entrada: date, salida: date) -> dict:
+    respuesta = client.post("/reservas/reservas", headers=auth, json={
+        "cliente_id": cliente_id,
+        "habitacion_id": habitacion_id,
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": salida.isoformat()
+    })
+    assert respuesta.status_code == 200, respuesta.text
+    return respuesta.json()["data"]
+
+
+def _inscribir(client, auth, cliente_id: int, entrada: date, salida: date, tipo: str) -> dict:
+    respuesta = client.post("/lista-espera", headers=auth, json={
+        "cliente_id": cliente_id,
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": salida.isoformat(),
+        "tipo": tipo
+    })
+    assert respuesta.status_code == 200, respuesta.text
+    return respuesta.json()["data"]
+
+
+def _estado(client, auth, inscripcion: dict) -> dict:
+    inscripciones = client.get(f"/lista-espera/cliente/{inscripcion['cliente_id']}", headers=auth).json()["data"]
+    return next(i for i in inscripciones if i["id"] == inscripcion["id"])
+
+
+def test_oferta_tras_cancelacion_se_acepta(client, auth, crear_habitacion, crear_cliente):
+    habitacion = crear_habitacion(tipo="EsperaAceptar")
+    entrada = date.today() + timedelta(days=60)
+    salida = entrada + timedelta(days=3)
+    reserva = _reservar(client, auth, habitacion.id, crear_cliente().id, entrada, salida)
+
+    interesado = crear_cliente()
+    respuesta = client.post("/lista-espera", headers=auth, json={
+        "cliente_id": interesado.id,
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": salida.isoformat(),
+        "tipo": "EsperaAceptar"
+    })
+    assert respuesta.status_code == 200, respuesta.text
+    inscripcion = respuesta.json()["data"]
+
+    assert client.delete(f"/reservas/reservas/{reserva['id']}", headers=auth).status_code == 200
+
+    ofrecidas = client.get(f"/lista-espera/cliente/{interesado.id}", headers=auth).json()["data"]
+    assert ofrecidas[0]["estado"] == "Ofrecida"
+    assert ofrecidas[0]["habitacion_id"] == habitacion.id
+    assert ofrecidas[0]["bloqueo_token"]
+
+    # Mientras dura la oferta nadie más puede reservar la habitación
+    respuesta = client.post("/reservas/reservas", headers=auth, json={
+        "cliente_id": crear_cliente().id,
+        "habitacion_id": habitacion.id,
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": salida.isoformat()
+    })
+    assert respuesta.status_code == 400
+
+    respuesta = client.post(f"/lista-espera/{inscripcion['id']}/aceptar", headers=auth)
+    assert respuesta.status_code == 200, respuesta.text
+    assert respuesta.json()["data"]["cliente_id"] == interesado.id
+
+
+def test_cancelar_oferta_libera_la_habitacion(client, auth, crear_habitacion, crear_cliente):
+    habitacion = crear_habitacion(tipo="EsperaCancelar")
+    entrada = date.today() + timedelta(days=70)
+    salida = entrada + timedelta(days=2)
+    reserva = _reservar(client, auth, habitacion.id, crear_cliente().id, entrada, salida)
+
+    respuesta = client.post("/lista-espera", headers=auth, json={
+        "cliente_id": crear_cliente().id,
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": salida.isoformat(),
+        "tipo": "EsperaCancelar"
+    })
+    inscripcion = respuesta.json()["data"]
+    assert inscripcion["estado"] == "Pendiente"
+    assert client.delete(f"/reservas/reservas/{reserva['id']}", headers=auth).status_code == 200
+
+    assert client.delete(f"/lista-espera/{inscripcion['id']}", headers=auth).status_code == 200
+    _reservar(client, auth, habitacion.id, crear_cliente().id, entrada, salida)
+
+
+def test_cancelar_oferta_pasa_a_la_siguiente_inscripcion(client, auth, crear_habitacion, crear_cliente):
+    habitacion = crear_habitacion(tipo="EsperaSiguiente")
+    entrada = date.today() + timedelta(days=75)
+    salida = entrada + timedelta(days=2)
+    reserva = _reservar(client, auth, habitacion.id, crear_cliente().id, entrada, salida)
+    primera = _inscribir(client, auth, crear_cliente().id, entrada, salida, "EsperaSiguiente")
+    segunda = _inscribir(client, auth, crear_cliente().id, entrada, salida, "EsperaSiguiente")
+
+    assert client.delete(f"/reservas/reservas/{reserva['id']}", headers=auth).status_code == 200
+    assert _estado(client, auth, primera)["estado"] == "Ofrecida"
+    assert _estado(client, auth, segunda)["estado"] == "Pendiente"
+
+    assert client.delete(f"/lista-espera/{primera['id']}", headers=auth).status_code == 200
+    oferta = _estado(client, auth, segunda)
+    assert oferta["estado"] == "Ofrecida"
+    assert oferta["habitacion_id"] == habitacion.id
+
+
+def test_oferta_vencida_pasa_a_la_siguiente_inscripcion(client, auth, db, crear_habitacion, crear_cliente):
+    habitacion = crear_habitacion(tipo="EsperaVencida")
+    entrada = date.today() + timedelta(days=80)
+    salida = entrada + timedelta(days=2)
+    reserva = _reservar(client, auth, habitacion.id, crear_cliente().id, entrada, salida)
+    primera = _inscribir(client, auth, crear_cliente().id, entrada, salida, "EsperaVencida")
+    segunda = _inscribir(client, auth, crear_cliente().id, entrada, salida, "EsperaVencida")
+    assert client.delete(f"/reservas/reservas/{reserva['id']}", headers=auth).status_code == 200
+
+    # La oferta de la primera vence sin respuesta
+    vencida = datetime.now(timezone.utc) - timedelta(minutes=1)
+    token = _estado(client, auth, primera)["bloqueo_token"]
+    db.query(ListaEspera).filter_by(id=primera["id"]).update({"oferta_expira": vencida})
+    db.query(BloqueoHabitacion).filter_by(token=token).update({"expira": vencida})
+    db.commit()
+
+    ofrecidas = lista_espera_service.reofrecer_vencidas(db)
+    assert segunda["id"] in {i.id for i in ofrecidas}
+    assert _estado(client, auth, segunda)["habitacion_id"] == habitacion.id
+    assert _estado(client, auth, primera)["estado"] == "Pendiente"
+
+
+def test_salida_anticipada_de_grupo_ofrece_cada_habitacion(client, auth, crear_habitacion, crear_cliente, monkeypatch):
+    habitaciones = [crear_habitacion(tipo="EsperaGrupo").id for _ in range(3)]
+    hoy = date.today()
+    salida = hoy + timedelta(days=2)
+    grupo = client.post("/reservas/grupos", headers=auth, json={
+        "cliente_id": crear_cliente().id,
+        "nombre": "Grupo con salida anticipada",
+        "habitacion_ids": habitaciones,
+        "fecha_entrada": hoy.isoformat(),
+        "fecha_salida": salida.isoformat()
+    }).json()["data"]
+    assert client.post(f"/reservas/grupos/{grupo['id']}/check-in", headers=auth).status_code == 200
+    inscripciones = [_inscribir(client, auth, crear_cliente().id, hoy, salida, "EsperaGrupo") for _ in range(3)]
+
+    # Las tres habitaciones comparten hueco: una sola consulta de candidatas
+    consultas = []
+    candidatas = lista_espera_repository.candidatas
+
+    def registrar(*args):
+        consultas.append(args)
+        return candidatas(*args)
+
+    monkeypatch.setattr(lista_espera_repository, "candidatas", registrar)
+    respuesta = client.post(f"/reservas/grupos/{grupo['id']}/check-out", headers=auth)
+    assert respuesta.status_code == 200, respuesta.text
+    assert len(consultas) == 1
+
+    ofrecidas = [_estado(client, auth, i) for i in inscripciones]
+    assert {i["estado"] for i in ofrecidas} == {"Ofrecida"}
+    assert sorted(i["habitacion_id"] for i in ofrecidas) == sorted(habitaciones)
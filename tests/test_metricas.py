@@ -0,0 +1,71 @@
+"""
+Pruebas del endpoint de métricas de Prometheus
+"""
+
+import re
+
+import pytest
+
+from app.config import metricas
+from app.config.presupuesto_consultas import CapturaConsultas
+
+_LINEA = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+
+
+def _muestras(texto: str) -> dict:
+    """{(métrica, ruta, etiqueta extra): valor} de la exposición de texto"""
+    muestras = {}
+    for linea in texto.splitlines():
+        coincidencia = _LINEA.match(linea)
+        if not coincidencia:
+            continue
+        nombre, etiquetas, valor = coincidencia.groups()
+        etiquetas = dict(re.findall(r'(\w+)="([^"]*)"', etiquetas))
+        extra = etiquetas.get("le") or etiquetas.get("status")
+        muestras[(nombre, etiquetas.get("method"), etiquetas.get("route"), extra)] = float(valor)
+    return muestras
+
+
+@pytest.fixture
+def contadores_vacios():
+    metricas.contadores.reiniciar()
+    yield
+    metricas.contadores.reiniciar()
+
+
+def test_bucket_de_cada_peticion_y_acumulado(contadores_vacios):
+    metricas.registrar_peticion("GET", "/prueba", 200, 0.007, [2, 0.001])
+    metricas.registrar_peticion("GET", "/prueba", 200, 0.3, [3, 0.002])
+    metricas.registrar_peticion("GET", "/prueba", 503, 20.0, None)
+
+    muestras = _muestras(metricas.exportar_prometheus())
+    bucket = lambda le: muestras[("http_request_duration_seconds_bucket", "GET", "/prueba", le)]
+    assert (bucket("0.005"), bucket("0.01"), bucket("0.25"), bucket("0.5"), bucket("10.0")) == (0, 1, 1, 2, 2)
+    assert bucket("+Inf") == 3
+    assert muestras[("http_request_duration_seconds_count", "GET", "/prueba", None)] == 3
+    assert muestras[("http_request_duration_seconds_sum", "GET", "/prueba", None)] == pytest.approx(20.307)
+    assert muestras[("http_requests_total", "GET", "/prueba", "200")] == 2
+    assert muestras[("http_requests_total", "GET", "/prueba", "503")] == 1
+    # Sin contador SQL (None) la petición no suma consultas
+    assert muestras[("db_queries_total", "GET", "/prueba", None)] == 5
+
+
+def test_metrics_cuenta_peticiones_y_consultas_por_ruta(client, auth, crear_cliente, contadores_vacios):
+    cliente_id = crear_cliente().id
+    with CapturaConsultas() as captura:
+        for _ in range(2):
+            assert client.get(f"/clientes/clientes/{cliente_id}", headers=auth).status_code == 200
+    assert client.get("/no-existe", headers=auth).status_code == 404
+
+    respuesta = client.get("/metrics")
+    assert respuesta.status_code == 200
+    assert respuesta.headers["content-type"].startswith("text/plain")
+    muestras = _muestras(respuesta.text)
+
+    ruta = "/clientes/clientes/{cliente_id}"
+    assert muestras[("http_request_duration_seconds_count", "GET", ruta, None)] == 2
+    assert muestras[("http_request_duration_seconds_bucket", "GET", ruta, "+Inf")] == 2
+    assert muestras[("http_requests_total", "GET", ruta, "200")] == 2
+    assert muestras[("db_queries_total", "GET", ruta, None)] == captura.total > 0
+    # Las rutas desconocidas comparten una sola etiqueta
+    assert muestras[("http_requests_total", "GET", metricas.RUTA_DESCONOCIDA, "404")] == 1
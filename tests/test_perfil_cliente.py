@@ -0,0 +1,60 @@
+"""
+Pruebas de la caché de perfiles de cliente
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.models.reserva import Reserva
+from app.services.auditoria_service import auditoria_service
+
+
+@pytest.fixture(autouse=True)
+def cache_de_perfiles(monkeypatch):
+    monkeypatch.setattr("app.services.cliente_service.PERFIL_CACHE_TTL", 300)
+
+
+def _perfil(client, auth, cliente_id):
+    respuesta = client.get(f"/clientes/clientes/{cliente_id}/perfil", headers=auth)
+    assert respuesta.status_code == 200
+    return respuesta.json()["data"]
+
+
+def test_facturas_y_pagos_invalidan_el_perfil(client, auth, crear_habitacion, crear_cliente):
+    cliente = crear_cliente()
+    inicio = date.today() + timedelta(days=120)
+    reserva = client.post("/reservas/reservas", headers=auth, json={
+        "cliente_id": cliente.id,
+        "habitacion_id": crear_habitacion(precio_noche=100.0).id,
+        "fecha_entrada": inicio.isoformat(),
+        "fecha_salida": (inicio + timedelta(days=1)).isoformat()
+    }).json()["data"]
+    assert _perfil(client, auth, cliente.id)["gasto_total"] == 0
+
+    factura = client.post("/facturas/facturas", headers=auth, json={"reserva_id": reserva["id"]}).json()["data"]
+    assert _perfil(client, auth, cliente.id)["gasto_total"] == 115.0
+
+    client.put(f"/facturas/facturas/{factura['id']}", headers=auth, json={"descuentos": 15})
+    assert _perfil(client, auth, cliente.id)["gasto_total"] == 100.0
+
+    client.post("/pagos", headers=auth, json={"factura_id": factura["id"], "monto": 40, "metodo_pago": "Efectivo"})
+    assert _perfil(client, auth, cliente.id)["saldo_pendiente"] == 60.0
+
+
+def test_no_show_de_la_auditoria_invalida_el_perfil(client, auth, db, crear_habitacion, crear_cliente):
+    cliente = crear_cliente()
+    reserva = Reserva(
+        cliente_id=cliente.id,
+        habitacion_id=crear_habitacion().id,
+        fecha_entrada=date(1999, 12, 30),
+        fecha_salida=date(1999, 12, 31),
+        precio_total=100.0,
+        estado="Confirmada"
+    )
+    db.add(reserva)
+    db.commit()
+    assert _perfil(client, auth, cliente.id)["ultimas_reservas"][0]["estado"] == "Confirmada"
+
+    auditoria_service.cerrar_dia(db, date(2000, 1, 1))
+    assert _perfil(client, auth, cliente.id)["ultimas_reservas"][0]["estado"] == "No_Show"
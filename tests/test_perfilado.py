@@ -0,0 +1,23 @@
+"""
+Pruebas de los tokens de perfilado
+"""
+
+from app.config import perfilado
+
+
+def test_token_de_perfilado_no_autentica(client, admin):
+    token = perfilado.crear_token(admin)
+    assert perfilado.token_valido(token)
+    respuesta = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert respuesta.status_code == 401
+
+
+def test_token_de_acceso_no_habilita_perfilado(auth):
+    assert not perfilado.token_valido(auth["Authorization"].split()[1])
+
+
+def test_peticion_perfilada_devuelve_perfil(client, auth, admin):
+    token = perfilado.crear_token(admin)
+    respuesta = client.get("/auth/me", headers={**auth, "X-Perfilado": token})
+    assert respuesta.status_code == 200
+    assert respuesta.headers["x-perfil"].endswith(".pstats")
@@ -0,0 +1,899 @@
+"""
+Pruebas del presupuesto de consultas por endpoint
+"""
+
+import itertools
+from datetime import date, timedelta
+
+import pytest
+
+from app.config import database, perfilado
+from app.config.security import create_access_token
+from app.config.presupuesto_consultas import (
+    PRESUPUESTOS_RUTAS,
+    UMBRAL_N_MAS_1,
+    PresupuestoExcedido,
+    limite_consultas,
+    normalizar_sql
+)
+from app.models.cliente import Cliente
+from app.models.habitacion import Habitacion
+from app.models.reserva import Reserva
+from app.models.usuario import Usuario
+from app.repositories.auditoria_repository import auditoria_repository
+from app.repositories.base_repository import invalidar_totales
+from app.services import auditoria_service as auditoria_module
+from app.services.catalogo_habitaciones import catalogo_habitaciones
+from app.services.programador import programador
+
+
+def test_normalizar_sql_agrupa_literales_y_listas():
+    assert normalizar_sql("SELECT * FROM t WHERE id IN (?, ?, ?) AND n = 'x'") == \
+        normalizar_sql("SELECT  *  FROM t WHERE id IN (?, ?) AND n = 'y'")
+
+
+def test_limite_detecta_n_mas_1(db):
+    with pytest.raises(PresupuestoExcedido, match="N\\+1"):
+        with limite_consultas(etiqueta="bucle"):
+            for habitacion_id in range(1, 4):
+                db.get(Habitacion, habitacion_id)
+                db.expunge_all()
+
+
+def test_usuario_actual_dentro_del_presupuesto(client, auth, presupuesto_consultas):
+    with presupuesto_consultas("GET", "/auth/me") as captura:
+        respuesta = client.get("/auth/me", headers=auth)
+    assert respuesta.status_code == 200
+    assert captura.total == 1
+
+
+def _reservar(client, auth, cliente_id, habitacion_id, entrada, salida):
+    respuesta = client.post("/reservas/reservas", headers=auth, json={
+        "cliente_id": cliente_id,
+        "habitacion_id": habitacion_id,
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": salida.isoformat()
+    })
+    assert respuesta.status_code == 200
+    return respuesta.json()["data"]
+
+
+def test_actualizar_fechas_de_reserva(client, auth, crear_habitacion, crear_cliente, presupuesto_consultas):
+    habitacion = crear_habitacion(precio_noche=80.0)
+    inicio = date.today() + timedelta(days=60)
+    reserva = _reservar(client, auth, crear_cliente().id, habitacion.id, inicio, inicio + timedelta(days=2))
+
+    ruta = "/reservas/reservas/{reserva_id}"
+    with presupuesto_consultas("PUT", ruta):
+        respuesta = client.put(ruta.format(reserva_id=reserva["id"]), headers=auth, json={
+            "fecha_salida": (inicio + timedelta(days=3)).isoformat()
+        })
+    assert respuesta.status_code == 200
+    assert respuesta.json()["data"]["precio_total"] == 240.0
+
+    respuesta = client.put(ruta.format(reserva_id=reserva["id"]), headers=auth, json={"estado": "Confirmada"})
+    assert respuesta.status_code == 200
+
+
+def test_actualizar_fechas_rechaza_solapamiento(client, auth, crear_habitacion, crear_cliente):
+    habitacion = crear_habitacion()
+    inicio = date.today() + timedelta(days=70)
+    cliente_id = crear_cliente().id
+    reserva = _reservar(client, auth, cliente_id, habitacion.id, inicio, inicio + timedelta(days=2))
+    _reservar(client, auth, cliente_id, habitacion.id, inicio + timedelta(days=3), inicio + timedelta(days=5))
+
+    respuesta = client.put(f"/reservas/reservas/{reserva['id']}", headers=auth, json={
+        "fecha_salida": (inicio + timedelta(days=4)).isoformat()
+    })
+    assert respuesta.status_code == 400
+
+
+def test_cancelar_reserva_dentro_del_presupuesto(client, auth, crear_habitacion, crear_cliente, presupuesto_consultas):
+    inicio = date.today() + timedelta(days=80)
+    reserva = _reservar(client, auth, crear_cliente().id, crear_habitacion().id, inicio, inicio + timedelta(days=2))
+
+    ruta = "/reservas/reservas/{reserva_id}"
+    with presupuesto_consultas("DELETE", ruta):
+        respuesta = client.delete(ruta.format(reserva_id=reserva["id"]), headers=auth)
+    assert respuesta.status_code == 200
+
+
+def test_reporte_habitaciones_agrupa_estados(client, auth, crear_habitacion, presupuesto_consultas):
+    crear_habitacion(estado="Mantenimiento")
+    with presupuesto_consultas("GET", "/reportes/habitaciones"):
+        respuesta = client.get("/reportes/habitaciones", headers=auth)
+    assert respuesta.status_code == 200
+    assert respuesta.json()["data"]["por_estado"]["mantenimiento"] >= 1
+
+
+def test_actualizar_y_eliminar_factura(client, auth, crear_habitacion, crear_cliente, presupuesto_consultas):
+    inicio = date.today() + timedelta(days=90)
+    reserva = _reservar(client, auth, crear_cliente().id, crear_habitacion(precio_noche=100.0).id, inicio, inicio + timedelta(days=1))
+    factura = client.post("/facturas/facturas", headers=auth, json={"reserva_id": reserva["id"]}).json()["data"]
+
+    ruta = "/facturas/facturas/{factura_id}"
+    with presupuesto_consultas("PUT", ruta):
+        respuesta = client.put(ruta.format(factura_id=factura["id"]), headers=auth, json={"descuentos": 15})
+    assert respuesta.status_code == 200
+    assert respuesta.json()["data"]["total"] == 100.0
+
+    with presupuesto_consultas("DELETE", ruta):
+        respuesta = client.delete(ruta.format(factura_id=factura["id"]), headers=auth)
+    assert respuesta.status_code == 200
+    assert client.get(ruta.format(factura_id=factura["id"]), headers=auth).status_code == 404
+
+
+def test_crear_usuario_y_cambiar_contrasena(client, auth, presupuesto_consultas):
+    with presupuesto_consultas("POST", "/usuarios/usuarios"):
+        respuesta = client.post("/usuarios/usuarios", headers=auth, json={
+            "username": "recepcion_pruebas",
+            "email": "recepcion@pruebas.com",
+            "nombre": "Recepción",
+            "apellido": "Pruebas",
+            "rol": "Recepcionista",
+            "password": "clave_inicial"
+        })
+    assert respuesta.status_code == 200
+
+    login = client.post("/auth/login", json={"username": "recepcion_pruebas", "password": "clave_inicial"})
+    assert login.status_code == 200
+    cabeceras = {"Authorization": f"Bearer {login.json()['data']['access_token']}"}
+    with presupuesto_consultas("POST", "/auth/change-password"):
+        respuesta = client.post("/auth/change-password", headers=cabeceras, json={
+            "old_password": "clave_inicial",
+            "new_password": "clave_nueva"
+        })
+    assert respuesta.status_code == 200
+    assert client.post("/auth/login", json={"username": "recepcion_pruebas", "password": "clave_nueva"}).status_code == 200
+
+
+def test_balance_sin_fechas(client, auth, presupuesto_consultas):
+    with presupuesto_consultas("GET", "/contabilidad/balance"):
+        respuesta = client.get("/contabilidad/balance", headers=auth)
+    assert respuesta.status_code == 200
+
+
+@pytest.mark.parametrize("ruta, tabla", [
+    ("/reservas/reservas", "reservas"),
+    ("/clientes/clientes", "clientes"),
+    ("/habitaciones/habitaciones", "habitaciones"),
+])
+def test_listado_en_frio_dentro_del_presupuesto(client, auth, presupuesto_consultas, ruta, tabla):
+    invalidar_totales(tabla)
+    with presupuesto_consultas("GET", ruta) as captura:
+        respuesta = client.get(ruta, headers=auth)
+    assert respuesta.status_code == 200
+    assert captura.total <= 3
+
+
+# ========== Todos los endpoints ==========
+# Cada caso prepara fuera de la captura lo que el endpoint necesita y
+# devuelve la petición a medir: la URL y los argumentos de client.request.
+# Solo esa petición cuenta contra el presupuesto declarado.
+
+CASOS = {}
+
+
+def _caso(clave: str, umbral: int = UMBRAL_N_MAS_1):
+    def registrar(funcion):
+        CASOS[clave] = (funcion, umbral)
+        return funcion
+    return registrar
+
+
+class Escenario:
+    """Fábricas de datos de apoyo para los casos"""
+
+    def __init__(self, client, auth, db, admin, crear_habitacion, crear_cliente, monkeypatch, tmp_path):
+        self.client = client
+        self.auth = auth
+        self.db = db
+        self.admin = admin
+        self.crear_habitacion = crear_habitacion
+        self.crear_cliente = crear_cliente
+        self.monkeypatch = monkeypatch
+        self.tmp_path = tmp_path
+
+    def dia(self, dias: int) -> str:
+        return (date.today() + timedelta(days=dias)).isoformat()
+
+    def post(self, url: str, **peticion) -> dict:
+        respuesta = self.client.post(url, headers=self.auth, **peticion)
+        assert respuesta.status_code == 200, respuesta.text
+        return respuesta.json()["data"]
+
+    def habitacion(self, **datos) -> Habitacion:
+        # Un tipo propio aísla el inventario y la lista de espera del caso
+        datos.setdefault("tipo", f"Presupuesto{next(_tipos)}")
+        return self.crear_habitacion(**datos)
+
+    def reserva(self, entrada: int = 200, noches: int = 2, **datos) -> dict:
+        if "tipo" not in datos:
+            datos.setdefault("habitacion_id", self.habitacion().id)
+        return self.post("/reservas/reservas", json={
+            "cliente_id": self.crear_cliente().id,
+            "fecha_entrada": self.dia(entrada),
+            "fecha_salida": self.dia(entrada + noches),
+            **datos
+        })
+
+    def factura(self) -> dict:
+        return self.post("/facturas/facturas", json={"reserva_id": self.reserva()["id"]})
+
+    def pago(self) -> dict:
+        factura = self.factura()
+        return self.post("/pagos", json={"factura_id": factura["id"], "monto": 10.0, "metodo_pago": "efectivo"})
+
+    def usuario(self) -> dict:
+        numero = next(_tipos)
+        return self.post("/usuarios/usuarios", json={
+            "username": f"presupuesto{numero}",
+            "email": f"presupuesto{numero}@pruebas.com",
+            "nombre": "Usuario",
+            "apellido": "Presupuesto",
+            "rol": "Recepcionista",
+            "password": "clave_presupuesto"
+        })
+
+    def cuenta(self) -> dict:
+        return self.post("/contabilidad/cuentas", json={
+            "codigo": f"8.{next(_tipos)}", "nombre": "Cuenta presupuesto", "tipo": "ingreso"
+        })
+
+    def tarifa(self) -> dict:
+        return self.post("/tarifas/tarifas", json={
+            "nombre": "Temporada presupuesto", "habitacion_id": self.habitacion().id, "precio": 90.0
+        })
+
+    def bloqueo(self) -> dict:
+        return self.post("/reservas/bloqueos", json={
+            "habitacion_id": self.habitacion().id,
+            "fecha_entrada": self.dia(210),
+            "fecha_salida": self.dia(212),
+            "cliente_id": self.crear_cliente().id
+        })
+
+    def habitaciones(self, cantidad: int) -> list[int]:
+        """Habitaciones de un mismo tipo"""
+        tipo = self.habitacion().tipo
+        return [self.habitacion(tipo=tipo).id for _ in range(cantidad)]
+
+    def grupo(self, entrada: int = 220) -> dict:
+        return self.post("/reservas/grupos", json={
+            "cliente_id": self.crear_cliente().id,
+            "nombre": "Grupo presupuesto",
+            "habitacion_ids": self.habitaciones(3),
+            "fecha_entrada": self.dia(entrada),
+            "fecha_salida": self.dia(entrada + 2)
+        })
+
+    def oferta(self) -> dict:
+        """Inscripción a la que se ofrece la habitación de una reserva cancelada"""
+        habitacion = self.habitacion()
+        reserva = self.reserva(230, habitacion_id=habitacion.id)
+        inscripcion = self.post("/lista-espera", json={
+            "cliente_id": self.crear_cliente().id,
+            "fecha_entrada": reserva["fecha_entrada"],
+            "fecha_salida": reserva["fecha_salida"],
+            "tipo": habitacion.tipo
+        })
+        assert self.client.delete(f"/reservas/reservas/{reserva['id']}", headers=self.auth).status_code == 200
+        return inscripcion
+
+    def perfil(self) -> str:
+        respuesta = self.client.get("/auth/me", headers={**self.auth, "X-Perfilado": perfilado.crear_token(self.admin)})
+        return respuesta.headers["x-perfil"]
+
+
+_tipos = itertools.count(1)
+
+
+@pytest.fixture
+def escenario(client, auth, db, admin, crear_habitacion, crear_cliente, monkeypatch, tmp_path):
+    return Escenario(client, auth, db, admin, crear_habitacion, crear_cliente, monkeypatch, tmp_path)
+
+
+# Autenticación y usuarios
+
+@_caso("POST /auth/login")
+def _(e):
+    usuario = e.usuario()
+    return "/auth/login", {"json": {"username": usuario["username"], "password": "clave_presupuesto"}}
+
+
+@_caso("POST /auth/change-password")
+def _(e):
+    usuario = e.usuario()
+    login = e.client.post("/auth/login", json={"username": usuario["username"], "password": "clave_presupuesto"})
+    cabeceras = {"Authorization": f"Bearer {login.json()['data']['access_token']}"}
+    return "/auth/change-password", {"headers": cabeceras, "json": {
+        "old_password": "clave_presupuesto", "new_password": "otra_clave"
+    }}
+
+
+@_caso("GET /auth/me")
+def _(e):
+    return "/auth/me", {"headers": e.auth}
+
+
+@_caso("GET /usuarios/me")
+def _(e):
+    return "/usuarios/me", {"headers": e.auth}
+
+
+@_caso("GET /usuarios/admin")
+def _(e):
+    # La ruta exige el rol "admin", distinto de "Administrador"
+    usuario = Usuario(username=f"admin{next(_tipos)}", nombre="Admin", apellido="Rol", email=f"rol{next(_tipos)}@pruebas.com",
+                      hashed_password="-", rol="admin", activo=True)
+    e.db.add(usuario)
+    e.db.commit()
+    token = create_access_token({"sub": usuario.username, "rol": "admin"})
+    return "/usuarios/admin", {"headers": {"Authorization": f"Bearer {token}"}}
+
+
+@_caso("POST /usuarios/usuarios")
+def _(e):
+    return "/usuarios/usuarios", {"headers": e.auth, "json": {
+        "username": f"alta{next(_tipos)}",
+        "email": f"alta{next(_tipos)}@pruebas.com",
+        "nombre": "Alta",
+        "apellido": "Presupuesto",
+        "rol": "Contador",
+        "password": "clave"
+    }}
+
+
+@_caso("GET /usuarios/usuarios")
+def _(e):
+    return "/usuarios/usuarios", {"headers": e.auth}
+
+
+@_caso("GET /usuarios/usuarios/{usuario_id}")
+def _(e):
+    return f"/usuarios/usuarios/{e.usuario()['id']}", {"headers": e.auth}
+
+
+@_caso("PUT /usuarios/usuarios/{usuario_id}")
+def _(e):
+    return f"/usuarios/usuarios/{e.usuario()['id']}", {"headers": e.auth, "json": {"nombre": "Renombrado"}}
+
+
+@_caso("DELETE /usuarios/usuarios/{usuario_id}")
+def _(e):
+    return f"/usuarios/usuarios/{e.usuario()['id']}", {"headers": e.auth}
+
+
+# Clientes
+
+@_caso("POST /clientes/clientes")
+def _(e):
+    numero = next(_tipos)
+    return "/clientes/clientes", {"headers": e.auth, "json": {
+        "nombre": "Cliente",
+        "apellido": f"Presupuesto{numero}",
+        "identificacion": f"PRE{numero:08d}",
+        "email": f"cliente{numero}@presupuesto.com"
+    }}
+
+
+@_caso("GET /clientes/clientes")
+def _(e):
+    return "/clientes/clientes", {"headers": e.auth}
+
+
+@_caso("POST /clientes/clientes/deduplicar")
+def _(e):
+    # Mismo documento con distinta escritura
+    for identificacion in ("DUP-PRESUPUESTO", "dup.presupuesto"):
+        e.db.add(Cliente(nombre="Duplicado", apellido="Presupuesto", identificacion=identificacion,
+                         email=f"dup{next(_tipos)}@presupuesto.com"))
+    e.db.commit()
+    return "/clientes/clientes/deduplicar", {"headers": e.auth, "params": {"fusionar": True}}
+
+
+@_caso("POST /clientes/clientes/{cliente_id}/fusionar")
+def _(e):
+    destino, origen = e.crear_cliente(), e.crear_cliente()
+    e.reserva(habitacion_id=e.habitacion().id)
+    return f"/clientes/clientes/{destino.id}/fusionar", {"headers": e.auth, "json": {"clientes_origen_ids": [origen.id]}}
+
+
+@_caso("GET /clientes/clientes/{cliente_id}")
+def _(e):
+    return f"/clientes/clientes/{e.crear_cliente().id}", {"headers": e.auth}
+
+
+@_caso("GET /clientes/clientes/{cliente_id}/perfil")
+def _(e):
+    return f"/clientes/clientes/{e.reserva()['cliente_id']}/perfil", {"headers": e.auth}
+
+
+@_caso("PUT /clientes/clientes/{cliente_id}")
+def _(e):
+    return f"/clientes/clientes/{e.crear_cliente().id}", {"headers": e.auth, "json": {"telefono": "555-0100"}}
+
+
+@_caso("DELETE /clientes/clientes/{cliente_id}")
+def _(e):
+    return f"/clientes/clientes/{e.crear_cliente().id}", {"headers": e.auth}
+
+
+# Habitaciones
+
+@_caso("POST /habitaciones/habitaciones")
+def _(e):
+    return "/habitaciones/habitaciones", {"headers": e.auth, "json": {
+        "numero": f"PR{next(_tipos)}", "tipo": "Doble", "precio_noche": 100.0, "capacidad": 2
+    }}
+
+
+@_caso("GET /habitaciones/habitaciones")
+def _(e):
+    return "/habitaciones/habitaciones", {"headers": e.auth}
+
+
+@_caso("GET /habitaciones/habitaciones/disponibles")
+def _(e):
+    return "/habitaciones/habitaciones/disponibles", {"headers": e.auth}
+
+
+@_caso("GET /habitaciones/habitaciones/{habitacion_id}")
+def _(e):
+    return f"/habitaciones/habitaciones/{e.habitacion().id}", {"headers": e.auth}
+
+
+@_caso("PUT /habitaciones/habitaciones/{habitacion_id}")
+def _(e):
+    return f"/habitaciones/habitaciones/{e.habitacion().id}", {"headers": e.auth, "json": {"precio_noche": 110.0}}
+
+
+@_caso("DELETE /habitaciones/habitaciones/{habitacion_id}")
+def _(e):
+    return f"/habitaciones/habitaciones/{e.habitacion().id}", {"headers": e.auth}
+
+
+# Reservas
+
+@_caso("POST /reservas/reservas")
+def _(e):
+    return "/reservas/reservas", {"headers": e.auth, "json": {
+        "cliente_id": e.crear_cliente().id,
+        "habitacion_id": e.habitacion().id,
+        "fecha_entrada": e.dia(200),
+        "fecha_salida": e.dia(203)
+    }}
+
+
+@_caso("GET /reservas/reservas")
+def _(e):
+    return "/reservas/reservas", {"headers": e.auth}
+
+
+@_caso("GET /reservas/reservas/{reserva_id}")
+def _(e):
+    return f"/reservas/reservas/{e.reserva()['id']}", {"headers": e.auth}
+
+
+@_caso("PUT /reservas/reservas/{reserva_id}")
+def _(e):
+    return f"/reservas/reservas/{e.reserva()['id']}", {"headers": e.auth, "json": {
+        "fecha_entrada": e.dia(201), "fecha_salida": e.dia(204)
+    }}
+
+
+@_caso("DELETE /reservas/reservas/{reserva_id}")
+def _(e):
+    # La habitación liberada se ofrece a la lista de espera
+    habitacion = e.habitacion()
+    reserva = e.reserva(habitacion_id=habitacion.id)
+    e.post("/lista-espera", json={
+        "cliente_id": e.crear_cliente().id,
+        "fecha_entrada": reserva["fecha_entrada"],
+        "fecha_salida": reserva["fecha_salida"],
+        "tipo": habitacion.tipo
+    })
+    return f"/reservas/reservas/{reserva['id']}", {"headers": e.auth}
+
+
+@_caso("GET /reservas/reservas/{reserva_id}/habitaciones")
+def _(e):
+    tipo = e.habitacion().tipo
+    e.habitacion(tipo=tipo)
+    return f"/reservas/reservas/{e.reserva(tipo=tipo, cantidad=2)['id']}/habitaciones", {"headers": e.auth}
+
+
+@_caso("POST /reservas/asignaciones/reoptimizar", umbral=2 * 3 + 1)
+def _(e):
+    # Tres tipos con estancias movibles en los próximos 4 días (las de otras
+    # pruebas entran más tarde); cada tipo se bloquea y reparte por separado
+    # con dos lecturas de ocupación
+    for _ in range(3):
+        tipo = e.habitacion().tipo
+        for _ in range(3):
+            e.habitacion(tipo=tipo)
+        e.reserva(1, 1, tipo=tipo)
+        e.reserva(3, 2, tipo=tipo)
+    return "/reservas/asignaciones/reoptimizar", {"headers": e.auth, "params": {"dias": 4}}
+
+
+@_caso("POST /reservas/bloqueos")
+def _(e):
+    return "/reservas/bloqueos", {"headers": e.auth, "json": {
+        "habitacion_id": e.habitacion().id, "fecha_entrada": e.dia(210), "fecha_salida": e.dia(212)
+    }}
+
+
+@_caso("DELETE /reservas/bloqueos/{token}")
+def _(e):
+    return f"/reservas/bloqueos/{e.bloqueo()['token']}", {"headers": e.auth}
+
+
+@_caso("POST /reservas/bloqueos/{token}/confirmar")
+def _(e):
+    return f"/reservas/bloqueos/{e.bloqueo()['token']}/confirmar", {"headers": e.auth, "json": {}}
+
+
+@_caso("POST /reservas/grupos")
+def _(e):
+    return "/reservas/grupos", {"headers": e.auth, "json": {
+        "cliente_id": e.crear_cliente().id,
+        "nombre": "Grupo presupuesto",
+        "habitacion_ids": e.habitaciones(5),
+        "fecha_entrada": e.dia(220),
+        "fecha_salida": e.dia(223)
+    }}
+
+
+@_caso("GET /reservas/grupos/{grupo_id}")
+def _(e):
+    return f"/reservas/grupos/{e.grupo()['id']}", {"headers": e.auth}
+
+
+@_caso("POST /reservas/grupos/{grupo_id}/check-in")
+def _(e):
+    return f"/reservas/grupos/{e.grupo(0)['id']}/check-in", {"headers": e.auth}
+
+
+@_caso("POST /reservas/grupos/{grupo_id}/check-out", umbral=2 * 3)
+def _(e):
+    # La salida anticipada ofrece cada habitación a la lista de espera; cada
+    # oferta bloquea su habitación en su propia transacción
+    grupo = e.grupo(0)
+    e.post(f"/reservas/grupos/{grupo['id']}/check-in")
+    for reserva in grupo["reservas"]:
+        e.post("/lista-espera", json={
+            "cliente_id": e.crear_cliente().id,
+            "fecha_entrada": grupo["fecha_entrada"],
+            "fecha_salida": grupo["fecha_salida"],
+            "tipo": reserva["tipo"]
+        })
+    return f"/reservas/grupos/{grupo['id']}/check-out", {"headers": e.auth}
+
+
+# Auditoría nocturna
+
+@_caso("GET /auditoria/fecha-negocio")
+def _(e):
+    return "/auditoria/fecha-negocio", {"headers": e.auth}
+
+
+# Cada día cerrado repite las mismas consultas (y lee dos veces su auditoría)
+@_caso("POST /auditoria/ejecutar", umbral=2 * auditoria_module.AUDITORIA_MAX_DIAS + 1)
+def _(e):
+    # Peor caso: AUDITORIA_MAX_DIAS días pendientes, con una salida vencida
+    # (factura), una estancia (ingreso) y un no-show entre ellos
+    if auditoria_repository.get_ultima_completada(e.db) is None:
+        e.monkeypatch.setattr(
+            auditoria_module, "AUDITORIA_FECHA_INICIAL",
+            (date.today() - timedelta(days=auditoria_module.AUDITORIA_MAX_DIAS)).isoformat()
+        )
+    for dias, estado in ((-10, "En_Curso"), (-5, "Confirmada")):
+        reserva = e.reserva(200, 2)
+        e.db.query(Reserva).filter(Reserva.id == reserva["id"]).update({
+            "fecha_entrada": date.today() + timedelta(days=dias),
+            "fecha_salida": date.today() + timedelta(days=dias + 2),
+            "estado": estado
+        })
+    e.db.commit()
+    return "/auditoria/ejecutar", {"headers": e.auth}
+
+
+# Inventario por tipo
+
+@_caso("GET /inventario/disponibilidad")
+def _(e):
+    return "/inventario/disponibilidad", {"headers": e.auth, "params": {
+        "tipo": e.habitacion().tipo, "fecha_entrada": e.dia(200), "fecha_salida": e.dia(207)
+    }}
+
+
+@_caso("POST /inventario/reconciliar")
+def _(e):
+    return "/inventario/reconciliar", {"headers": e.auth, "params": {"corregir": True}}
+
+
+# Lista de espera
+
+@_caso("POST /lista-espera")
+def _(e):
+    return "/lista-espera", {"headers": e.auth, "json": {
+        "cliente_id": e.crear_cliente().id,
+        "fecha_entrada": e.dia(240),
+        "fecha_salida": e.dia(242),
+        "tipo": e.habitacion().tipo
+    }}
+
+
+@_caso("GET /lista-espera")
+def _(e):
+    return "/lista-espera", {"headers": e.auth}
+
+
+@_caso("GET /lista-espera/cliente/{cliente_id}")
+def _(e):
+    return f"/lista-espera/cliente/{e.oferta()['cliente_id']}", {"headers": e.auth}
+
+
+@_caso("POST /lista-espera/{lista_espera_id}/aceptar")
+def _(e):
+    return f"/lista-espera/{e.oferta()['id']}/aceptar", {"headers": e.auth}
+
+
+@_caso("DELETE /lista-espera/{lista_espera_id}")
+def _(e):
+    # Cancelar una oferta la pasa al siguiente de la lista
+    inscripcion = e.oferta()
+    e.post("/lista-espera", json={
+        "cliente_id": e.crear_cliente().id,
+        "fecha_entrada": inscripcion["fecha_entrada"],
+        "fecha_salida": inscripcion["fecha_salida"],
+        "tipo": inscripcion["tipo"]
+    })
+    return f"/lista-espera/{inscripcion['id']}", {"headers": e.auth}
+
+
+# Facturas y pagos
+
+@_caso("POST /facturas/facturas")
+def _(e):
+    return "/facturas/facturas", {"headers": e.auth, "json": {"reserva_id": e.reserva()["id"]}}
+
+
+@_caso("GET /facturas/facturas")
+def _(e):
+    return "/facturas/facturas", {"headers": e.auth}
+
+
+@_caso("GET /facturas/facturas/{factura_id}")
+def _(e):
+    return f"/facturas/facturas/{e.factura()['id']}", {"headers": e.auth}
+
+
+@_caso("PUT /facturas/facturas/{factura_id}")
+def _(e):
+    return f"/facturas/facturas/{e.factura()['id']}", {"headers": e.auth, "json": {"descuentos": 5}}
+
+
+@_caso("DELETE /facturas/facturas/{factura_id}")
+def _(e):
+    return f"/facturas/facturas/{e.factura()['id']}", {"headers": e.auth}
+
+
+@_caso("POST /pagos")
+def _(e):
+    return "/pagos", {"headers": e.auth, "json": {"factura_id": e.factura()["id"], "monto": 20.0, "metodo_pago": "tarjeta"}}
+
+
+@_caso("GET /pagos")
+def _(e):
+    return "/pagos", {"headers": e.auth}
+
+
+@_caso("GET /pagos/factura/{factura_id}")
+def _(e):
+    return f"/pagos/factura/{e.pago()['factura_id']}", {"headers": e.auth}
+
+
+@_caso("GET /pagos/factura/{factura_id}/saldo")
+def _(e):
+    return f"/pagos/factura/{e.pago()['factura_id']}/saldo", {"headers": e.auth}
+
+
+@_caso("GET /pagos/{pago_id}")
+def _(e):
+    return f"/pagos/{e.pago()['id']}", {"headers": e.auth}
+
+
+# Contabilidad
+
+@_caso("POST /contabilidad/cuentas")
+def _(e):
+    return "/contabilidad/cuentas", {"headers": e.auth, "json": {
+        "codigo": f"8.{next(_tipos)}", "nombre": "Cuenta nueva", "tipo": "egreso"
+    }}
+
+
+@_caso("GET /contabilidad/cuentas")
+def _(e):
+    return "/contabilidad/cuentas", {"headers": e.auth}
+
+
+@_caso("GET /contabilidad/cuentas/{cuenta_id}")
+def _(e):
+    return f"/contabilidad/cuentas/{e.cuenta()['id']}", {"headers": e.auth}
+
+
+@_caso("PUT /contabilidad/cuentas/{cuenta_id}")
+def _(e):
+    return f"/contabilidad/cuentas/{e.cuenta()['id']}", {"headers": e.auth, "json": {"nombre": "Renombrada"}}
+
+
+@_caso("POST /contabilidad/transacciones")
+def _(e):
+    return "/contabilidad/transacciones", {"headers": e.auth, "json": {
+        "cuenta_id": e.cuenta()["id"], "tipo": "ingreso", "concepto": "Venta", "monto": 50.0,
+        "fecha_transaccion": e.dia(0)
+    }}
+
+
+@_caso("GET /contabilidad/transacciones")
+def _(e):
+    return "/contabilidad/transacciones", {"headers": e.auth}
+
+
+@_caso("GET /contabilidad/balance")
+def _(e):
+    return "/contabilidad/balance", {"headers": e.auth, "params": {"fecha_desde": e.dia(-30), "fecha_hasta": e.dia(0)}}
+
+
+# Reportes
+
+@_caso("GET /reportes/ocupacion")
+def _(e):
+    return "/reportes/ocupacion", {"headers": e.auth, "params": {"fecha_desde": e.dia(-30), "fecha_hasta": e.dia(30)}}
+
+
+@_caso("GET /reportes/revpar")
+def _(e):
+    return "/reportes/revpar", {"headers": e.auth, "params": {"fecha_desde": e.dia(-30), "fecha_hasta": e.dia(30)}}
+
+
+@_caso("GET /reportes/ingresos")
+def _(e):
+    return "/reportes/ingresos", {"headers": e.auth, "params": {"fecha_desde": e.dia(-30), "fecha_hasta": e.dia(30)}}
+
+
+@_caso("GET /reportes/libro-diario")
+def _(e):
+    return "/reportes/libro-diario", {"headers": e.auth, "params": {"fecha_desde": e.dia(-30), "fecha_hasta": e.dia(30)}}
+
+
+@_caso("GET /reportes/habitaciones")
+def _(e):
+    return "/reportes/habitaciones", {"headers": e.auth}
+
+
+# Tarifas
+
+@_caso("POST /tarifas/tarifas")
+def _(e):
+    return "/tarifas/tarifas", {"headers": e.auth, "json": {
+        "nombre": "Fin de semana", "tipo": e.habitacion().tipo, "dias_semana": "0000011", "factor": 1.2
+    }}
+
+
+@_caso("GET /tarifas/tarifas")
+def _(e):
+    return "/tarifas/tarifas", {"headers": e.auth}
+
+
+@_caso("PUT /tarifas/tarifas/{tarifa_id}")
+def _(e):
+    return f"/tarifas/tarifas/{e.tarifa()['id']}", {"headers": e.auth, "json": {"precio": 95.0}}
+
+
+@_caso("DELETE /tarifas/tarifas/{tarifa_id}")
+def _(e):
+    return f"/tarifas/tarifas/{e.tarifa()['id']}", {"headers": e.auth}
+
+
+@_caso("POST /tarifas/cotizaciones")
+def _(e):
+    return "/tarifas/cotizaciones", {"headers": e.auth, "json": {"fecha_entrada": e.dia(200), "fecha_salida": e.dia(207)}}
+
+
+@_caso("POST /tarifas/cotizaciones/lote")
+def _(e):
+    return "/tarifas/cotizaciones/lote", {"headers": e.auth, "json": {"estadias": [
+        {"fecha_entrada": e.dia(200 + dias), "fecha_salida": e.dia(203 + dias), "personas": 2}
+        for dias in range(5)
+    ], "top_k": 3}}
+
+
+# Administración y métricas
+
+@_caso("GET /admin/db/pool")
+def _(e):
+    return "/admin/db/pool", {"headers": e.auth}
+
+
+@_caso("POST /admin/db/replicas/snapshot")
+def _(e):
+    e.monkeypatch.setattr(database, "DATABASE_REPLICA_URLS", [f"sqlite:///{e.tmp_path / 'replica.db'}"])
+    return "/admin/db/replicas/snapshot", {"headers": e.auth}
+
+
+@_caso("GET /admin/db/consultas-lentas")
+def _(e):
+    return "/admin/db/consultas-lentas", {"headers": e.auth}
+
+
+@_caso("DELETE /admin/db/consultas-lentas")
+def _(e):
+    return "/admin/db/consultas-lentas", {"headers": e.auth}
+
+
+@_caso("POST /admin/perfiles/token")
+def _(e):
+    return "/admin/perfiles/token", {"headers": e.auth}
+
+
+@_caso("GET /admin/perfiles")
+def _(e):
+    return "/admin/perfiles", {"headers": e.auth}
+
+
+@_caso("GET /admin/perfiles/{nombre}")
+def _(e):
+    return f"/admin/perfiles/{e.perfil()}", {"headers": e.auth}
+
+
+@_caso("GET /admin/perfiles/{nombre}/resumen")
+def _(e):
+    return f"/admin/perfiles/{e.perfil()}/resumen", {"headers": e.auth}
+
+
+@_caso("GET /admin/trazas")
+def _(e):
+    return "/admin/trazas", {"headers": e.auth}
+
+
+@_caso("GET /admin/programador")
+def _(e):
+    return "/admin/programador", {"headers": e.auth}
+
+
+@_caso("GET /admin/programador/ejecuciones")
+def _(e):
+    return "/admin/programador/ejecuciones", {"headers": e.auth}
+
+
+@_caso("POST /admin/programador/tareas/{nombre}/ejecutar")
+def _(e):
+    # La tarea corre después en el ejecutor del programador: se mide la petición
+    lanzadas = []
+    e.monkeypatch.setattr(programador, "_lanzar", lanzadas.append)
+    return "/admin/programador/tareas/auditoria_nocturna/ejecutar", {"headers": e.auth}
+
+
+@_caso("GET /metrics")
+def _(e):
+    return "/metrics", {}
+
+
+def test_todos_los_presupuestos_tienen_caso():
+    assert sorted(set(PRESUPUESTOS_RUTAS) - set(CASOS)) == []
+    assert sorted(set(CASOS) - set(PRESUPUESTOS_RUTAS)) == []
+
+
+@pytest.mark.parametrize("clave", sorted(CASOS))
+def test_endpoint_dentro_del_presupuesto(client, escenario, presupuesto_consultas, clave):
+    metodo, ruta = clave.split(" ", 1)
+    preparar, umbral = CASOS[clave]
+    url, peticion = preparar(escenario)
+    # La preparación cambia habitaciones: se mide con el catálogo ya recargado
+    catalogo_habitaciones.instantanea(escenario.db)
+    with presupuesto_consultas(metodo, ruta, umbral):
+        respuesta = client.request(metodo, url, **peticion)
+    assert respuesta.status_code == 200, respuesta.text
@@ -0,0 +1,115 @@
+"""
+Pruebas del programador de tareas
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.repositories.programador_repository import programador_repository
+from app.services import programador as programador_module
+from app.services.programador import Cron, Programador
+
+
+@pytest.mark.parametrize("expresion, desde, esperado", [
+    # Estrictamente después: un minuto que coincide no se devuelve otra vez
+    ("*/15 * * * *", datetime(2026, 10, 19, 10, 7, 30), datetime(2026, 10, 19, 10, 15)),
+    ("*/15 * * * *", datetime(2026, 10, 19, 10, 15), datetime(2026, 10, 19, 10, 30)),
+    # Cambio de año
+    ("30 23 31 12 *", datetime(2026, 12, 31, 23, 30), datetime(2027, 12, 31, 23, 30)),
+    # 29 de febrero: el siguiente año bisiesto
+    ("0 0 29 2 *", datetime(2026, 3, 1), datetime(2028, 2, 29)),
+    # Día del mes y de la semana restringidos: basta con uno (13 o lunes)
+    ("0 9 13 * 1", datetime(2026, 11, 10, 10), datetime(2026, 11, 13, 9)),
+    ("0 9 13 * 1", datetime(2026, 10, 14, 10), datetime(2026, 10, 19, 9)),
+    # Con uno de los dos libre, debe coincidir el otro
+    ("0 9 13 * *", datetime(2026, 10, 14, 10), datetime(2026, 11, 13, 9)),
+    # Domingo como 7
+    ("0 8 * * 7", datetime(2026, 10, 19), datetime(2026, 10, 25, 8)),
+    # Rangos y listas
+    ("0 8-10/2,23 * * *", datetime(2026, 10, 19, 8, 30), datetime(2026, 10, 19, 10)),
+])
+def test_cron_siguiente(expresion, desde, esperado):
+    assert Cron(expresion).siguiente(desde) == esperado
+
+
+@pytest.mark.parametrize("expresion", ["60 * * * *", "* * * *", "* 5-2 * * *", "*/0 * * * *", "0 0 31 2 *"])
+def test_cron_invalido(expresion):
+    with pytest.raises(ValueError):
+        Cron(expresion).siguiente(datetime(2026, 10, 19))
+
+
+def test_arriendo_vencido_o_soltado_lo_toma_otro_worker(db):
+    ahora = datetime.now(timezone.utc)
+    vida = timedelta(seconds=60)
+    assert programador_repository.adquirir_arriendo(db, "prueba_arriendo", "a", ahora, vida)
+    assert not programador_repository.adquirir_arriendo(db, "prueba_arriendo", "b", ahora, vida)
+    # El titular lo renueva
+    assert programador_repository.adquirir_arriendo(db, "prueba_arriendo", "a", ahora + timedelta(seconds=30), vida)
+    assert not programador_repository.adquirir_arriendo(db, "prueba_arriendo", "b", ahora + timedelta(seconds=61), vida)
+
+    # Sin renovar, vence y otro worker lo toma
+    assert programador_repository.adquirir_arriendo(db, "prueba_arriendo", "b", ahora + timedelta(seconds=91), vida)
+    assert not programador_repository.adquirir_arriendo(db, "prueba_arriendo", "a", ahora + timedelta(seconds=92), vida)
+
+    # Soltarlo (parada ordenada) lo deja libre al momento
+    programador_repository.soltar_arriendo(db, "prueba_arriendo", "b", ahora + timedelta(seconds=100))
+    assert programador_repository.adquirir_arriendo(db, "prueba_arriendo", "a", ahora + timedelta(seconds=101), vida)
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    """Dos programadores con la misma tarea, que la ejecutan en el hilo de la prueba"""
+    monkeypatch.setattr(programador_module, "ARRIENDO", "prueba_programador")
+    ejecutadas = []
+    creados = []
+    for nombre in ("a", "b"):
+        worker = Programador()
+        worker.titular = f"prueba-{nombre}"
+        worker.registrar(
+            "prueba_minuto",
+            "* * * * *",
+            lambda db, nombre=nombre: ejecutadas.append(nombre)
+        )
+        worker._lanzar = lambda tarea, worker=worker: worker._ejecutar(tarea)
+        creados.append(worker)
+    yield creados, ejecutadas
+
+
+def test_solo_el_lider_ejecuta_y_el_nuevo_lider_sigue_el_historial(db, workers):
+    (a, b), ejecutadas = workers
+    ahora = datetime.now()
+
+    a._revisar(ahora)
+    b._revisar(ahora)
+    assert (a.lider, b.lider) == (True, False)
+    # Próxima ejecución: el minuto siguiente
+    a._revisar(ahora + timedelta(minutes=2))
+    b._revisar(ahora + timedelta(minutes=2))
+    assert ejecutadas == ["a"]
+
+    [ejecucion] = programador_repository.get_ejecuciones(db, "prueba_minuto")
+    assert (ejecucion.titular, ejecucion.estado, ejecucion.error) == ("prueba-a", "Completada", None)
+    assert ejecucion.fin is not None and ejecucion.duracion >= 0
+
+    # A se detiene; B toma el mando y calcula la próxima desde el historial:
+    # en el mismo minuto de la ejecución de A no la repite
+    programador_repository.soltar_arriendo(db, "prueba_programador", a.titular, datetime.now(timezone.utc))
+    inicio_a = programador_module._a_local(ejecucion.inicio)
+    b._revisar(inicio_a)
+    assert b.lider and ejecutadas == ["a"]
+
+
+def test_ejecucion_fallida_queda_en_el_historial(db, workers):
+    (a, _), _ = workers
+
+    def fallar(db):
+        raise RuntimeError("sin conexión con el banco")
+
+    a.registrar("prueba_fallida", "0 3 * * *", fallar)
+    a.ejecutar_ahora("prueba_fallida")
+
+    [ejecucion] = programador_repository.get_ejecuciones(db, "prueba_fallida")
+    assert ejecucion.estado == "Error"
+    assert ejecucion.error == "RuntimeError: sin conexión con el banco"
+    assert 'scheduler_job_runs_total{job="prueba_fallida",status="Error"} 1' in a.exportar_prometheus()
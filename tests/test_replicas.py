@@ -0,0 +1,83 @@
+"""
+Pruebas del enrutado de lecturas a réplicas
+"""
+
+import pytest
+
+from app.config import database
+from app.models.cliente import Cliente
+
+
+@pytest.fixture
+def replica(client, monkeypatch, tmp_path):
+    """Réplica SQLite congelada con el estado actual de la base principal"""
+    destino = database.snapshot_sqlite(str(tmp_path / "replica.db"))
+    motor = database.crear_engine(f"sqlite:///{destino}", solo_lectura=True)
+    monkeypatch.setattr(database, "replica_engines", [motor])
+    yield motor
+    motor.dispose()
+
+
+def _ids_clientes(client, auth):
+    respuesta = client.get("/clientes/clientes", headers=auth, params={"limit": 1000})
+    assert respuesta.status_code == 200
+    return {c["id"] for c in respuesta.json()["data"]}
+
+
+def test_lecturas_tras_escribir_van_al_principal(client, auth, replica):
+    client.cookies.clear()
+    respuesta = client.post("/clientes/clientes", headers=auth, json={
+        "nombre": "Réplica",
+        "apellido": "Pruebas",
+        "identificacion": "REPLICA001",
+        "email": "replica@pruebas.com"
+    })
+    assert respuesta.status_code == 200
+    assert database.COOKIE_ESCRITURA in respuesta.cookies
+    nuevo = respuesta.json()["data"]["id"]
+
+    # Con la cookie, el listado se lee del principal y ve el alta
+    assert nuevo in _ids_clientes(client, auth)
+
+    # Sin ella se lee de la réplica, que aún no la tiene
+    client.cookies.clear()
+    assert nuevo not in _ids_clientes(client, auth)
+
+
+def test_sin_replicas_no_se_emite_la_cookie(client, auth):
+    client.cookies.clear()
+    respuesta = client.post("/clientes/clientes", headers=auth, json={
+        "nombre": "Principal",
+        "apellido": "Pruebas",
+        "identificacion": "REPLICA002",
+        "email": "principal@pruebas.com"
+    })
+    assert respuesta.status_code == 200
+    assert database.COOKIE_ESCRITURA not in respuesta.cookies
+
+
+def test_la_sesion_lee_siempre_de_la_misma_replica(replica, monkeypatch):
+    otra = database.crear_engine(str(replica.url), solo_lectura=True)
+    monkeypatch.setattr(database, "replica_engines", [replica, otra])
+    try:
+        for _ in range(10):
+            sesion = database.SessionLocal()
+            sesion.info["solo_lectura"] = True
+            assert len({sesion.get_bind() for _ in range(20)}) == 1
+            sesion.close()
+    finally:
+        otra.dispose()
+
+
+def test_un_flush_fija_la_sesion_en_el_principal(replica):
+    sesion = database.SessionLocal()
+    sesion.info["solo_lectura"] = True
+    try:
+        assert sesion.get_bind() is replica
+        sesion.add(Cliente(nombre="Flush", apellido="Pruebas", identificacion="REPLICA003", email="flush@pruebas.com"))
+        sesion.flush()
+        assert sesion.info["escritura"]
+        assert sesion.get_bind() is database.engine
+    finally:
+        sesion.rollback()
+        sesion.close()
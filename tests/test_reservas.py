@@ -0,0 +1,60 @@
+"""
+Pruebas de la modificación de reservas
+"""
+
+from datetime import date, timedelta
+
+
+def _dia(dias: int) -> str:
+    return (date.today() + timedelta(days=dias)).isoformat()
+
+
+def _reservar(client, auth, habitacion_id: int, cliente_id: int, entrada: int, salida: int) -> dict:
+    resp = client.post("/reservas/reservas", headers=auth, json={
+        "cliente_id": cliente_id,
+        "habitacion_id": habitacion_id,
+        "fecha_entrada": _dia(entrada),
+        "fecha_salida": _dia(salida)
+    })
+    assert resp.status_code == 200, resp.text
+    return resp.json()["data"]
+
+
+def test_cambio_de_fechas_recalcula_precio_y_comprueba_disponibilidad(
+    client, auth, crear_habitacion, crear_cliente
+):
+    habitacion_id, cliente_id = crear_habitacion(precio_noche=100.0).id, crear_cliente().id
+    reserva = _reservar(client, auth, habitacion_id, cliente_id, 120, 122)
+    _reservar(client, auth, habitacion_id, cliente_id, 125, 126)
+
+    resp = client.put(f"/reservas/reservas/{reserva['id']}", json={
+        "fecha_entrada": _dia(121), "fecha_salida": _dia(124)
+    })
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["data"]["precio_total"] == reserva["precio_total"] / 2 * 3
+
+    # Se solapa con la segunda reserva; la propia no cuenta como conflicto
+    resp = client.put(f"/reservas/reservas/{reserva['id']}", json={
+        "fecha_entrada": _dia(124), "fecha_salida": _dia(126)
+    })
+    assert resp.status_code == 400
+    resp = client.put(f"/reservas/reservas/{reserva['id']}", json={
+        "fecha_entrada": _dia(122), "fecha_salida": _dia(125)
+    })
+    assert resp.status_code == 200, resp.text
+
+
+def test_reglas_de_estado(client, auth, crear_habitacion, crear_cliente):
+    reserva = _reservar(client, auth, crear_habitacion().id, crear_cliente().id, 130, 131)
+    url = f"/reservas/reservas/{reserva['id']}"
+
+    assert client.put(url, json={"estado": "Pendiente"}).status_code == 400
+
+    resp = client.put(url, json={"estado": "Cancelada", "observaciones": "Cambio de planes"})
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["data"]["estado"] == "Cancelada"
+    assert resp.json()["data"]["observaciones"] == "Cambio de planes"
+
+    # Una reserva cancelada ya no se modifica
+    assert client.put(url, json={"observaciones": "Otra"}).status_code == 400
+    assert client.put("/reservas/reservas/999999", json={"observaciones": "x"}).status_code == 404
@@ -0,0 +1,22 @@
+"""
+Pruebas del renderizado rápido de respuestas
+"""
+
+import json
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+
+from app.config import respuestas
+from app.schemas.common import ResponseData
+
+
+def test_renderizado_rapido_igual_a_fastapi():
+    contenido = ResponseData(
+        success=True,
+        message="ok",
+        data={"creado": datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc)}
+    )
+    cuerpo = json.loads(respuestas.renderizar(contenido))
+    assert cuerpo["data"]["creado"] == "2024-01-01T12:30:00Z"
+    assert cuerpo == jsonable_encoder(contenido)
@@ -0,0 +1,102 @@
+"""
+Pruebas de las trazas: muestreo y jerarquía de spans
+"""
+
+from collections import deque
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+
+from app.config import trazas
+
+
+@pytest.fixture
+def exportadas(monkeypatch):
+    """Trazas exportadas a memoria durante la prueba"""
+    monkeypatch.setattr(trazas, "TRAZAS_EXPORTADOR", "memoria")
+    monkeypatch.setattr(trazas, "trazas_recientes", deque(maxlen=10))
+    return trazas.trazas_recientes
+
+
+@pytest.fixture
+def sql_instrumentado():
+    trazas.instalar_trazas_sql()
+    yield
+    event.remove(Engine, "before_cursor_execute", trazas._antes_de_ejecutar)
+    event.remove(Engine, "after_cursor_execute", trazas._despues_de_ejecutar)
+    event.remove(Engine, "handle_error", trazas._error_sql)
+
+
+def test_reglas_de_muestreo_por_metodo_y_prefijo(monkeypatch):
+    reglas = trazas._reglas_muestreo(" post /reservas=0, GET /reportes=0.5,GET /=1, incompleta")
+    assert reglas == [("POST", "/reservas", 0.0), ("GET", "/reportes", 0.5), ("GET", "/", 1.0)]
+
+    monkeypatch.setattr(trazas, "TRAZAS_MUESTREO", 1.0)
+    monkeypatch.setattr(trazas, "TRAZAS_MUESTREO_RUTAS", reglas)
+    monkeypatch.setattr(trazas.random, "random", lambda: 0.7)
+    # Una fracción 0 nunca muestrea, aunque el valor por defecto sea 1
+    assert not trazas._muestrear("POST", "/reservas/reservas")
+    # Gana la primera regla que coincide
+    assert not trazas._muestrear("GET", "/reportes/ocupacion")
+    assert trazas._muestrear("GET", "/clientes")
+    # Sin regla aplicable se usa TRAZAS_MUESTREO
+    assert trazas._muestrear("DELETE", "/reservas/reservas/1")
+
+
+def _app(motor) -> FastAPI:
+    class Servicio:
+        def reservar(self, reserva_id: int) -> int:
+            with trazas.span("calcular_precio"):
+                pass
+            with motor.connect() as conn:
+                return conn.execute(text("SELECT :id"), {"id": reserva_id}).scalar()
+
+    servicio = Servicio()
+    assert trazas.instrumentar(servicio, "service") == 1
+
+    app = FastAPI()
+
+    @app.get("/reservas/{reserva_id}")
+    def reservar(reserva_id: int):
+        return {"id": servicio.reservar(reserva_id)}
+
+    app.add_middleware(trazas.TrazasMiddleware)
+    return app
+
+
+def test_spans_de_servicio_y_sql_cuelgan_de_la_peticion(tmp_path, exportadas, sql_instrumentado, monkeypatch):
+    monkeypatch.setattr(trazas, "TRAZAS_MUESTREO", 1.0)
+    motor = create_engine(f"sqlite:///{tmp_path / 'trazas.db'}")
+    with TestClient(_app(motor)) as cliente:
+        assert cliente.get("/reservas/7").json() == {"id": 7}
+    motor.dispose()
+
+    [traza] = exportadas
+    spans = {span["name"]: span for span in traza}
+    raiz = spans["GET /reservas/{reserva_id}"]
+    servicio = spans["service.Servicio.reservar"]
+    assert raiz["parentSpanId"] == "" and raiz["kind"] == "SPAN_KIND_SERVER"
+    assert servicio["parentSpanId"] == raiz["spanId"]
+    assert spans["calcular_precio"]["parentSpanId"] == servicio["spanId"]
+    assert spans["SQL SELECT"]["parentSpanId"] == servicio["spanId"]
+    assert spans["SQL SELECT"]["kind"] == "SPAN_KIND_CLIENT"
+    assert {span["traceId"] for span in traza} == {raiz["traceId"]}
+
+
+def test_traceparent_entrante_muestreado_continua_la_traza(tmp_path, exportadas, monkeypatch):
+    monkeypatch.setattr(trazas, "TRAZAS_MUESTREO", 0.0)
+    motor = create_engine(f"sqlite:///{tmp_path / 'trazas.db'}")
+    trace_id, padre = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+    with TestClient(_app(motor)) as cliente:
+        cliente.get("/reservas/1", headers={"traceparent": f"00-{trace_id}-{padre}-01"})
+        # No muestreada por el llamante ni por la fracción local
+        cliente.get("/reservas/2", headers={"traceparent": f"00-{trace_id}-{padre}-00"})
+        cliente.get("/reservas/3")
+    motor.dispose()
+
+    [traza] = exportadas
+    raiz = next(span for span in traza if span["kind"] == "SPAN_KIND_SERVER")
+    assert (raiz["traceId"], raiz["parentSpanId"]) == (trace_id, padre)
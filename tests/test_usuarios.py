@@ -0,0 +1,49 @@
+"""
+Pruebas del alta de usuarios y del cambio de contraseña
+"""
+
+
+def _login(client, username: str, password: str):
+    return client.post("/auth/login", json={"username": username, "password": password})
+
+
+def test_usuario_creado_puede_iniciar_sesion(client, auth):
+    resp = client.post("/usuarios/usuarios", headers=auth, json={
+        "username": "recepcion_alta",
+        "email": "recepcion_alta@pruebas.com",
+        "nombre": "Recepción",
+        "apellido": "Alta",
+        "rol": "Recepcionista",
+        "password": "clave_inicial"
+    })
+    assert resp.status_code < 300, resp.text
+
+    login = _login(client, "recepcion_alta", "clave_inicial")
+    assert login.status_code == 200, login.text
+    assert login.json()["data"]["access_token"]
+    assert _login(client, "recepcion_alta", "otra_clave").status_code == 401
+
+
+def test_cambio_de_contrasena(client, auth):
+    client.post("/usuarios/usuarios", headers=auth, json={
+        "username": "recepcion_cambio",
+        "email": "recepcion_cambio@pruebas.com",
+        "nombre": "Recepción",
+        "apellido": "Cambio",
+        "rol": "Recepcionista",
+        "password": "clave_vieja"
+    })
+    token = _login(client, "recepcion_cambio", "clave_vieja").json()["data"]["access_token"]
+    cabeceras = {"Authorization": f"Bearer {token}"}
+
+    incorrecta = client.post("/auth/change-password", headers=cabeceras, json={
+        "old_password": "no_es_esta", "new_password": "clave_nueva"
+    })
+    assert incorrecta.status_code == 400
+
+    resp = client.post("/auth/change-password", headers=cabeceras, json={
+        "old_password": "clave_vieja", "new_password": "clave_nueva"
+    })
+    assert resp.status_code == 200, resp.text
+    assert _login(client, "recepcion_cambio", "clave_nueva").status_code == 200
+    assert _login(client, "recepcion_cambio", "clave_vieja").status_code == 401
@@ -0,0 +1,45 @@
+"""
+Pruebas del GET condicional de los catálogos
+"""
+
+from datetime import date, timedelta
+
+
+def test_etag_de_habitaciones_cambia_con_las_reservas(client, auth, crear_habitacion, crear_cliente):
+    habitacion = crear_habitacion()
+    cliente = crear_cliente()
+    # Una página que incluya la habitación aunque otras pruebas hayan creado más
+    pagina = {"limit": 10000}
+    respuesta = client.get("/habitaciones/habitaciones", headers=auth, params=pagina)
+    etag = respuesta.headers["etag"]
+
+    entrada = date.today()
+    respuesta = client.post("/reservas/reservas", headers=auth, json={
+        "cliente_id": cliente.id,
+        "habitacion_id": habitacion.id,
+        "fecha_entrada": entrada.isoformat(),
+        "fecha_salida": (entrada + timedelta(days=1)).isoformat()
+    })
+    assert respuesta.status_code == 200, respuesta.text
+
+    respuesta = client.get(
+        "/habitaciones/habitaciones",
+        headers={**auth, "If-None-Match": etag},
+        params=pagina
+    )
+    assert respuesta.status_code == 200
+    assert respuesta.headers["etag"] != etag
+    estados = {h["id"]: h["estado"] for h in respuesta.json()["data"]}
+    assert estados[habitacion.id] == "Reservada"
+
+
+def test_etag_de_habitaciones_cambia_al_modificar_el_catalogo(client, auth, crear_habitacion):
+    habitacion = crear_habitacion()
+    etag = client.get("/habitaciones/habitaciones", headers=auth).headers["etag"]
+
+    respuesta = client.put(f"/habitaciones/habitaciones/{habitacion.id}", headers=auth, json={"precio_noche": 120.0})
+    assert respuesta.status_code == 200, respuesta.text
+
+    respuesta = client.get("/habitaciones/habitaciones", headers={**auth, "If-None-Match": etag})
+    assert respuesta.status_code == 200
+    assert respuesta.headers["etag"] != etag